@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Reporte
+from .models import Reporte, PronosticoProducto, MetricaCliente
 
 
 @admin.register(Reporte)
@@ -21,3 +21,21 @@ class ReporteAdmin(admin.ModelAdmin):
             'fields': ('registros_procesados', 'tiempo_generacion', 'fecha_generacion')
         }),
     )
+
+
+@admin.register(PronosticoProducto)
+class PronosticoProductoAdmin(admin.ModelAdmin):
+    list_display = ['producto', 'stock', 'velocidad_diaria', 'dias_cobertura', 'fecha_quiebre', 'punto_reorden', 'cantidad_sugerida', 'requiere_reorden']
+    list_filter = ['requiere_reorden', 'fecha_calculo']
+    search_fields = ['producto__codigo', 'producto__nombre']
+    list_select_related = ['producto']
+    readonly_fields = [field.name for field in PronosticoProducto._meta.fields]
+
+
+@admin.register(MetricaCliente)
+class MetricaClienteAdmin(admin.ModelAdmin):
+    list_display = ['cliente', 'segmento', 'recencia_dias', 'frecuencia', 'monto_total', 'ultima_compra', 'r_score', 'f_score', 'm_score']
+    list_filter = ['segmento', 'r_score', 'f_score']
+    search_fields = ['cliente__nombre', 'cliente__apellido', 'cliente__ci']
+    list_select_related = ['cliente']
+    readonly_fields = [field.name for field in MetricaCliente._meta.fields]
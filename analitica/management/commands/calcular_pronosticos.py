@@ -0,0 +1,167 @@
+"""
+Calcula la velocidad de venta, días de cobertura y punto de reorden de todos los productos.
+
+Pensado para ejecutarse cada noche:
+    python manage.py calcular_pronosticos
+    python manage.py calcular_pronosticos --ventana 56 --tiempo-reposicion 10
+"""
+import time
+from datetime import datetime, timedelta
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.db.models import Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from analitica.models import PronosticoProducto
+from analitica.utils.pronosticos import calcular_indicadores
+from inventario.modelsProducto import Producto
+from transacciones.modelsDetalleNotaDeVenta import DetalleNotaDeVenta
+
+TAMANO_LOTE = 5000
+
+
+class Command(BaseCommand):
+    help = 'Recalcula los pronósticos de reabastecimiento de todos los productos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias-historia', type=int, default=730, help='Días de ventas a cargar (por defecto 730)')
+        parser.add_argument('--ventana', type=int, default=28, help='Días del promedio móvil (por defecto 28)')
+        parser.add_argument('--tiempo-reposicion', type=int, default=7, help='Días que tarda un pedido (por defecto 7)')
+        parser.add_argument('--factor-servicio', type=float, default=1.65, help='z del nivel de servicio (1.65 ≈ 95%%)')
+        parser.add_argument('--cobertura-objetivo', type=int, default=30, help='Días que debe cubrir un pedido (por defecto 30)')
+
+    def handle(self, *args, **options):
+        dias_historia = options['dias_historia']
+        if dias_historia <= 0 or options['ventana'] <= 0:
+            raise CommandError("--dias-historia y --ventana deben ser mayores a 0")
+
+        ahora = timezone.now()
+        hoy = timezone.localdate()
+        inicio = hoy - timedelta(days=dias_historia - 1)
+
+        t0 = time.perf_counter()
+        ids, stock = self.cargar_productos()
+        if not len(ids):
+            self.stdout.write("ℹ️ No hay productos para pronosticar")
+            return
+        producto_idx, dia_idx, unidades = self.cargar_demanda(ids, inicio)
+        t1 = time.perf_counter()
+
+        indicadores = calcular_indicadores(
+            producto_idx, dia_idx, unidades, stock, dias_historia,
+            ventana=options['ventana'],
+            tiempo_reposicion=options['tiempo_reposicion'],
+            factor_servicio=options['factor_servicio'],
+            cobertura_objetivo=options['cobertura_objetivo'],
+        )
+        t2 = time.perf_counter()
+
+        self.guardar(ids, stock, indicadores, ahora, hoy, min(options['ventana'], dias_historia))
+        t3 = time.perf_counter()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {len(ids)} productos, {len(unidades)} filas de demanda: "
+            f"carga {t1 - t0:.2f}s, cálculo {t2 - t1:.2f}s, escritura {t3 - t2:.2f}s. "
+            f"{int(indicadores['requiere_reorden'].sum())} productos requieren reorden"
+        ))
+
+    def cargar_productos(self):
+        filas = list(Producto.objects.order_by('id').values_list('id', 'stock'))
+        ids = np.fromiter((f[0] for f in filas), dtype=np.int64, count=len(filas))
+        stock = np.fromiter((f[1] for f in filas), dtype=np.int64, count=len(filas))
+        return ids, stock
+
+    def cargar_demanda(self, ids, inicio):
+        """
+        Unidades vendidas por producto y día (agrupadas en la base de datos), como arrays dispersos
+        """
+        filas = list(
+            DetalleNotaDeVenta.objects.filter(
+                nota_venta__estado='pagada',
+                nota_venta__fecha__gte=timezone.make_aware(datetime.combine(inicio, datetime.min.time())),
+            )
+            .annotate(dia=TruncDate('nota_venta__fecha'))
+            .order_by()
+            .values('producto_id', 'dia')
+            .annotate(unidades=Sum('cantidad'))
+            .values_list('producto_id', 'dia', 'unidades')
+        )
+        if not filas:
+            vacio = np.empty(0, dtype=np.int64)
+            return vacio, vacio, vacio
+
+        producto_ids = np.fromiter((f[0] for f in filas), dtype=np.int64, count=len(filas))
+        dias = np.array([f[1] for f in filas], dtype='datetime64[D]')
+        unidades = np.fromiter((f[2] for f in filas), dtype=np.int64, count=len(filas))
+
+        # ID de producto -> posición en `ids` (ordenado)
+        producto_idx = np.searchsorted(ids, producto_ids)
+        producto_idx = np.minimum(producto_idx, len(ids) - 1)
+        validos = ids[producto_idx] == producto_ids
+        dia_idx = (dias - np.datetime64(inicio, 'D')).astype(np.int64)
+
+        return producto_idx[validos], dia_idx[validos], unidades[validos]
+
+    def guardar(self, ids, stock, indicadores, ahora, hoy, ventana):
+        """
+        Reemplaza todos los pronósticos. Con ~100k filas, un INSERT parametrizado con
+        executemany evita el costo de preparar cada campo de cada instancia en bulk_create.
+        """
+        connection = connections[PronosticoProducto.objects.db]
+        opts = PronosticoProducto._meta
+        campos = [
+            'producto', 'fecha_calculo', 'ventana_dias', 'stock', 'unidades_ventana',
+            'velocidad_diaria', 'velocidad_historica', 'desviacion_diaria', 'dias_cobertura',
+            'fecha_quiebre', 'stock_seguridad', 'punto_reorden', 'cantidad_sugerida', 'requiere_reorden',
+        ]
+        tabla = connection.ops.quote_name(opts.db_table)
+        columnas = ", ".join(connection.ops.quote_name(opts.get_field(campo).column) for campo in campos)
+        marcadores = ", ".join(["%s"] * len(campos))
+
+        fecha_calculo = opts.get_field('fecha_calculo').get_db_prep_value(ahora, connection)
+        campo_quiebre = opts.get_field('fecha_quiebre')
+        # Una fecha de quiebre por cantidad de días de cobertura (acotada a 10 años)
+        cobertura = indicadores['dias_cobertura']
+        sin_ventas = np.isnan(cobertura)
+        dias_quiebre = np.where(sin_ventas, 0, np.minimum(np.floor(np.nan_to_num(cobertura)), 3650)).astype(np.int64)
+        fechas_quiebre = {
+            dias: campo_quiebre.get_db_prep_value(hoy + timedelta(days=dias), connection)
+            for dias in np.unique(dias_quiebre[~sin_ventas]).tolist()
+        }
+
+        filas = [
+            (
+                producto_id, fecha_calculo, ventana, stock_actual, unidades_ventana,
+                round(velocidad, 4), round(velocidad_historica, 4), round(desviacion, 4),
+                None if sin_venta else round(dias_cobertura, 1),
+                None if sin_venta else fechas_quiebre[dias],
+                stock_seguridad, punto_reorden, cantidad_sugerida, requiere_reorden,
+            )
+            for (producto_id, stock_actual, unidades_ventana, velocidad, velocidad_historica, desviacion,
+                 dias_cobertura, sin_venta, dias, stock_seguridad, punto_reorden, cantidad_sugerida,
+                 requiere_reorden) in zip(
+                ids.tolist(),
+                stock.tolist(),
+                indicadores['unidades_ventana'].tolist(),
+                indicadores['velocidad_diaria'].tolist(),
+                indicadores['velocidad_historica'].tolist(),
+                indicadores['desviacion_diaria'].tolist(),
+                cobertura.tolist(),
+                sin_ventas.tolist(),
+                dias_quiebre.tolist(),
+                indicadores['stock_seguridad'].tolist(),
+                indicadores['punto_reorden'].tolist(),
+                indicadores['cantidad_sugerida'].tolist(),
+                indicadores['requiere_reorden'].tolist(),
+            )
+        ]
+
+        # Reemplazo completo: los lectores ven el cálculo anterior hasta que se confirma el nuevo
+        with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {tabla}")
+            for inicio in range(0, len(filas), TAMANO_LOTE):
+                cursor.executemany(
+                    f"INSERT INTO {tabla} ({columnas}) VALUES ({marcadores})",
+                    filas[inicio:inicio + TAMANO_LOTE]
+                )
@@ -0,0 +1,102 @@
+"""
+Recalcula las métricas RFM (recencia, frecuencia, monto) y el segmento de todos los clientes.
+
+Pensado para ejecutarse cada noche (refresca la recencia de quienes no volvieron a comprar):
+    python manage.py recalcular_rfm
+"""
+import time
+import numpy as np
+from django.core.management.base import BaseCommand
+from django.db import connections, transaction
+from django.db.models import Count, Max, Min, Sum
+from django.utils import timezone
+from analitica.models import MetricaCliente
+from analitica.utils.rfm import CENTAVOS, calcular_cortes, guardar_cortes, marcar_recalculado, puntuar
+from transacciones.modelsNotaDeVenta import NotaDeVenta
+
+TAMANO_LOTE = 5000
+
+
+class Command(BaseCommand):
+    help = 'Recalcula la segmentación RFM de todos los clientes desde las ventas pagadas'
+
+    def handle(self, *args, **options):
+        ahora = timezone.now()
+
+        t0 = time.perf_counter()
+        # Una fila por cliente, agrupada por la FK (no por el CI en texto)
+        filas = list(
+            NotaDeVenta.objects.filter(estado='pagada')
+            .order_by()
+            .values('cliente_id')
+            .annotate(
+                frecuencia=Count('id'),
+                monto_total=Sum('total'),
+                primera_compra=Min('fecha'),
+                ultima_compra=Max('fecha'),
+            )
+            .values_list('cliente_id', 'frecuencia', 'monto_total', 'primera_compra', 'ultima_compra')
+        )
+        t1 = time.perf_counter()
+
+        frecuencia = np.fromiter((f[1] for f in filas), dtype=np.int64, count=len(filas))
+        monto = np.fromiter((f[2] for f in filas), dtype=np.float64, count=len(filas))
+        recencia = np.fromiter(
+            (max((ahora - f[4]).days, 0) for f in filas), dtype=np.int64, count=len(filas)
+        )
+        cortes = calcular_cortes(recencia, frecuencia, monto)
+        r_score, f_score, m_score, segmento = puntuar(recencia, frecuencia, monto, cortes)
+        t2 = time.perf_counter()
+
+        self.guardar(filas, recencia, r_score, f_score, m_score, segmento, ahora)
+        guardar_cortes(cortes)
+        # Desde ahora top_clientes puede leer la tabla en vez del histórico
+        marcar_recalculado(ahora)
+        t3 = time.perf_counter()
+
+        resumen = ", ".join(
+            f"{nombre}: {cantidad}" for nombre, cantidad in zip(*np.unique(segmento, return_counts=True))
+        ) if len(filas) else "sin clientes con compras"
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {len(filas)} clientes: carga {t1 - t0:.2f}s, cálculo {t2 - t1:.2f}s, "
+            f"escritura {t3 - t2:.2f}s ({resumen})"
+        ))
+
+    def guardar(self, filas, recencia, r_score, f_score, m_score, segmento, ahora):
+        """Reemplaza la tabla completa con un INSERT parametrizado (executemany)"""
+        connection = connections[MetricaCliente.objects.db]
+        opts = MetricaCliente._meta
+        campos = [
+            'cliente', 'primera_compra', 'ultima_compra', 'recencia_dias', 'frecuencia', 'monto_total',
+            'ticket_promedio', 'r_score', 'f_score', 'm_score', 'segmento', 'fecha_actualizacion',
+        ]
+        tabla = connection.ops.quote_name(opts.db_table)
+        columnas = ", ".join(connection.ops.quote_name(opts.get_field(campo).column) for campo in campos)
+        marcadores = ", ".join(["%s"] * len(campos))
+
+        campo_fecha = opts.get_field('ultima_compra')
+        campo_monto = opts.get_field('monto_total')
+        fecha_actualizacion = campo_fecha.get_db_prep_value(ahora, connection)
+
+        registros = [
+            (
+                cliente_id,
+                campo_fecha.get_db_prep_value(primera_compra, connection),
+                campo_fecha.get_db_prep_value(ultima_compra, connection),
+                dias, frecuencia,
+                campo_monto.get_db_prep_save(monto_total, connection),
+                campo_monto.get_db_prep_save((monto_total / frecuencia).quantize(CENTAVOS), connection),
+                r, f, m, seg, fecha_actualizacion,
+            )
+            for (cliente_id, frecuencia, monto_total, primera_compra, ultima_compra), dias, r, f, m, seg in zip(
+                filas, recencia.tolist(), r_score.tolist(), f_score.tolist(), m_score.tolist(), segmento.tolist()
+            )
+        ]
+
+        with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {tabla}")
+            for inicio in range(0, len(registros), TAMANO_LOTE):
+                cursor.executemany(
+                    f"INSERT INTO {tabla} ({columnas}) VALUES ({marcadores})",
+                    registros[inicio:inicio + TAMANO_LOTE]
+                )
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.7 on 2026-10-19 03:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analitica', '0001_initial'),
+        ('inventario', '0010_categoria_umbral_stock_bajo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PronosticoProducto',
+            fields=[
+                ('producto', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='pronostico', serialize=False, to='inventario.producto')),
+                ('fecha_calculo', models.DateTimeField()),
+                ('ventana_dias', models.PositiveIntegerField(help_text='Días usados para el promedio móvil')),
+                ('stock', models.IntegerField(help_text='Stock al momento del cálculo')),
+                ('unidades_ventana', models.IntegerField(default=0, help_text='Unidades vendidas en la ventana')),
+                ('velocidad_diaria', models.FloatField(default=0.0, help_text='Promedio móvil de unidades vendidas por día')),
+                ('velocidad_historica', models.FloatField(default=0.0, help_text='Unidades por día en todo el historial cargado')),
+                ('desviacion_diaria', models.FloatField(default=0.0, help_text='Desviación estándar de la demanda diaria en la ventana')),
+                ('dias_cobertura', models.FloatField(blank=True, help_text='Días hasta agotar el stock (vacío si no hay ventas)', null=True)),
+                ('fecha_quiebre', models.DateField(blank=True, help_text='Fecha estimada de quiebre de stock', null=True)),
+                ('stock_seguridad', models.IntegerField(default=0)),
+                ('punto_reorden', models.IntegerField(default=0)),
+                ('cantidad_sugerida', models.IntegerField(default=0, help_text='Unidades a pedir para cubrir el período objetivo')),
+                ('requiere_reorden', models.BooleanField(default=False)),
+            ],
+            options={
+                'verbose_name': 'Pronóstico de Producto',
+                'verbose_name_plural': 'Pronósticos de Productos',
+                'db_table': 'pronostico_producto',
+                'ordering': ['dias_cobertura'],
+                'indexes': [models.Index(fields=['requiere_reorden', 'dias_cobertura'], name='pronostico__requier_992ff1_idx')],
+            },
+        ),
+    ]
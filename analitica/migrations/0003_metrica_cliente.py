@@ -0,0 +1,39 @@
+# Generated by Django 5.2.7 on 2026-10-19 03:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analitica', '0002_pronostico_producto'),
+        ('perfiles', '0003_devicetoken'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MetricaCliente',
+            fields=[
+                ('cliente', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='metricas', serialize=False, to='perfiles.cliente')),
+                ('primera_compra', models.DateTimeField()),
+                ('ultima_compra', models.DateTimeField()),
+                ('recencia_dias', models.PositiveIntegerField(default=0, help_text='Días desde la última compra')),
+                ('frecuencia', models.PositiveIntegerField(default=0, help_text='Cantidad de compras pagadas')),
+                ('monto_total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('ticket_promedio', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('r_score', models.PositiveSmallIntegerField(default=1)),
+                ('f_score', models.PositiveSmallIntegerField(default=1)),
+                ('m_score', models.PositiveSmallIntegerField(default=1)),
+                ('segmento', models.CharField(choices=[('campeones', 'Campeones'), ('leales', 'Leales'), ('nuevos', 'Nuevos'), ('potenciales', 'Potenciales'), ('en_riesgo', 'En riesgo'), ('hibernando', 'Hibernando'), ('perdidos', 'Perdidos')], default='potenciales', max_length=20)),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Métrica de Cliente',
+                'verbose_name_plural': 'Métricas de Clientes',
+                'db_table': 'metrica_cliente',
+                'ordering': ['-monto_total'],
+                'indexes': [models.Index(fields=['segmento', '-monto_total'], name='metrica_cli_segment_d60dd2_idx'), models.Index(fields=['-monto_total'], name='metrica_cli_monto_t_0f3c57_idx'), models.Index(fields=['frecuencia'], name='metrica_cli_frecuen_c748cc_idx'), models.Index(fields=['ultima_compra'], name='metrica_cli_ultima__86760d_idx')],
+            },
+        ),
+    ]
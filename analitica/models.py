@@ -37,3 +37,91 @@ class Reporte(models.Model):
     
     def __str__(self):
         return f"{self.nombre} - {self.get_tipo_display()} ({self.formato}) - {self.fecha_generacion:%d/%m/%Y}"
+
+
+class PronosticoProducto(models.Model):
+    """
+    Velocidad de venta y punto de reorden por producto.
+    Se recalcula completo cada noche con `python manage.py calcular_pronosticos`.
+    """
+    producto = models.OneToOneField(
+        'inventario.Producto',
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='pronostico'
+    )
+    fecha_calculo = models.DateTimeField()
+    ventana_dias = models.PositiveIntegerField(help_text="Días usados para el promedio móvil")
+    stock = models.IntegerField(help_text="Stock al momento del cálculo")
+    unidades_ventana = models.IntegerField(default=0, help_text="Unidades vendidas en la ventana")
+    velocidad_diaria = models.FloatField(default=0.0, help_text="Promedio móvil de unidades vendidas por día")
+    velocidad_historica = models.FloatField(default=0.0, help_text="Unidades por día en todo el historial cargado")
+    desviacion_diaria = models.FloatField(default=0.0, help_text="Desviación estándar de la demanda diaria en la ventana")
+    dias_cobertura = models.FloatField(null=True, blank=True, help_text="Días hasta agotar el stock (vacío si no hay ventas)")
+    fecha_quiebre = models.DateField(null=True, blank=True, help_text="Fecha estimada de quiebre de stock")
+    stock_seguridad = models.IntegerField(default=0)
+    punto_reorden = models.IntegerField(default=0)
+    cantidad_sugerida = models.IntegerField(default=0, help_text="Unidades a pedir para cubrir el período objetivo")
+    requiere_reorden = models.BooleanField(default=False)
+
+    class Meta:
+        db_table = "pronostico_producto"
+        ordering = ['dias_cobertura']
+        verbose_name = "Pronóstico de Producto"
+        verbose_name_plural = "Pronósticos de Productos"
+        indexes = [
+            models.Index(fields=['requiere_reorden', 'dias_cobertura']),
+        ]
+
+    def __str__(self):
+        return f"Pronóstico {self.producto_id}: {self.velocidad_diaria:.2f} u/día, reorden en {self.punto_reorden}"
+
+
+class MetricaCliente(models.Model):
+    """
+    Métricas RFM (recencia, frecuencia, monto) por cliente.
+    Se actualiza con cada pago confirmado y se recalcula completa con
+    `python manage.py recalcular_rfm` (que también refresca la recencia y los puntajes).
+    """
+    SEGMENTO_CHOICES = [
+        ('campeones', 'Campeones'),
+        ('leales', 'Leales'),
+        ('nuevos', 'Nuevos'),
+        ('potenciales', 'Potenciales'),
+        ('en_riesgo', 'En riesgo'),
+        ('hibernando', 'Hibernando'),
+        ('perdidos', 'Perdidos'),
+    ]
+
+    cliente = models.OneToOneField(
+        'perfiles.Cliente',
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='metricas'
+    )
+    primera_compra = models.DateTimeField()
+    ultima_compra = models.DateTimeField()
+    recencia_dias = models.PositiveIntegerField(default=0, help_text="Días desde la última compra")
+    frecuencia = models.PositiveIntegerField(default=0, help_text="Cantidad de compras pagadas")
+    monto_total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    ticket_promedio = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    r_score = models.PositiveSmallIntegerField(default=1)
+    f_score = models.PositiveSmallIntegerField(default=1)
+    m_score = models.PositiveSmallIntegerField(default=1)
+    segmento = models.CharField(max_length=20, choices=SEGMENTO_CHOICES, default='potenciales')
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "metrica_cliente"
+        ordering = ['-monto_total']
+        verbose_name = "Métrica de Cliente"
+        verbose_name_plural = "Métricas de Clientes"
+        indexes = [
+            models.Index(fields=['segmento', '-monto_total']),
+            models.Index(fields=['-monto_total']),
+            models.Index(fields=['frecuencia']),
+            models.Index(fields=['ultima_compra']),
+        ]
+
+    def __str__(self):
+        return f"RFM {self.cliente_id}: {self.r_score}{self.f_score}{self.m_score} ({self.get_segmento_display()})"
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Reporte
+from .models import Reporte, PronosticoProducto
 from django.contrib.auth.models import User
 
 
@@ -45,6 +45,7 @@ class GenerarReporteEstaticoSerializer(serializers.Serializer):
         ('productos_stock_bajo', 'Productos con Stock Bajo'),
         ('ventas_por_cliente', 'Ventas por Cliente'),
         ('productos_mas_vendidos', 'Productos Más Vendidos'),
+        ('productos_reorden', 'Productos a Reordenar'),
     ])
     formato = serializers.ChoiceField(choices=['PDF', 'XLSX'], default='PDF')
     fecha_inicio = serializers.DateField(required=False, help_text="Fecha inicio para filtros (opcional)")
@@ -82,7 +83,7 @@ class ReportePersonalizadoSerializer(serializers.Serializer):
         help_text="Nombre descriptivo del reporte"
     )
     entidad = serializers.ChoiceField(
-        choices=['productos', 'clientes', 'ventas', 'categorias'],
+        choices=['productos', 'clientes', 'ventas', 'categorias', 'metricas_clientes'],
         help_text="Entidad sobre la cual generar el reporte"
     )
     campos = serializers.ListField(
@@ -156,3 +157,33 @@ class ReporteNaturalSerializer(serializers.Serializer):
                 "La consulta debe tener al menos 5 caracteres"
             )
         return value.strip()
+
+
+class PronosticoProductoSerializer(serializers.ModelSerializer):
+    """Serializer de solo lectura para los pronósticos de reabastecimiento"""
+    producto_codigo = serializers.CharField(source='producto.codigo', read_only=True)
+    producto_nombre = serializers.CharField(source='producto.nombre', read_only=True)
+    categoria = serializers.IntegerField(source='producto.categoria_id', read_only=True)
+
+    class Meta:
+        model = PronosticoProducto
+        fields = [
+            'producto',
+            'producto_codigo',
+            'producto_nombre',
+            'categoria',
+            'fecha_calculo',
+            'ventana_dias',
+            'stock',
+            'unidades_ventana',
+            'velocidad_diaria',
+            'velocidad_historica',
+            'desviacion_diaria',
+            'dias_cobertura',
+            'fecha_quiebre',
+            'stock_seguridad',
+            'punto_reorden',
+            'cantidad_sugerida',
+            'requiere_reorden',
+        ]
+        read_only_fields = fields
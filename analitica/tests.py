@@ -1,3 +1,108 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from analitica.utils.rfm import CLAVE_CORTES, obtener_cortes, registrar_compra_cliente
+from backend_exa2 import pruebas_consultas
+from perfiles.models import Cliente
+from transacciones.modelsListadoHistoricoVentas import ListadoHistoricoVentas
+from transacciones.modelsNotaDeVenta import NotaDeVenta
+
+
+class PresupuestoConsultasTest(pruebas_consultas.PresupuestoConsultasTestCase):
+    app = 'analitica'
+    prefijo = '/api/analitica/'
+    presupuestos = {
+        'api-root': 0,
+        'reporte-list': 1,
+        'reporte-detail': 1,
+        'reporte-disponibles': 0,
+        'reporte-entidades': 0,
+        'reporte-campos-entidad': 0,
+        'reporte-ejemplos-nl': 0,
+        'reporte-historial': 1,
+        'reporte-descargar': 1,
+        'pronostico-list': 2,
+        'pronostico-detail': 1,
+    }
+    argumentos = {'reporte-campos-entidad': {'entidad_id': 'entidad'}}
+
+
+class PronosticosTest(TestCase):
+
+    def test_categoria_invalida(self):
+        cliente = APIClient()
+        cliente.force_authenticate(get_user_model().objects.create(username='admin', is_staff=True))
+        self.assertEqual(cliente.get('/api/analitica/pronosticos/', {'categoria': 'abc'}).status_code, 400)
+        respuesta = cliente.get('/api/analitica/pronosticos/', {'categoria': '3'})
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta.data['total'], 0)
+
+
+class MetricasRfmTest(TestCase):
+    """Métricas RFM incrementales antes y después del primer `recalcular_rfm` (analitica/utils/rfm.py)"""
+
+    def setUp(self):
+        cache.clear()
+        self.ana = Cliente.objects.create(nombre='Ana', apellido='Rojas', ci='100', sexo='F')
+        self.beto = Cliente.objects.create(nombre='Beto', apellido='Paz', ci='200', sexo='M')
+        self.numero = 0
+        self._venta(self.ana, '100.00', dias=90)
+        self._venta(self.ana, '200.00', dias=30)
+        self._venta(self.beto, '1000.00', dias=60)
+
+    def _venta(self, cliente, total, dias=0):
+        self.numero += 1
+        nota = NotaDeVenta.objects.create(
+            numero_comprobante=f"NV-RFM-{self.numero}", cliente=cliente, estado='pagada',
+            subtotal=Decimal(total), total=Decimal(total),
+        )
+        fecha = timezone.now() - timedelta(days=dias)
+        NotaDeVenta.objects.filter(pk=nota.pk).update(fecha=fecha)
+        ListadoHistoricoVentas.objects.create(
+            nota_venta=nota, cliente_nombre=f"{cliente.nombre} {cliente.apellido}", cliente_ci=cliente.ci,
+            numero_venta=nota.numero_comprobante, fecha_venta=fecha, subtotal=nota.total, total=nota.total,
+            metodo_pago='Stripe', estado_pago='pagado', fecha_pago=fecha,
+        )
+        return Decimal(total), fecha
+
+    def test_primer_pago_parte_del_historico(self):
+        monto, fecha = self._venta(self.ana, '50.00')
+        metrica = registrar_compra_cliente(self.ana.pk, monto, fecha)
+        self.assertEqual(metrica.frecuencia, 3)
+        self.assertEqual(metrica.monto_total, Decimal('350.00'))
+        self.assertEqual(metrica.recencia_dias, 0)
+
+        # Con la fila ya creada, el siguiente pago es incremental
+        monto, fecha = self._venta(self.ana, '25.00')
+        metrica = registrar_compra_cliente(self.ana.pk, monto, fecha)
+        self.assertEqual(metrica.frecuencia, 4)
+        self.assertEqual(metrica.monto_total, Decimal('375.00'))
+        self.assertEqual(metrica.ticket_promedio, Decimal('93.75'))
+
+    def test_top_clientes_antes_del_recalculo(self):
+        monto, fecha = self._venta(self.ana, '50.00')
+        registrar_compra_cliente(self.ana.pk, monto, fecha)
+
+        # Solo Ana tiene fila: hasta el recálculo se agrupa el histórico
+        top = self.client.get('/api/transacciones/historial-ventas/top_clientes/').json()['top_clientes']
+        self.assertEqual([(c['cliente_ci'], c['total_compras']) for c in top], [('200', 1), ('100', 3)])
+
+        call_command('recalcular_rfm', stdout=StringIO())
+        top = self.client.get('/api/transacciones/historial-ventas/top_clientes/').json()['top_clientes']
+        self.assertEqual([(c['cliente_ci'], c['total_compras']) for c in top], [('200', 1), ('100', 3)])
+        self.assertIn('segmento', top[0])
+
+    def test_cortes_de_tabla_vacia_no_se_guardan(self):
+        self.assertEqual(obtener_cortes(), {'recencia': [], 'frecuencia': [], 'monto': []})
+        self.assertIsNone(cache.get(CLAVE_CORTES))
 
-# Create your tests here.
+        call_command('recalcular_rfm', stdout=StringIO())
+        self.assertEqual(len(cache.get(CLAVE_CORTES)['monto']), 4)
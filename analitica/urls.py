@@ -1,9 +1,10 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import ReporteViewSet
+from .views import ReporteViewSet, PronosticoProductoViewSet
 
 router = DefaultRouter()
 router.register(r'reportes', ReporteViewSet, basename='reporte')
+router.register(r'pronosticos', PronosticoProductoViewSet, basename='pronostico')
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -0,0 +1,68 @@
+"""
+Cálculo vectorizado de velocidad de venta y punto de reorden.
+
+La demanda se recibe en forma dispersa (una fila por producto y día con ventas) y
+se agrega con np.bincount, así el costo depende de las filas con ventas y no de
+productos × días.
+"""
+import numpy as np
+
+
+def calcular_indicadores(producto_idx, dia_idx, unidades, stock, dias_historia,
+                         ventana=28, tiempo_reposicion=7, factor_servicio=1.65, cobertura_objetivo=30):
+    """
+    Calcula los indicadores de reabastecimiento de todos los productos en una pasada.
+
+    Args:
+        producto_idx: índice (0..n-1) del producto de cada fila de demanda
+        dia_idx: día de cada fila contado desde el inicio del historial (0..dias_historia-1)
+        unidades: unidades vendidas en ese producto/día
+        stock: stock actual de los n productos
+        dias_historia: cantidad de días cargados
+        ventana: días del promedio móvil (los últimos `ventana` días del historial)
+        tiempo_reposicion: días que tarda en llegar un pedido
+        factor_servicio: z del nivel de servicio (1.65 ≈ 95%)
+        cobertura_objetivo: días de venta que debe cubrir un pedido
+
+    Returns:
+        dict: arrays de largo n con los indicadores por producto
+    """
+    n = len(stock)
+    stock = np.asarray(stock, dtype=np.float64)
+    producto_idx = np.asarray(producto_idx, dtype=np.int64)
+    dia_idx = np.asarray(dia_idx, dtype=np.int64)
+    unidades = np.asarray(unidades, dtype=np.float64)
+    ventana = min(ventana, dias_historia)
+
+    en_ventana = dia_idx >= dias_historia - ventana
+    unidades_ventana = np.bincount(producto_idx[en_ventana], weights=unidades[en_ventana], minlength=n)
+    cuadrados_ventana = np.bincount(producto_idx[en_ventana], weights=unidades[en_ventana] ** 2, minlength=n)
+    unidades_historia = np.bincount(producto_idx, weights=unidades, minlength=n)
+
+    # Los días sin ventas cuentan como demanda 0
+    velocidad = unidades_ventana / ventana
+    varianza = np.maximum(cuadrados_ventana / ventana - velocidad ** 2, 0.0)
+    desviacion = np.sqrt(varianza)
+    velocidad_historica = unidades_historia / dias_historia
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        dias_cobertura = np.where(velocidad > 0, np.maximum(stock, 0) / velocidad, np.nan)
+
+    stock_seguridad = np.ceil(factor_servicio * desviacion * np.sqrt(tiempo_reposicion))
+    punto_reorden = np.ceil(velocidad * tiempo_reposicion + stock_seguridad)
+    cantidad_sugerida = np.maximum(
+        np.ceil(velocidad * (tiempo_reposicion + cobertura_objetivo) + stock_seguridad - stock), 0
+    )
+    requiere_reorden = (velocidad > 0) & (stock <= punto_reorden)
+
+    return {
+        'unidades_ventana': unidades_ventana.astype(np.int64),
+        'velocidad_diaria': velocidad,
+        'velocidad_historica': velocidad_historica,
+        'desviacion_diaria': desviacion,
+        'dias_cobertura': dias_cobertura,
+        'stock_seguridad': stock_seguridad.astype(np.int64),
+        'punto_reorden': punto_reorden.astype(np.int64),
+        'cantidad_sugerida': cantidad_sugerida.astype(np.int64),
+        'requiere_reorden': requiere_reorden,
+    }
@@ -91,6 +91,28 @@ REPORTES_ESTATICOS = {
         ],
         'filtros_default': {}
     },
+
+    'productos_reorden': {
+        'nombre': 'Productos a Reordenar',
+        'descripcion': 'Productos cuyo stock no cubre la demanda pronosticada durante la reposición',
+        'modelo': 'analitica.PronosticoProducto',
+        'campos': [
+            'producto__codigo',
+            'producto__nombre',
+            'stock',
+            'velocidad_diaria',
+            'dias_cobertura',
+            'fecha_quiebre',
+            'punto_reorden',
+            'cantidad_sugerida',
+        ],
+        'filtros_default': {
+            'requiere_reorden': True
+        },
+        # Los que se agotan primero arriba; fecha_inicio/fecha_fin filtran por fecha de quiebre
+        'orden': ['dias_cobertura', 'producto__nombre'],
+        'campo_fecha': 'fecha_quiebre',
+    },
 }
 
 
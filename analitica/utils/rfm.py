@@ -0,0 +1,171 @@
+"""
+Segmentación RFM de clientes (recencia, frecuencia, monto).
+
+Cada dimensión se puntúa de 1 a 5 según los quintiles de todos los clientes
+(5 = compró hace poco / compra seguido / gasta más). El segmento se decide con
+los puntajes de recencia y frecuencia. Los cortes de los quintiles los calcula
+`recalcular_rfm` y se guardan en caché para puntuar los pagos nuevos sin
+recorrer la tabla.
+
+Hasta el primer `recalcular_rfm` la tabla solo tiene a los clientes que pagaron
+desde entonces: `tabla_completa()` indica si ya se puede leer en lugar del
+histórico de ventas.
+"""
+import logging
+from decimal import Decimal
+import numpy as np
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+CLAVE_CORTES = 'analitica:rfm:cortes'
+CLAVE_RECALCULADO = 'analitica:rfm:recalculado'
+PERCENTILES = [20, 40, 60, 80]
+CENTAVOS = Decimal('0.01')
+
+
+def calcular_cortes(recencia, frecuencia, monto):
+    """Cortes de los quintiles de cada dimensión (listas de 4 valores)"""
+    if not len(recencia):
+        return {'recencia': [], 'frecuencia': [], 'monto': []}
+    return {
+        'recencia': np.percentile(recencia, PERCENTILES).tolist(),
+        'frecuencia': np.percentile(frecuencia, PERCENTILES).tolist(),
+        'monto': np.percentile(monto, PERCENTILES).tolist(),
+    }
+
+
+def puntuar(recencia, frecuencia, monto, cortes):
+    """
+    Puntajes 1..5 y segmento de cada cliente (arrays, vectorizado)
+
+    Returns:
+        tuple: (r_score, f_score, m_score, segmento)
+    """
+    recencia = np.asarray(recencia, dtype=np.float64)
+    frecuencia = np.asarray(frecuencia, dtype=np.float64)
+    monto = np.asarray(monto, dtype=np.float64)
+
+    # Menos días desde la última compra = mejor
+    r_score = 5 - np.searchsorted(cortes['recencia'], recencia, side='left')
+    # Solo supera un corte quien está estrictamente por encima (muchos empates con 1 compra)
+    f_score = 1 + np.searchsorted(cortes['frecuencia'], frecuencia, side='left')
+    m_score = 1 + np.searchsorted(cortes['monto'], monto, side='left')
+
+    segmento = np.select(
+        [
+            (r_score >= 4) & (f_score >= 4),
+            (r_score >= 3) & (f_score >= 4),
+            (r_score >= 4) & (f_score <= 1),
+            r_score >= 3,
+            f_score >= 3,
+            r_score == 2,
+        ],
+        ['campeones', 'leales', 'nuevos', 'potenciales', 'en_riesgo', 'hibernando'],
+        default='perdidos',
+    )
+    return r_score, f_score, m_score, segmento
+
+
+def guardar_cortes(cortes):
+    cache.set(CLAVE_CORTES, cortes, timeout=None)
+
+
+def marcar_recalculado(fecha):
+    """Registra que `recalcular_rfm` llenó la tabla con todos los clientes"""
+    cache.set(CLAVE_RECALCULADO, fecha.isoformat(), timeout=None)
+
+
+def tabla_completa():
+    """
+    True si la tabla ya se recalculó completa. Si la caché se reinició (o no es
+    compartida con el proceso que corrió el comando) se asume que no: quien lee
+    vuelve al histórico, más lento pero correcto, hasta el siguiente recálculo.
+    """
+    return cache.get(CLAVE_RECALCULADO) is not None
+
+
+def obtener_cortes():
+    """
+    Cortes vigentes. Si no están en caché (otro proceso, caché reiniciada) se
+    recalculan desde la tabla. Los cortes de una tabla vacía no se guardan: con
+    ellos todos los clientes tendrían el mismo puntaje hasta el próximo recálculo.
+    """
+    cortes = cache.get(CLAVE_CORTES)
+    if cortes is None:
+        from analitica.models import MetricaCliente
+        filas = list(MetricaCliente.objects.values_list('recencia_dias', 'frecuencia', 'monto_total'))
+        columnas = np.array(filas, dtype=np.float64).reshape(-1, 3)
+        cortes = calcular_cortes(columnas[:, 0], columnas[:, 1], columnas[:, 2])
+        if filas:
+            guardar_cortes(cortes)
+    return cortes
+
+
+def _metricas_historicas(cliente_id):
+    """Frecuencia, monto y fechas del cliente según todas sus ventas pagadas"""
+    from django.db.models import Count, Max, Min, Sum
+    from transacciones.modelsNotaDeVenta import NotaDeVenta
+
+    return NotaDeVenta.objects.filter(cliente_id=cliente_id, estado='pagada').aggregate(
+        frecuencia=Count('id'),
+        monto_total=Sum('total'),
+        primera_compra=Min('fecha'),
+        ultima_compra=Max('fecha'),
+    )
+
+
+def registrar_compra_cliente(cliente_id, monto, fecha):
+    """
+    Actualiza las métricas de un cliente con una compra pagada (incremental).
+    La recencia de los demás clientes se actualiza en el recálculo periódico.
+
+    Si el cliente aún no tiene fila (primer pago desde el último recálculo, o
+    nunca se recalculó) se crea con todo su histórico de ventas pagadas, que ya
+    incluye esta, y no solo con esta compra.
+    """
+    from analitica.models import MetricaCliente
+
+    with transaction.atomic():
+        metrica = MetricaCliente.objects.select_for_update().filter(cliente_id=cliente_id).first()
+        creada = False
+        if metrica is None:
+            historico = _metricas_historicas(cliente_id)
+            if not historico['frecuencia']:
+                historico = {'frecuencia': 1, 'monto_total': monto, 'primera_compra': fecha, 'ultima_compra': fecha}
+            metrica, creada = MetricaCliente.objects.select_for_update().get_or_create(
+                cliente_id=cliente_id, defaults=historico,
+            )
+        if not creada:
+            metrica.frecuencia += 1
+            metrica.monto_total += monto
+            metrica.primera_compra = min(metrica.primera_compra, fecha)
+            metrica.ultima_compra = max(metrica.ultima_compra, fecha)
+        metrica.ticket_promedio = (metrica.monto_total / metrica.frecuencia).quantize(CENTAVOS)
+        metrica.recencia_dias = max((timezone.now() - metrica.ultima_compra).days, 0)
+
+        r_score, f_score, m_score, segmento = puntuar(
+            [metrica.recencia_dias], [metrica.frecuencia], [metrica.monto_total], obtener_cortes()
+        )
+        metrica.r_score = int(r_score[0])
+        metrica.f_score = int(f_score[0])
+        metrica.m_score = int(m_score[0])
+        metrica.segmento = str(segmento[0])
+        metrica.save()
+    return metrica
+
+
+def programar_registro_compra_cliente(cliente_id, monto, fecha):
+    """
+    Registra la compra cuando se confirma la transacción del pago.
+    Un error aquí no debe afectar al pago: solo se registra en el log.
+    """
+    def registrar():
+        try:
+            registrar_compra_cliente(cliente_id, monto, fecha)
+        except Exception as e:
+            logger.error(f"Error actualizando métricas RFM del cliente {cliente_id}: {e}")
+
+    transaction.on_commit(registrar)
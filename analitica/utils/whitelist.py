@@ -156,6 +156,39 @@ ENTIDADES_DISPONIBLES = {
             'total__lt': {'label': 'Total menor a', 'tipo': 'number'},
         }
     },
+    
+    'metricas_clientes': {
+        'nombre': 'Segmentación de Clientes (RFM)',
+        'modelo': 'analitica.MetricaCliente',
+        'campos_disponibles': {
+            'cliente__id': {'label': 'ID Cliente', 'tipo': 'number'},
+            'cliente__nombre': {'label': 'Nombre Cliente', 'tipo': 'text'},
+            'cliente__apellido': {'label': 'Apellido Cliente', 'tipo': 'text'},
+            'cliente__ci': {'label': 'CI Cliente', 'tipo': 'text'},
+            'cliente__telefono': {'label': 'Teléfono Cliente', 'tipo': 'text'},
+            'segmento': {'label': 'Segmento', 'tipo': 'text'},
+            'recencia_dias': {'label': 'Días desde la Última Compra', 'tipo': 'number'},
+            'frecuencia': {'label': 'Cantidad de Compras', 'tipo': 'number'},
+            'monto_total': {'label': 'Monto Total', 'tipo': 'number'},
+            'ticket_promedio': {'label': 'Ticket Promedio', 'tipo': 'number'},
+            'primera_compra': {'label': 'Primera Compra', 'tipo': 'date'},
+            'ultima_compra': {'label': 'Última Compra', 'tipo': 'date'},
+            'r_score': {'label': 'Puntaje Recencia', 'tipo': 'number'},
+            'f_score': {'label': 'Puntaje Frecuencia', 'tipo': 'number'},
+            'm_score': {'label': 'Puntaje Monto', 'tipo': 'number'},
+        },
+        'filtros_disponibles': {
+            'segmento': {'label': 'Segmento', 'tipo': 'choice', 'choices': ['campeones', 'leales', 'nuevos', 'potenciales', 'en_riesgo', 'hibernando', 'perdidos']},
+            'recencia_dias__lte': {'label': 'Compró hace como máximo (días)', 'tipo': 'number'},
+            'recencia_dias__gte': {'label': 'Sin comprar hace al menos (días)', 'tipo': 'number'},
+            'frecuencia__gte': {'label': 'Compras mínimas', 'tipo': 'number'},
+            'monto_total__gte': {'label': 'Monto total mayor o igual a', 'tipo': 'number'},
+            'monto_total__lte': {'label': 'Monto total menor o igual a', 'tipo': 'number'},
+            'ultima_compra__gte': {'label': 'Última compra desde', 'tipo': 'date'},
+            'ultima_compra__lte': {'label': 'Última compra hasta', 'tipo': 'date'},
+            'cliente__nombre__icontains': {'label': 'Cliente nombre contiene', 'tipo': 'text'},
+        }
+    },
 }
 
 
@@ -3,28 +3,30 @@ Vistas para el módulo de Reportes con Lenguaje Natural
 """
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.http import FileResponse
 from django.utils import timezone
-from django.db.models import Sum, Count, Q
+from django.db.models import Sum, Count, Q, F
 from django.apps import apps
 from datetime import datetime, timedelta
 import time
 import json
 
-from .models import Reporte
+from .models import Reporte, PronosticoProducto
 from .serializers import (
     ReporteSerializer,
     GenerarReporteEstaticoSerializer,
     ReporteHistorialSerializer,
     ReporteNaturalSerializer,
-    ReportePersonalizadoSerializer
+    ReportePersonalizadoSerializer,
+    PronosticoProductoSerializer
 )
 from .utils.reportes_config import obtener_config_reporte, listar_reportes_disponibles
-from .utils.pdf_generator import generar_pdf_simple
-from .utils.excel_generator import generar_excel
 from .utils.nl_parser import interpretar_consulta, generar_ejemplos_consultas
+# pdf_generator (reportlab) y excel_generator (openpyxl) se importan al generar el
+# archivo: cargarlos con las vistas sumaba ~0,2 s al arranque de cada worker
 
 
 class ReporteViewSet(viewsets.ModelViewSet):
@@ -35,8 +37,8 @@ class ReporteViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     
     def get_queryset(self):
-        # Cada usuario solo ve sus propios reportes
-        return Reporte.objects.filter(usuario=self.request.user)
+        # Cada usuario solo ve sus propios reportes (el usuario va en la misma consulta)
+        return Reporte.objects.filter(usuario_id=self.request.user.id).select_related('usuario')
     
     @action(detail=False, methods=['get'])
     def disponibles(self, request):
@@ -149,7 +151,7 @@ class ReporteViewSet(viewsets.ModelViewSet):
             
             # Guardar registro en base de datos
             reporte = Reporte.objects.create(
-                usuario=request.user,
+                usuario_id=request.user.id,
                 tipo='ESTATICO',
                 nombre=config['nombre'],
                 descripcion=config['descripcion'],
@@ -262,7 +264,7 @@ class ReporteViewSet(viewsets.ModelViewSet):
             # Aplicar select_related según el modelo para optimizar queries
             if model_name == 'Producto':
                 queryset = queryset.select_related('categoria')
-            elif model_name == 'NotaDeVenta':
+            elif model_name in ('NotaDeVenta', 'MetricaCliente'):
                 queryset = queryset.select_related('cliente')
             
             # Aplicar filtros si existen
@@ -304,7 +306,7 @@ class ReporteViewSet(viewsets.ModelViewSet):
             
             # Guardar registro en base de datos
             reporte = Reporte.objects.create(
-                usuario=request.user,
+                usuario_id=request.user.id,
                 tipo='PERSONALIZADO',
                 nombre=data['nombre'],
                 descripcion=f"Reporte personalizado de {config_entidad['nombre']}",
@@ -502,7 +504,7 @@ class ReporteViewSet(viewsets.ModelViewSet):
             
             # Guardar registro en base de datos
             reporte = Reporte.objects.create(
-                usuario=request.user,
+                usuario_id=request.user.id,
                 tipo='NATURAL',
                 nombre=nombre,
                 descripcion=f"Consulta: {consulta}",
@@ -561,16 +563,22 @@ class ReporteViewSet(viewsets.ModelViewSet):
         Model = apps.get_model(app_label, model_name)
         
         # Construir filtros
-        filtros = self._construir_filtros(config['filtros_default'], fecha_inicio, fecha_fin)
+        filtros = self._construir_filtros(
+            config['filtros_default'], fecha_inicio, fecha_fin, config.get('campo_fecha', 'fecha')
+        )
         
         # Construir queryset base
         queryset = Model.objects.filter(**filtros) if filtros else Model.objects.all()
+        if config.get('orden'):
+            queryset = queryset.order_by(*config['orden'])
         
         # Aplicar select_related
         if model_name == 'NotaDeVenta':
             queryset = queryset.select_related('cliente')
         elif model_name == 'Producto':
             queryset = queryset.select_related('categoria')
+        elif model_name == 'PronosticoProducto':
+            queryset = queryset.select_related('producto')
         
         # Extraer valores
         registros = []
@@ -589,7 +597,7 @@ class ReporteViewSet(viewsets.ModelViewSet):
             'total_registros': len(registros)
         }
     
-    def _construir_filtros(self, filtros_default, fecha_inicio, fecha_fin):
+    def _construir_filtros(self, filtros_default, fecha_inicio, fecha_fin, campo_fecha='fecha'):
         """
         Construye el diccionario de filtros reemplazando valores especiales
         """
@@ -605,9 +613,9 @@ class ReporteViewSet(viewsets.ModelViewSet):
         
         # Filtros personalizados de fechas
         if fecha_inicio:
-            filtros['fecha__gte'] = fecha_inicio
+            filtros[f'{campo_fecha}__gte'] = fecha_inicio
         if fecha_fin:
-            filtros['fecha__lte'] = fecha_fin
+            filtros[f'{campo_fecha}__lte'] = fecha_fin
         
         return filtros
     
@@ -660,6 +668,7 @@ class ReporteViewSet(viewsets.ModelViewSet):
             'info_adicional': info_adicional
         }
         
+        from .utils.pdf_generator import generar_pdf_simple
         return generar_pdf_simple(datos_pdf)
     
     def _generar_excel_reporte(self, config, datos):
@@ -678,6 +687,7 @@ class ReporteViewSet(viewsets.ModelViewSet):
             fila = [registro.get(campo, '') for campo in datos['campos']]
             filas.append(fila)
         
+        from .utils.excel_generator import generar_excel
         return generar_excel(
             titulo=datos['nombre'],
             encabezados=encabezados,
@@ -718,6 +728,7 @@ class ReporteViewSet(viewsets.ModelViewSet):
             'info_adicional': info_adicional
         }
         
+        from .utils.pdf_generator import generar_pdf_simple
         return generar_pdf_simple(datos_pdf)
     
     def _generar_excel_personalizado(self, datos_reporte, config_entidad):
@@ -738,9 +749,53 @@ class ReporteViewSet(viewsets.ModelViewSet):
             fila = [registro.get(campo, '') for campo in datos_reporte['campos']]
             filas.append(fila)
         
+        from .utils.excel_generator import generar_excel
         return generar_excel(
             titulo=datos_reporte['nombre'],
             encabezados=encabezados,
             datos=filas,
             hoja_nombre="Reporte"
         )
+
+
+class PronosticoProductoViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Pronósticos de reabastecimiento calculados por `calcular_pronosticos`
+    GET /api/analitica/pronosticos/?requiere_reorden=true&categoria=3&limite=50
+    GET /api/analitica/pronosticos/{producto_id}/
+    """
+    serializer_class = PronosticoProductoSerializer
+    permission_classes = [IsAuthenticated]
+    limite_default = 100
+    limite_maximo = 1000
+
+    def get_queryset(self):
+        queryset = PronosticoProducto.objects.select_related('producto').order_by(
+            F('dias_cobertura').asc(nulls_last=True), 'producto_id'
+        )
+        requiere_reorden = self.request.query_params.get('requiere_reorden')
+        if requiere_reorden is not None:
+            queryset = queryset.filter(requiere_reorden=requiere_reorden.lower() in ('1', 'true', 'si'))
+        categoria = self.request.query_params.get('categoria')
+        if categoria:
+            try:
+                categoria = int(categoria)
+            except ValueError:
+                raise ValidationError({'categoria': "El parámetro 'categoria' debe ser un número entero"})
+            queryset = queryset.filter(producto__categoria_id=categoria)
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        try:
+            limite = int(request.query_params.get('limite', self.limite_default))
+        except ValueError:
+            limite = self.limite_default
+        limite = max(1, min(limite, self.limite_maximo))
+
+        queryset = self.get_queryset()
+        serializer = self.get_serializer(queryset[:limite], many=True)
+        return Response({
+            'success': True,
+            'total': queryset.count(),
+            'pronosticos': serializer.data
+        })
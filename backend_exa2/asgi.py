@@ -5,12 +5,26 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
+
+Despliegue: gunicorn -c python:backend_exa2.gunicorn_asgi backend_exa2.asgi:application
 """
 
 import os
 
 from django.core.asgi import get_asgi_application
 
+from backend_exa2.http_asincrono import ciclo_de_vida
+
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend_exa2.settings')
+# Con ASGI los pagos con Stripe se atienden con vistas async (ver settings.VISTAS_ASINCRONAS)
+os.environ.setdefault('VISTAS_ASINCRONAS', 'True')
+
+django_application = get_asgi_application()
+
 
-application = get_asgi_application()
+async def application(scope, receive, send):
+    # Django no implementa lifespan: se usa para cerrar el cliente HTTP compartido
+    if scope['type'] == 'lifespan':
+        await ciclo_de_vida(scope, receive, send)
+    else:
+        await django_application(scope, receive, send)
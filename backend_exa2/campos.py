@@ -0,0 +1,232 @@
+"""
+Respuestas con campos a pedido: ?fields= y ?expand=.
+
+    GET /api/transacciones/nota-venta/5/?fields=id,total,detalles.producto_nombre
+    GET /api/inventario/carritos/3/?expand=                 -> sin los bloques pesados
+    GET /api/inventario/carritos/3/?expand=detalles.producto_info
+
+- `fields`: lista de campos a devolver (con '.' para los de un serializer anidado).
+- `expand`: campos pesados (Meta.expandibles del serializer: detalles anidados,
+  bloques armados con SerializerMethodField) a incluir.
+
+Sin ninguno de los dos parámetros la respuesta es la de siempre, completa. Con
+alguno de ellos, los expandibles solo aparecen si se nombran en `expand` o en
+`fields`.
+
+El recorte también llega a la consulta (ConsultaCamposMixin): la vista arma el
+queryset con only() de las columnas usadas, select_related de las FK leídas y
+Prefetch solo de las relaciones pedidas. Los campos que el ORM no puede deducir
+(SerializerMethodField, propiedades del modelo) declaran sus rutas en
+Meta.rutas_campos; si falta alguna se deja el queryset de la vista tal cual.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch, QuerySet
+from django.db.models.constants import LOOKUP_SEP
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+PARAMETRO_CAMPOS = 'fields'
+PARAMETRO_EXPANDIR = 'expand'
+
+
+def _arbol(texto):
+    """'id,detalles.cantidad' -> {'id': {}, 'detalles': {'cantidad': {}}}"""
+    arbol = {}
+    for ruta in texto.split(','):
+        nodo = arbol
+        for parte in ruta.strip().split('.'):
+            if parte:
+                nodo = nodo.setdefault(parte, {})
+    return arbol
+
+
+def leer_parametros(request):
+    """(árbol de fields, árbol de expand); None en los que el request no trae"""
+    if request is None or request.method not in SAFE_METHODS:
+        return None, None
+    parametros = request.query_params
+    campos = _arbol(parametros[PARAMETRO_CAMPOS]) if PARAMETRO_CAMPOS in parametros else None
+    expandir = _arbol(parametros[PARAMETRO_EXPANDIR]) if PARAMETRO_EXPANDIR in parametros else None
+    return campos, expandir
+
+
+def seleccionar(nombres, expandibles, campos, expandir):
+    """
+    Campos a incluir de `nombres`: {nombre: (subcampos, subexpandir)} para
+    recortar los anidados. None si el request no pide recorte.
+    """
+    if campos is None and expandir is None:
+        return None
+    expandir = expandir or {}
+    seleccion = {}
+    for nombre in nombres:
+        if campos:
+            if nombre not in campos:
+                continue
+        elif nombre in expandibles and nombre not in expandir:
+            continue
+        seleccion[nombre] = ((campos or {}).get(nombre) or None, expandir.get(nombre, {}))
+    return seleccion
+
+
+class CamposDinamicosMixin:
+    """
+    Serializer que respeta ?fields= y ?expand=.
+
+    Meta.expandibles: campos que se omiten al recortar salvo que se pidan.
+    Meta.rutas_campos: {campo: [rutas del ORM]} de los campos calculados.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        campos, expandir = self._parametros_campos()
+        seleccion = seleccionar(fields, getattr(self.Meta, 'expandibles', ()), campos, expandir)
+        if seleccion is None:
+            return fields
+
+        recortados = {}
+        for nombre, parametros in seleccion.items():
+            campo = fields[nombre]
+            anidado = getattr(campo, 'child', campo)
+            if isinstance(anidado, CamposDinamicosMixin):
+                anidado.parametros_campos = parametros
+            recortados[nombre] = campo
+        return recortados
+
+    def _parametros_campos(self):
+        if hasattr(self, 'parametros_campos'):
+            return self.parametros_campos
+        padre = self.parent.parent if isinstance(self.parent, serializers.ListSerializer) else self.parent
+        if padre is not None:
+            # Anidado en un serializer que no recorta
+            return None, None
+        return leer_parametros(self.context.get('request'))
+
+
+def _es_ruta(modelo, ruta):
+    try:
+        for parte in ruta.split(LOOKUP_SEP):
+            campo = modelo._meta.pk if parte == 'pk' else modelo._meta.get_field(parte)
+            modelo = campo.related_model if campo.is_relation else None
+    except (FieldDoesNotExist, AttributeError):
+        return False
+    return True
+
+
+def rutas_serializer(serializer):
+    """Rutas del ORM que lee el serializer (ya recortado); None si alguna no se puede deducir"""
+    modelo = serializer.Meta.model
+    declaradas = getattr(serializer.Meta, 'rutas_campos', {})
+    rutas = {modelo._meta.pk.name}
+    for nombre, campo in serializer.fields.items():
+        if campo.write_only:
+            continue
+        if nombre in declaradas:
+            rutas.update(declaradas[nombre])
+            continue
+        if campo.source == '*':
+            return None
+        fuente = campo.source.replace('.', LOOKUP_SEP)
+        anidado = getattr(campo, 'child', campo)
+        if isinstance(anidado, serializers.ModelSerializer):
+            internas = rutas_serializer(anidado)
+            if internas is None:
+                return None
+            rutas.update(f"{fuente}{LOOKUP_SEP}{ruta}" for ruta in internas)
+        elif _es_ruta(modelo, fuente):
+            rutas.add(fuente)
+        else:
+            return None
+    return rutas
+
+
+def consulta_para(queryset, rutas):
+    """
+    El queryset con only() de las columnas de `rutas`, select_related de las FK
+    que recorren y Prefetch (recortado igual) de las relaciones a muchos.
+    """
+    modelo = queryset.model
+    solo = {modelo._meta.pk.name}
+    relacionados = set()
+    prefetch = {}
+    for ruta in rutas:
+        partes = ruta.split(LOOKUP_SEP)
+        actual = modelo
+        for indice, parte in enumerate(partes):
+            campo = actual._meta.pk if parte == 'pk' else actual._meta.get_field(parte)
+            partes[indice] = campo.name
+            camino = LOOKUP_SEP.join(partes[:indice + 1])
+            if campo.one_to_many or campo.many_to_many:
+                internas = prefetch.setdefault(camino, (campo, set()))[1]
+                if indice + 1 < len(partes):
+                    internas.add(LOOKUP_SEP.join(partes[indice + 1:]))
+                break
+            if campo.concrete:
+                solo.add(camino)
+            if campo.is_relation and indice + 1 < len(partes):
+                relacionados.add(camino)
+                actual = campo.related_model
+            elif not campo.concrete:
+                # Relación inversa uno a uno al final de la ruta: se trae completa
+                relacionados.add(camino)
+                break
+
+    prefetches = []
+    for camino, (campo, internas) in sorted(prefetch.items()):
+        if campo.one_to_many:
+            # La FK hacia el padre, para repartir las filas
+            internas.add(campo.field.name)
+        interno = consulta_para(campo.related_model._default_manager.all(), internas)
+        prefetches.append(Prefetch(camino, queryset=interno))
+
+    queryset = queryset.select_related(None).prefetch_related(None)
+    if relacionados:
+        queryset = queryset.select_related(*sorted(relacionados))
+    if prefetches:
+        queryset = queryset.prefetch_related(*prefetches)
+    return queryset.only(*sorted(solo))
+
+
+def campos_orden(vista, queryset):
+    """Columnas locales de orden de la vista: la paginación por cursor lee su valor en cada fila"""
+    orden = [
+        *(getattr(vista, 'ordering_cursor', None) or ()),
+        *(getattr(vista, 'ordering', None) or ()),
+        *queryset.query.order_by,
+        *queryset.model._meta.ordering,
+        *vista.request.query_params.get('ordering', '').split(','),
+    ]
+    campos = set()
+    for campo in orden:
+        if not isinstance(campo, str):
+            continue
+        nombre = campo.strip().lstrip('-')
+        if nombre and LOOKUP_SEP not in nombre and _es_ruta(queryset.model, nombre):
+            campos.add(nombre)
+    return campos
+
+
+class ConsultaCamposMixin:
+    """
+    ViewSet: con ?fields= o ?expand= en list/retrieve, el queryset trae solo lo
+    que usa el serializer recortado (ver consulta_para).
+    """
+    acciones_campos = ('list', 'retrieve')
+
+    def filter_queryset(self, queryset):
+        # filter_queryset y no get_queryset: lo usan list y get_object, y varias
+        # vistas redefinen get_queryset sin llamar a super()
+        queryset = super().filter_queryset(queryset)
+        if (
+            getattr(self, 'listado_rapido', False) or not isinstance(queryset, QuerySet)
+            or self.action not in self.acciones_campos or leer_parametros(self.request) == (None, None)
+        ):
+            return queryset
+
+        serializer = self.get_serializer()
+        if not isinstance(serializer, CamposDinamicosMixin) or serializer.Meta.model is not queryset.model:
+            return queryset
+        rutas = rutas_serializer(serializer)
+        if rutas is None:
+            return queryset
+        return consulta_para(queryset, rutas | campos_orden(self, queryset))
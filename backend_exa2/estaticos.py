@@ -0,0 +1,35 @@
+"""
+WhiteNoiseMiddleware que también puede ir en una cadena de middlewares async.
+
+WhiteNoise 6.6 solo es síncrono: con ASGI, Django tendría que pasar cada
+request a un hilo y volver al event loop para la vista, aunque la vista sea
+async. Esta versión atiende los archivos estáticos igual que WhiteNoise y, para
+el resto, espera a la vista sin salir del loop.
+"""
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+
+class WhiteNoiseAsincronoMiddleware(WhiteNoiseMiddleware):
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, *args, **kwargs):
+        super().__init__(get_response, *args, **kwargs)
+        self.asincrono = iscoroutinefunction(get_response)
+        if self.asincrono:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.asincrono:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = self.find_file(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return self.serve(static_file, request)
+        return await self.get_response(request)
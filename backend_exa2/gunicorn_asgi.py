@@ -0,0 +1,23 @@
+"""
+Perfil de despliegue ASGI: gunicorn administra los procesos y cada worker es uvicorn.
+
+    gunicorn -c python:backend_exa2.gunicorn_asgi backend_exa2.asgi:application
+
+Un worker atiende muchos requests a la vez en su event loop: las vistas async
+(create-payment-intent, confirm-payment, confirm-payment-auto) esperan a Stripe
+sin ocupar el worker, y las vistas síncronas de DRF corren en hilos. Con WSGI
+(`gunicorn backend_exa2.wsgi:application`) cada worker sync atiende un request
+por vez y queda bloqueado mientras Stripe responde.
+
+Como con WSGI, gunicorn toma la cantidad de workers de WEB_CONCURRENCY y el
+puerto de PORT. Comparación de los dos perfiles con servicios externos lentos:
+`python tools/benchmark/ejecutar.py externos`.
+"""
+import os
+
+worker_class = 'uvicorn_worker.UvicornWorker'
+# Segundos sin avisar al árbitro antes de que gunicorn reinicie el worker (un loop bloqueado)
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 60))
+graceful_timeout = 30
+# Conexiones keep-alive del proxy de Railway
+keepalive = 75
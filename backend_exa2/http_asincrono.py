@@ -0,0 +1,83 @@
+"""
+Cliente HTTP asíncrono compartido (httpx) para los servicios externos.
+
+Stripe (métodos *_async), FCM e ImgBB piden el cliente con `cliente_http()`: un
+httpx.AsyncClient por event loop, con un pool de hasta settings.HTTP_MAX_CONEXIONES
+conexiones keep-alive. Así un worker ASGI tiene cientos de llamadas lentas en
+vuelo sin un hilo por cada una y sin repetir el handshake TLS en cada request.
+
+    respuesta = await cliente_http().post(url, json=mensaje, timeout=10)
+
+Desde código síncrono (Pago.save, el hilo de imágenes, comandos) `ejecutar()`
+corre una función async en un event loop propio, con un cliente que se cierra
+al terminar:
+
+    resultados = ejecutar(servicio.send_push_to_tokens_async, tokens, titulo, cuerpo)
+
+Con el despliegue ASGI, `ciclo_de_vida` (protocolo lifespan, ver asgi.py) cierra
+el cliente del worker al apagarlo. httpx se importa en el primer uso.
+"""
+import asyncio
+import weakref
+from contextvars import ContextVar
+from django.conf import settings
+
+# event loop -> httpx.AsyncClient
+_clientes = weakref.WeakKeyDictionary()
+# El cliente de `ejecutar()` tiene prioridad sobre el del loop
+_cliente_propio = ContextVar('cliente_http_propio', default=None)
+
+
+def nuevo_cliente():
+    import httpx
+    return httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONEXIONES,
+            max_keepalive_connections=settings.HTTP_CONEXIONES_LIBRES,
+        ),
+        timeout=httpx.Timeout(settings.HTTP_TIMEOUT, connect=5),
+    )
+
+
+def cliente_http():
+    """El httpx.AsyncClient del event loop actual (se crea en el primer uso)"""
+    cliente = _cliente_propio.get()
+    if cliente is not None:
+        return cliente
+    loop = asyncio.get_running_loop()
+    cliente = _clientes.get(loop)
+    if cliente is None or cliente.is_closed:
+        cliente = _clientes[loop] = nuevo_cliente()
+    return cliente
+
+
+async def cerrar_cliente():
+    """Cierra el cliente del event loop actual"""
+    cliente = _clientes.pop(asyncio.get_running_loop(), None)
+    if cliente is not None:
+        await cliente.aclose()
+
+
+def ejecutar(funcion, *args, **kwargs):
+    """
+    Ejecuta la función async `funcion` desde código síncrono y devuelve su resultado.
+    No se puede llamar desde un event loop en marcha: ahí se usa `await` directamente.
+    """
+    async def con_cliente_propio():
+        async with nuevo_cliente() as cliente:
+            _cliente_propio.set(cliente)
+            return await funcion(*args, **kwargs)
+
+    return asyncio.run(con_cliente_propio())
+
+
+async def ciclo_de_vida(scope, receive, send):
+    """Protocolo lifespan de ASGI: al apagar el worker cierra el cliente de su loop"""
+    while True:
+        mensaje = await receive()
+        if mensaje['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif mensaje['type'] == 'lifespan.shutdown':
+            await cerrar_cliente()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
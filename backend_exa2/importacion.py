@@ -0,0 +1,89 @@
+"""
+Tiempo de importación del arranque de un worker (python -X importtime).
+
+Mide, en un intérprete nuevo, todo lo que se importa hasta poder atender el
+primer request: la aplicación WSGI (settings + django.setup()) y el urlconf con
+las vistas de todas las apps.
+
+    python -m backend_exa2.importacion             # total y módulos más lentos
+    python -m backend_exa2.importacion --top 40
+
+Las dependencias pesadas (MODULOS_DIFERIDOS) se importan en su primer uso:
+Stripe al crear un pago, reportlab/openpyxl al generar un reporte, Pillow al
+procesar una imagen, google-auth al enviar una notificación FCM y httpx en la
+primera llamada con el cliente HTTP async.
+backend_exa2/tests.py falla si alguna vuelve a cargarse en el arranque o si el
+total supera IMPORTACION_PRESUPUESTO_MS.
+"""
+import os
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CODIGO_ARRANQUE = (
+    "import backend_exa2.wsgi\n"
+    "from django.urls import get_resolver\n"
+    "get_resolver().url_patterns\n"
+)
+
+MODULOS_DIFERIDOS = ('stripe', 'reportlab', 'openpyxl', 'PIL', 'numpy', 'google.auth', 'google.oauth2', 'httpx')
+
+
+def medir(codigo=CODIGO_ARRANQUE):
+    """
+    Ejecuta `codigo` con -X importtime en un proceso nuevo.
+
+    Returns:
+        list: (módulo, µs propios, µs acumulados, nivel de anidamiento) en el orden de la salida
+    """
+    entorno = {**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'backend_exa2.settings')}
+    proceso = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', codigo],
+        cwd=RAIZ, env=entorno, capture_output=True, text=True, timeout=120,
+    )
+    if proceso.returncode != 0:
+        raise RuntimeError(f"El arranque falló:\n{proceso.stderr[-2000:]}")
+
+    modulos = []
+    for linea in proceso.stderr.splitlines():
+        if not linea.startswith('import time:') or 'self [us]' in linea:
+            continue
+        propio, acumulado, nombre = linea[len('import time:'):].split('|')
+        nivel = (len(nombre) - len(nombre.lstrip()) - 1) // 2
+        modulos.append((nombre.strip(), int(propio), int(acumulado), nivel))
+    return modulos
+
+
+def total_ms(modulos):
+    """Tiempo total de importación: la suma de los imports de primer nivel"""
+    return sum(acumulado for _, _, acumulado, nivel in modulos if nivel == 0) / 1000
+
+
+def diferidos_cargados(modulos):
+    """Los MODULOS_DIFERIDOS (o sus submódulos) que se importaron"""
+    nombres = {nombre for nombre, _, _, _ in modulos}
+    return [
+        diferido for diferido in MODULOS_DIFERIDOS
+        if any(nombre == diferido or nombre.startswith(f"{diferido}.") for nombre in nombres)
+    ]
+
+
+def informe(modulos, top=20):
+    """Texto con el total y los `top` módulos con más tiempo acumulado"""
+    lineas = [f"⏱️ Importación del arranque: {total_ms(modulos):.0f} ms ({len(modulos)} módulos)"]
+    cargados = diferidos_cargados(modulos)
+    if cargados:
+        lineas.append(f"⚠️ Dependencias pesadas cargadas en el arranque: {', '.join(cargados)}")
+    lineas.append(f"   {'acumulado':>12} {'propio':>10}  módulo")
+    for nombre, propio, acumulado, nivel in sorted(modulos, key=lambda modulo: -modulo[2])[:top]:
+        lineas.append(f"   {acumulado / 1000:>9.1f} ms {propio / 1000:>7.1f} ms  {'  ' * nivel}{nombre}")
+    return '\n'.join(lineas)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Perfil de importación del arranque (ver docstring del módulo)')
+    parser.add_argument('--top', type=int, default=20)
+    print(informe(medir(), parser.parse_args().top))
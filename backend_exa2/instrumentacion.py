@@ -0,0 +1,396 @@
+"""
+Instrumentación por request: consultas SQL, tiempos por fase y métricas.
+
+InstrumentacionMiddleware mide en cada request:
+- consultas SQL y tiempo en la base de datos (execute_wrapper en cada conexión)
+- tiempo en servicios externos (Stripe, FCM, ImgBB) marcado con `medir('stripe')`
+- tiempo de serialización (`serializar()`: listados y detalles de ListadoRapidoMixin,
+  por DRF o por el camino rápido) y de render
+
+y con eso:
+- agrega el encabezado `Server-Timing` (visible en las DevTools del navegador)
+  Server-Timing: db;dur=12.4;desc="8 consultas", serializacion;dur=3.1, render;dur=0.6, total;dur=21.0
+- registra en el log los requests lentos (settings.INSTRUMENTACION_LENTO_MS)
+- en una muestra de los requests (settings.INSTRUMENTACION_MUESTREO) agrupa las
+  consultas por huella (el SQL sin valores) y avisa cuando una se repite
+  settings.INSTRUMENTACION_DUPLICADAS veces o más: el típico N+1
+- acumula totales por vista que GET /metrics/ devuelve en formato de texto de Prometheus,
+  junto con las conexiones a la base de datos y el estado del pool de psycopg
+  (settings.DB_POOL): en uso, libres, requests esperando, esperas agotadas
+
+Los tiempos de fase se solapan: la serialización incluye las consultas perezosas
+que dispara. Los totales son del proceso: con varios workers, cada uno tiene los suyos.
+
+Marcar una llamada externa:
+
+    with medir('stripe'):
+        payment_intent = stripe.PaymentIntent.retrieve(payment_intent_id)
+
+Fuera de un request (comandos, hilos de fondo) `medir` no hace nada.
+"""
+import hmac
+import logging
+import random
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.http import Http404, HttpResponse
+
+logger = logging.getLogger(__name__)
+
+# Límites (en segundos) del histograma de duración de requests
+LIMITES_DURACION = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Fases que se informan en Server-Timing además de db y total
+FASES = ('serializacion', 'render', 'stripe', 'fcm', 'imgbb')
+
+_medicion = ContextVar('medicion', default=None)
+# Fases abiertas en el hilo o tarea actual: los hilos de /api/batch/ y las tareas de
+# asyncio comparten la Medicion del request pero cada uno anida sus propias fases
+_fases_activas = ContextVar('fases_activas', default=frozenset())
+
+
+class Medicion:
+    """Contadores de un request. Las lecturas en paralelo de /api/batch/ comparten la del request"""
+
+    def __init__(self, huellas=False):
+        self.inicio = time.perf_counter()
+        self.consultas = 0
+        self.tiempo_db = 0.0
+        self.fases = defaultdict(float)
+        self.huellas = Counter() if huellas else None
+        self.lock = threading.Lock()
+
+    def registrar_consulta(self, sql, duracion):
+        with self.lock:
+            self.consultas += 1
+            self.tiempo_db += duracion
+            if self.huellas is not None:
+                self.huellas[huella(sql)] += 1
+
+    def duplicadas(self, umbral):
+        """[(huella, veces)] de las consultas repetidas `umbral` veces o más"""
+        if self.huellas is None:
+            return []
+        return [(sql, veces) for sql, veces in self.huellas.most_common() if veces >= umbral]
+
+
+def medicion_actual():
+    return _medicion.get()
+
+
+@contextmanager
+def medir(fase):
+    """Suma el tiempo del bloque a `fase` en el request actual (también sirve de decorador)"""
+    medicion = _medicion.get()
+    activas = _fases_activas.get()
+    # Una fase anidada en sí misma (ej: guardar con @medir llamado dentro de medir) se cuenta una vez
+    if medicion is None or fase in activas:
+        yield
+        return
+    token = _fases_activas.set(activas | {fase})
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        duracion = time.perf_counter() - inicio
+        with medicion.lock:
+            medicion.fases[fase] += duracion
+        _fases_activas.reset(token)
+
+
+def serializar(serializer):
+    """`serializer.data` contado en la fase de serialización"""
+    with medir('serializacion'):
+        return serializer.data
+
+
+_NUMEROS = re.compile(r"\b\d+(?:\.\d+)?\b")
+_TEXTOS = re.compile(r"'(?:[^']|'')*'")
+_LISTAS = re.compile(r"\(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))*\s*\)")
+
+
+def huella(sql):
+    """El SQL sin valores: dos consultas con la misma huella solo difieren en los parámetros"""
+    sql = _TEXTOS.sub('?', sql)
+    sql = _NUMEROS.sub('?', sql)
+    return _LISTAS.sub('(...)', sql)
+
+
+def _registrar_sql(execute, sql, params, many, context):
+    medicion = _medicion.get()
+    if medicion is None:
+        return execute(sql, params, many, context)
+    inicio = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        medicion.registrar_consulta(sql, time.perf_counter() - inicio)
+
+
+def _instalar_en_conexion(sender, connection, **kwargs):
+    # Con conexiones persistentes, muchos menos que requests; con pool, cada vez que se toma una
+    agregado.registrar_conexion(connection.alias)
+    # connection_created se emite también al reconectar: no duplicar el wrapper
+    if _registrar_sql not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_registrar_sql)
+
+
+class Agregado:
+    """Totales del proceso por vista, para /metrics/"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.limpiar()
+
+    def limpiar(self):
+        with self.lock:
+            self.solicitudes = Counter()      # (metodo, vista, estado) -> requests
+            self.duraciones = {}              # (metodo, vista) -> [conteos por límite..., suma, total]
+            self.consultas = Counter()        # vista -> consultas
+            self.tiempo_db = Counter()        # vista -> segundos
+            self.fases = Counter()            # (vista, fase) -> segundos
+            self.lentos = Counter()           # vista -> requests lentos
+            self.duplicadas = Counter()       # vista -> requests con N+1 detectado
+            self.conexiones = Counter()       # alias de la base -> conexiones abiertas
+
+    def registrar(self, metodo, vista, estado, duracion, medicion, lento, con_duplicadas):
+        with self.lock:
+            self.solicitudes[(metodo, vista, estado)] += 1
+            cubetas = self.duraciones.setdefault((metodo, vista), [0] * (len(LIMITES_DURACION) + 2))
+            for indice, limite in enumerate(LIMITES_DURACION):
+                if duracion <= limite:
+                    cubetas[indice] += 1
+            cubetas[-2] += duracion
+            cubetas[-1] += 1
+            self.consultas[vista] += medicion.consultas
+            self.tiempo_db[vista] += medicion.tiempo_db
+            for fase, segundos in medicion.fases.items():
+                self.fases[(vista, fase)] += segundos
+            if lento:
+                self.lentos[vista] += 1
+            if con_duplicadas:
+                self.duplicadas[vista] += 1
+
+    def registrar_conexion(self, alias):
+        with self.lock:
+            self.conexiones[alias] += 1
+
+    def prometheus(self):
+        """Los totales en el formato de texto de Prometheus (version 0.0.4)"""
+        lineas = []
+
+        def metrica(nombre, tipo, ayuda, valores):
+            lineas.append(f"# HELP {nombre} {ayuda}")
+            lineas.append(f"# TYPE {nombre} {tipo}")
+            for etiquetas, valor in valores:
+                lineas.append(f"{nombre}{_etiquetas(etiquetas)} {_numero(valor)}")
+
+        with self.lock:
+            metrica('http_requests_total', 'counter', 'Requests atendidos.', (
+                ({'method': metodo, 'view': vista, 'status': estado}, total)
+                for (metodo, vista, estado), total in sorted(self.solicitudes.items())
+            ))
+
+            lineas.append("# HELP http_request_duration_seconds Duración de los requests.")
+            lineas.append("# TYPE http_request_duration_seconds histogram")
+            for (metodo, vista), cubetas in sorted(self.duraciones.items()):
+                base = {'method': metodo, 'view': vista}
+                for limite, conteo in zip(LIMITES_DURACION, cubetas):
+                    lineas.append(f"http_request_duration_seconds_bucket{_etiquetas({**base, 'le': _numero(limite)})} {conteo}")
+                lineas.append(f"http_request_duration_seconds_bucket{_etiquetas({**base, 'le': '+Inf'})} {cubetas[-1]}")
+                lineas.append(f"http_request_duration_seconds_sum{_etiquetas(base)} {_numero(cubetas[-2])}")
+                lineas.append(f"http_request_duration_seconds_count{_etiquetas(base)} {cubetas[-1]}")
+
+            metrica('http_request_db_queries_total', 'counter', 'Consultas SQL hechas por los requests.', (
+                ({'view': vista}, total) for vista, total in sorted(self.consultas.items())
+            ))
+            metrica('http_request_db_seconds_total', 'counter', 'Tiempo de los requests en la base de datos.', (
+                ({'view': vista}, total) for vista, total in sorted(self.tiempo_db.items())
+            ))
+            metrica('http_request_phase_seconds_total', 'counter',
+                    'Tiempo de los requests por fase (serialización, render, servicios externos).', (
+                        ({'view': vista, 'phase': fase}, total) for (vista, fase), total in sorted(self.fases.items())
+                    ))
+            metrica('http_requests_slow_total', 'counter', 'Requests más lentos que INSTRUMENTACION_LENTO_MS.', (
+                ({'view': vista}, total) for vista, total in sorted(self.lentos.items())
+            ))
+            metrica('http_requests_duplicate_queries_total', 'counter',
+                    'Requests muestreados con consultas repetidas (posible N+1).', (
+                        ({'view': vista}, total) for vista, total in sorted(self.duplicadas.items())
+                    ))
+            metrica('db_connections_total', 'counter',
+                    'Conexiones a la base de datos abiertas (con pool: tomadas del pool).', (
+                        ({'database': alias}, total) for alias, total in sorted(self.conexiones.items())
+                    ))
+
+        pools = estadisticas_pools()
+        if pools:
+            metrica('db_pool_connections', 'gauge', 'Conexiones del pool en uso y libres.', (
+                ({'database': alias, 'state': estado}, valor)
+                for alias, estadisticas in pools
+                for estado, valor in (
+                    ('in_use', estadisticas['pool_size'] - estadisticas['pool_available']),
+                    ('idle', estadisticas['pool_available']),
+                )
+            ))
+            metrica('db_pool_max_connections', 'gauge', 'Tamaño máximo del pool (DB_POOL_MAX).', (
+                ({'database': alias}, estadisticas['pool_max']) for alias, estadisticas in pools
+            ))
+            metrica('db_pool_waiting', 'gauge', 'Requests esperando una conexión libre.', (
+                ({'database': alias}, estadisticas.get('requests_waiting', 0)) for alias, estadisticas in pools
+            ))
+            metrica('db_pool_requests_total', 'counter', 'Conexiones pedidas al pool.', (
+                ({'database': alias}, estadisticas.get('requests_num', 0)) for alias, estadisticas in pools
+            ))
+            metrica('db_pool_queued_total', 'counter', 'Pedidos que tuvieron que esperar una conexión.', (
+                ({'database': alias}, estadisticas.get('requests_queued', 0)) for alias, estadisticas in pools
+            ))
+            metrica('db_pool_wait_seconds_total', 'counter', 'Tiempo esperando una conexión del pool.', (
+                ({'database': alias}, estadisticas.get('requests_wait_ms', 0) / 1000) for alias, estadisticas in pools
+            ))
+            metrica('db_pool_timeouts_total', 'counter', 'Pedidos sin conexión después de DB_POOL_TIMEOUT.', (
+                ({'database': alias}, estadisticas.get('requests_errors', 0)) for alias, estadisticas in pools
+            ))
+            metrica('db_pool_connections_opened_total', 'counter', 'Conexiones que abrió el pool.', (
+                ({'database': alias}, estadisticas.get('connections_num', 0)) for alias, estadisticas in pools
+            ))
+            metrica('db_pool_connections_lost_total', 'counter',
+                    'Conexiones descartadas por fallar la verificación (DB_CONN_HEALTH_CHECKS).', (
+                        ({'database': alias}, estadisticas.get('connections_lost', 0))
+                        for alias, estadisticas in pools
+                    ))
+        return '\n'.join(lineas) + '\n'
+
+
+def estadisticas_pools():
+    """[(alias, estadísticas de psycopg_pool)] de las bases con pool (settings.DB_POOL)"""
+    from django.db import connections
+
+    pools = []
+    for alias in connections:
+        conexion = connections[alias]
+        if conexion.settings_dict.get('OPTIONS', {}).get('pool'):
+            pools.append((alias, conexion.pool.get_stats()))
+    return pools
+
+
+def _escapar(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _etiquetas(etiquetas):
+    return '{' + ','.join(f'{clave}="{_escapar(valor)}"' for clave, valor in etiquetas.items()) + '}'
+
+
+def _numero(valor):
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+agregado = Agregado()
+
+
+def _vista(request):
+    coincidencia = getattr(request, 'resolver_match', None)
+    if coincidencia is None:
+        return 'sin_ruta'
+    return coincidencia.view_name or coincidencia.route or 'sin_nombre'
+
+
+def _server_timing(medicion, total):
+    partes = [f'db;dur={medicion.tiempo_db * 1000:.1f};desc="{medicion.consultas} consultas"']
+    partes.extend(
+        f"{fase};dur={medicion.fases[fase] * 1000:.1f}" for fase in FASES if fase in medicion.fases
+    )
+    partes.append(f"total;dur={total * 1000:.1f}")
+    return ', '.join(partes)
+
+
+class InstrumentacionMiddleware:
+    """
+    Mide cada request (ver módulo). Va primero en MIDDLEWARE para que el total
+    incluya a los demás middlewares. Funciona con WSGI y con ASGI (cadena async).
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.asincrono = iscoroutinefunction(get_response)
+        if self.asincrono:
+            markcoroutinefunction(self)
+        self.lento = settings.INSTRUMENTACION_LENTO_MS / 1000
+        self.muestreo = settings.INSTRUMENTACION_MUESTREO
+        self.umbral_duplicadas = settings.INSTRUMENTACION_DUPLICADAS
+        self.server_timing = settings.INSTRUMENTACION_SERVER_TIMING
+
+        connection_created.connect(_instalar_en_conexion, dispatch_uid='instrumentacion_sql')
+        # Conexiones ya abiertas antes de cargar el middleware (ej: shell, pruebas)
+        from django.db import connections
+        for conexion in connections.all(initialized_only=True):
+            _instalar_en_conexion(None, conexion)
+
+    def __call__(self, request):
+        if self.asincrono:
+            return self.__acall__(request)
+        medicion = Medicion(huellas=random.random() < self.muestreo)
+        token = _medicion.set(medicion)
+        try:
+            response = self.get_response(request)
+        finally:
+            _medicion.reset(token)
+        return self._registrar(request, response, medicion)
+
+    async def __acall__(self, request):
+        medicion = Medicion(huellas=random.random() < self.muestreo)
+        token = _medicion.set(medicion)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _medicion.reset(token)
+        return self._registrar(request, response, medicion)
+
+    def _registrar(self, request, response, medicion):
+        total = time.perf_counter() - medicion.inicio
+
+        if self.server_timing:
+            response['Server-Timing'] = _server_timing(medicion, total)
+
+        vista = _vista(request)
+        lento = total >= self.lento
+        if lento:
+            fases = ', '.join(f"{fase} {segundos * 1000:.0f} ms" for fase, segundos in medicion.fases.items())
+            logger.warning(
+                f"🐢 Request lento {request.method} {request.path} ({vista}) -> {response.status_code} "
+                f"en {total * 1000:.0f} ms: {medicion.consultas} consultas ({medicion.tiempo_db * 1000:.0f} ms en BD)"
+                f"{', ' + fases if fases else ''}"
+            )
+        duplicadas = medicion.duplicadas(self.umbral_duplicadas)
+        for sql, veces in duplicadas:
+            logger.warning(
+                f"🔁 Posible N+1 en {request.method} {request.path} ({vista}): "
+                f"{veces} consultas iguales: {sql[:300]}"
+            )
+
+        agregado.registrar(request.method, vista, str(response.status_code), total, medicion, lento, bool(duplicadas))
+        return response
+
+
+def metricas(request):
+    """
+    GET /metrics/: totales del proceso en formato Prometheus.
+    Con settings.METRICAS_TOKEN pide `Authorization: Bearer <token>`; sin token solo responde con DEBUG.
+    """
+    esperado = settings.METRICAS_TOKEN
+    if esperado:
+        recibido = request.headers.get('Authorization', '').removeprefix('Bearer ').strip()
+        if not hmac.compare_digest(recibido.encode(), esperado.encode()):
+            return HttpResponse('No autorizado\n', status=401, content_type='text/plain')
+    elif not settings.DEBUG:
+        raise Http404
+    return HttpResponse(agregado.prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
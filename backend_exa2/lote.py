@@ -0,0 +1,232 @@
+"""
+POST /api/batch/: varias llamadas a la API en un solo request.
+
+Pensado para el arranque de la app móvil: en vez de N viajes por la red celular
+(/api/me/, categorías, productos, carritos...) se hace uno solo.
+
+Body:
+{
+    "paralelo": true,
+    "solicitudes": [
+        {"id": "me", "url": "/api/me/"},
+        {"id": "categorias", "url": "/api/inventario/categorias/?fields=id,nombre"},
+        {"id": "carrito", "metodo": "POST", "url": "/api/inventario/carritos/", "cuerpo": {"codigo": "C-1"}}
+    ]
+}
+
+Respuesta (mismo orden que las solicitudes):
+{
+    "respuestas": [
+        {"id": "me", "estado": 200, "cuerpo": {...}},
+        ...
+    ]
+}
+
+Cada sub-request se resuelve con el URLconf y se ejecuta en el mismo proceso,
+con el usuario ya autenticado del request principal (el token se valida una
+sola vez). Los errores de una sub-request quedan en su "estado" y no cortan el
+resto.
+
+Con "paralelo": true los GET consecutivos se ejecutan a la vez en un pool de
+hilos (settings.LOTE_HILOS); cada escritura (POST/PUT/PATCH/DELETE) se ejecuta
+sola y en orden, así una lectura posterior ve lo que escribió. El paralelismo
+rinde cuando las vistas esperan a la base de datos, no en cálculo puro de Python.
+"""
+import io
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from urllib.parse import urlsplit
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.http import Http404
+from django.urls import Resolver404, resolve
+from rest_framework import serializers, status
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+logger = logging.getLogger(__name__)
+
+MAX_SOLICITUDES = 25
+METODOS = ('GET', 'POST', 'PUT', 'PATCH', 'DELETE')
+METODOS_LECTURA = ('GET',)
+# Encabezados de la sub-respuesta que se devuelven al cliente
+ENCABEZADOS = ('Location', 'ETag', 'Last-Modified', 'Cache-Control', 'Retry-After')
+# Encabezados del request principal que no pasan a las sub-requests
+META_EXCLUIDOS = ('wsgi.input', 'CONTENT_LENGTH', 'CONTENT_TYPE', 'QUERY_STRING', 'PATH_INFO', 'REQUEST_METHOD')
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _obtener_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=settings.LOTE_HILOS, thread_name_prefix='lote')
+    return _pool
+
+
+class SolicitudLoteSerializer(serializers.Serializer):
+    id = serializers.CharField(max_length=100, required=False)
+    metodo = serializers.CharField(default='GET')
+    url = serializers.CharField(max_length=2000)
+    cuerpo = serializers.JSONField(required=False, allow_null=True)
+
+    def validate_metodo(self, value):
+        value = value.upper()
+        if value not in METODOS:
+            raise serializers.ValidationError(f"Método no soportado. Use uno de: {', '.join(METODOS)}.")
+        return value
+
+    def validate_url(self, value):
+        if not value.startswith('/api/'):
+            raise serializers.ValidationError("La URL debe ser una ruta de la API (/api/...).")
+        return value
+
+
+class LoteSerializer(serializers.Serializer):
+    solicitudes = SolicitudLoteSerializer(many=True, allow_empty=False, max_length=MAX_SOLICITUDES)
+    paralelo = serializers.BooleanField(default=False)
+
+
+def _construir_request(request, solicitud):
+    """HttpRequest de la sub-request: los META del principal con otra ruta, método y cuerpo"""
+    url = urlsplit(solicitud['url'])
+    cuerpo = b''
+    if solicitud.get('cuerpo') is not None:
+        cuerpo = json.dumps(solicitud['cuerpo'], cls=DjangoJSONEncoder).encode()
+
+    environ = {clave: valor for clave, valor in request.META.items() if clave not in META_EXCLUIDOS}
+    environ.update({
+        'REQUEST_METHOD': solicitud['metodo'],
+        'PATH_INFO': url.path,
+        'QUERY_STRING': url.query,
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(cuerpo)),
+        'HTTP_ACCEPT': 'application/json',
+        'wsgi.input': io.BytesIO(cuerpo),
+    })
+    sub_request = WSGIRequest(environ)
+
+    # DRF usa este usuario en vez de volver a validar el token
+    if request.user.is_authenticated:
+        sub_request._force_auth_user = request.user
+        sub_request._force_auth_token = request.auth
+    return sub_request
+
+
+def _cuerpo_respuesta(respuesta):
+    if hasattr(respuesta, 'data'):
+        # Response de DRF: los datos sin renderizar (se renderizan una vez, en la respuesta del lote)
+        return respuesta.data
+    if respuesta.streaming:
+        return None
+    contenido = respuesta.content
+    if respuesta.get('Content-Type', '').startswith('application/json'):
+        return json.loads(contenido or b'null')
+    return contenido.decode(respuesta.charset or 'utf-8', errors='replace')
+
+
+def ejecutar_solicitud(request, solicitud):
+    """Ejecuta una sub-request y devuelve su resultado para la respuesta del lote"""
+    resultado = {'id': solicitud.get('id')}
+    url = urlsplit(solicitud['url'])
+    try:
+        coincidencia = resolve(url.path)
+    except Resolver404:
+        coincidencia = None
+    vista = getattr(coincidencia, 'func', None)
+    # Las vistas async (settings.VISTAS_ASINCRONAS) indican su equivalente síncrono de DRF
+    vista = getattr(vista, 'vista_sincrona', vista)
+    # Solo vistas de DRF: las de Django (admin) dependen de los middlewares
+    clase = vista and getattr(vista, 'cls', None)
+    if clase is None or not issubclass(clase, APIView):
+        return {**resultado, 'estado': status.HTTP_404_NOT_FOUND, 'cuerpo': {'error': 'Ruta no encontrada'}}
+    if issubclass(clase, LoteView):
+        return {**resultado, 'estado': status.HTTP_400_BAD_REQUEST, 'cuerpo': {'error': 'No se permiten lotes anidados'}}
+
+    sub_request = _construir_request(request, solicitud)
+    sub_request.resolver_match = coincidencia
+    try:
+        respuesta = vista(sub_request, *coincidencia.args, **coincidencia.kwargs)
+    except Http404:
+        return {**resultado, 'estado': status.HTTP_404_NOT_FOUND, 'cuerpo': {'error': 'No encontrado'}}
+    except Exception as e:
+        logger.exception(f"❌ Error en sub-request {solicitud['metodo']} {solicitud['url']}: {e}")
+        return {**resultado, 'estado': status.HTTP_500_INTERNAL_SERVER_ERROR, 'cuerpo': {'error': 'Error interno'}}
+
+    resultado['estado'] = respuesta.status_code
+    encabezados = {nombre: respuesta[nombre] for nombre in ENCABEZADOS if respuesta.has_header(nombre)}
+    if encabezados:
+        resultado['encabezados'] = encabezados
+    resultado['cuerpo'] = _cuerpo_respuesta(respuesta)
+    return resultado
+
+
+def _ejecutar_en_hilo(request, solicitud):
+    # Cada hilo del pool abre su propia conexión y la cierra (o la devuelve al pool de
+    # conexiones) al terminar: no queda una conexión persistente por hilo (CONN_MAX_AGE)
+    try:
+        return ejecutar_solicitud(request, solicitud)
+    finally:
+        connections.close_all()
+
+
+def ejecutar_lote(request, solicitudes, paralelo=False):
+    """
+    Resultados en el orden de `solicitudes`. En paralelo, cada tramo de GET
+    consecutivos se reparte en el pool; las escrituras van de a una.
+    """
+    if not paralelo:
+        return [ejecutar_solicitud(request, solicitud) for solicitud in solicitudes]
+
+    resultados = []
+    tramo = []
+
+    def vaciar_tramo():
+        if len(tramo) == 1:
+            resultados.append(ejecutar_solicitud(request, tramo[0]))
+        elif tramo:
+            # Cada hilo con una copia del contexto: la instrumentación sigue sumando al request del lote
+            contextos = [(copy_context(), solicitud) for solicitud in tramo]
+            resultados.extend(_obtener_pool().map(
+                lambda par: par[0].run(_ejecutar_en_hilo, request, par[1]), contextos
+            ))
+        tramo.clear()
+
+    for solicitud in solicitudes:
+        if solicitud['metodo'] in METODOS_LECTURA:
+            tramo.append(solicitud)
+        else:
+            vaciar_tramo()
+            resultados.append(ejecutar_solicitud(request, solicitud))
+    vaciar_tramo()
+    return resultados
+
+
+class LoteView(APIView):
+    """
+    Ejecuta varias llamadas a la API en un solo request (ver módulo).
+    Cada sub-request aplica sus propios permisos con el usuario del request principal.
+    """
+    permission_classes = [AllowAny]
+
+    def post(self, request):
+        serializer = LoteSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(
+                {"error": "Datos inválidos", "details": serializer.errors},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        datos = serializer.validated_data
+        # Resolver el usuario aquí: los hilos solo lo leen
+        request.user
+
+        respuestas = ejecutar_lote(request, datos['solicitudes'], datos['paralelo'])
+        return Response({'respuestas': respuestas})
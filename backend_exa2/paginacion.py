@@ -0,0 +1,147 @@
+"""
+Paginación por defecto de los listados de la API.
+
+Por defecto es paginación por cursor (keyset): cada página filtra por el último
+valor visto del campo de orden (WHERE fecha < X ORDER BY fecha DESC LIMIT n), así
+una página profunda cuesta lo mismo que la primera y no se ejecuta COUNT(*).
+
+    GET /api/transacciones/notas-venta/                  -> primera página
+    GET /api/transacciones/notas-venta/?cursor=cD0yMDI1  -> siguiente (usar el link "next")
+    GET /api/transacciones/notas-venta/?page_size=200    -> tamaño de página (máx. 500)
+
+Paginación por desplazamiento (opcional) al enviar `offset`:
+
+    GET /api/inventario/productos/?offset=100&limit=50
+
+El total solo se calcula si se pide con `contar=true` (agrega "count" a la respuesta).
+
+Orden del cursor, en prioridad: `?ordering=` si la vista usa OrderingFilter, el
+atributo `ordering_cursor` de la vista, el order_by del queryset, el Meta.ordering
+del modelo o la clave primaria. Siempre se agrega pk como desempate.
+"""
+from rest_framework.filters import OrderingFilter
+from rest_framework.pagination import BasePagination, CursorPagination, LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+TAMANO_PAGINA_MAXIMO = 500
+PARAMETRO_CONTAR = 'contar'
+
+
+def _pide_total(request):
+    return request.query_params.get(PARAMETRO_CONTAR, '').lower() in ('1', 'true', 'si')
+
+
+class PaginacionCursor(CursorPagination):
+    page_size_query_param = 'page_size'
+    max_page_size = TAMANO_PAGINA_MAXIMO
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.total = queryset.count() if _pide_total(request) else None
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_ordering(self, request, queryset, view):
+        ordering = None
+        for backend in getattr(view, 'filter_backends', []):
+            if issubclass(backend, OrderingFilter) and backend.ordering_param in request.query_params:
+                ordering = backend().get_ordering(request, queryset, view)
+                break
+        if not ordering:
+            ordering = getattr(view, 'ordering_cursor', None)
+        if not ordering:
+            ordering = [campo for campo in queryset.query.order_by if isinstance(campo, str)]
+        if not ordering:
+            ordering = queryset.model._meta.ordering
+        ordering = [campo for campo in ordering if isinstance(campo, str) and '__' not in campo] or ['pk']
+
+        # 'pk' por la columna de la clave (nota_venta_id en Pago/historial: ordenar por
+        # 'nota_venta' usaría el orden de NotaDeVenta). Los listados rápidos paginan
+        # filas de .values(), que traen esa columna pero no la clave 'pk'.
+        nombre_pk = queryset.model._meta.pk.attname
+        ordering = [campo.replace('pk', nombre_pk) if campo.lstrip('-') == 'pk' else campo for campo in ordering]
+
+        # Desempate por pk en la misma dirección que el primer campo
+        if not any(campo.lstrip('-') in (nombre_pk, queryset.model._meta.pk.name) for campo in ordering):
+            ordering.append(f"-{nombre_pk}" if ordering[0].startswith('-') else nombre_pk)
+        return tuple(ordering)
+
+    def get_paginated_response(self, data):
+        respuesta = {'next': self.get_next_link(), 'previous': self.get_previous_link(), 'results': data}
+        if self.total is not None:
+            respuesta = {'count': self.total, **respuesta}
+        return Response(respuesta)
+
+    def get_paginated_response_schema(self, schema):
+        esquema = super().get_paginated_response_schema(schema)
+        esquema['properties']['count'] = {'type': 'integer', 'example': 123}
+        return esquema
+
+
+class PaginacionOffset(LimitOffsetPagination):
+    """LimitOffsetPagination sin COUNT(*): se lee un registro extra para saber si hay más"""
+    max_limit = TAMANO_PAGINA_MAXIMO
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+        self.offset = self.get_offset(request)
+        self.count = queryset.count() if _pide_total(request) else None
+
+        filas = list(queryset[self.offset:self.offset + self.limit + 1])
+        self.hay_siguiente = len(filas) > self.limit
+        return filas[:self.limit]
+
+    def get_next_link(self):
+        # La implementación base compara contra self.count
+        if not self.hay_siguiente:
+            return None
+        url = replace_query_param(self.request.build_absolute_uri(), self.limit_query_param, self.limit)
+        return replace_query_param(url, self.offset_query_param, self.offset + self.limit)
+
+    def get_paginated_response(self, data):
+        respuesta = {'next': self.get_next_link(), 'previous': self.get_previous_link(), 'results': data}
+        if self.count is not None:
+            respuesta = {'count': self.count, **respuesta}
+        return Response(respuesta)
+
+    def get_paginated_response_schema(self, schema):
+        esquema = super().get_paginated_response_schema(schema)
+        esquema['required'] = ['results']
+        return esquema
+
+
+class Paginacion(BasePagination):
+    """Cursor por defecto; desplazamiento cuando el request trae `offset`"""
+
+    def _elegir(self, request):
+        if not hasattr(self, 'paginador'):
+            usa_offset = PaginacionOffset.offset_query_param in request.query_params
+            self.paginador = PaginacionOffset() if usa_offset else PaginacionCursor()
+        return self.paginador
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self._elegir(request).paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.paginador.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        return PaginacionCursor().get_paginated_response_schema(schema)
+
+    def get_schema_operation_parameters(self, view):
+        parametros = PaginacionCursor().get_schema_operation_parameters(view)
+        nombres = {parametro['name'] for parametro in parametros}
+        parametros += [
+            parametro for parametro in PaginacionOffset().get_schema_operation_parameters(view)
+            if parametro['name'] not in nombres
+        ]
+        parametros.append({
+            'name': PARAMETRO_CONTAR,
+            'required': False,
+            'in': 'query',
+            'description': 'true para incluir el total de registros (COUNT)',
+            'schema': {'type': 'boolean'},
+        })
+        return parametros
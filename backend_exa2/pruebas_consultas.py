@@ -0,0 +1,289 @@
+"""
+Regresión de la cantidad de consultas SQL por endpoint.
+
+Cada app declara en su tests.py una subclase de PresupuestoConsultasTestCase
+con el presupuesto (consultas máximas) de cada ruta GET de su urls.py:
+
+    class PresupuestoConsultasTest(PresupuestoConsultasTestCase):
+        app = 'inventario'
+        prefijo = '/api/inventario/'
+        presupuestos = {
+            'producto-list': 1,
+            'producto-list?rapido=false': 1,        # variante con parámetros
+            'producto-kardex': 6,                   # pk: el objeto sembrado de su basename ('producto')
+        }
+
+La prueba siembra los datos de todas las apps en dos tamaños (TAMANO_PEQUENO y
+TAMANO_GRANDE: filas por tabla y también hijos por registro, ej: detalles por
+nota), pide cada endpoint con la caché vacía y falla si:
+- con más filas hace más consultas (N+1), o
+- supera su presupuesto, o
+- hay una ruta GET sin presupuesto (las nuevas se registran al agregarlas).
+
+Los parámetros del presupuesto se completan con los datos sembrados
+(ej: 'historial-ventas-por-cliente?ci={cliente_ci}'). Los endpoints de
+escritura no entran: su costo depende del cuerpo enviado, no de las filas que
+ya existen.
+
+    python manage.py test perfiles inventario transacciones analitica
+"""
+import shutil
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+from importlib import import_module
+
+from django.contrib.auth.models import Group, Permission, User
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.db import connection, transaction
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import NoReverseMatch, URLPattern, URLResolver, reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+TAMANO_PEQUENO = 3
+TAMANO_GRANDE = 12
+
+
+def sembrar(tamano, usuario):
+    """
+    Crea `tamano` filas de cada modelo (y `tamano // 3` hijos por registro).
+    El usuario de la prueba es dueño de los reportes y los dispositivos.
+
+    Returns:
+        dict: pk del último objeto de cada ruta (por basename) y valores para
+        los parámetros de los presupuestos
+    """
+    from analitica.models import MetricaCliente, PronosticoProducto, Reporte
+    from inventario.modelsCarrito import Carrito
+    from inventario.modelsCategoria import Categoria
+    from inventario.modelsCoocurrenciaProducto import CoocurrenciaProducto
+    from inventario.modelsDetalleCarrito import DetalleCarrito
+    from inventario.modelsMovimientoInventario import MovimientoInventario
+    from inventario.modelsProducto import Producto
+    from inventario.modelsProductoEliminado import ProductoEliminado
+    from perfiles.models import Cliente, Empleado
+    from perfiles.models_device_token import DeviceToken
+    from transacciones.modelsDetalleNotaDeVenta import DetalleNotaDeVenta
+    from transacciones.modelsListadoHistoricoVentas import ListadoHistoricoVentas
+    from transacciones.modelsNotaDeVenta import NotaDeVenta
+    from transacciones.modelsPago import Pago
+
+    hijos = max(tamano // 3, 1)
+    ahora = timezone.now()
+    permisos = list(Permission.objects.order_by('id')[:hijos])
+
+    roles = []
+    for numero in range(tamano):
+        rol = Group.objects.create(name=f"rol-prueba-{numero}")
+        rol.permissions.set(permisos)
+        roles.append(rol)
+
+    clientes, empleados = [], []
+    for numero in range(tamano):
+        usuario_cliente = User.objects.create(username=f"cliente{numero}", email=f"cliente{numero}@prueba.local")
+        usuario_cliente.groups.set(roles[:hijos])
+        clientes.append(Cliente.objects.create(
+            nombre=f"Cliente {numero}", apellido='Prueba', ci=f"{1000 + numero}", sexo='F', usuario=usuario_cliente,
+        ))
+        usuario_empleado = User.objects.create(username=f"empleado{numero}", is_staff=True)
+        usuario_empleado.groups.set(roles[:hijos])
+        empleados.append(Empleado.objects.create(
+            nombre=f"Empleado {numero}", apellido='Prueba', ci=f"{5000 + numero}", sexo='M', usuario=usuario_empleado,
+        ))
+
+    categorias = [Categoria.objects.create(nombre=f"Categoría {numero}", descripcion='') for numero in range(tamano)]
+    productos = [
+        Producto.objects.create(
+            codigo=f"PR-{numero:04d}", nombre=f"Producto {numero}", descripcion='', categoria=categorias[numero],
+            precio_compra=Decimal('60.00'), precio_venta=Decimal('100.00'), costo_promedio=Decimal('60.00'),
+            stock=50, imagen=f"https://imagenes.local/{numero}.webp",
+        )
+        for numero in range(tamano)
+    ]
+    ProductoEliminado.objects.bulk_create(
+        ProductoEliminado(producto_id=100000 + numero, codigo=f"EL-{numero:04d}") for numero in range(tamano)
+    )
+    objetivo = productos[-1]
+    MovimientoInventario.objects.bulk_create(
+        MovimientoInventario(producto=objetivo, tipo='compra', cantidad=5, costo_unitario=Decimal('60.00'),
+                             documento='prueba', documento_id=str(numero), usuario=usuario, fecha=ahora)
+        for numero in range(tamano)
+    )
+    CoocurrenciaProducto.objects.bulk_create(
+        CoocurrenciaProducto(producto=objetivo, relacionado=producto, veces=tamano - numero)
+        for numero, producto in enumerate(productos[:-1])
+    )
+
+    carritos = []
+    for numero, cliente in enumerate(clientes):
+        carrito = Carrito.objects.create(codigo=f"CAR-{numero:04d}", cliente=cliente)
+        DetalleCarrito.objects.bulk_create(
+            DetalleCarrito(carrito=carrito, producto=producto, cantidad=1, precio_unitario=producto.precio_venta)
+            for producto in productos[:hijos]
+        )
+        carritos.append(carrito)
+
+    notas = []
+    for numero in range(tamano):
+        # La mitad de las ventas son del primer cliente (sus listados también crecen)
+        cliente = clientes[0] if numero % 2 == 0 else clientes[numero]
+        nota = NotaDeVenta.objects.create(
+            numero_comprobante=f"NV-{numero:04d}", cliente=cliente, estado='pagada',
+            fecha=ahora - timedelta(days=numero), subtotal=Decimal(100 * hijos), total=Decimal(100 * hijos),
+        )
+        DetalleNotaDeVenta.objects.bulk_create(
+            DetalleNotaDeVenta(nota_venta=nota, producto=producto, codigo=producto.codigo, cantidad=1,
+                               subtotal=producto.precio_venta, total=producto.precio_venta)
+            for producto in productos[:hijos]
+        )
+        Pago.objects.create(nota_venta=nota, fecha=nota.fecha, monto=nota.total, moneda='BOB',
+                            total_stripe=f"pi_prueba_{numero}")
+        ListadoHistoricoVentas.objects.create(
+            nota_venta=nota, cliente_nombre=cliente.nombre, cliente_ci=cliente.ci, numero_venta=nota.numero_comprobante,
+            fecha_venta=nota.fecha, subtotal=nota.subtotal, total=nota.total, metodo_pago='Stripe',
+            estado_pago='pagado', fecha_pago=nota.fecha, referencia_pago=f"pi_prueba_{numero}",
+        )
+        notas.append(nota)
+
+    for cliente, nota in zip(clientes, notas):
+        MetricaCliente.objects.create(cliente=cliente, primera_compra=nota.fecha, ultima_compra=nota.fecha,
+                                      frecuencia=1, monto_total=nota.total, ticket_promedio=nota.total)
+    for producto in productos:
+        PronosticoProducto.objects.create(producto=producto, fecha_calculo=ahora, ventana_dias=30, stock=producto.stock)
+
+    reportes = []
+    for numero in range(tamano):
+        reporte = Reporte(usuario=usuario, tipo='ESTATICO', nombre=f"Reporte {numero}", consulta_original='{}',
+                          formato='PDF')
+        reporte.archivo.save(f"reporte_{numero}.pdf", ContentFile(b'%PDF-1.4 prueba'), save=False)
+        reporte.save()
+        reportes.append(reporte)
+    tokens = [
+        DeviceToken.objects.create(user=usuario, token=f"dispositivo-prueba-{numero}", platform='android')
+        for numero in range(tamano)
+    ]
+
+    nota = notas[0]
+    return {
+        'cliente': clientes[-1].pk, 'empleado': empleados[-1].pk, 'rol': roles[-1].pk,
+        'usuario': clientes[-1].usuario_id, 'categoria': categorias[-1].pk, 'producto': objetivo.pk,
+        'carrito': carritos[-1].pk, 'detalle-carrito': carritos[-1].detalles.first().pk,
+        'nota-venta': nota.pk, 'detalle-nota-venta': nota.detalles.first().pk, 'pago': nota.pk,
+        'historial-ventas': nota.pk, 'reporte': reportes[-1].pk, 'pronostico': objetivo.pk,
+        'token_id': tokens[-1].pk, 'cliente_ci': clientes[0].ci, 'nota_venta_id': nota.pk,
+        'entidad': 'productos', 'desde': (ahora - timedelta(days=tamano)).date().isoformat(),
+        'hasta': ahora.date().isoformat(),
+    }
+
+
+def rutas_get(urlpatterns):
+    """{nombre: basename del router o None} de las rutas de `urlpatterns` que responden a GET"""
+    rutas = {}
+    for patron in urlpatterns:
+        if isinstance(patron, URLResolver):
+            rutas.update(rutas_get(patron.url_patterns))
+            continue
+        if not isinstance(patron, URLPattern) or patron.name is None or 'format' in patron.pattern.regex.groupindex:
+            continue
+        vista = patron.callback
+        acciones = getattr(vista, 'actions', None)
+        clase = getattr(vista, 'cls', None) or getattr(vista, 'view_class', None)
+        if acciones is not None:
+            responde = 'get' in acciones
+        else:
+            responde = clase is not None and hasattr(clase, 'get')
+        if responde:
+            rutas[patron.name] = getattr(vista, 'initkwargs', {}).get('basename')
+    return rutas
+
+
+class PresupuestoConsultasTestCase(APITestCase):
+    """Ver el docstring del módulo"""
+    app = None
+    prefijo = None
+    # {'nombre-de-ruta[?parametros]': consultas máximas}
+    presupuestos = {}
+    # Argumentos de las rutas que no son el pk de su objeto: {'nombre-de-ruta': {'kwarg': clave de los datos}}
+    argumentos = {}
+
+    @classmethod
+    def setUpClass(cls):
+        cls._media = tempfile.mkdtemp()
+        # Caché en memoria: cada medición la vacía (nunca el Redis configurado)
+        cls._configuracion = override_settings(MEDIA_ROOT=cls._media, CACHES={
+            'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'pruebas-consultas'},
+        })
+        cls._configuracion.enable()
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls._configuracion.disable()
+        shutil.rmtree(cls._media, ignore_errors=True)
+
+    @classmethod
+    def setUpTestData(cls):
+        from perfiles.models import Cliente, Empleado
+        cls.usuario = User.objects.create_superuser('admin-prueba', 'admin@prueba.local', 'admin-prueba')
+        Cliente.objects.create(nombre='Admin', apellido='Prueba', ci='999', sexo='M', usuario=cls.usuario)
+        Empleado.objects.create(nombre='Admin', apellido='Prueba', ci='9999', sexo='M', usuario=cls.usuario)
+
+    def setUp(self):
+        if self.app is None:
+            self.skipTest('Subclase sin app')
+        self.client.force_authenticate(self.usuario)
+
+    def _url(self, clave, datos):
+        nombre, _, parametros = clave.partition('?')
+        urlconf = f'{self.app}.urls'
+        argumentos = {argumento: datos[dato] for argumento, dato in self.argumentos.get(nombre, {}).items()}
+        try:
+            ruta = reverse(nombre, urlconf=urlconf, kwargs=argumentos)
+        except NoReverseMatch:
+            # Ruta de detalle: el pk del objeto sembrado de su basename
+            basename = rutas_get(import_module(urlconf).urlpatterns)[nombre]
+            ruta = reverse(nombre, urlconf=urlconf, kwargs={'pk': datos[basename], **argumentos})
+        url = self.prefijo + ruta.lstrip('/')
+        if parametros:
+            url += '?' + parametros.format(**datos)
+        return url
+
+    def _medir(self, tamano):
+        """{clave: (consultas, status, url)} con `tamano` filas; los datos se descartan al terminar"""
+        mediciones = {}
+        with transaction.atomic():
+            datos = sembrar(tamano, self.usuario)
+            for clave in self.presupuestos:
+                url = self._url(clave, datos)
+                cache.clear()
+                with CaptureQueriesContext(connection) as consultas:
+                    respuesta = self.client.get(url)
+                mediciones[clave] = (len(consultas), respuesta.status_code, url)
+            transaction.set_rollback(True)
+        return mediciones
+
+    def test_rutas_con_presupuesto(self):
+        urlconf = import_module(f'{self.app}.urls')
+        declaradas = {clave.partition('?')[0] for clave in self.presupuestos}
+        faltantes = sorted(set(rutas_get(urlconf.urlpatterns)) - declaradas)
+        self.assertEqual(faltantes, [], f"Rutas GET de {self.app} sin presupuesto de consultas")
+
+    def test_consultas_no_crecen_con_las_filas(self):
+        pequeno = self._medir(TAMANO_PEQUENO)
+        grande = self._medir(TAMANO_GRANDE)
+        for clave, presupuesto in self.presupuestos.items():
+            with self.subTest(endpoint=clave):
+                consultas_pequeno, status_pequeno, _ = pequeno[clave]
+                consultas, status, url = grande[clave]
+                self.assertLess(status, 400, f"GET {url} respondió {status}")
+                self.assertEqual(status_pequeno, status)
+                self.assertLessEqual(
+                    consultas, consultas_pequeno,
+                    f"GET {url}: {consultas_pequeno} consultas con {TAMANO_PEQUENO} filas y {consultas} con "
+                    f"{TAMANO_GRANDE} (N+1)"
+                )
+                self.assertLessEqual(consultas, presupuesto, f"GET {url}: {consultas} consultas, presupuesto {presupuesto}")
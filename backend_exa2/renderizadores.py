@@ -0,0 +1,43 @@
+"""
+Renderizador JSON de la API con orjson.
+
+Produce los mismos bytes que JSONRenderer de DRF (separadores compactos, UTF-8
+sin escapar, U+2028/U+2029 escapados) pero codifica en C. Las fechas, Decimal y
+demás tipos que orjson no trata igual que DRF se delegan al JSONEncoder de DRF.
+
+Si orjson no está instalado, se pide indentación (?indent / Accept con indent) o
+orjson no puede codificar el dato (ej: enteros de más de 64 bits), se usa el
+renderizador de DRF.
+"""
+from rest_framework.renderers import JSONRenderer
+from backend_exa2.instrumentacion import medir
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dependencia opcional
+    orjson = None
+
+OPCIONES_ORJSON = (
+    orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS if orjson else 0
+)
+
+
+class JSONRendererRapido(JSONRenderer):
+
+    @medir('render')
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None or data is None or not self.compact or self.ensure_ascii
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default, option=OPCIONES_ORJSON)
+        except (orjson.JSONEncodeError, TypeError):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Igual que DRF: estos separadores son válidos en JSON pero no en JavaScript
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
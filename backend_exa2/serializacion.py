@@ -0,0 +1,320 @@
+"""
+Serialización rápida de solo lectura para listados grandes.
+
+Un SerializadorRapido se declara con la lista de campos de salida y se compila
+(una vez) en:
+- la consulta `.values()` con exactamente las columnas necesarias (incluidas
+  las de relaciones, sin instanciar modelos); en los listados se agregan solo
+  las columnas de orden que la paginación por cursor usa como posición
+- una función fila -> dict generada en código, que aplica los mismos formatos
+  que DRF (Decimal como texto con sus decimales, fechas ISO 8601 en la zona
+  horaria activa con 'Z' para UTC, etc.) para que el JSON sea idéntico al del
+  ModelSerializer equivalente.
+
+Campos:
+    'codigo'                              -> campo del modelo
+    ('categoria_nombre', 'categoria__nombre') -> otra ruta del ORM
+    Calculado('dias', funcion, 'fecha')   -> funcion(*valores de las rutas)
+    Anotado('cantidad_items', Count(...)) -> expresión agregada en la consulta
+    Anidado('producto_info', [...], si_existe='producto__id') -> dict anidado
+
+Uso en una vista (ver ListadoRapidoMixin):
+
+    serializador_rapido = SerializadorRapido(Producto, ['id', 'codigo', ...])
+
+`expandibles` cumple el papel de Meta.expandibles del serializer: con ?fields= o
+?expand= el listado rápido se recorta igual (backend_exa2/campos.py), también en SQL.
+
+La compilación es perezosa y segura entre hilos: se arma completa y se publica
+de una vez.
+"""
+import decimal
+import threading
+from collections import OrderedDict
+from django.db import models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.db.models.constants import LOOKUP_SEP
+from django.utils import timezone
+from rest_framework.response import Response
+from backend_exa2.campos import campos_orden, leer_parametros, seleccionar
+from backend_exa2.instrumentacion import medir, serializar
+
+
+class Calculado:
+    """Campo calculado en Python a partir de otras columnas"""
+
+    def __init__(self, nombre, funcion, *rutas, formato=None):
+        self.nombre = nombre
+        self.funcion = funcion
+        self.rutas = rutas
+        self.formato = formato
+
+
+class Anotado:
+    """Campo calculado por la base de datos (annotate)"""
+
+    def __init__(self, nombre, expresion, formato=None):
+        self.nombre = nombre
+        self.expresion = expresion
+        self.formato = formato
+
+
+class Anidado:
+    """Objeto anidado; None si la ruta `si_existe` es nula (ej: FK vacía)"""
+
+    def __init__(self, nombre, campos, si_existe=None):
+        self.nombre = nombre
+        self.campos = campos
+        self.si_existe = si_existe
+
+
+# Formatos equivalentes a los to_representation de DRF
+
+def formato_decimal(decimales, max_digitos=None):
+    """DecimalField de DRF con COERCE_DECIMAL_TO_STRING"""
+    exponente = decimal.Decimal(1).scaleb(-decimales)
+    contexto = decimal.Context(prec=max_digitos) if max_digitos else decimal.getcontext()
+
+    def convertir(valor):
+        if valor is None:
+            return None
+        if not isinstance(valor, decimal.Decimal):
+            valor = decimal.Decimal(str(valor).strip())
+        return '{:f}'.format(valor.quantize(exponente, context=contexto))
+    return convertir
+
+
+def formato_fecha_hora(valor, zona):
+    if valor is None:
+        return None
+    if timezone.is_aware(valor):
+        valor = valor.astimezone(zona)
+    texto = valor.isoformat()
+    if texto.endswith('+00:00'):
+        texto = texto[:-6] + 'Z'
+    return texto
+
+
+def formato_iso(valor):
+    return None if valor is None else valor.isoformat()
+
+
+def formato_texto(valor):
+    return None if valor is None else str(valor)
+
+
+def conteo_relacionado(queryset, campo, referencia='pk'):
+    """
+    COUNT correlacionado para un Anotado: se evalúa solo para las filas de la
+    página, sin el GROUP BY sobre toda la tabla que haría Count('relacion').
+
+        Anotado('cantidad_items', conteo_relacionado(DetalleNotaDeVenta.objects, 'nota_venta', 'nota_venta'))
+    """
+    conteo = (
+        queryset.filter(**{campo: OuterRef(referencia)})
+        .order_by().values(campo).annotate(cantidad=Count('*')).values('cantidad')
+    )
+    return Coalesce(Subquery(conteo, output_field=models.IntegerField()), 0)
+
+
+def _formato_campo(campo):
+    """Formato de salida de un campo del modelo (None = el valor tal cual)"""
+    if isinstance(campo, models.DecimalField):
+        return formato_decimal(campo.decimal_places, campo.max_digits)
+    if isinstance(campo, models.DateTimeField):
+        return formato_fecha_hora
+    if isinstance(campo, (models.DateField, models.TimeField)):
+        return formato_iso
+    if isinstance(campo, (models.UUIDField, models.GenericIPAddressField)):
+        return formato_texto
+    if isinstance(campo, models.FileField):
+        raise ValueError(f"{campo} necesita el request para armar la URL: usar el serializer de DRF")
+    return None
+
+
+def _resolver_campo(modelo, ruta):
+    """Campo del modelo al final de una ruta del ORM ('producto__categoria__nombre')"""
+    partes = ruta.split(LOOKUP_SEP)
+    campo = None
+    for indice, parte in enumerate(partes):
+        campo = modelo._meta.pk if parte == 'pk' else modelo._meta.get_field(parte)
+        if campo.is_relation and indice < len(partes) - 1:
+            modelo = campo.related_model
+    if campo.is_relation:
+        # Una FK sola se serializa como su pk (PrimaryKeyRelatedField)
+        campo = campo.target_field
+    return campo
+
+
+class _Compilacion:
+    """Resultado de compilar un SerializadorRapido; se publica completo, nunca a medias"""
+
+    def __init__(self, modelo, campos):
+        self.rutas = []
+        self.anotaciones = {}
+        self.globales = {'_fecha_hora': formato_fecha_hora}
+        self.modelo = modelo
+        codigo = self._codigo_dict(campos)
+
+        self.fuente = f"def convertir_fila(f, _zona):\n    return {codigo}\n"
+        exec(compile(self.fuente, f'<SerializadorRapido {modelo.__name__}>', 'exec'), self.globales)
+        self.convertir_fila = self.globales['convertir_fila']
+
+    def _columna(self, ruta):
+        if ruta not in self.rutas:
+            self.rutas.append(ruta)
+        return f"f[{ruta!r}]"
+
+    def _aplicar(self, expresion, formato):
+        if formato is None:
+            return expresion
+        if formato is formato_fecha_hora:
+            return f"_fecha_hora({expresion}, _zona)"
+        nombre = f"_formato{len(self.globales)}"
+        self.globales[nombre] = formato
+        return f"{nombre}({expresion})"
+
+    def _codigo_dict(self, campos):
+        partes = []
+        for campo in campos:
+            if isinstance(campo, str):
+                campo = (campo, campo)
+            if isinstance(campo, tuple):
+                nombre, ruta = campo
+                expresion = self._aplicar(self._columna(ruta), _formato_campo(_resolver_campo(self.modelo, ruta)))
+            elif isinstance(campo, Calculado):
+                nombre = campo.nombre
+                funcion = f"_funcion{len(self.globales)}"
+                self.globales[funcion] = campo.funcion
+                argumentos = ", ".join(self._columna(ruta) for ruta in campo.rutas)
+                expresion = self._aplicar(f"{funcion}({argumentos})", campo.formato)
+            elif isinstance(campo, Anotado):
+                nombre = campo.nombre
+                self.anotaciones[nombre] = campo.expresion
+                expresion = self._aplicar(self._columna(nombre), campo.formato)
+            elif isinstance(campo, Anidado):
+                nombre = campo.nombre
+                expresion = self._codigo_dict(campo.campos)
+                if campo.si_existe:
+                    expresion = f"({expresion} if {self._columna(campo.si_existe)} is not None else None)"
+            else:
+                raise TypeError(f"Campo no soportado: {campo!r}")
+            partes.append(f"{nombre!r}: {expresion}")
+        return "{" + ", ".join(partes) + "}"
+
+
+class SerializadorRapido:
+
+    # Combinaciones de ?fields= / ?expand= compiladas que se conservan por serializador
+    MAX_RECORTES = 64
+
+    def __init__(self, modelo, campos, expandibles=()):
+        self.modelo = modelo
+        self.campos = campos
+        self.expandibles = expandibles
+        self._compilacion = None
+        # Los listados se sirven desde varios hilos (/api/batch/ en paralelo, ASGI)
+        self._bloqueo = threading.Lock()
+        self._recortes = OrderedDict()
+
+    @property
+    def nombres(self):
+        return [campo if isinstance(campo, str) else campo[0] if isinstance(campo, tuple) else campo.nombre
+                for campo in self.campos]
+
+    def recortar(self, nombres):
+        """
+        Serializador con solo los campos de `nombres`. Se guardan los últimos
+        MAX_RECORTES: las combinaciones las elige el cliente.
+        """
+        clave = frozenset(nombres)
+        with self._bloqueo:
+            recorte = self._recortes.get(clave)
+            if recorte is None:
+                campos = [campo for campo, nombre in zip(self.campos, self.nombres) if nombre in clave]
+                recorte = self._recortes[clave] = SerializadorRapido(self.modelo, campos)
+                if len(self._recortes) > self.MAX_RECORTES:
+                    self._recortes.popitem(last=False)
+            else:
+                self._recortes.move_to_end(clave)
+        return recorte
+
+    def para_request(self, request):
+        """El serializador recortado según ?fields= / ?expand="""
+        seleccion = seleccionar(self.nombres, self.expandibles, *leer_parametros(request))
+        return self if seleccion is None else self.recortar(seleccion)
+
+    @property
+    def compilacion(self):
+        """Se compila una vez, en el primer uso"""
+        compilacion = self._compilacion
+        if compilacion is None:
+            with self._bloqueo:
+                if self._compilacion is None:
+                    self._compilacion = _Compilacion(self.modelo, self.campos)
+                compilacion = self._compilacion
+        return compilacion
+
+    @property
+    def fuente(self):
+        return self.compilacion.fuente
+
+    def consulta(self, queryset, orden=()):
+        """
+        queryset.values() con las columnas del serializador y además las de `orden`:
+        la paginación por cursor lee de cada fila el valor de sus campos de orden.
+        """
+        compilacion = self.compilacion
+        # .values() no admite prefetch; las relaciones salen del JOIN
+        queryset = queryset.prefetch_related(None)
+        if compilacion.anotaciones:
+            queryset = queryset.annotate(**compilacion.anotaciones)
+        extra = sorted(campo for campo in orden if campo not in compilacion.rutas)
+        return queryset.values(*compilacion.rutas, *extra)
+
+    def convertir(self, filas):
+        """Lista de dicts con la misma forma que el ModelSerializer"""
+        zona = timezone.get_current_timezone()
+        convertir_fila = self.compilacion.convertir_fila
+        return [convertir_fila(fila, zona) for fila in filas]
+
+    def serializar(self, queryset):
+        return self.convertir(self.consulta(queryset))
+
+
+class ListadoRapidoMixin:
+    """
+    Mixin para ViewSets: `list` usa `serializador_rapido` en vez del serializer de DRF.
+    `?rapido=false` fuerza el camino normal (para comparar salidas).
+    Por cualquiera de los dos caminos, y en `retrieve`, la serialización se mide aparte.
+    """
+    serializador_rapido = None
+
+    def list(self, request, *args, **kwargs):
+        if self.serializador_rapido is None or request.query_params.get('rapido', '').lower() in ('0', 'false', 'no'):
+            return self.listado_drf()
+
+        # La consulta la arma el serializador rápido (ConsultaCamposMixin no interviene)
+        self.listado_rapido = True
+        rapido = self.serializador_rapido.para_request(request)
+        queryset = self.filter_queryset(self.get_queryset())
+        filas = rapido.consulta(queryset, campos_orden(self, queryset) | {queryset.model._meta.pk.attname})
+        page = self.paginate_queryset(filas)
+        with medir('serializacion'):
+            datos = rapido.convertir(page if page is not None else filas)
+        if page is not None:
+            return self.get_paginated_response(datos)
+        return Response(datos)
+
+    def listado_drf(self):
+        """ListModelMixin.list con la serialización medida"""
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        datos = serializar(self.get_serializer(page if page is not None else queryset, many=True))
+        if page is not None:
+            return self.get_paginated_response(datos)
+        return Response(datos)
+
+    def retrieve(self, request, *args, **kwargs):
+        return Response(serializar(self.get_serializer(self.get_object())))
@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 from pathlib import Path
 from datetime import timedelta
 from decouple import config
+from django.core.exceptions import ImproperlyConfigured
 import dj_database_url
 from dotenv import load_dotenv
 import os
@@ -79,20 +80,67 @@ INSTALLED_APPS = [
         'corsheaders',
 ]
 
+# Caché
+# Con REDIS_URL (Railway) la caché es compartida entre workers; sin ella se usa memoria local,
+# donde las invalidaciones solo alcanzan al proceso que las hizo (válido en desarrollo).
+REDIS_URL = config('REDIS_URL', default='')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+            'KEY_PREFIX': 'backend_exa2',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'backend_exa2',
+        }
+    }
+
+# Caché compartida entre workers: las invalidaciones y revocaciones llegan a todos los procesos
+CACHE_COMPARTIDA = CACHES['default']['BACKEND'] != 'django.core.cache.backends.locmem.LocMemCache'
+
+# Autenticación JWT sin estado: el usuario se arma con los claims del token
+# (perfiles/authentication.py) en vez de leer el User en cada request.
+# La revocación (logout, baja, cambio de contraseña, rol o grupos) es una lista de denegación en
+# la caché: con la caché en memoria de cada proceso solo la vería el worker que hizo el cambio.
+# Por eso se activa por defecto solo con caché compartida, y sin ella únicamente se admite con DEBUG
+JWT_SIN_ESTADO = config('JWT_SIN_ESTADO', default=CACHE_COMPARTIDA, cast=bool)
+if JWT_SIN_ESTADO and not CACHE_COMPARTIDA and not DEBUG:
+    raise ImproperlyConfigured(
+        "JWT_SIN_ESTADO requiere una caché compartida (REDIS_URL): la revocación de tokens "
+        "no llegaría a los demás workers"
+    )
+
 # Configuración de autenticación JWT para DRF
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'perfiles.authentication.JWTSinEstadoAuthentication' if JWT_SIN_ESTADO
+        else 'rest_framework_simplejwt.authentication.JWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    # Cursor por defecto, desplazamiento con ?offset= (ver backend_exa2/paginacion.py)
+    'DEFAULT_PAGINATION_CLASS': 'backend_exa2.paginacion.Paginacion',
+    'PAGE_SIZE': 50,
+    # Mismo JSON que JSONRenderer pero codificado con orjson (backend_exa2/renderizadores.py)
+    'DEFAULT_RENDERER_CLASSES': (
+        'backend_exa2.renderizadores.JSONRendererRapido',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
 }
 
+# /api/batch/: hilos para ejecutar en paralelo las lecturas de un lote (backend_exa2/lote.py)
+LOTE_HILOS = config('LOTE_HILOS', default=4, cast=int)
+
 # JWT: Duración de sesión (tokens)
-# Acceso: 1 hora | Refresh: 7 días (con rotación y blacklist)
+# Acceso: 15 minutos (corto: los claims del token se usan sin consultar la BD) | Refresh: 7 días (con rotación y blacklist)
 SIMPLE_JWT = {
-    'ACCESS_TOKEN_LIFETIME': timedelta(hours=1),
+    'ACCESS_TOKEN_LIFETIME': timedelta(minutes=config('JWT_ACCESS_MINUTES', default=15, cast=int)),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
@@ -100,9 +148,12 @@ SIMPLE_JWT = {
 }
 
 MIDDLEWARE = [
+    # Primero: mide el request completo (consultas, fases, Server-Timing, /metrics/)
+    'backend_exa2.instrumentacion.InstrumentacionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',  # Servir archivos estáticos en producción
+    # Servir archivos estáticos en producción (WhiteNoise, también en una cadena async: ver estaticos.py)
+    'backend_exa2.estaticos.WhiteNoiseAsincronoMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -111,6 +162,47 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Instrumentación por request (backend_exa2/instrumentacion.py)
+# Requests más lentos que esto (ms) se registran en el log
+INSTRUMENTACION_LENTO_MS = config('INSTRUMENTACION_LENTO_MS', default=500, cast=int)
+# Fracción de requests en los que se buscan consultas repetidas (N+1)
+INSTRUMENTACION_MUESTREO = config('INSTRUMENTACION_MUESTREO', default=1.0 if DEBUG else 0.1, cast=float)
+# Veces que se tiene que repetir una consulta en un request para avisar
+INSTRUMENTACION_DUPLICADAS = config('INSTRUMENTACION_DUPLICADAS', default=5, cast=int)
+INSTRUMENTACION_SERVER_TIMING = config('INSTRUMENTACION_SERVER_TIMING', default=True, cast=bool)
+# Token Bearer de GET /metrics/ (Prometheus). Sin token, /metrics/ solo responde con DEBUG
+METRICAS_TOKEN = config('METRICAS_TOKEN', default='')
+
+# Tiempo máximo (ms) de los imports del arranque de un worker; lo verifica backend_exa2/tests.py
+# (ver backend_exa2/importacion.py)
+IMPORTACION_PRESUPUESTO_MS = config('IMPORTACION_PRESUPUESTO_MS', default=1500, cast=int)
+
+# Despliegue ASGI (backend_exa2/asgi.py y backend_exa2/gunicorn_asgi.py)
+# Atiende create-payment-intent, confirm-payment y confirm-payment-auto con vistas async que no
+# ocupan un worker mientras esperan a Stripe. asgi.py lo activa; con WSGI queda en False
+VISTAS_ASINCRONAS = config('VISTAS_ASINCRONAS', default=False, cast=bool)
+# Cliente HTTP async compartido para Stripe, FCM e ImgBB (backend_exa2/http_asincrono.py):
+# conexiones simultáneas por proceso, cuántas quedan abiertas para reutilizarse y segundos de espera
+HTTP_MAX_CONEXIONES = config('HTTP_MAX_CONEXIONES', default=500, cast=int)
+HTTP_CONEXIONES_LIBRES = config('HTTP_CONEXIONES_LIBRES', default=50, cast=int)
+HTTP_TIMEOUT = config('HTTP_TIMEOUT', default=30, cast=float)
+
+# Logs de la aplicación por consola (Railway los toma de stdout/stderr)
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'simple': {'format': '{levelname} {name}: {message}', 'style': '{'},
+    },
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler', 'formatter': 'simple'},
+    },
+    'loggers': {
+        app: {'handlers': ['console'], 'level': config('LOG_LEVEL', default='INFO'), 'propagate': False}
+        for app in ('backend_exa2', 'perfiles', 'inventario', 'transacciones', 'analitica')
+    },
+}
+
 ROOT_URLCONF = 'backend_exa2.urls'
 
 TEMPLATES = [
@@ -133,9 +225,51 @@ WSGI_APPLICATION = 'backend_exa2.wsgi.application'
 
 # Database
 # Usar DATABASE_URL si está disponible (Railway), sino usar SQLite para desarrollo
+# Conexiones (métricas del pool en GET /metrics/, ver backend_exa2/instrumentacion.py):
+# - DB_POOL: pool nativo de psycopg 3 por proceso (solo PostgreSQL). Por defecto con ASGI, donde cada
+#   request corre en su propio hilo y una conexión persistente no se reutilizaría
+# - sin pool: cada hilo mantiene su conexión DB_CONN_MAX_AGE segundos (0: una conexión por request).
+#   Con ASGI queda en 0 por la misma razón
+# - DB_CONN_HEALTH_CHECKS: verificar la conexión antes de reutilizarla (persistente o del pool)
+# Conexiones por proceso worker: una persistente por hilo que atiende requests, más hasta
+# LOTE_HILOS (/api/batch/) e IMAGENES_HILOS (miniaturas) abiertas solo mientras dura cada
+# tarea, porque esos hilos cierran su conexión al terminarla. Total en el servidor:
+# WEB_CONCURRENCY x (hilos de request + LOTE_HILOS + IMAGENES_HILOS), debe entrar en el
+# max_connections de PostgreSQL. Con DB_POOL todos comparten el pool (DB_POOL_MAX)
+DB_POOL = config('DB_POOL', default=VISTAS_ASINCRONAS, cast=bool)
+DB_CONN_MAX_AGE = config('DB_CONN_MAX_AGE', default=0 if VISTAS_ASINCRONAS else 600, cast=int)
+DB_CONN_HEALTH_CHECKS = config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool)
+# Conexiones del pool por proceso: abiertas siempre, máximo y segundos de espera por una libre
+DB_POOL_MIN = config('DB_POOL_MIN', default=2, cast=int)
+DB_POOL_MAX = config('DB_POOL_MAX', default=10, cast=int)
+DB_POOL_TIMEOUT = config('DB_POOL_TIMEOUT', default=10, cast=float)
+
 DATABASES = {
-    'default': dj_database_url.config(default=os.getenv('DATABASE_URL'))
+    'default': dj_database_url.config(
+        default=os.getenv('DATABASE_URL'),
+        conn_max_age=DB_CONN_MAX_AGE,
+        conn_health_checks=DB_CONN_HEALTH_CHECKS,
+    )
 }
+if DB_POOL and DATABASES['default'].get('ENGINE') == 'django.db.backends.postgresql':
+    # El pool reemplaza a las conexiones persistentes: Django no admite ambos. Con
+    # CONN_HEALTH_CHECKS, Django verifica cada conexión al tomarla del pool
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default'].setdefault('OPTIONS', {})['pool'] = {
+        'min_size': DB_POOL_MIN,
+        'max_size': DB_POOL_MAX,
+        'timeout': DB_POOL_TIMEOUT,
+    }
+
+
+# Segundos que se conserva el perfil cacheado de un usuario (ver perfiles/cache_perfil.py)
+# También aplica a los permisos y al catálogo de roles (perfiles/cache_permisos.py).
+# Sin caché compartida las invalidaciones de perfiles/signals.py solo alcanzan al worker que hizo
+# el cambio: los demás conservan su copia hasta que vence, por eso el valor por defecto es corto
+PERFIL_CACHE_TIMEOUT = config('PERFIL_CACHE_TIMEOUT', default=3600 if CACHE_COMPARTIDA else 30, cast=int)
+
+# has_perm con los permisos cacheados; el login es el mismo de ModelBackend
+AUTHENTICATION_BACKENDS = ['perfiles.backends.ModelBackendCacheado']
 
 
 # Password validation
@@ -236,12 +370,23 @@ CORS_ALLOW_CREDENTIALS = True
 # Obtén tu API Key en: https://api.imgbb.com/
 API_KEY_IMGBB = config('API_KEY_IMGBB', default='')
 
+# Pipeline de imágenes de productos (ver inventario/procesamiento_imagenes.py)
+# Backend donde se publican las variantes: 'imgbb', 'filesystem' o 'local' (stub sin red)
+IMAGENES_BACKEND = config('IMAGENES_BACKEND', default='imgbb')
+# Hilos de fondo que generan las miniaturas
+IMAGENES_HILOS = config('IMAGENES_HILOS', default=2, cast=int)
+# Prefijo absoluto para las URLs del backend 'filesystem' (ej: https://api.midominio.com)
+IMAGENES_URL_BASE = config('IMAGENES_URL_BASE', default='')
+
 # Stripe API Configuration
 # Configuración para pagos con Stripe
 STRIPE_SECRET_KEY = config('STRIPE_SECRET_KEY', default='')
 STRIPE_PUBLISHABLE_KEY = config('STRIPE_PUBLISHABLE_KEY', default='')
 STRIPE_WEBHOOK_SECRET = config('STRIPE_WEBHOOK_SECRET', default='')
 
+# Umbral de stock bajo por defecto (cada categoría puede definir el suyo)
+STOCK_BAJO_UMBRAL = config('STOCK_BAJO_UMBRAL', default=3, cast=int)
+
 # Firebase Cloud Messaging Configuration
 # Configuración para notificaciones push
 FIREBASE_PROJECT_ID = config('FIREBASE_PROJECT_ID', default='')
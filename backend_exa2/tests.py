@@ -0,0 +1,406 @@
+import re
+import shutil
+import tempfile
+import threading
+import time
+from contextvars import copy_context
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import AsyncClient, SimpleTestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient, APITestCase
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from backend_exa2 import importacion, instrumentacion, pruebas_consultas
+from backend_exa2.renderizadores import JSONRendererRapido
+from backend_exa2.serializacion import SerializadorRapido
+from inventario.modelsCategoria import Categoria
+from inventario.modelsDetalleCarrito import DetalleCarrito
+from inventario.modelsProducto import Producto
+from inventario.serializers.serializerDetalleCarrito import DETALLE_CARRITO_RAPIDO, DetalleCarritoSerializer
+from inventario.serializers.serializerProducto import PRODUCTO_RAPIDO, ProductoSerializer
+from transacciones.modelsDetalleNotaDeVenta import DetalleNotaDeVenta
+from transacciones.modelsListadoHistoricoVentas import ListadoHistoricoVentas
+from transacciones.modelsNotaDeVenta import NotaDeVenta
+from transacciones.serializers.serializersDetalleNotaDeVenta import (
+    DETALLE_NOTA_DE_VENTA_RAPIDO, DetalleNotaDeVentaSerializer
+)
+from transacciones.serializers.serializersListadoHistoricoVentas import (
+    HISTORIAL_VENTAS_RAPIDO, ListadoHistoricoVentasSimpleSerializer
+)
+from transacciones.serializers.serializersNotaDeVenta import NOTA_DE_VENTA_RAPIDO, NotaDeVentaSimpleSerializer
+
+
+class TiempoImportacionTest(SimpleTestCase):
+    """Arranque en frío de un worker (ver backend_exa2/importacion.py)"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # El mejor de tres: el tiempo de un solo proceso varía con la carga de la máquina
+        cls.mediciones = [importacion.medir() for _ in range(3)]
+        cls.mejor = min(cls.mediciones, key=importacion.total_ms)
+
+    def test_dependencias_pesadas_diferidas(self):
+        self.assertEqual(importacion.diferidos_cargados(self.mejor), [], importacion.informe(self.mejor))
+
+    def test_tiempo_de_importacion(self):
+        self.assertLessEqual(
+            importacion.total_ms(self.mejor), settings.IMPORTACION_PRESUPUESTO_MS, importacion.informe(self.mejor)
+        )
+
+
+class ApiSembradaTestCase(APITestCase):
+    """Datos de todas las apps (pruebas_consultas.sembrar) y un superusuario autenticado"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls._media = tempfile.mkdtemp()
+        cls._configuracion = override_settings(MEDIA_ROOT=cls._media, CACHES={
+            'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'pruebas-api'},
+        })
+        cls._configuracion.enable()
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls._configuracion.disable()
+        shutil.rmtree(cls._media, ignore_errors=True)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = get_user_model().objects.create_superuser('admin-api', 'admin@prueba.local', 'admin-api')
+        cls.datos = pruebas_consultas.sembrar(pruebas_consultas.TAMANO_GRANDE, cls.usuario)
+
+    def setUp(self):
+        self.client.force_authenticate(self.usuario)
+
+    def recorrer(self, url):
+        """Resultados de todas las páginas siguiendo el link next"""
+        resultados = []
+        while url:
+            respuesta = self.client.get(url)
+            self.assertEqual(respuesta.status_code, 200, respuesta.content)
+            resultados += respuesta.data['results']
+            url = respuesta.data['next']
+        return resultados
+
+
+class PaginacionTest(ApiSembradaTestCase):
+    """Paginación por cursor y por desplazamiento (backend_exa2/paginacion.py)"""
+
+    # (listado, modelo, campo con la clave en cada resultado)
+    LISTADOS = [
+        ('/api/inventario/productos/', Producto, 'id'),
+        ('/api/transacciones/nota-venta/', NotaDeVenta, 'id'),
+        ('/api/transacciones/detalle-nota-venta/', DetalleNotaDeVenta, 'id'),
+        ('/api/transacciones/historial-ventas/', ListadoHistoricoVentas, 'nota_venta'),
+    ]
+
+    def assertRecorridoCompleto(self, url, modelo, clave):
+        claves = [resultado[clave] for resultado in self.recorrer(url)]
+        self.assertEqual(len(claves), len(set(claves)), f"{url}: resultados repetidos")
+        self.assertEqual(set(claves), set(modelo.objects.values_list('pk', flat=True)), f"{url}: faltan resultados")
+
+    def test_cursor_sin_repetidos_ni_huecos(self):
+        # Empates en el campo de orden: el cursor desempata por pk
+        Producto.objects.update(fecha_creacion=Producto.objects.first().fecha_creacion)
+        for listado, modelo, clave in self.LISTADOS:
+            for parametros in ('?page_size=5', '?page_size=5&rapido=false', '?page_size=5&ordering=-id'):
+                with self.subTest(listado=listado, parametros=parametros):
+                    self.assertRecorridoCompleto(listado + parametros, modelo, clave)
+
+    def test_desplazamiento_sin_repetidos_ni_huecos(self):
+        for listado, modelo, clave in self.LISTADOS:
+            with self.subTest(listado=listado):
+                self.assertRecorridoCompleto(f"{listado}?offset=0&limit=5", modelo, clave)
+
+    def test_total_solo_con_contar(self):
+        total = Producto.objects.count()
+        for parametros in ('page_size=5', 'offset=5&limit=5'):
+            with self.subTest(parametros=parametros):
+                respuesta = self.client.get(f"/api/inventario/productos/?{parametros}")
+                self.assertNotIn('count', respuesta.data)
+                respuesta = self.client.get(f"/api/inventario/productos/?{parametros}&contar=true")
+                self.assertEqual(respuesta.data['count'], total)
+                self.assertEqual(len(respuesta.data['results']), 5)
+
+
+class SerializacionRapidaTest(ApiSembradaTestCase):
+    """El camino rápido (backend_exa2/serializacion.py) produce el mismo JSON que el serializer de DRF"""
+
+    # (listado, queryset como el de la vista, serializer de DRF, serializador rápido), como tools/bench_serializacion.py
+    LISTADOS = [
+        ('/api/inventario/productos/', Producto.objects.select_related('categoria').order_by('-fecha_creacion', '-id'),
+         ProductoSerializer, PRODUCTO_RAPIDO),
+        ('/api/transacciones/nota-venta/', NotaDeVenta.objects.order_by('-fecha', '-id'),
+         NotaDeVentaSimpleSerializer, NOTA_DE_VENTA_RAPIDO),
+        ('/api/transacciones/detalle-nota-venta/', DetalleNotaDeVenta.objects.order_by('-id'),
+         DetalleNotaDeVentaSerializer, DETALLE_NOTA_DE_VENTA_RAPIDO),
+        ('/api/transacciones/historial-ventas/',
+         ListadoHistoricoVentas.objects.select_related('nota_venta', 'nota_venta__cliente')
+         .order_by('-fecha_venta', '-nota_venta_id'),
+         ListadoHistoricoVentasSimpleSerializer, HISTORIAL_VENTAS_RAPIDO),
+        ('/api/inventario/detalles-carrito/', DetalleCarrito.objects.select_related('carrito', 'producto').order_by('-id'),
+         DetalleCarritoSerializer, DETALLE_CARRITO_RAPIDO),
+    ]
+
+    def test_mismos_bytes_que_drf(self):
+        for listado, queryset, serializer_class, rapido in self.LISTADOS:
+            with self.subTest(listado=listado):
+                drf = JSONRenderer().render(serializer_class(queryset.all(), many=True).data)
+                filas = rapido.convertir(rapido.consulta(queryset.all()))
+                self.assertNotEqual(drf, b'[]')
+                self.assertEqual(JSONRenderer().render(filas), drf)
+                self.assertEqual(JSONRendererRapido().render(filas), drf)
+
+    def test_mismo_listado_con_y_sin_rapido(self):
+        for listado, *_ in self.LISTADOS:
+            with self.subTest(listado=listado):
+                rapida = self.client.get(f"{listado}?page_size=500")
+                self.assertEqual(rapida.status_code, 200)
+                self.assertEqual(rapida.json(), self.client.get(f"{listado}?page_size=500&rapido=false").json())
+
+
+class SerializadorRapidoHilosTest(SimpleTestCase):
+    """Compilación y recortes del serializador rápido desde varios hilos a la vez"""
+
+    def test_compilacion_unica(self):
+        rapido = SerializadorRapido(NotaDeVenta, ['id', 'numero_comprobante', 'fecha', 'total'])
+        barrera = threading.Barrier(8)
+        compilaciones = []
+
+        def compilar():
+            barrera.wait()
+            compilaciones.append(rapido.compilacion)
+
+        hilos = [threading.Thread(target=compilar) for _ in range(8)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        self.assertEqual(len({id(compilacion) for compilacion in compilaciones}), 1)
+        self.assertEqual(compilaciones[0].rutas, ['id', 'numero_comprobante', 'fecha', 'total'])
+
+    def test_recortes_acotados(self):
+        nombres = [f"campo_{numero}" for numero in range(10)]
+        rapido = SerializadorRapido(NotaDeVenta, nombres)
+        primero = rapido.recortar({'campo_0'})
+        self.assertIs(rapido.recortar({'campo_0'}), primero)
+        for numero in range(SerializadorRapido.MAX_RECORTES * 2):
+            rapido.recortar({nombre for bit, nombre in enumerate(nombres) if numero >> bit & 1})
+        self.assertEqual(len(rapido._recortes), SerializadorRapido.MAX_RECORTES)
+
+
+class InstrumentacionTest(ApiSembradaTestCase):
+    """Fases de Server-Timing medidas explícitamente, sin parchear DRF"""
+
+    def fases(self, url):
+        respuesta = self.client.get(url)
+        self.assertEqual(respuesta.status_code, 200)
+        return {parte.split(';')[0].strip() for parte in respuesta['Server-Timing'].split(',')}
+
+    def test_serializacion_en_listados_y_detalles(self):
+        nota = self.datos['nota_venta_id']
+        for url in ('/api/transacciones/nota-venta/', '/api/transacciones/nota-venta/?rapido=false',
+                    f'/api/transacciones/nota-venta/{nota}/'):
+            with self.subTest(url=url):
+                self.assertTrue({'serializacion', 'render', 'db', 'total'} <= self.fases(url))
+        self.assertNotIn('medido', vars(serializers.Serializer.data.fget))
+
+    def test_fases_anidadas_por_hilo(self):
+        # Dos hilos de /api/batch/ con la misma Medicion: cada uno cuenta su propia fase
+        medicion = instrumentacion.Medicion()
+        token = instrumentacion._medicion.set(medicion)
+        try:
+            barrera = threading.Barrier(2)
+
+            def llamada_externa():
+                with instrumentacion.medir('stripe'):
+                    barrera.wait()
+                    time.sleep(0.02)
+
+            hilos = [threading.Thread(target=copy_context().run, args=(llamada_externa,)) for _ in range(2)]
+            for hilo in hilos:
+                hilo.start()
+            for hilo in hilos:
+                hilo.join()
+        finally:
+            instrumentacion._medicion.reset(token)
+        self.assertGreaterEqual(medicion.fases['stripe'], 0.04)
+
+
+class EstaticosAsincronoTest(SimpleTestCase):
+    """WhiteNoiseAsincronoMiddleware en la cadena async de ASGI (AsyncClient)"""
+
+    @override_settings(WHITENOISE_USE_FINDERS=True, WHITENOISE_AUTOREFRESH=True)
+    async def test_estaticos_y_resto(self):
+        respuesta = await AsyncClient().get('/static/admin/css/base.css')
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertTrue(respuesta['Content-Type'].startswith('text/css'))
+
+        # Lo que no es un archivo estático sigue hasta la vista
+        with override_settings(METRICAS_TOKEN='secreto'):
+            respuesta = await AsyncClient().get('/metrics/', headers={'Authorization': 'Bearer secreto'})
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertIn(b'http_requests_total', respuesta.content)
+
+
+class CamposAPedidoTest(ApiSembradaTestCase):
+    """?fields= y ?expand= recortan la respuesta y la consulta (backend_exa2/campos.py)"""
+
+    def get(self, url):
+        with CaptureQueriesContext(connection) as consultas:
+            respuesta = self.client.get(url)
+        self.assertEqual(respuesta.status_code, 200, respuesta.content)
+        return respuesta.json(), len(consultas)
+
+    def test_fields_con_anidados(self):
+        url = f"/api/transacciones/nota-venta/{self.datos['nota-venta']}/"
+        completa, _ = self.get(url)
+        recortada, _ = self.get(f"{url}?fields=id,total,detalles.producto_nombre")
+
+        self.assertEqual(set(recortada), {'id', 'total', 'detalles'})
+        self.assertEqual(recortada['total'], completa['total'])
+        self.assertEqual(
+            recortada['detalles'],
+            [{'producto_nombre': detalle['producto_nombre']} for detalle in completa['detalles']],
+        )
+
+    def test_expand_omite_los_bloques_pesados(self):
+        url = f"/api/inventario/carritos/{self.datos['carrito']}/"
+        completa, consultas_completa = self.get(url)
+        liviana, consultas_liviana = self.get(f"{url}?expand=")
+        expandida, _ = self.get(f"{url}?expand=detalles.producto_info")
+
+        self.assertIn('detalles', completa)
+        self.assertNotIn('detalles', liviana)
+        # Los campos calculados con los detalles siguen siendo correctos sin devolverlos
+        self.assertEqual(
+            {clave: valor for clave, valor in completa.items() if clave != 'detalles'}, liviana
+        )
+        self.assertLessEqual(consultas_liviana, consultas_completa)
+        self.assertEqual(expandida['detalles'], completa['detalles'])
+
+    def columnas_leidas(self, url, tabla):
+        """Columnas de `tabla` en el SELECT de la página del listado"""
+        with CaptureQueriesContext(connection) as consultas:
+            respuesta = self.client.get(url)
+        self.assertEqual(respuesta.status_code, 200, respuesta.content)
+        select = next(c['sql'] for c in consultas.captured_queries if f'FROM "{tabla}"' in c['sql'])
+        return set(re.findall(rf'"{tabla}"\."(\w+)"', select.split(' FROM ')[0]))
+
+    def test_fields_en_listados(self):
+        for parametros in ('', '&rapido=false'):
+            with self.subTest(parametros=parametros):
+                listado, _ = self.get(f"/api/transacciones/nota-venta/?fields=id,total{parametros}")
+                self.assertTrue(listado['results'])
+                self.assertTrue(all(set(fila) == {'id', 'total'} for fila in listado['results']))
+                listado, _ = self.get(f"/api/inventario/detalles-carrito/?expand={parametros}")
+                self.assertTrue(all('producto_info' not in fila for fila in listado['results']))
+
+                # El recorte llega al SQL: los campos pedidos más los de orden del cursor
+                self.assertEqual(
+                    self.columnas_leidas(f"/api/transacciones/nota-venta/?fields=id,total{parametros}",
+                                         'transacciones_notadeventa'),
+                    {'id', 'total', 'fecha'},
+                )
+                self.assertEqual(
+                    self.columnas_leidas(f"/api/inventario/productos/?fields=id{parametros}", 'inventario_producto'),
+                    {'id', 'fecha_creacion'},
+                )
+                self.assertEqual(
+                    self.columnas_leidas(f"/api/inventario/productos/?fields=id&ordering=nombre{parametros}",
+                                         'inventario_producto'),
+                    {'id', 'nombre', 'fecha_creacion'},
+                )
+
+
+class LoteMixin:
+    """Lote de prueba: lecturas antes, entre y después de dos escrituras"""
+
+    SOLICITUDES = [
+        {'id': 'antes', 'url': '/api/inventario/categorias/?fields=nombre'},
+        {'id': 'me', 'url': '/api/me/'},
+        {'id': 'crear-a', 'metodo': 'POST', 'url': '/api/inventario/categorias/', 'cuerpo': {'nombre': 'Lote A'}},
+        {'id': 'entre', 'url': '/api/inventario/categorias/?fields=nombre'},
+        {'id': 'entre-2', 'url': '/api/inventario/categorias/?fields=nombre&page_size=1'},
+        {'id': 'crear-b', 'metodo': 'POST', 'url': '/api/inventario/categorias/', 'cuerpo': {'nombre': 'Lote B'}},
+        {'id': 'despues', 'url': '/api/inventario/categorias/?fields=nombre'},
+        {'id': 'despues-2', 'url': '/api/inventario/categorias/?fields=nombre'},
+    ]
+
+    def assertOrdenDeEscrituras(self, respuestas):
+        self.assertEqual([r['id'] for r in respuestas], [s['id'] for s in self.SOLICITUDES])
+        self.assertEqual({r['estado'] for r in respuestas}, {200, 201}, respuestas)
+        nombres = {r['id']: {fila['nombre'] for fila in r['cuerpo'].get('results', [])} for r in respuestas}
+        self.assertEqual(nombres['antes'] & {'Lote A', 'Lote B'}, set())
+        self.assertIn('Lote A', nombres['entre'])
+        self.assertNotIn('Lote B', nombres['entre'])
+        self.assertEqual({'Lote A', 'Lote B'} - nombres['despues'], set())
+        self.assertEqual(nombres['despues'], nombres['despues-2'])
+
+
+class LoteTest(LoteMixin, APITestCase):
+    """POST /api/batch/ (backend_exa2/lote.py)"""
+
+    def setUp(self):
+        self.usuario = get_user_model().objects.create_superuser('admin-lote', 'admin@prueba.local', 'admin-lote')
+        token = RefreshToken.for_user(self.usuario).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def lote(self, solicitudes, paralelo=False):
+        respuesta = self.client.post('/api/batch/', {'solicitudes': solicitudes, 'paralelo': paralelo}, format='json')
+        self.assertEqual(respuesta.status_code, 200, respuesta.content)
+        return respuesta.json()['respuestas']
+
+    def test_token_validado_una_vez(self):
+        validar = JWTAuthentication.get_validated_token
+        llamadas = []
+
+        def contar(autenticacion, token):
+            llamadas.append(token)
+            return validar(autenticacion, token)
+
+        with mock.patch.object(JWTAuthentication, 'get_validated_token', contar):
+            respuestas = self.lote(self.SOLICITUDES[:2])
+        self.assertEqual(len(llamadas), 1)
+        self.assertEqual([r['estado'] for r in respuestas], [200, 200])
+        self.assertEqual(respuestas[1]['cuerpo']['username'], 'admin-lote')
+
+    def test_sin_autenticacion_cada_solicitud_aplica_sus_permisos(self):
+        self.client.credentials()
+        respuestas = self.lote(self.SOLICITUDES[:3])
+        self.assertEqual([r['estado'] for r in respuestas], [401, 401, 401])
+        self.assertFalse(Categoria.objects.filter(nombre='Lote A').exists())
+
+    def test_escrituras_en_orden(self):
+        self.assertOrdenDeEscrituras(self.lote(self.SOLICITUDES))
+
+    def test_solicitudes_invalidas(self):
+        respuestas = self.lote([
+            {'id': 'anidado', 'metodo': 'POST', 'url': '/api/batch/', 'cuerpo': {'solicitudes': []}},
+            {'id': 'inexistente', 'url': '/api/no-existe/'},
+        ])
+        self.assertEqual([r['estado'] for r in respuestas], [400, 404])
+        respuesta = self.client.post('/api/batch/', {'solicitudes': [{'url': '/admin/'}]}, format='json')
+        self.assertEqual(respuesta.status_code, 400)
+
+
+class LoteParaleloTest(LoteMixin, TransactionTestCase):
+    """Con "paralelo" los GET van a hilos con su propia conexión: los datos deben estar confirmados"""
+
+    def test_escrituras_en_orden(self):
+        usuario = get_user_model().objects.create_superuser('admin-lote', 'admin@prueba.local', 'admin-lote')
+        cliente = APIClient()
+        cliente.force_authenticate(usuario)
+        respuesta = cliente.post('/api/batch/', {'solicitudes': self.SOLICITUDES, 'paralelo': True}, format='json')
+        self.assertEqual(respuesta.status_code, 200, respuesta.content)
+        self.assertOrdenDeEscrituras(respuesta.json()['respuestas'])
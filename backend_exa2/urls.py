@@ -14,14 +14,28 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
+from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import path, include
+from backend_exa2.instrumentacion import metricas
+from backend_exa2.lote import LoteView
 
 
 urlpatterns = [
+    # Varias llamadas a la API en un solo request (app móvil)
+    path('api/batch/', LoteView.as_view(), name='batch'),
+    # Métricas de la instrumentación en formato Prometheus
+    path('metrics/', metricas, name='metricas'),
     path('api/', include('perfiles.urls')),
     path('api/inventario/', include('inventario.urls')),
     path('api/transacciones/', include('transacciones.urls')),
     path('api/analitica/', include('analitica.urls')),
+]
+
+# En desarrollo, servir las imágenes del backend 'filesystem' (antes del admin, que captura todo)
+urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+
+urlpatterns += [
     path('', admin.site.urls),
 ]
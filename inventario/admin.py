@@ -1,10 +1,15 @@
 from django.contrib import admin
-from inventario.models import Categoria, Producto, Carrito, DetalleCarrito
+from django.db import transaction
+from inventario.kardex import ajustar_stock
+from inventario.models import (
+    Categoria, Producto, ProductoEliminado, Carrito, DetalleCarrito, MovimientoInventario, SaldoInventario,
+    CoocurrenciaProducto
+)
 
 
 @admin.register(Categoria)
 class CategoriaAdmin(admin.ModelAdmin):
-    list_display = ('id', 'nombre', 'descripcion')
+    list_display = ('id', 'nombre', 'descripcion', 'umbral_stock_bajo')
     search_fields = ('nombre',)
     ordering = ('nombre',)
 
@@ -29,6 +34,55 @@ class ProductoAdmin(admin.ModelAdmin):
         }),
     )
 
+    def save_model(self, request, obj, form, change):
+        """En una edición, el cambio de stock se registra como ajuste en el kardex"""
+        if change and 'stock' in form.changed_data:
+            stock_nuevo = obj.stock
+            with transaction.atomic():
+                obj.stock = Producto.objects.select_for_update().values_list('stock', flat=True).get(pk=obj.pk)
+                super().save_model(request, obj, form, change)
+                ajustar_stock(obj, stock_nuevo, documento='admin', usuario=request.user)
+        else:
+            super().save_model(request, obj, form, change)
+
+
+@admin.register(ProductoEliminado)
+class ProductoEliminadoAdmin(admin.ModelAdmin):
+    list_display = ('producto_id', 'codigo', 'fecha_eliminacion')
+    search_fields = ('codigo',)
+    readonly_fields = ('producto_id', 'codigo', 'fecha_eliminacion')
+    ordering = ('-fecha_eliminacion',)
+
+
+@admin.register(MovimientoInventario)
+class MovimientoInventarioAdmin(admin.ModelAdmin):
+    list_display = ('fecha', 'producto', 'tipo', 'cantidad', 'costo_unitario', 'documento', 'documento_id', 'usuario')
+    list_filter = ('tipo', 'documento', 'fecha')
+    search_fields = ('producto__codigo', 'producto__nombre', 'documento_id')
+    raw_id_fields = ('producto', 'usuario')
+    ordering = ('-fecha', '-id')
+
+    def has_change_permission(self, request, obj=None):
+        # El kardex es de solo inserción
+        return False
+
+
+@admin.register(SaldoInventario)
+class SaldoInventarioAdmin(admin.ModelAdmin):
+    list_display = ('producto', 'fecha_corte', 'stock')
+    list_filter = ('fecha_corte',)
+    search_fields = ('producto__codigo', 'producto__nombre')
+    raw_id_fields = ('producto',)
+    ordering = ('-fecha_corte',)
+
+
+@admin.register(CoocurrenciaProducto)
+class CoocurrenciaProductoAdmin(admin.ModelAdmin):
+    list_display = ('producto', 'relacionado', 'veces')
+    search_fields = ('producto__codigo', 'producto__nombre')
+    raw_id_fields = ('producto', 'relacionado')
+    ordering = ('producto', '-veces')
+
 
 @admin.register(Carrito)
 class CarritoAdmin(admin.ModelAdmin):
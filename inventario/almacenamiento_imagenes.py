@@ -0,0 +1,116 @@
+"""
+Backends de almacenamiento para las imágenes de productos.
+
+El backend activo se elige con settings.IMAGENES_BACKEND:
+- 'imgbb': publica las imágenes en ImgBB (requiere API_KEY_IMGBB)
+- 'filesystem': guarda las imágenes en MEDIA_ROOT y las sirve desde MEDIA_URL
+- 'local': stub sin red ni disco, devuelve URLs ficticias (desarrollo y pruebas)
+También se acepta la ruta completa a una clase propia (ej: 'mi_app.almacenamiento.S3').
+
+`guardar_async` publica sin bloquear el event loop: ImgBB lo hace con el cliente
+HTTP async compartido (backend_exa2/http_asincrono.py) y el resto, por defecto,
+ejecuta `guardar` en un hilo.
+"""
+import logging
+import requests
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils.module_loading import import_string
+from backend_exa2.http_asincrono import cliente_http
+from backend_exa2.instrumentacion import medir
+
+logger = logging.getLogger(__name__)
+
+
+class AlmacenamientoImagenes:
+    """
+    Interfaz base: publica una imagen ya procesada y devuelve su URL pública
+    """
+
+    def guardar(self, nombre, contenido, content_type):
+        """
+        Args:
+            nombre (str): Nombre de archivo sugerido (único)
+            contenido (bytes): Bytes de la imagen codificada
+            content_type (str): Tipo MIME (image/webp, image/jpeg)
+
+        Returns:
+            str: URL pública de la imagen
+        """
+        raise NotImplementedError
+
+    async def guardar_async(self, nombre, contenido, content_type):
+        """guardar() para código async (mismos argumentos y resultado)"""
+        return await sync_to_async(self.guardar, thread_sensitive=False)(nombre, contenido, content_type)
+
+
+class ImgBBAlmacenamiento(AlmacenamientoImagenes):
+    """
+    Sube las imágenes a ImgBB
+    """
+    url = "https://api.imgbb.com/1/upload"
+    # (conexión, lectura) en segundos
+    timeout = (5, 30)
+
+    @medir('imgbb')
+    def guardar(self, nombre, contenido, content_type):
+        response = requests.post(
+            self.url,
+            data={"key": settings.API_KEY_IMGBB, "name": nombre},
+            files={"image": (nombre, contenido, content_type)},
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        return response.json()["data"]["url"]
+
+    async def guardar_async(self, nombre, contenido, content_type):
+        import httpx
+
+        with medir('imgbb'):
+            response = await cliente_http().post(
+                self.url,
+                data={"key": settings.API_KEY_IMGBB, "name": nombre},
+                files={"image": (nombre, contenido, content_type)},
+                timeout=httpx.Timeout(self.timeout[1], connect=self.timeout[0]),
+            )
+        response.raise_for_status()
+        return response.json()["data"]["url"]
+
+
+class SistemaArchivosAlmacenamiento(AlmacenamientoImagenes):
+    """
+    Guarda las imágenes en el storage por defecto de Django (MEDIA_ROOT)
+    """
+    carpeta = 'productos/variantes'
+
+    def guardar(self, nombre, contenido, content_type):
+        ruta = default_storage.save(f"{self.carpeta}/{nombre}", ContentFile(contenido))
+        return f"{settings.IMAGENES_URL_BASE}{default_storage.url(ruta)}"
+
+
+class LocalStubAlmacenamiento(AlmacenamientoImagenes):
+    """
+    No publica nada: devuelve una URL ficticia. Útil en desarrollo, pruebas y benchmarks
+    """
+
+    def guardar(self, nombre, contenido, content_type):
+        logger.debug(f"Imagen {nombre} ({len(contenido)} bytes) descartada por el stub local")
+        return f"https://imagenes.local/{nombre}"
+
+
+BACKENDS = {
+    'imgbb': ImgBBAlmacenamiento,
+    'filesystem': SistemaArchivosAlmacenamiento,
+    'local': LocalStubAlmacenamiento,
+}
+
+
+def obtener_almacenamiento():
+    """
+    Retorna una instancia del backend configurado en settings.IMAGENES_BACKEND
+    """
+    backend = settings.IMAGENES_BACKEND
+    clase = BACKENDS.get(backend) or import_string(backend)
+    return clase()
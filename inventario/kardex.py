@@ -0,0 +1,180 @@
+"""
+Kardex de inventario.
+
+Todo cambio de stock se registra como un MovimientoInventario (solo inserciones).
+Producto.stock y Producto.costo_promedio se mantienen como saldo materializado:
+se actualizan en la misma transacción con un UPDATE atómico (stock = stock + delta),
+sin leer-modificar-escribir el producto en Python: dos ventas concurrentes no pisan
+el stock de la otra. El UPDATE bloquea la fila del producto hasta que se confirma la
+transacción que lo contiene (normalmente la del pago o la venta), no solo mientras
+dura la sentencia. Las ventas concurrentes de un mismo producto se serializan durante
+todo ese tiempo: conviene registrar los movimientos al final de la transacción, sin
+trabajo lento después, y los productos se actualizan en orden de pk para no generar
+deadlocks.
+
+Para consultas históricas, `compactar_kardex` guarda saldos (SaldoInventario) a fechas
+de corte y stock_en_fecha() parte del último saldo anterior. Si los movimientos
+anteriores a un saldo se eliminaron (--eliminar-anteriores), el stock a fechas previas
+a ese saldo ya no se puede reconstruir y stock_en_fecha() lanza KardexDepurado.
+"""
+from collections import defaultdict
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import DecimalField, ExpressionWrapper, F, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+from inventario.modelsMovimientoInventario import MovimientoInventario
+from inventario.modelsProducto import Producto
+from inventario.modelsSaldoInventario import SaldoInventario
+from inventario.stock_bajo import programar_evaluacion
+
+# Fecha anterior a cualquier movimiento (para productos sin saldo compactado)
+ORIGEN = datetime(2000, 1, 1, tzinfo=dt_timezone.utc)
+
+
+class KardexDepurado(Exception):
+    """Los movimientos de esa fecha se eliminaron: solo se conoce el stock desde `disponible_desde`"""
+
+    def __init__(self, disponible_desde):
+        super().__init__(f"Kardex depurado hasta {disponible_desde.isoformat()}")
+        self.disponible_desde = disponible_desde
+
+
+def registrar_movimientos(movimientos, aplicar=True, permitir_negativo=True, evaluar_stock=True):
+    """
+    Registra movimientos de inventario y, si corresponde, los aplica al stock de los productos.
+
+    Args:
+        movimientos: lista de MovimientoInventario sin guardar
+        aplicar: False cuando el stock ya se escribió en el producto (ej: importación por lotes)
+            y solo falta dejar constancia en el kardex
+        permitir_negativo: si es False, las salidas de un producto sin stock suficiente
+            no se aplican ni se registran
+        evaluar_stock: evaluar transiciones de stock bajo de los productos afectados
+
+    Returns:
+        list: IDs de productos cuyas salidas se rechazaron por stock insuficiente
+    """
+    if not movimientos:
+        return []
+
+    rechazados = []
+    with transaction.atomic():
+        if aplicar:
+            rechazados = _aplicar_a_productos(movimientos, permitir_negativo)
+            if rechazados:
+                movimientos = [m for m in movimientos if m.producto_id not in rechazados]
+
+        MovimientoInventario.objects.bulk_create(movimientos)
+
+        if evaluar_stock:
+            programar_evaluacion({m.producto_id for m in movimientos})
+
+    return rechazados
+
+
+def _aplicar_a_productos(movimientos, permitir_negativo):
+    """Un UPDATE atómico por producto, en orden de pk para no generar deadlocks"""
+    deltas = defaultdict(int)
+    entradas = defaultdict(lambda: [0, Decimal('0')])  # producto -> [cantidad, costo total]
+    for movimiento in movimientos:
+        deltas[movimiento.producto_id] += movimiento.cantidad
+        if movimiento.cantidad > 0 and movimiento.costo_unitario is not None:
+            entradas[movimiento.producto_id][0] += movimiento.cantidad
+            entradas[movimiento.producto_id][1] += movimiento.costo_unitario * movimiento.cantidad
+
+    ahora = timezone.now()
+    rechazados = []
+    for producto_id in sorted(deltas):
+        delta = deltas[producto_id]
+        valores = {'stock': F('stock') + delta, 'fecha_actualizacion': ahora}
+
+        cantidad_entrada, costo_total = entradas.get(producto_id, (0, None))
+        if cantidad_entrada:
+            # Promedio ponderado calculado por la base de datos con el stock vigente
+            costo_entrada = (costo_total / cantidad_entrada).quantize(Decimal('0.01'))
+            stock_previo = Greatest(F('stock'), Value(0))
+            valores['costo_promedio'] = ExpressionWrapper(
+                (stock_previo * Coalesce(F('costo_promedio'), Value(costo_entrada)) + Value(costo_total))
+                / (stock_previo + Value(cantidad_entrada)),
+                output_field=DecimalField(max_digits=10, decimal_places=2)
+            )
+
+        productos = Producto.objects.filter(pk=producto_id)
+        if delta < 0 and not permitir_negativo:
+            productos = productos.filter(stock__gte=-delta)
+        if not productos.update(**valores):
+            rechazados.append(producto_id)
+    return rechazados
+
+
+def ajustar_stock(producto, stock_nuevo, documento='ajuste', documento_id='', usuario=None, tipo='ajuste'):
+    """
+    Lleva el stock de un producto a un valor absoluto (conteo físico, edición manual)
+    registrando la diferencia como movimiento.
+
+    Returns:
+        int: Diferencia aplicada
+    """
+    with transaction.atomic():
+        stock_actual = Producto.objects.select_for_update().values_list('stock', flat=True).get(pk=producto.pk)
+        diferencia = stock_nuevo - stock_actual
+        if diferencia:
+            registrar_movimientos([MovimientoInventario(
+                producto_id=producto.pk,
+                tipo=tipo,
+                cantidad=diferencia,
+                documento=documento,
+                documento_id=str(documento_id),
+                usuario=usuario,
+            )])
+    producto.stock = stock_nuevo
+    return diferencia
+
+
+def stock_en_fecha(producto_id, fecha):
+    """
+    Stock de un producto a una fecha: último saldo compactado anterior + movimientos posteriores
+
+    Raises:
+        KardexDepurado: si la fecha es anterior a un saldo cuyos movimientos previos se eliminaron
+    """
+    # Un saldo depurado posterior a la fecha sale primero (orden por fecha descendente)
+    saldo = (
+        SaldoInventario.objects.filter(producto_id=producto_id)
+        .filter(Q(fecha_corte__lte=fecha) | Q(fecha_corte__gt=fecha, movimientos_depurados=True))
+        .order_by('-fecha_corte').values('stock', 'fecha_corte').first()
+    )
+    if saldo and saldo['fecha_corte'] > fecha:
+        raise KardexDepurado(saldo['fecha_corte'])
+    movimientos = MovimientoInventario.objects.filter(producto_id=producto_id, fecha__lte=fecha)
+    if saldo:
+        movimientos = movimientos.filter(fecha__gt=saldo['fecha_corte'])
+    total = movimientos.aggregate(total=Sum('cantidad'))['total'] or 0
+    return (saldo['stock'] if saldo else 0) + total
+
+
+def productos_con_stock_kardex(productos=None, hasta=None):
+    """
+    Anota cada producto con `stock_kardex`: su stock según el kardex (último saldo + movimientos
+    posteriores), para compararlo con el stock materializado.
+
+    Args:
+        productos: queryset de productos (por defecto todos)
+        hasta: calcular el stock a esta fecha en lugar de al momento actual
+    """
+    productos = Producto.objects.all() if productos is None else productos
+    saldos = SaldoInventario.objects.filter(producto=OuterRef('pk')).order_by('-fecha_corte')
+    movimientos = MovimientoInventario.objects.filter(producto=OuterRef('pk'), fecha__gt=OuterRef('saldo_fecha'))
+    if hasta is not None:
+        saldos = saldos.filter(fecha_corte__lte=hasta)
+        movimientos = movimientos.filter(fecha__lte=hasta)
+    movimientos = movimientos.order_by().values('producto').annotate(total=Sum('cantidad')).values('total')
+
+    return productos.annotate(
+        saldo_fecha=Coalesce(Subquery(saldos.values('fecha_corte')[:1]), Value(ORIGEN)),
+        saldo_stock=Coalesce(Subquery(saldos.values('stock')[:1]), Value(0)),
+    ).annotate(
+        stock_kardex=F('saldo_stock') + Coalesce(Subquery(movimientos), Value(0))
+    )
@@ -0,0 +1,131 @@
+"""
+Genera saldos de inventario (SaldoInventario) a una fecha de corte a partir del kardex.
+
+Pensado para ejecutarse periódicamente (ej: cada noche):
+    python manage.py compactar_kardex
+    python manage.py compactar_kardex --hasta 2025-10-31
+    python manage.py compactar_kardex --reconciliar          # corrige diferencias con Producto.stock
+    python manage.py compactar_kardex --eliminar-anteriores 365
+
+Tras --eliminar-anteriores el stock histórico solo se puede consultar desde el saldo
+que cubre los movimientos eliminados (ver kardex.stock_en_fecha).
+"""
+from datetime import datetime, time, timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import F, Max, OuterRef, Subquery
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from inventario.kardex import ORIGEN, productos_con_stock_kardex, registrar_movimientos
+from inventario.modelsMovimientoInventario import MovimientoInventario
+from inventario.modelsSaldoInventario import SaldoInventario
+
+MARGEN_CORTE = timedelta(minutes=10)
+
+
+class Command(BaseCommand):
+    help = 'Compacta el kardex generando saldos de stock por producto a una fecha de corte'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hasta',
+            help='Fecha de corte (YYYY-MM-DD, se toma el fin del día). Por defecto: fin del día de ayer'
+        )
+        parser.add_argument(
+            '--reconciliar', action='store_true',
+            help='Registrar ajustes para los productos cuyo stock no coincide con el kardex'
+        )
+        parser.add_argument(
+            '--eliminar-anteriores', type=int, metavar='DIAS',
+            help='Eliminar los movimientos con más de DIAS días que ya quedaron cubiertos por un saldo'
+        )
+
+    def handle(self, *args, **options):
+        if options['hasta']:
+            fecha = parse_date(options['hasta'])
+            if not fecha:
+                raise CommandError("--hasta debe tener el formato YYYY-MM-DD")
+        else:
+            fecha = timezone.localdate() - timedelta(days=1)
+        corte = timezone.make_aware(datetime.combine(fecha, time.max))
+        # Un corte futuro (o demasiado reciente) dejaría fuera movimientos aún no confirmados
+        corte = min(corte, timezone.now() - MARGEN_CORTE)
+
+        if options['reconciliar']:
+            self.reconciliar()
+
+        self.compactar(corte)
+
+        if options['eliminar_anteriores'] is not None:
+            self.eliminar_anteriores(options['eliminar_anteriores'])
+
+    def compactar(self, corte):
+        ultimo_corte = SaldoInventario.objects.aggregate(ultimo=Max('fecha_corte'))['ultimo'] or ORIGEN
+        if corte <= ultimo_corte:
+            self.stdout.write(f"ℹ️ Ya existe un saldo al {ultimo_corte:%d/%m/%Y}, nada que compactar")
+            return
+
+        # Solo los productos con movimientos desde el último corte necesitan un saldo nuevo
+        con_movimientos = (
+            MovimientoInventario.objects.filter(fecha__gt=ultimo_corte, fecha__lte=corte)
+            .order_by().values('producto').distinct()
+        )
+        productos = (
+            productos_con_stock_kardex(hasta=corte)
+            .filter(pk__in=con_movimientos)
+            .values_list('pk', 'stock_kardex')
+        )
+        saldos = [
+            SaldoInventario(producto_id=producto_id, fecha_corte=corte, stock=stock)
+            for producto_id, stock in productos.iterator(chunk_size=2000)
+        ]
+        if not saldos:
+            self.stdout.write("ℹ️ No hay movimientos nuevos para compactar")
+            return
+
+        with transaction.atomic():
+            SaldoInventario.objects.bulk_create(saldos, batch_size=2000)
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {len(saldos)} saldos generados al {timezone.localtime(corte):%d/%m/%Y}"
+        ))
+
+    def reconciliar(self):
+        """Productos cuyo stock cambió por fuera del kardex (admin, SQL directo, etc.)"""
+        diferencias = (
+            productos_con_stock_kardex()
+            .exclude(stock=F('stock_kardex'))
+            .values_list('pk', 'stock', 'stock_kardex')
+        )
+        movimientos = [
+            MovimientoInventario(
+                producto_id=producto_id,
+                tipo='ajuste',
+                cantidad=stock - stock_kardex,
+                documento='reconciliacion',
+            )
+            for producto_id, stock, stock_kardex in diferencias.iterator(chunk_size=2000)
+        ]
+        # El stock del producto ya es el correcto: solo se deja constancia en el kardex
+        registrar_movimientos(movimientos, aplicar=False, evaluar_stock=False)
+        self.stdout.write(f"🔧 {len(movimientos)} productos reconciliados con el kardex")
+
+    def eliminar_anteriores(self, dias):
+        limite = timezone.now() - timedelta(days=dias)
+        # Solo se pueden borrar movimientos anteriores a un saldo del mismo producto
+        cubiertos = MovimientoInventario.objects.filter(fecha__lt=limite).filter(
+            producto__saldos__fecha_corte__gte=F('fecha'),
+            producto__saldos__fecha_corte__lte=limite,
+        ).values('pk')
+        # Todos los eliminados quedan antes del último saldo del producto hasta el límite:
+        # se marca para que stock_en_fecha() no reconstruya fechas anteriores con el kardex incompleto
+        ultimo_saldo = (
+            SaldoInventario.objects.filter(producto=OuterRef('producto'), fecha_corte__lte=limite)
+            .order_by('-fecha_corte').values('fecha_corte')[:1]
+        )
+        with transaction.atomic():
+            SaldoInventario.objects.filter(
+                producto__in=MovimientoInventario.objects.filter(pk__in=cubiertos).values('producto'),
+                fecha_corte=Subquery(ultimo_saldo),
+            ).update(movimientos_depurados=True)
+            eliminados, _ = MovimientoInventario.objects.filter(pk__in=cubiertos).delete()
+        self.stdout.write(f"🧹 {eliminados} movimientos anteriores al {timezone.localtime(limite):%d/%m/%Y} eliminados")
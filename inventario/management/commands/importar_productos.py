@@ -0,0 +1,221 @@
+"""
+Importa (o actualiza) productos desde un CSV en lotes.
+
+Columnas esperadas:
+    codigo,nombre,descripcion,precio_compra,precio_compra_anterior,precio_venta,
+    costo_promedio,stock,imagen,categoria
+
+Las líneas que empiezan con '#' se ignoran. Los productos se identifican por `codigo`:
+si ya existe se actualizan sus datos, si no se crea. Las categorías se resuelven por
+nombre y las que no existen se crean. Los cambios de stock quedan registrados en el kardex.
+
+La columna `imagen` solo se usa al crear el producto: la imagen de un producto existente
+(y sus variantes mediana/miniatura) no se toca, se cambia desde la API de productos.
+
+Uso:
+    python manage.py importar_productos Productos_inventario.csv
+    python manage.py importar_productos catalogo.csv --lote 5000
+"""
+import csv
+import time
+from decimal import Decimal, InvalidOperation
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from inventario.kardex import registrar_movimientos
+from inventario.modelsCategoria import Categoria
+from inventario.modelsMovimientoInventario import MovimientoInventario
+from inventario.modelsProducto import Producto
+from inventario.stock_bajo import registrar_estado_inicial
+
+# Campos que se sobrescriben cuando el código ya existe. `imagen` no está: pisarla dejaría
+# imagen_mediana, imagen_miniatura e imagen_estado de la imagen anterior
+CAMPOS_ACTUALIZABLES = [
+    'nombre', 'descripcion', 'precio_compra', 'precio_compra_anterior', 'precio_venta',
+    'costo_promedio', 'stock', 'categoria', 'fecha_actualizacion',
+]
+
+# DecimalField(max_digits=10, decimal_places=2)
+PRECIO_MAXIMO = Decimal('99999999.99')
+CENTAVOS = Decimal('0.01')
+
+
+class FilaInvalida(Exception):
+    """La fila del CSV no se puede convertir en un producto"""
+
+
+class Command(BaseCommand):
+    help = 'Importa productos desde un CSV usando inserciones/actualizaciones por lotes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('archivo', help='Ruta del CSV de productos')
+        parser.add_argument('--lote', type=int, default=2000, help='Filas por lote (por defecto 2000)')
+        parser.add_argument('--encoding', default='utf-8', help='Codificación del archivo (por defecto utf-8)')
+
+    def handle(self, *args, **options):
+        tamano_lote = options['lote']
+        if tamano_lote <= 0:
+            raise CommandError("--lote debe ser mayor a 0")
+
+        self.max_codigo = Producto._meta.get_field('codigo').max_length
+        self.max_nombre = Producto._meta.get_field('nombre').max_length
+        self.max_categoria = Categoria._meta.get_field('nombre').max_length
+
+        # Mapa nombre -> id de todas las categorías, cargado una sola vez
+        self.categorias = {}
+        for categoria_id, nombre in Categoria.objects.order_by('id').values_list('id', 'nombre'):
+            self.categorias.setdefault(nombre, categoria_id)
+
+        self.insertados = self.actualizados = self.rechazados = 0
+        inicio = time.perf_counter()
+
+        try:
+            csvfile = open(options['archivo'], newline='', encoding=options['encoding'])
+        except OSError as e:
+            raise CommandError(f"No se pudo abrir el archivo: {e}")
+
+        with csvfile:
+            filtered_lines = (line for line in csvfile if not line.strip().startswith('#'))
+            reader = csv.DictReader(filtered_lines)
+
+            lote = {}
+            for numero, row in enumerate(reader, start=2):
+                try:
+                    datos = self.convertir_fila(row)
+                except FilaInvalida as e:
+                    self.rechazados += 1
+                    self.stderr.write(f"❌ Fila {numero} rechazada: {e}")
+                    continue
+
+                # Un código repetido dentro del lote: gana la última fila
+                lote[datos['codigo']] = datos
+                if len(lote) >= tamano_lote:
+                    self.guardar_lote(lote)
+                    lote = {}
+
+            if lote:
+                self.guardar_lote(lote)
+
+        duracion = time.perf_counter() - inicio
+        procesadas = self.insertados + self.actualizados + self.rechazados
+        velocidad = procesadas / duracion if duracion > 0 else 0
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Importación finalizada: {self.insertados} insertados, {self.actualizados} actualizados, "
+            f"{self.rechazados} rechazados en {duracion:.2f}s ({velocidad:,.0f} filas/s)"
+        ))
+
+    def convertir_fila(self, row):
+        """Valida y convierte una fila del CSV en los valores del producto"""
+        codigo = (row.get('codigo') or '').strip()
+        nombre = (row.get('nombre') or '').strip()
+        categoria = (row.get('categoria') or '').strip()
+
+        if not codigo:
+            raise FilaInvalida("falta el código")
+        if len(codigo) > self.max_codigo:
+            raise FilaInvalida(f"el código '{codigo}' supera {self.max_codigo} caracteres")
+        if not nombre:
+            raise FilaInvalida(f"falta el nombre del producto {codigo}")
+        if len(nombre) > self.max_nombre:
+            raise FilaInvalida(f"el nombre del producto {codigo} supera {self.max_nombre} caracteres")
+        if len(categoria) > self.max_categoria:
+            raise FilaInvalida(f"la categoría del producto {codigo} supera {self.max_categoria} caracteres")
+
+        precio_compra = self.convertir_precio(row, 'precio_compra')
+        costo_promedio = self.convertir_precio(row, 'costo_promedio', opcional=True)
+        try:
+            stock = int(row.get('stock') or 0)
+        except ValueError:
+            raise FilaInvalida(f"stock inválido: {row.get('stock')!r}")
+
+        return {
+            'codigo': codigo,
+            'nombre': nombre,
+            'descripcion': row.get('descripcion') or '',
+            'precio_compra': precio_compra,
+            'precio_compra_anterior': self.convertir_precio(row, 'precio_compra_anterior', opcional=True),
+            'precio_venta': self.convertir_precio(row, 'precio_venta'),
+            # Si no se proporciona costo_promedio, usar precio_compra (igual que la API)
+            'costo_promedio': costo_promedio if costo_promedio is not None else precio_compra,
+            'stock': stock,
+            'imagen': row.get('imagen') or None,
+            'categoria': categoria or None,
+        }
+
+    def convertir_precio(self, row, campo, opcional=False):
+        valor = (row.get(campo) or '').strip()
+        if not valor:
+            if opcional:
+                return None
+            raise FilaInvalida(f"falta {campo}")
+        try:
+            precio = Decimal(valor).quantize(CENTAVOS)
+        except InvalidOperation:
+            raise FilaInvalida(f"{campo} inválido: {valor!r}")
+        if precio < 0 or precio > PRECIO_MAXIMO:
+            raise FilaInvalida(f"{campo} fuera de rango: {valor}")
+        return precio
+
+    def resolver_categorias(self, nombres):
+        """Crea en una sola consulta las categorías del lote que aún no existen"""
+        nuevas = [nombre for nombre in nombres if nombre and nombre not in self.categorias]
+        if not nuevas:
+            return
+        creadas = Categoria.objects.bulk_create([Categoria(nombre=nombre) for nombre in nuevas])
+        if all(categoria.pk for categoria in creadas):
+            for categoria in creadas:
+                self.categorias[categoria.nombre] = categoria.pk
+        else:
+            # Motores que no devuelven los IDs insertados
+            for categoria_id, nombre in Categoria.objects.filter(nombre__in=nuevas).values_list('id', 'nombre'):
+                self.categorias.setdefault(nombre, categoria_id)
+        self.stdout.write(f"📁 Categorías creadas: {', '.join(nuevas)}")
+
+    def registrar_kardex(self, lote, existentes):
+        """Deja constancia en el kardex del stock inicial o de la diferencia importada"""
+        ids = dict(Producto.objects.filter(codigo__in=lote.keys()).values_list('codigo', 'id'))
+        movimientos = []
+        for codigo, datos in lote.items():
+            stock_anterior = existentes.get(codigo)
+            diferencia = datos['stock'] - (stock_anterior or 0)
+            if diferencia:
+                movimientos.append(MovimientoInventario(
+                    producto_id=ids[codigo],
+                    tipo='inicial' if stock_anterior is None else 'importacion',
+                    cantidad=diferencia,
+                    costo_unitario=datos['costo_promedio'] if diferencia > 0 else None,
+                    documento='importacion',
+                ))
+        # El stock ya quedó escrito por el upsert
+        registrar_movimientos(movimientos, aplicar=False)
+
+    def guardar_lote(self, lote):
+        """Inserta o actualiza un lote de productos en una sola sentencia"""
+        with transaction.atomic():
+            self.resolver_categorias({datos['categoria'] for datos in lote.values()})
+
+            # Stock previo de los productos existentes (bloqueados hasta el fin del lote)
+            existentes = dict(
+                Producto.objects.select_for_update()
+                .filter(codigo__in=lote.keys())
+                .values_list('codigo', 'stock')
+            )
+            productos = []
+            for datos in lote.values():
+                categoria = datos.pop('categoria')
+                productos.append(Producto(categoria_id=self.categorias.get(categoria), **datos))
+
+            Producto.objects.bulk_create(
+                productos,
+                update_conflicts=True,
+                unique_fields=['codigo'],
+                update_fields=CAMPOS_ACTUALIZABLES,
+            )
+            registrar_estado_inicial(Producto.objects.filter(codigo__in=lote.keys() - existentes.keys()))
+            self.registrar_kardex(lote, existentes)
+
+        self.actualizados += len(existentes)
+        self.insertados += len(lote) - len(existentes)
+        self.stdout.write(
+            f"📦 Lote guardado: {self.insertados + self.actualizados} productos procesados"
+        )
@@ -0,0 +1,34 @@
+"""
+Mantenimiento del índice de productos "comprados juntos".
+
+Pensado para ejecutarse periódicamente (ej: cada noche):
+    python manage.py podar_relacionados
+    python manage.py podar_relacionados --top 30 --minimo 2
+    python manage.py podar_relacionados --reconstruir     # recalcula desde el historial de ventas
+"""
+from django.core.management.base import BaseCommand, CommandError
+from inventario.relacionados import TOP_K, podar_relacionados, reconstruir_relacionados
+
+
+class Command(BaseCommand):
+    help = 'Recorta los productos relacionados de cada producto a sus K vecinos más frecuentes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=TOP_K, help=f'Vecinos a conservar por producto (por defecto {TOP_K})')
+        parser.add_argument('--minimo', type=int, default=1, help='Eliminar pares con menos coincidencias (por defecto 1)')
+        parser.add_argument(
+            '--reconstruir', action='store_true',
+            help='Recalcular todo el índice desde las ventas pagadas en lugar de podar'
+        )
+
+    def handle(self, *args, **options):
+        if options['top'] <= 0:
+            raise CommandError("--top debe ser mayor a 0")
+
+        if options['reconstruir']:
+            guardados = reconstruir_relacionados(top_k=options['top'])
+            self.stdout.write(self.style.SUCCESS(f"✅ Índice reconstruido: {guardados} pares guardados"))
+            return
+
+        eliminados = podar_relacionados(top_k=options['top'], minimo=options['minimo'])
+        self.stdout.write(self.style.SUCCESS(f"🧹 {eliminados} pares fuera del top {options['top']} eliminados"))
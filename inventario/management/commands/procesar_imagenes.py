@@ -0,0 +1,67 @@
+"""
+Procesa las imágenes de productos que quedaron pendientes.
+
+Uso:
+    python manage.py procesar_imagenes
+    python manage.py procesar_imagenes --reintentar-errores
+    python manage.py procesar_imagenes --remotas   # genera miniaturas de imágenes ya publicadas
+"""
+import uuid
+import requests
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from inventario.modelsProducto import Producto
+from inventario.procesamiento_imagenes import CARPETA_ORIGINALES, procesar_imagen_producto
+
+
+class Command(BaseCommand):
+    help = 'Genera las variantes de las imágenes de productos pendientes de procesar'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reintentar-errores', action='store_true',
+            help='Incluir las imágenes cuyo procesamiento falló anteriormente'
+        )
+        parser.add_argument(
+            '--remotas', action='store_true',
+            help='Descargar las imágenes existentes sin miniatura y generar sus variantes'
+        )
+
+    def handle(self, *args, **options):
+        estados = ['pendiente', 'error'] if options['reintentar_errores'] else ['pendiente']
+
+        if options['remotas']:
+            self.preparar_remotas()
+
+        ids = list(
+            Producto.objects.filter(imagen_original__isnull=False, imagen_estado__in=estados)
+            .values_list('id', flat=True)
+        )
+        self.stdout.write(f"📷 {len(ids)} imágenes por procesar")
+
+        procesadas = 0
+        for producto_id in ids:
+            if procesar_imagen_producto(producto_id):
+                procesadas += 1
+            else:
+                self.stdout.write(self.style.WARNING(f"⚠️ No se pudo procesar la imagen del producto {producto_id}"))
+
+        self.stdout.write(self.style.SUCCESS(f"✅ {procesadas}/{len(ids)} imágenes procesadas"))
+
+    def preparar_remotas(self):
+        """Descarga las imágenes remotas sin variantes y las deja pendientes de procesar"""
+        productos = Producto.objects.filter(
+            imagen__isnull=False, imagen_miniatura__isnull=True, imagen_original__isnull=True
+        ).exclude(imagen='').values_list('id', 'imagen')
+
+        for producto_id, url in productos.iterator():
+            try:
+                response = requests.get(url, timeout=(5, 30))
+                response.raise_for_status()
+            except requests.exceptions.RequestException as e:
+                self.stdout.write(self.style.WARNING(f"⚠️ Producto {producto_id}: no se pudo descargar {url} ({e})"))
+                continue
+
+            ruta = default_storage.save(f"{CARPETA_ORIGINALES}/{uuid.uuid4().hex}", ContentFile(response.content))
+            Producto.objects.filter(pk=producto_id).update(imagen_original=ruta, imagen_estado='pendiente')
@@ -0,0 +1,25 @@
+"""
+Barrido periódico de stock bajo sobre todo el catálogo.
+
+Detecta con una sola consulta los productos que cruzaron el umbral de su categoría
+(o settings.STOCK_BAJO_UMBRAL) y envía un único resumen a cada administrador.
+Cubre también los cambios de stock hechos por fuera de la aplicación.
+
+Uso:
+    python manage.py revisar_stock_bajo
+"""
+from django.core.management.base import BaseCommand
+from inventario.stock_bajo import evaluar_stock_bajo
+
+
+class Command(BaseCommand):
+    help = 'Revisa el stock bajo de todos los productos y notifica un resumen a los administradores'
+
+    def handle(self, *args, **options):
+        nuevos_bajos = evaluar_stock_bajo()
+        if nuevos_bajos:
+            self.stdout.write(self.style.WARNING(
+                f"📦 {len(nuevos_bajos)} productos pasaron a stock bajo, resumen enviado a los administradores"
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS("✅ Sin productos nuevos con stock bajo"))
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.7 on 2026-10-19 02:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0005_producto_notificado_stock_bajo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductoEliminado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('producto_id', models.BigIntegerField(help_text='ID del producto eliminado')),
+                ('codigo', models.CharField(help_text='Código del producto eliminado', max_length=20)),
+                ('fecha_eliminacion', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Producto Eliminado',
+                'verbose_name_plural': 'Productos Eliminados',
+                'ordering': ['fecha_eliminacion', 'id'],
+            },
+        ),
+        migrations.AddField(
+            model_name='producto',
+            name='fecha_actualizacion',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='producto',
+            index=models.Index(fields=['fecha_actualizacion', 'id'], name='inventario__fecha_a_5860ab_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productoeliminado',
+            index=models.Index(fields=['fecha_eliminacion', 'id'], name='inventario__fecha_e_c14e4e_idx'),
+        ),
+    ]
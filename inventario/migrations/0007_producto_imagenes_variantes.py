@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-19 03:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0006_productoeliminado_producto_fecha_actualizacion_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='producto',
+            name='imagen_estado',
+            field=models.CharField(blank=True, choices=[('pendiente', 'Pendiente'), ('procesada', 'Procesada'), ('error', 'Error')], default='', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='producto',
+            name='imagen_mediana',
+            field=models.URLField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='producto',
+            name='imagen_miniatura',
+            field=models.URLField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='producto',
+            name='imagen_original',
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+    ]
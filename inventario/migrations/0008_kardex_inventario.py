@@ -0,0 +1,52 @@
+# Generated by Django 5.2.7 on 2026-10-19 03:12
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0007_producto_imagenes_variantes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MovimientoInventario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('inicial', 'Saldo inicial'), ('compra', 'Compra / Ingreso'), ('venta', 'Venta'), ('ajuste', 'Ajuste'), ('importacion', 'Importación')], max_length=20)),
+                ('cantidad', models.IntegerField()),
+                ('costo_unitario', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('documento', models.CharField(blank=True, max_length=30)),
+                ('documento_id', models.CharField(blank=True, max_length=50)),
+                ('fecha', models.DateTimeField(default=django.utils.timezone.now)),
+                ('producto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='movimientos', to='inventario.producto')),
+                ('usuario', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Movimiento de Inventario',
+                'verbose_name_plural': 'Movimientos de Inventario',
+                'ordering': ['fecha', 'id'],
+                'indexes': [models.Index(fields=['producto', 'fecha'], name='inventario__product_fadacf_idx'), models.Index(fields=['fecha'], name='inventario__fecha_f978ae_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='SaldoInventario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha_corte', models.DateTimeField()),
+                ('stock', models.IntegerField()),
+                ('producto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='saldos', to='inventario.producto')),
+            ],
+            options={
+                'verbose_name': 'Saldo de Inventario',
+                'verbose_name_plural': 'Saldos de Inventario',
+                'ordering': ['-fecha_corte'],
+                'constraints': [models.UniqueConstraint(fields=('producto', 'fecha_corte'), name='saldo_inventario_producto_corte_unico')],
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+from django.db import migrations
+
+
+def crear_saldos_iniciales(apps, schema_editor):
+    """El stock actual de cada producto pasa a ser su movimiento inicial en el kardex"""
+    Producto = apps.get_model('inventario', 'Producto')
+    MovimientoInventario = apps.get_model('inventario', 'MovimientoInventario')
+
+    movimientos = [
+        MovimientoInventario(
+            producto_id=producto_id,
+            tipo='inicial',
+            cantidad=stock,
+            costo_unitario=costo_promedio if costo_promedio is not None else precio_compra,
+            documento='migracion',
+        )
+        for producto_id, stock, costo_promedio, precio_compra in
+        Producto.objects.exclude(stock=0).values_list('id', 'stock', 'costo_promedio', 'precio_compra').iterator()
+    ]
+    MovimientoInventario.objects.bulk_create(movimientos, batch_size=2000)
+
+
+def eliminar_saldos_iniciales(apps, schema_editor):
+    MovimientoInventario = apps.get_model('inventario', 'MovimientoInventario')
+    MovimientoInventario.objects.filter(documento='migracion').delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0008_kardex_inventario'),
+    ]
+
+    operations = [
+        migrations.RunPython(crear_saldos_iniciales, eliminar_saldos_iniciales),
+    ]
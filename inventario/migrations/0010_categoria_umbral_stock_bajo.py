@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 03:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0009_kardex_saldo_inicial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='categoria',
+            name='umbral_stock_bajo',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
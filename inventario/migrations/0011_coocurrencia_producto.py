@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-19 03:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0010_categoria_umbral_stock_bajo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CoocurrenciaProducto',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('veces', models.PositiveIntegerField(default=0)),
+                ('producto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='coocurrencias', to='inventario.producto')),
+                ('relacionado', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='inventario.producto')),
+            ],
+            options={
+                'verbose_name': 'Coocurrencia de Productos',
+                'verbose_name_plural': 'Coocurrencias de Productos',
+                'indexes': [models.Index(fields=['producto', '-veces'], name='coocurrencia_top_idx')],
+                'constraints': [models.UniqueConstraint(fields=('producto', 'relacionado'), name='coocurrencia_producto_par_unico')],
+            },
+        ),
+    ]
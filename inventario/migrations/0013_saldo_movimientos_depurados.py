@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 04:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0012_indice_producto_fecha_creacion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='saldoinventario',
+            name='movimientos_depurados',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.db import migrations
+from django.db.models import F, Q
+
+
+def marcar_stock_bajo_existente(apps, schema_editor):
+    """Los productos que ya están en stock bajo no cruzaron el umbral ahora: no se notifican al desplegar"""
+    Producto = apps.get_model('inventario', 'Producto')
+    Producto.objects.filter(
+        Q(categoria__umbral_stock_bajo__isnull=False, stock__lte=F('categoria__umbral_stock_bajo'))
+        | Q(categoria__umbral_stock_bajo__isnull=True, stock__lte=settings.STOCK_BAJO_UMBRAL),
+        notificado_stock_bajo=False,
+    ).update(notificado_stock_bajo=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0013_saldo_movimientos_depurados'),
+    ]
+
+    operations = [
+        migrations.RunPython(marcar_stock_bajo_existente, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,12 @@
 # Importar modelos desde archivos separados
 from inventario.modelsCategoria import Categoria
 from inventario.modelsProducto import Producto
+from inventario.modelsProductoEliminado import ProductoEliminado
 from inventario.modelsCarrito import Carrito
 from inventario.modelsDetalleCarrito import DetalleCarrito
+from inventario.modelsMovimientoInventario import MovimientoInventario
+from inventario.modelsSaldoInventario import SaldoInventario
+from inventario.modelsCoocurrenciaProducto import CoocurrenciaProducto
 
 # Exportar para que otros módulos puedan importar desde inventario.models
-__all__ = ['Categoria', 'Producto', 'Carrito', 'DetalleCarrito']
+__all__ = ['Categoria', 'Producto', 'ProductoEliminado', 'Carrito', 'DetalleCarrito', 'MovimientoInventario', 'SaldoInventario', 'CoocurrenciaProducto']
@@ -5,6 +5,8 @@ class Categoria(models.Model):
     id = models.AutoField(primary_key=True)
     nombre = models.CharField(max_length=100)
     descripcion = models.TextField(blank=True)
+    # Stock a partir del cual se avisa a los administradores (vacío = settings.STOCK_BAJO_UMBRAL)
+    umbral_stock_bajo = models.PositiveIntegerField(blank=True, null=True)
 
     def __str__(self):
         return self.nombre
@@ -0,0 +1,27 @@
+from django.db import models
+from inventario.modelsProducto import Producto
+
+
+class CoocurrenciaProducto(models.Model):
+    """
+    Cantidad de ventas pagadas en las que dos productos se compraron juntos.
+    Cada par se guarda en ambas direcciones para que los relacionados de un producto
+    se lean con una sola consulta sobre el índice (producto, -veces).
+    Se mantiene al confirmar cada Pago y `podar_relacionados` conserva solo los top-K.
+    """
+    producto = models.ForeignKey(Producto, on_delete=models.CASCADE, related_name='coocurrencias')
+    relacionado = models.ForeignKey(Producto, on_delete=models.CASCADE, related_name='+')
+    veces = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.producto_id} + {self.relacionado_id}: {self.veces}"
+
+    class Meta:
+        verbose_name = 'Coocurrencia de Productos'
+        verbose_name_plural = 'Coocurrencias de Productos'
+        constraints = [
+            models.UniqueConstraint(fields=['producto', 'relacionado'], name='coocurrencia_producto_par_unico'),
+        ]
+        indexes = [
+            models.Index(fields=['producto', '-veces'], name='coocurrencia_top_idx'),
+        ]
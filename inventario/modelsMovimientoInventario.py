@@ -0,0 +1,44 @@
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+from inventario.modelsProducto import Producto
+
+
+class MovimientoInventario(models.Model):
+    """
+    Kardex: registro inmutable (solo inserciones) de cada cambio de stock.
+    Producto.stock y Producto.costo_promedio son el saldo acumulado de estos movimientos;
+    ver inventario/kardex.py.
+    """
+    TIPO_CHOICES = [
+        ('inicial', 'Saldo inicial'),
+        ('compra', 'Compra / Ingreso'),
+        ('venta', 'Venta'),
+        ('ajuste', 'Ajuste'),
+        ('importacion', 'Importación'),
+    ]
+
+    producto = models.ForeignKey(Producto, on_delete=models.CASCADE, related_name='movimientos')
+    tipo = models.CharField(max_length=20, choices=TIPO_CHOICES)
+    # Positivo = entrada, negativo = salida
+    cantidad = models.IntegerField()
+    costo_unitario = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True)
+    # Documento que originó el movimiento (ej: nota_venta / 15, edicion_manual / usuario)
+    documento = models.CharField(max_length=30, blank=True)
+    documento_id = models.CharField(max_length=50, blank=True)
+    usuario = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+    fecha = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.get_tipo_display()} {self.cantidad:+d} - {self.producto_id} ({self.fecha:%d/%m/%Y %H:%M})"
+
+    class Meta:
+        verbose_name = 'Movimiento de Inventario'
+        verbose_name_plural = 'Movimientos de Inventario'
+        ordering = ['fecha', 'id']
+        indexes = [
+            # Kardex de un producto en un rango de fechas / stock a una fecha
+            models.Index(fields=['producto', 'fecha']),
+            # Movimientos de todos los productos en un período
+            models.Index(fields=['fecha']),
+        ]
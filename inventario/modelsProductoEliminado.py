@@ -0,0 +1,23 @@
+from django.db import models
+
+
+class ProductoEliminado(models.Model):
+    """
+    Registro (tombstone) de un producto eliminado.
+    Permite que los clientes móviles sincronizados sepan qué productos
+    deben quitar de su catálogo local.
+    """
+    producto_id = models.BigIntegerField(help_text="ID del producto eliminado")
+    codigo = models.CharField(max_length=20, help_text="Código del producto eliminado")
+    fecha_eliminacion = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Producto eliminado {self.codigo} ({self.fecha_eliminacion:%d/%m/%Y %H:%M})"
+
+    class Meta:
+        verbose_name = 'Producto Eliminado'
+        verbose_name_plural = 'Productos Eliminados'
+        ordering = ['fecha_eliminacion', 'id']
+        indexes = [
+            models.Index(fields=['fecha_eliminacion', 'id']),
+        ]
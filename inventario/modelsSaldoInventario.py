@@ -0,0 +1,26 @@
+from django.db import models
+from inventario.modelsProducto import Producto
+
+
+class SaldoInventario(models.Model):
+    """
+    Foto del stock de un producto a una fecha de corte, generada por `compactar_kardex`.
+    El stock a cualquier fecha es el último saldo anterior más los movimientos posteriores,
+    así las consultas históricas no recorren todo el kardex.
+    """
+    producto = models.ForeignKey(Producto, on_delete=models.CASCADE, related_name='saldos')
+    fecha_corte = models.DateTimeField()
+    stock = models.IntegerField()
+    # Los movimientos anteriores a este corte se eliminaron (compactar_kardex --eliminar-anteriores)
+    movimientos_depurados = models.BooleanField(default=False)
+
+    def __str__(self):
+        return f"Saldo {self.producto_id} al {self.fecha_corte:%d/%m/%Y}: {self.stock}"
+
+    class Meta:
+        verbose_name = 'Saldo de Inventario'
+        verbose_name_plural = 'Saldos de Inventario'
+        ordering = ['-fecha_corte']
+        constraints = [
+            models.UniqueConstraint(fields=['producto', 'fecha_corte'], name='saldo_inventario_producto_corte_unico'),
+        ]
@@ -0,0 +1,184 @@
+"""
+Pipeline asíncrono de imágenes de productos.
+
+1. La vista guarda el archivo subido tal cual en el storage local (guardar_imagen_original)
+   y responde de inmediato con imagen_estado='pendiente'.
+2. Al confirmarse la transacción, un hilo de fondo genera las variantes redimensionadas
+   con Pillow y las publica a la vez en el backend configurado (ver almacenamiento_imagenes).
+3. El producto queda con las URLs de imagen, imagen_mediana e imagen_miniatura.
+
+Las imágenes que quedaron pendientes (ej: reinicio del servidor) se reprocesan con
+`python manage.py procesar_imagenes`.
+
+Pillow se importa al recibir o procesar una imagen, no al cargar las vistas de
+productos (junto con numpy suma ~0,15 s al arranque de cada worker).
+"""
+import asyncio
+import logging
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.utils import timezone
+from backend_exa2.http_asincrono import ejecutar
+from inventario.almacenamiento_imagenes import obtener_almacenamiento
+from inventario.modelsProducto import Producto
+
+logger = logging.getLogger(__name__)
+
+CARPETA_ORIGINALES = 'productos/originales'
+
+# campo del producto -> (lado máximo en píxeles, formato de salida)
+VARIANTES = {
+    'imagen_miniatura': (200, 'WEBP'),
+    'imagen_mediana': (600, 'WEBP'),
+    'imagen': (1600, 'JPEG'),
+}
+
+EXTENSIONES = {'WEBP': 'webp', 'JPEG': 'jpg'}
+
+_executor = None
+
+
+class ImagenInvalida(Exception):
+    """El archivo subido no es una imagen que Pillow pueda leer"""
+
+
+def guardar_imagen_original(archivo):
+    """
+    Valida y guarda el archivo subido en el storage local sin cargarlo completo en memoria.
+
+    Args:
+        archivo: UploadedFile recibido en la petición
+
+    Returns:
+        str: Ruta del original dentro del storage
+    """
+    from PIL import Image, UnidentifiedImageError
+
+    try:
+        with Image.open(archivo) as imagen:
+            formato = imagen.format
+    except (UnidentifiedImageError, OSError):
+        raise ImagenInvalida("El archivo no es una imagen válida")
+    except Image.DecompressionBombError:
+        raise ImagenInvalida("La imagen tiene demasiados píxeles")
+    archivo.seek(0)
+
+    extension = (formato or 'img').lower()
+    return default_storage.save(f"{CARPETA_ORIGINALES}/{uuid.uuid4().hex}.{extension}", archivo)
+
+
+def encolar_procesamiento(producto_id):
+    """
+    Programa el procesamiento de la imagen del producto cuando la transacción actual se confirme
+    """
+    transaction.on_commit(lambda: _obtener_executor().submit(_procesar_en_hilo, producto_id))
+
+
+def _obtener_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.IMAGENES_HILOS,
+            thread_name_prefix='imagenes-productos'
+        )
+    return _executor
+
+
+def _procesar_en_hilo(producto_id):
+    try:
+        procesar_imagen_producto(producto_id)
+    finally:
+        # Cada hilo abre su propia conexión a la base de datos
+        connection.close()
+
+
+def generar_variante(imagen, lado_maximo, formato):
+    """
+    Redimensiona la imagen (sin agrandarla) y la codifica en el formato indicado.
+
+    Returns:
+        bytes: Imagen codificada
+    """
+    from PIL import Image
+
+    variante = imagen.copy()
+    variante.thumbnail((lado_maximo, lado_maximo), Image.LANCZOS)
+
+    if formato == 'JPEG' and variante.mode != 'RGB':
+        fondo = Image.new('RGB', variante.size, (255, 255, 255))
+        if variante.mode in ('RGBA', 'LA'):
+            fondo.paste(variante, mask=variante.getchannel('A'))
+        else:
+            fondo.paste(variante.convert('RGB'))
+        variante = fondo
+    elif formato == 'WEBP' and variante.mode not in ('RGB', 'RGBA'):
+        variante = variante.convert('RGBA' if 'A' in variante.getbands() else 'RGB')
+
+    buffer = BytesIO()
+    if formato == 'JPEG':
+        variante.save(buffer, format='JPEG', quality=85, optimize=True, progressive=True)
+    else:
+        variante.save(buffer, format='WEBP', quality=80, method=4)
+    return buffer.getvalue()
+
+
+async def publicar_variantes(almacenamiento, archivos):
+    """
+    Sube todas las variantes a la vez.
+
+    Args:
+        archivos (dict): campo -> (nombre, contenido, content_type)
+
+    Returns:
+        dict: campo -> URL pública
+    """
+    urls = await asyncio.gather(*(almacenamiento.guardar_async(*archivo) for archivo in archivos.values()))
+    return dict(zip(archivos, urls))
+
+
+def procesar_imagen_producto(producto_id):
+    """
+    Genera y publica las variantes de la imagen original pendiente de un producto.
+
+    Returns:
+        bool: True si el producto quedó con sus imágenes publicadas
+    """
+    from PIL import Image, ImageOps
+
+    ruta = Producto.objects.filter(pk=producto_id).values_list('imagen_original', flat=True).first()
+    if not ruta:
+        return False
+
+    try:
+        with default_storage.open(ruta, 'rb') as archivo:
+            with Image.open(archivo) as imagen:
+                imagen = ImageOps.exif_transpose(imagen)
+                imagen.load()
+
+        sufijo = uuid.uuid4().hex[:8]
+        archivos = {}
+        for campo, (lado_maximo, formato) in VARIANTES.items():
+            contenido = generar_variante(imagen, lado_maximo, formato)
+            nombre = f"producto-{producto_id}-{campo.replace('_', '-')}-{sufijo}.{EXTENSIONES[formato]}"
+            archivos[campo] = (nombre, contenido, f"image/{EXTENSIONES[formato].replace('jpg', 'jpeg')}")
+        urls = ejecutar(publicar_variantes, obtener_almacenamiento(), archivos)
+    except Exception as e:
+        logger.error(f"Error procesando imagen del producto {producto_id}: {e}")
+        Producto.objects.filter(pk=producto_id, imagen_original=ruta).update(imagen_estado='error')
+        return False
+
+    # Solo aplicar si no llegó una imagen más nueva mientras se procesaba
+    actualizados = Producto.objects.filter(pk=producto_id, imagen_original=ruta).update(
+        imagen_original=None,
+        imagen_estado='procesada',
+        fecha_actualizacion=timezone.now(),
+        **urls
+    )
+    default_storage.delete(ruta)
+    logger.info(f"Imagen del producto {producto_id} procesada ({len(urls)} variantes)")
+    return actualizados > 0
+
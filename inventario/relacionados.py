@@ -0,0 +1,157 @@
+"""
+Índice de productos "comprados juntos".
+
+Cada Pago confirmado suma 1 a los pares de productos de su nota de venta en
+CoocurrenciaProducto (en ambas direcciones). Los relacionados de un producto se
+leen con una sola consulta ordenada por el índice (producto, -veces), sin unir
+DetalleNotaDeVenta en cada request. `podar_relacionados` recorta periódicamente
+cada producto a sus TOP_K vecinos para que la tabla no crezca con el cuadrado del catálogo.
+"""
+import logging
+from collections import Counter, defaultdict
+from itertools import groupby
+from django.db import transaction
+from django.db.models import F
+from inventario.modelsCoocurrenciaProducto import CoocurrenciaProducto
+
+logger = logging.getLogger(__name__)
+
+# Vecinos que se conservan por producto al podar
+TOP_K = 20
+
+# Ventas con más productos distintos no se cuentan (compras mayoristas: muchos pares, poca señal)
+MAX_PRODUCTOS_POR_VENTA = 50
+
+
+def registrar_compra(producto_ids):
+    """
+    Incrementa los pares de productos comprados juntos en una venta.
+
+    Args:
+        producto_ids: IDs de los productos de la venta (se ignoran repetidos)
+    """
+    ids = sorted(set(producto_ids))
+    if len(ids) < 2 or len(ids) > MAX_PRODUCTOS_POR_VENTA:
+        return
+
+    with transaction.atomic():
+        # Crear los pares que aún no existen; los existentes se ignoran
+        CoocurrenciaProducto.objects.bulk_create(
+            [
+                CoocurrenciaProducto(producto_id=producto_id, relacionado_id=relacionado_id)
+                for producto_id in ids for relacionado_id in ids if producto_id != relacionado_id
+            ],
+            ignore_conflicts=True,
+        )
+        # Un UPDATE atómico por producto (en orden de ID para no provocar deadlocks)
+        for producto_id in ids:
+            CoocurrenciaProducto.objects.filter(
+                producto_id=producto_id, relacionado_id__in=ids
+            ).exclude(relacionado_id=producto_id).update(veces=F('veces') + 1)
+
+
+def programar_registro_compra(nota_venta_id):
+    """
+    Registra los pares de la nota de venta cuando se confirma la transacción del pago.
+    Un error aquí no debe afectar al pago: solo se registra en el log.
+    """
+    def registrar():
+        from transacciones.modelsDetalleNotaDeVenta import DetalleNotaDeVenta
+        try:
+            registrar_compra(
+                DetalleNotaDeVenta.objects.filter(nota_venta_id=nota_venta_id).values_list('producto_id', flat=True)
+            )
+        except Exception as e:
+            logger.error(f"Error registrando productos relacionados de la venta {nota_venta_id}: {e}")
+
+    transaction.on_commit(registrar)
+
+
+def obtener_relacionados(producto_id, limite=10):
+    """
+    Productos comprados con más frecuencia junto a `producto_id`.
+
+    Returns:
+        list: diccionarios con los datos básicos del producto y `veces`
+    """
+    campos = ('id', 'codigo', 'nombre', 'precio_venta', 'stock', 'imagen_miniatura')
+    filas = (
+        CoocurrenciaProducto.objects.filter(producto_id=producto_id)
+        .order_by('-veces', 'relacionado_id')
+        .values_list('veces', *(f'relacionado__{campo}' for campo in campos))[:limite]
+    )
+    relacionados = []
+    for veces, *valores in filas:
+        producto = dict(zip(campos, valores), veces=veces)
+        # Mismo formato que ProductoSerializer (decimales como texto)
+        producto['precio_venta'] = str(producto['precio_venta'])
+        relacionados.append(producto)
+    return relacionados
+
+
+def podar_relacionados(top_k=TOP_K, minimo=1):
+    """
+    Elimina los pares que quedan fuera de los `top_k` vecinos de cada producto
+    o que tienen menos de `minimo` coincidencias.
+
+    Returns:
+        int: Cantidad de filas eliminadas
+    """
+    sobrantes = []
+    filas = (
+        CoocurrenciaProducto.objects.order_by('producto_id', '-veces', 'relacionado_id')
+        .values_list('producto_id', 'id', 'veces')
+        .iterator(chunk_size=5000)
+    )
+    for _, vecinos in groupby(filas, key=lambda fila: fila[0]):
+        for posicion, (_, pk, veces) in enumerate(vecinos):
+            if posicion >= top_k or veces < minimo:
+                sobrantes.append(pk)
+
+    eliminados = 0
+    for inicio in range(0, len(sobrantes), 5000):
+        borrados, _ = CoocurrenciaProducto.objects.filter(pk__in=sobrantes[inicio:inicio + 5000]).delete()
+        eliminados += borrados
+    return eliminados
+
+
+def reconstruir_relacionados(top_k=TOP_K):
+    """
+    Recalcula el índice completo desde el historial de ventas pagadas
+    (ej: después de importar ventas con `importar_ventas`, que no pasa por Pago.save).
+
+    Returns:
+        int: Cantidad de pares guardados
+    """
+    from transacciones.modelsDetalleNotaDeVenta import DetalleNotaDeVenta
+
+    pares = Counter()
+    detalles = (
+        DetalleNotaDeVenta.objects.filter(nota_venta__estado='pagada')
+        .order_by('nota_venta_id')
+        .values_list('nota_venta_id', 'producto_id')
+        .iterator(chunk_size=5000)
+    )
+    for _, filas in groupby(detalles, key=lambda fila: fila[0]):
+        ids = sorted({producto_id for _, producto_id in filas})
+        if len(ids) > MAX_PRODUCTOS_POR_VENTA:
+            continue
+        for i, producto_id in enumerate(ids):
+            for relacionado_id in ids[i + 1:]:
+                pares[(producto_id, relacionado_id)] += 1
+
+    # Ambas direcciones, recortadas a los top_k vecinos de cada producto
+    vecinos = defaultdict(list)
+    for (a, b), veces in pares.items():
+        vecinos[a].append((veces, b))
+        vecinos[b].append((veces, a))
+
+    registros = [
+        CoocurrenciaProducto(producto_id=producto_id, relacionado_id=relacionado_id, veces=veces)
+        for producto_id, lista in vecinos.items()
+        for veces, relacionado_id in sorted(lista, key=lambda par: (-par[0], par[1]))[:top_k]
+    ]
+    with transaction.atomic():
+        CoocurrenciaProducto.objects.all().delete()
+        CoocurrenciaProducto.objects.bulk_create(registros, batch_size=5000)
+    return len(registros)
@@ -2,11 +2,15 @@ from .serializerCategoria import CategoriaSerializer
 from .serializerProducto import ProductoSerializer
 from .serializerCarrito import CarritoSerializer, CarritoSimpleSerializer
 from .serializerDetalleCarrito import DetalleCarritoSerializer
+from .serializerActualizacionMasiva import ActualizacionMasivaSerializer
+from .serializerMovimientoInventario import MovimientoInventarioSerializer
 
 __all__ = [
     'CategoriaSerializer', 
     'ProductoSerializer', 
     'CarritoSerializer', 
     'CarritoSimpleSerializer',
-    'DetalleCarritoSerializer'
+    'DetalleCarritoSerializer',
+    'ActualizacionMasivaSerializer',
+    'MovimientoInventarioSerializer'
 ]
@@ -0,0 +1,31 @@
+from collections import Counter
+from rest_framework import serializers
+
+
+class ActualizacionMasivaItemSerializer(serializers.Serializer):
+    """Una fila de la actualización masiva: el producto se identifica por su código"""
+    codigo = serializers.CharField(max_length=20)
+    precio_venta = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=0, required=False)
+    precio_compra = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=0, required=False)
+    stock = serializers.IntegerField(min_value=0, required=False)
+
+    def validate(self, data):
+        if len(data) == 1:
+            raise serializers.ValidationError(
+                "Debe indicar al menos uno de: precio_venta, precio_compra, stock."
+            )
+        return data
+
+
+class ActualizacionMasivaSerializer(serializers.Serializer):
+    # Límite de filas por solicitud
+    MAX_PRODUCTOS = 10000
+
+    productos = ActualizacionMasivaItemSerializer(many=True, allow_empty=False, max_length=MAX_PRODUCTOS)
+
+    def validate_productos(self, productos):
+        conteo = Counter(item['codigo'] for item in productos)
+        repetidos = sorted(codigo for codigo, veces in conteo.items() if veces > 1)
+        if repetidos:
+            raise serializers.ValidationError(f"Códigos repetidos en la solicitud: {', '.join(repetidos)}")
+        return productos
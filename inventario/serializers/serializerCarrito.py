@@ -1,9 +1,10 @@
 from rest_framework import serializers
+from backend_exa2.campos import CamposDinamicosMixin
 from inventario.modelsCarrito import Carrito
 from inventario.serializers.serializerDetalleCarrito import DetalleCarritoSerializer
 
 
-class CarritoSerializer(serializers.ModelSerializer):
+class CarritoSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     cliente_nombre = serializers.CharField(source='cliente.nombre', read_only=True)
     cliente_apellido = serializers.CharField(source='cliente.apellido', read_only=True)
     detalles = DetalleCarritoSerializer(many=True, read_only=True)
@@ -28,13 +29,20 @@ class CarritoSerializer(serializers.ModelSerializer):
             'esta_vacio'
         ]
         read_only_fields = ['fecha_creacion', 'fecha_actualizacion', 'total_items', 'total_carrito']
+        expandibles = ['detalles']
+        # Propiedades del modelo calculadas con los detalles (prefetch)
+        rutas_campos = {
+            'total_items': ['detalles__cantidad'],
+            'total_carrito': ['detalles__cantidad', 'detalles__precio_unitario'],
+            'esta_vacio': ['detalles__id'],
+        }
 
     def get_esta_vacio(self, obj):
         """Método para obtener si el carrito está vacío"""
         return obj.esta_vacio()
 
 
-class CarritoSimpleSerializer(serializers.ModelSerializer):
+class CarritoSimpleSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     """Serializer sin los detalles anidados, útil para listados"""
     cliente_nombre = serializers.CharField(source='cliente.nombre', read_only=True)
     total_items = serializers.IntegerField(read_only=True)
@@ -54,3 +62,7 @@ class CarritoSimpleSerializer(serializers.ModelSerializer):
             'total_carrito'
         ]
         read_only_fields = ['fecha_creacion', 'fecha_actualizacion']
+        rutas_campos = {
+            'total_items': ['detalles__cantidad'],
+            'total_carrito': ['detalles__cantidad', 'detalles__precio_unitario'],
+        }
@@ -1,8 +1,9 @@
 from rest_framework import serializers
+from backend_exa2.campos import CamposDinamicosMixin
 from inventario.modelsCategoria import Categoria
 
 
-class CategoriaSerializer(serializers.ModelSerializer):
+class CategoriaSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     class Meta:
         model = Categoria
         fields = '__all__'
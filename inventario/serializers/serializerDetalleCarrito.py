@@ -1,11 +1,14 @@
 from rest_framework import serializers
+from backend_exa2.campos import CamposDinamicosMixin
+from backend_exa2.serializacion import Anidado, Calculado, SerializadorRapido, formato_decimal
 from inventario.modelsDetalleCarrito import DetalleCarrito
 
 
-class DetalleCarritoSerializer(serializers.ModelSerializer):
+class DetalleCarritoSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     producto_nombre = serializers.CharField(source='producto.nombre', read_only=True)
     producto_codigo = serializers.CharField(source='producto.codigo', read_only=True)
     producto_imagen = serializers.URLField(source='producto.imagen', read_only=True)
+    producto_miniatura = serializers.URLField(source='producto.imagen_miniatura', read_only=True)
     carrito_codigo = serializers.CharField(source='carrito.codigo', read_only=True)
     subtotal = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
     producto_info = serializers.SerializerMethodField()
@@ -20,12 +23,21 @@ class DetalleCarritoSerializer(serializers.ModelSerializer):
             'producto_nombre',
             'producto_codigo',
             'producto_imagen',
+            'producto_miniatura',
             'producto_info',
             'cantidad', 
             'precio_unitario',
             'subtotal'
         ]
         read_only_fields = ['subtotal', 'precio_unitario']
+        expandibles = ['producto_info']
+        rutas_campos = {
+            'subtotal': ['cantidad', 'precio_unitario'],
+            'producto_info': [
+                'producto__codigo', 'producto__nombre', 'producto__descripcion', 'producto__imagen',
+                'producto__imagen_miniatura', 'producto__stock', 'producto__precio_venta',
+            ],
+        }
 
     def get_producto_info(self, obj):
         """Devuelve información completa del producto"""
@@ -37,6 +49,7 @@ class DetalleCarritoSerializer(serializers.ModelSerializer):
             'nombre': obj.producto.nombre,
             'descripcion': obj.producto.descripcion,
             'imagen': obj.producto.imagen,
+            'imagen_miniatura': obj.producto.imagen_miniatura,
             'stock': obj.producto.stock,
             'precio_venta': str(obj.producto.precio_venta),
         }
@@ -57,3 +70,36 @@ class DetalleCarritoSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("La cantidad debe ser mayor a 0.")
 
         return data
+
+
+def _subtotal(cantidad, precio_unitario):
+    # Igual que DetalleCarrito.subtotal
+    if precio_unitario is None:
+        return 0
+    return cantidad * precio_unitario
+
+
+# Listado rápido: mismo JSON que DetalleCarritoSerializer
+DETALLE_CARRITO_RAPIDO = SerializadorRapido(DetalleCarrito, [
+    'id',
+    'carrito',
+    ('carrito_codigo', 'carrito__codigo'),
+    'producto',
+    ('producto_nombre', 'producto__nombre'),
+    ('producto_codigo', 'producto__codigo'),
+    ('producto_imagen', 'producto__imagen'),
+    ('producto_miniatura', 'producto__imagen_miniatura'),
+    Anidado('producto_info', [
+        ('id', 'producto__id'),
+        ('codigo', 'producto__codigo'),
+        ('nombre', 'producto__nombre'),
+        ('descripcion', 'producto__descripcion'),
+        ('imagen', 'producto__imagen'),
+        ('imagen_miniatura', 'producto__imagen_miniatura'),
+        ('stock', 'producto__stock'),
+        Calculado('precio_venta', str, 'producto__precio_venta'),
+    ], si_existe='producto__id'),
+    'cantidad',
+    'precio_unitario',
+    Calculado('subtotal', _subtotal, 'cantidad', 'precio_unitario', formato=formato_decimal(2, 10)),
+], expandibles=['producto_info'])
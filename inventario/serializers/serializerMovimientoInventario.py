@@ -0,0 +1,14 @@
+from rest_framework import serializers
+from inventario.modelsMovimientoInventario import MovimientoInventario
+
+
+class MovimientoInventarioSerializer(serializers.ModelSerializer):
+    tipo_display = serializers.CharField(source='get_tipo_display', read_only=True)
+
+    class Meta:
+        model = MovimientoInventario
+        fields = [
+            'id', 'fecha', 'tipo', 'tipo_display', 'cantidad', 'costo_unitario',
+            'documento', 'documento_id', 'usuario'
+        ]
+        read_only_fields = fields
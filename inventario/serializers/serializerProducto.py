@@ -1,8 +1,10 @@
 from rest_framework import serializers
+from backend_exa2.campos import CamposDinamicosMixin
+from backend_exa2.serializacion import SerializadorRapido
 from inventario.modelsProducto import Producto
 
 
-class ProductoSerializer(serializers.ModelSerializer):
+class ProductoSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     categoria_nombre = serializers.SerializerMethodField()
 
     class Meta:
@@ -10,8 +12,21 @@ class ProductoSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'codigo', 'nombre', 'descripcion', 'precio_compra',
             'precio_compra_anterior', 'precio_venta', 'costo_promedio',
-            'fecha_creacion', 'stock', 'imagen', 'categoria', 'categoria_nombre'
+            'fecha_creacion', 'fecha_actualizacion', 'stock', 'imagen', 'imagen_mediana', 'imagen_miniatura', 'imagen_estado',
+            'categoria', 'categoria_nombre'
         ]
+        # Las variantes las escribe el pipeline de imágenes, no el cliente
+        read_only_fields = ['imagen_mediana', 'imagen_miniatura', 'imagen_estado']
+        rutas_campos = {'categoria_nombre': ['categoria__nombre']}
 
     def get_categoria_nombre(self, obj):
         return obj.categoria.nombre if obj.categoria else None
+
+
+# Listado rápido: mismo JSON que ProductoSerializer, leído con .values()
+PRODUCTO_RAPIDO = SerializadorRapido(Producto, [
+    'id', 'codigo', 'nombre', 'descripcion', 'precio_compra',
+    'precio_compra_anterior', 'precio_venta', 'costo_promedio',
+    'fecha_creacion', 'fecha_actualizacion', 'stock', 'imagen', 'imagen_mediana', 'imagen_miniatura', 'imagen_estado',
+    'categoria', ('categoria_nombre', 'categoria__nombre'),
+])
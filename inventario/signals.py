@@ -0,0 +1,54 @@
+"""
+Señales del módulo de inventario.
+Mantienen actualizado el feed de sincronización de productos.
+"""
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models.signals import post_save, pre_delete, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+from inventario.modelsCategoria import Categoria
+from inventario.modelsMovimientoInventario import MovimientoInventario
+from inventario.modelsProducto import Producto
+from inventario.modelsProductoEliminado import ProductoEliminado
+from inventario.stock_bajo import programar_evaluacion
+
+
+@receiver(post_save, sender=Producto)
+def registrar_saldo_inicial(sender, instance, created, raw=False, **kwargs):
+    """El stock con el que se crea un producto es su primer movimiento en el kardex"""
+    if created and not raw and instance.stock:
+        MovimientoInventario.objects.create(
+            producto=instance,
+            tipo='inicial',
+            cantidad=instance.stock,
+            costo_unitario=instance.costo_promedio if instance.costo_promedio is not None else instance.precio_compra,
+        )
+
+
+@receiver(post_delete, sender=Producto)
+def registrar_producto_eliminado(sender, instance, **kwargs):
+    """Guarda un tombstone para que los clientes sincronizados eliminen el producto"""
+    ProductoEliminado.objects.create(producto_id=instance.pk, codigo=instance.codigo)
+    # Descartar el original que el pipeline de imágenes no llegó a procesar
+    if instance.imagen_original:
+        ruta = instance.imagen_original
+        transaction.on_commit(lambda: default_storage.delete(ruta))
+
+
+@receiver(post_save, sender=Categoria)
+def marcar_productos_categoria_actualizada(sender, instance, created, **kwargs):
+    """
+    El nombre de la categoría se envía dentro de cada producto,
+    por lo que un cambio en la categoría debe reflejarse en el feed.
+    """
+    if not created:
+        Producto.objects.filter(categoria=instance).update(fecha_actualizacion=timezone.now())
+        # El umbral de stock bajo pudo cambiar
+        programar_evaluacion(Producto.objects.filter(categoria=instance).values_list('id', flat=True))
+
+
+@receiver(pre_delete, sender=Categoria)
+def marcar_productos_categoria_eliminada(sender, instance, **kwargs):
+    """Los productos quedarán sin categoría (SET_NULL), marcarlos como modificados"""
+    Producto.objects.filter(categoria=instance).update(fecha_actualizacion=timezone.now())
@@ -0,0 +1,168 @@
+"""
+Detección de stock bajo por conjuntos.
+
+Se notifica solo la transición de un producto desde arriba del umbral hasta el
+umbral o por debajo. En lugar de comparar el stock anterior en cada save, la
+bandera Producto.notificado_stock_bajo guarda el último estado conocido: un
+producto con stock bajo y sin bandera acaba de cruzar el umbral, se notifica y se
+marca; un producto reabastecido con bandera se desmarca. Los productos que se
+crean ya con stock bajo no cruzaron nada: se marcan sin notificar
+(registrar_estado_inicial). Todos los productos que bajan en una misma
+transacción (o en un barrido periódico con `revisar_stock_bajo`) se agrupan en
+una sola notificación por administrador.
+
+El umbral es Categoria.umbral_stock_bajo o, si la categoría no lo define,
+settings.STOCK_BAJO_UMBRAL.
+"""
+import logging
+import threading
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from inventario.modelsProducto import Producto
+
+logger = logging.getLogger(__name__)
+
+# Productos que se listan por nombre en el cuerpo del resumen
+MAX_PRODUCTOS_RESUMEN = 5
+
+# Productos modificados en la transacción en curso de cada hilo, pendientes de evaluar
+_pendientes = threading.local()
+
+
+def filtro_stock_bajo():
+    """Q de los productos con stock en o por debajo del umbral de su categoría"""
+    return (
+        Q(categoria__umbral_stock_bajo__isnull=False, stock__lte=F('categoria__umbral_stock_bajo'))
+        | Q(categoria__umbral_stock_bajo__isnull=True, stock__lte=settings.STOCK_BAJO_UMBRAL)
+    )
+
+
+def evaluar_stock_bajo(producto_ids=None):
+    """
+    Actualiza las banderas de stock bajo y programa un único resumen para los
+    productos que acaban de cruzar el umbral.
+
+    Si se llama dentro de una transacción, la notificación se envía recién cuando
+    esa transacción se confirma.
+
+    Args:
+        producto_ids: IDs de los productos cuyo stock pudo cambiar (None = todo el catálogo)
+
+    Returns:
+        list: Productos (id, nombre, stock) que pasaron a stock bajo
+    """
+    candidatos = Producto.objects.all()
+    if producto_ids is not None:
+        producto_ids = list(producto_ids)
+        if not producto_ids:
+            return []
+        candidatos = candidatos.filter(pk__in=producto_ids)
+
+    nuevos_bajos = list(
+        candidatos.filter(filtro_stock_bajo(), notificado_stock_bajo=False)
+        .order_by('stock', 'nombre')
+        .values('id', 'nombre', 'stock')
+    )
+    if nuevos_bajos:
+        Producto.objects.filter(pk__in=[p['id'] for p in nuevos_bajos]).update(
+            notificado_stock_bajo=True
+        )
+
+    # Reabastecidos: resetear la bandera para volver a avisar la próxima vez
+    candidatos.filter(notificado_stock_bajo=True).exclude(filtro_stock_bajo()).update(
+        notificado_stock_bajo=False
+    )
+
+    if nuevos_bajos:
+        transaction.on_commit(lambda: notificar_resumen_stock_bajo(nuevos_bajos))
+    return nuevos_bajos
+
+
+def registrar_estado_inicial(productos):
+    """
+    Marca como ya notificados los productos recién creados con stock bajo: nacer por
+    debajo del umbral no es una transición y no genera aviso.
+
+    Args:
+        productos: queryset de los productos creados
+    """
+    productos.filter(filtro_stock_bajo()).update(notificado_stock_bajo=True)
+
+
+def _evaluar_pendientes():
+    """Callback de on_commit: el primero que corre evalúa todo lo acumulado, el resto no hace nada"""
+    producto_ids = getattr(_pendientes, 'producto_ids', None)
+    _pendientes.producto_ids = set()
+    if producto_ids:
+        evaluar_stock_bajo(producto_ids)
+
+
+def programar_evaluacion(producto_ids):
+    """
+    Agenda la evaluación de stock bajo de los productos para el final de la transacción
+    actual. Todas las llamadas de una misma transacción producen una sola evaluación
+    (y un solo resumen). Fuera de una transacción se evalúa de inmediato.
+
+    Si la transacción se revierte sus productos quedan acumulados y se evalúan con la
+    siguiente que se confirme en el hilo: evaluar de más no notifica nada nuevo.
+    """
+    if not transaction.get_connection().in_atomic_block:
+        evaluar_stock_bajo(producto_ids)
+        return
+
+    if not hasattr(_pendientes, 'producto_ids'):
+        _pendientes.producto_ids = set()
+    _pendientes.producto_ids.update(producto_ids)
+    # Un callback por llamada: los de un savepoint revertido se descartan, pero siempre
+    # queda al menos uno en la transacción que se confirma
+    transaction.on_commit(_evaluar_pendientes)
+
+
+def notificar_resumen_stock_bajo(productos):
+    """
+    Envía a cada administrador una sola notificación con todos los productos en stock bajo
+    """
+    try:
+        from django.contrib.auth.models import User
+        from perfiles.fcm_service import send_push_to_users
+
+        if len(productos) == 1:
+            producto = productos[0]
+            if producto['stock'] <= 0:
+                titulo = "🚨 Producto SIN STOCK"
+                cuerpo = f"¡{producto['nombre']} se ha agotado! Stock actual: 0 unidades"
+            elif producto['stock'] == 1:
+                titulo = "⚠️ Stock CRÍTICO"
+                cuerpo = f"{producto['nombre']} tiene solo 1 unidad disponible"
+            else:
+                titulo = "📦 Stock BAJO"
+                cuerpo = f"{producto['nombre']} tiene solo {producto['stock']} unidades disponibles"
+        else:
+            agotados = sum(1 for p in productos if p['stock'] <= 0)
+            titulo = f"📦 {len(productos)} productos con stock bajo"
+            if agotados:
+                titulo += f" ({agotados} agotados)"
+            nombres = [f"{p['nombre']} ({p['stock']})" for p in productos[:MAX_PRODUCTOS_RESUMEN]]
+            cuerpo = ", ".join(nombres)
+            if len(productos) > MAX_PRODUCTOS_RESUMEN:
+                cuerpo += f" y {len(productos) - MAX_PRODUCTOS_RESUMEN} más"
+
+        datos = {
+            'type': 'stock_bajo',
+            'cantidad_productos': str(len(productos)),
+            'producto_ids': ",".join(str(p['id']) for p in productos),
+            'screen': '/catalogo',
+        }
+        if len(productos) == 1:
+            # Compatibilidad con la app: mismos campos que la notificación individual anterior
+            datos.update({
+                'producto_id': str(productos[0]['id']),
+                'producto_nombre': productos[0]['nombre'],
+                'stock_actual': str(productos[0]['stock']),
+            })
+
+        send_push_to_users(users=User.objects.filter(is_staff=True, is_active=True), title=titulo, body=cuerpo, data=datos)
+        logger.info(f"Resumen de stock bajo enviado ({len(productos)} productos)")
+    except Exception as e:
+        logger.error(f"Error enviando resumen de stock bajo: {e}")
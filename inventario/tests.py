@@ -1,3 +1,490 @@
-from django.test import TestCase
+import base64
+import json
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+from io import BytesIO, StringIO
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from backend_exa2 import pruebas_consultas
+from inventario.kardex import KardexDepurado, ajustar_stock, productos_con_stock_kardex, registrar_movimientos, stock_en_fecha
+from inventario.modelsCategoria import Categoria
+from inventario.modelsMovimientoInventario import MovimientoInventario
+from inventario.modelsProducto import Producto
+from inventario.modelsProductoEliminado import ProductoEliminado
+from inventario.modelsSaldoInventario import SaldoInventario
+from inventario.procesamiento_imagenes import VARIANTES, procesar_imagen_producto
+from inventario.viewsProducto import ProductoViewSet
+from perfiles.models import Cliente
+from transacciones.modelsDetalleNotaDeVenta import DetalleNotaDeVenta
+from transacciones.modelsNotaDeVenta import NotaDeVenta
+from transacciones.modelsPago import Pago
 
-# Create your tests here.
+User = get_user_model()
+
+
+class PresupuestoConsultasTest(pruebas_consultas.PresupuestoConsultasTestCase):
+    app = 'inventario'
+    prefijo = '/api/inventario/'
+    presupuestos = {
+        'api-root': 0,
+        'categoria-list': 1,
+        'categoria-detail': 1,
+        'producto-list': 1,
+        'producto-list?rapido=false': 1,
+        'producto-cambios': 2,
+        'producto-detail': 1,
+        'producto-kardex?desde={desde}&hasta={hasta}': 6,
+        'producto-relacionados': 1,
+        'carrito-list': 3,
+        'carrito-detail': 3,
+        'detalle-carrito-list': 1,
+        'detalle-carrito-list?rapido=false': 1,
+        'detalle-carrito-detail': 1,
+    }
+
+
+class KardexTest(TestCase):
+    """El kardex y el stock materializado cuentan siempre lo mismo"""
+
+    def setUp(self):
+        self.admin = User.objects.create(username='admin', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        self.producto = Producto.objects.create(
+            codigo='PR-1', nombre='Producto', descripcion='', precio_compra=Decimal('60.00'),
+            precio_venta=Decimal('100.00'), stock=10,
+        )
+
+    def vender(self, numero, cantidad):
+        cliente = Cliente.objects.get_or_create(
+            ci='1000', defaults={'nombre': 'Cliente', 'apellido': 'Prueba', 'sexo': 'F'}
+        )[0]
+        nota = NotaDeVenta.objects.create(numero_comprobante=f"NV-{numero}", cliente=cliente, total=Decimal('100.00'))
+        DetalleNotaDeVenta.objects.create(
+            nota_venta=nota, producto=self.producto, codigo=self.producto.codigo, cantidad=cantidad,
+            subtotal=Decimal('100.00'), total=Decimal('100.00'),
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            Pago.objects.create(nota_venta=nota, monto=nota.total, total_stripe=f"pi_{numero}")
+
+    def assertKardexCuadra(self):
+        producto = productos_con_stock_kardex().get(pk=self.producto.pk)
+        self.assertEqual(producto.stock_kardex, producto.stock)
+        self.assertEqual(stock_en_fecha(producto.pk, timezone.now()), producto.stock)
+        return producto.stock
+
+    def test_stock_y_kardex_coinciden(self):
+        registrar_movimientos([MovimientoInventario(
+            producto=self.producto, tipo='compra', cantidad=5, costo_unitario=Decimal('50.00'),
+        )])
+        self.vender(1, 3)
+        ajustar_stock(self.producto, 7, usuario=self.admin)
+        self.assertEqual(self.assertKardexCuadra(), 7)
+        self.assertEqual(self.producto.movimientos.count(), 4)
+        # Salida sin stock suficiente: no se aplica ni se registra
+        registrar_movimientos([MovimientoInventario(producto=self.producto, tipo='venta', cantidad=-50)],
+                              permitir_negativo=False)
+        self.assertEqual(self.assertKardexCuadra(), 7)
+
+        call_command('compactar_kardex', hasta=str(timezone.localdate() + timedelta(days=1)), stdout=StringIO())
+        self.vender(3, 2)
+        self.assertEqual(self.assertKardexCuadra(), 5)
+
+    def test_reconciliar_cambios_por_fuera_del_kardex(self):
+        Producto.objects.filter(pk=self.producto.pk).update(stock=4)
+        call_command('compactar_kardex', reconciliar=True, stdout=StringIO())
+        self.assertEqual(self.assertKardexCuadra(), 4)
+
+    def test_eliminar_anteriores_no_reconstruye_fechas_depuradas(self):
+        hace_un_anio = timezone.now() - timedelta(days=400)
+        MovimientoInventario.objects.filter(producto=self.producto).update(fecha=hace_un_anio)
+        MovimientoInventario.objects.create(
+            producto=self.producto, tipo='compra', cantidad=5, fecha=hace_un_anio + timedelta(days=10)
+        )
+        Producto.objects.filter(pk=self.producto.pk).update(stock=15)
+        corte = (hace_un_anio + timedelta(days=20)).date()
+        call_command('compactar_kardex', hasta=str(corte), eliminar_anteriores=365, stdout=StringIO())
+
+        self.assertFalse(MovimientoInventario.objects.filter(producto=self.producto).exists())
+        self.assertTrue(SaldoInventario.objects.get(producto=self.producto).movimientos_depurados)
+        self.assertEqual(self.assertKardexCuadra(), 15)
+        with self.assertRaises(KardexDepurado):
+            stock_en_fecha(self.producto.pk, hace_un_anio + timedelta(days=5))
+
+        url = f"/api/inventario/productos/{self.producto.pk}/kardex/"
+        respuesta = self.client.get(url, {'desde': str((hace_un_anio + timedelta(days=1)).date()), 'hasta': str(corte)})
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertEqual(respuesta.data['disponible_desde'], corte)
+        respuesta = self.client.get(url, {'desde': str(corte + timedelta(days=1))})
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta.data['stock_inicial'], 15)
+
+    def test_kardex_paginado_con_cursor(self):
+        ahora = timezone.now()
+        MovimientoInventario.objects.bulk_create(
+            MovimientoInventario(producto=self.producto, tipo='compra', cantidad=1, fecha=ahora)
+            for _ in range(4)
+        )
+        url = f"/api/inventario/productos/{self.producto.pk}/kardex/"
+        vistos, parametros = [], {}
+        with mock.patch.object(ProductoViewSet, 'limite_cambios_maximo', 2):
+            while True:
+                respuesta = self.client.get(url, parametros)
+                self.assertEqual(respuesta.status_code, 200)
+                vistos += [movimiento['id'] for movimiento in respuesta.data['movimientos']]
+                self.assertEqual(respuesta.data['stock_final'], 14)
+                if not respuesta.data['hay_mas']:
+                    break
+                parametros = {'cursor': respuesta.data['cursor']}
+        self.assertEqual(vistos, list(self.producto.movimientos.order_by('fecha', 'id').values_list('id', flat=True)))
+        self.assertEqual(len(vistos), 5)
+        self.assertEqual(self.client.get(url, {'cursor': 'no-es-un-cursor'}).status_code, 400)
+
+
+class CambiosTest(TestCase):
+    """Feed /productos/cambios/ de la sincronización incremental"""
+
+    url = '/api/inventario/productos/cambios/'
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username='movil'))
+        # Fuera del margen de consistencia y todos con la misma fecha: el desempate es por id
+        self.pasado = timezone.now() - timedelta(minutes=5)
+        self.productos = [
+            Producto.objects.create(
+                codigo=f"PR-{numero}", nombre=f"Producto {numero}", descripcion='',
+                precio_compra=Decimal('5.00'), precio_venta=Decimal('9.00'), stock=0,
+            )
+            for numero in range(5)
+        ]
+        Producto.objects.update(fecha_actualizacion=self.pasado)
+
+    def sincronizar(self, cursor=None):
+        """Recorre el feed desde `cursor` de a 2 elementos; devuelve (productos, eliminados, cursor)"""
+        productos, eliminados, parametros = [], [], {'limite': 2}
+        if cursor:
+            parametros['cursor'] = cursor
+        while True:
+            respuesta = self.client.get(self.url, parametros)
+            self.assertEqual(respuesta.status_code, 200)
+            productos += [producto['id'] for producto in respuesta.data['productos']]
+            eliminados += respuesta.data['eliminados']
+            parametros['cursor'] = respuesta.data['cursor']
+            if not respuesta.data['hay_mas']:
+                return productos, eliminados, parametros['cursor']
+
+    def test_paginas_con_la_misma_fecha(self):
+        productos, eliminados, cursor = self.sincronizar()
+        self.assertEqual(productos, sorted(producto.pk for producto in self.productos))
+        self.assertEqual(eliminados, [])
+        self.assertEqual(self.sincronizar(cursor)[:2], ([], []))
+
+    @mock.patch.object(ProductoViewSet, 'margen_consistencia', timedelta(0))
+    def test_eliminados(self):
+        _, _, cursor = self.sincronizar()
+        borrado, modificado = self.productos[1], self.productos[3]
+        borrado_id = borrado.pk
+        borrado.delete()
+        modificado.nombre = 'Renombrado'
+        modificado.save()
+        self.assertEqual(ProductoEliminado.objects.get().producto_id, borrado_id)
+
+        productos, eliminados, _ = self.sincronizar(cursor)
+        self.assertEqual(productos, [modificado.pk])
+        self.assertEqual(eliminados, [borrado_id])
+
+    def test_cursor_invalido(self):
+        def codificar(contenido):
+            return base64.urlsafe_b64encode(json.dumps(contenido).encode()).decode()
+
+        fecha = self.pasado.isoformat()
+        for cursor in (
+            'no-es-un-cursor',
+            codificar([]),
+            codificar({'p': None}),
+            codificar({'p': None, 'e': None}),
+            codificar({'p': None, 'e': []}),
+            codificar({'p': ['x'], 'e': [fecha, 1]}),
+            codificar({'p': None, 'e': [fecha]}),
+            codificar({'p': None, 'e': [fecha[:19], 1]}),
+        ):
+            with self.subTest(cursor=cursor):
+                self.assertEqual(self.client.get(self.url, {'cursor': cursor}).status_code, 400)
+
+
+@mock.patch('inventario.stock_bajo.notificar_resumen_stock_bajo')
+class ActualizacionMasivaTest(TestCase):
+    """POST /productos/bulk-update/: todo o nada, con kardex y feed de cambios al día"""
+
+    url = '/api/inventario/productos/bulk-update/'
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username='admin', is_staff=True))
+        self.productos = {
+            codigo: Producto.objects.create(
+                codigo=codigo, nombre=codigo, descripcion='', precio_compra=Decimal('5.00'),
+                precio_venta=Decimal('9.00'), stock=10,
+            )
+            for codigo in ('PR-1', 'PR-2', 'PR-3')
+        }
+        self.pasado = timezone.now() - timedelta(minutes=5)
+        Producto.objects.update(fecha_actualizacion=self.pasado)
+
+    def actualizar(self, productos):
+        return self.client.post(self.url, {'productos': productos}, format='json')
+
+    def assertSinCambios(self):
+        for producto in Producto.objects.all():
+            self.assertEqual((producto.precio_venta, producto.stock), (Decimal('9.00'), 10), producto.codigo)
+            self.assertEqual(producto.fecha_actualizacion, self.pasado)
+        self.assertFalse(MovimientoInventario.objects.filter(documento='actualizacion_masiva').exists())
+
+    def test_solo_staff(self, notificar):
+        self.client.force_authenticate(User.objects.create(username='vendedor'))
+        respuesta = self.actualizar([{'codigo': 'PR-1', 'stock': 3}])
+        self.assertEqual(respuesta.status_code, 403)
+        self.assertSinCambios()
+
+    def test_codigos_repetidos(self, notificar):
+        respuesta = self.actualizar([{'codigo': 'PR-1', 'stock': 3}, {'codigo': 'PR-1', 'stock': 4}])
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertIn('PR-1', str(respuesta.data['details']))
+        self.assertSinCambios()
+
+    def test_todo_o_nada(self, notificar):
+        for invalida in ({'codigo': 'PR-3', 'stock': -1}, {'codigo': 'PR-3'}, {'codigo': 'NO-EXISTE', 'stock': 1}):
+            with self.subTest(invalida=invalida):
+                respuesta = self.actualizar([{'codigo': 'PR-1', 'stock': 3, 'precio_venta': '12.00'}, invalida])
+                self.assertEqual(respuesta.status_code, 400)
+                self.assertSinCambios()
+
+    @mock.patch.object(ProductoViewSet, 'margen_consistencia', timedelta(0))
+    def test_kardex_y_feed(self, notificar):
+        cursor = self.client.get('/api/inventario/productos/cambios/').data['cursor']
+
+        respuesta = self.actualizar([
+            {'codigo': 'PR-1', 'stock': 4},
+            {'codigo': 'PR-2', 'stock': 15, 'precio_venta': '11.50'},
+            {'codigo': 'PR-3', 'stock': 10},
+        ])
+        self.assertEqual(respuesta.status_code, 200, respuesta.data)
+        self.assertEqual((respuesta.data['actualizados'], respuesta.data['sin_cambios']), (2, 1))
+
+        movimientos = MovimientoInventario.objects.filter(documento='actualizacion_masiva')
+        self.assertEqual(
+            sorted(movimientos.values_list('producto__codigo', 'tipo', 'cantidad')),
+            [('PR-1', 'ajuste', -6), ('PR-2', 'ajuste', 5)],
+        )
+        for producto in productos_con_stock_kardex():
+            self.assertEqual(producto.stock_kardex, producto.stock, producto.codigo)
+        self.assertEqual(Producto.objects.get(codigo='PR-2').precio_venta, Decimal('11.50'))
+        self.assertEqual(Producto.objects.get(codigo='PR-3').fecha_actualizacion, self.pasado)
+
+        cambios = self.client.get('/api/inventario/productos/cambios/', {'cursor': cursor}).data
+        self.assertEqual(
+            sorted(producto['codigo'] for producto in cambios['productos']), ['PR-1', 'PR-2']
+        )
+
+
+@override_settings(IMAGENES_BACKEND='local')
+class ImagenesProductoTest(TestCase):
+    """Subida de la imagen original y generación de variantes con el backend 'local'"""
+
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        configuracion = override_settings(MEDIA_ROOT=media)
+        configuracion.enable()
+        self.addCleanup(configuracion.disable)
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username='admin', is_staff=True))
+
+    def subir(self, archivo):
+        # El pipeline se prueba aparte: aquí solo se verifica que quede encolado
+        with mock.patch('inventario.viewsProducto.encolar_procesamiento') as encolar:
+            respuesta = self.client.post('/api/inventario/productos/', {
+                'codigo': 'PR-1', 'nombre': 'Producto', 'descripcion': '', 'precio_compra': '5.00',
+                'precio_venta': '9.00', 'stock': 0, 'imagen': archivo,
+            }, format='multipart')
+        return respuesta, encolar
+
+    def png(self, lado=800):
+        from PIL import Image
+
+        buffer = BytesIO()
+        Image.new('RGBA', (lado, lado // 2), (200, 30, 30, 128)).save(buffer, format='PNG')
+        return SimpleUploadedFile('foto.png', buffer.getvalue(), content_type='image/png')
+
+    def test_subida_y_variantes(self):
+        respuesta, encolar = self.subir(self.png())
+        self.assertEqual(respuesta.status_code, 201, respuesta.data)
+        producto = Producto.objects.get(codigo='PR-1')
+        self.assertEqual(producto.imagen_estado, 'pendiente')
+        self.assertTrue(producto.imagen_original.endswith('.png'))
+        encolar.assert_called_once_with(producto.pk)
+
+        self.assertTrue(procesar_imagen_producto(producto.pk))
+        producto.refresh_from_db()
+        self.assertEqual((producto.imagen_estado, producto.imagen_original), ('procesada', None))
+        for campo in VARIANTES:
+            self.assertTrue(getattr(producto, campo).startswith('https://imagenes.local/'), campo)
+        self.assertTrue(producto.imagen.endswith('.jpg'))
+        self.assertTrue(producto.imagen_miniatura.endswith('.webp'))
+
+    def test_archivo_que_no_es_imagen(self):
+        respuesta, encolar = self.subir(SimpleUploadedFile('foto.png', b'no soy una imagen', content_type='image/png'))
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertEqual(respuesta.data['error'], 'Imagen inválida')
+        self.assertFalse(Producto.objects.exists())
+        encolar.assert_not_called()
+
+    def test_imagen_con_demasiados_pixeles(self):
+        from PIL import Image
+
+        with mock.patch.object(Image, 'MAX_IMAGE_PIXELS', 1000):
+            respuesta, _ = self.subir(self.png())
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertEqual(respuesta.data['details'], 'La imagen tiene demasiados píxeles')
+
+
+@mock.patch('inventario.stock_bajo.notificar_resumen_stock_bajo')
+class StockBajoTest(TestCase):
+    """Solo se notifica la transición desde arriba del umbral (3) hasta el umbral o por debajo"""
+
+    def crear(self, codigo, stock):
+        return Producto.objects.create(
+            codigo=codigo, nombre=codigo, descripcion='', precio_compra=Decimal('60.00'),
+            precio_venta=Decimal('100.00'), stock=stock,
+        )
+
+    def cambiar_stock(self, producto, stock):
+        with self.captureOnCommitCallbacks(execute=True):
+            ajustar_stock(producto, stock)
+
+    def test_transicion_notifica_una_vez(self, notificar):
+        producto = self.crear('PR-1', 10)
+        self.cambiar_stock(producto, 2)
+        notificar.assert_called_once_with([{'id': producto.pk, 'nombre': 'PR-1', 'stock': 2}])
+
+        self.cambiar_stock(producto, 1)
+        self.assertEqual(notificar.call_count, 1)
+
+        self.cambiar_stock(producto, 10)
+        producto.refresh_from_db()
+        self.assertFalse(producto.notificado_stock_bajo)
+        self.cambiar_stock(producto, 0)
+        self.assertEqual(notificar.call_count, 2)
+
+    def test_producto_creado_con_stock_bajo_no_notifica(self, notificar):
+        producto = self.crear('PR-1', 2)
+        self.assertTrue(Producto.objects.get(pk=producto.pk).notificado_stock_bajo)
+        self.cambiar_stock(producto, 1)
+        call_command('revisar_stock_bajo', stdout=StringIO())
+        notificar.assert_not_called()
+
+        # Al reabastecerse vuelve a avisar la próxima vez que baje
+        self.cambiar_stock(producto, 5)
+        self.cambiar_stock(producto, 3)
+        notificar.assert_called_once()
+
+    def test_una_evaluacion_por_transaccion(self, notificar):
+        productos = [self.crear(f"PR-{numero}", 10) for numero in range(3)]
+        with self.captureOnCommitCallbacks(execute=True):
+            for producto in productos:
+                ajustar_stock(producto, 1)
+        notificar.assert_called_once()
+        self.assertEqual(len(notificar.call_args.args[0]), 3)
+
+    def test_transaccion_revertida_se_evalua_con_la_siguiente(self, notificar):
+        revertido, confirmado = self.crear('PR-1', 10), self.crear('PR-2', 10)
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    ajustar_stock(revertido, 1)
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+            ajustar_stock(confirmado, 1)
+        notificar.assert_called_once()
+        self.assertEqual([p['id'] for p in notificar.call_args.args[0]], [confirmado.pk])
+
+
+class ImportarProductosTest(TestCase):
+    """manage.py importar_productos sobre un CSV pequeño"""
+
+    def importar(self, contenido):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False, encoding='utf-8') as archivo:
+            archivo.write(contenido)
+        self.addCleanup(os.remove, archivo.name)
+        salida, errores = StringIO(), StringIO()
+        call_command('importar_productos', archivo.name, '--lote', '2', stdout=salida, stderr=errores)
+        return salida.getvalue(), errores.getvalue()
+
+    @mock.patch('inventario.stock_bajo.notificar_resumen_stock_bajo')
+    def test_alta_y_actualizacion(self, notificar):
+        existente = Producto.objects.create(
+            codigo='PR-1', nombre='Viejo', descripcion='', precio_compra=Decimal('5.00'),
+            precio_venta=Decimal('9.00'), stock=10,
+        )
+        salida, errores = self.importar(
+            "codigo,nombre,descripcion,precio_compra,precio_compra_anterior,precio_venta,costo_promedio,stock,imagen,categoria\n"
+            "# comentario\n"
+            "PR-1,Filtro de aceite,,6.00,,10.50,,25,,Filtros\n"
+            "PR-2,Bujía,,3.00,,5.00,2.50,2,,Encendido\n"
+            "PR-3,Sin precio,,,,5.00,,1,,Encendido\n"
+            "PR-4,Pastilla,,8.00,,12.00,,4,,Frenos\n"
+            "PR-4,Pastilla de freno,,8.00,,12.00,,6,,Frenos\n"
+        )
+        self.assertIn("2 insertados, 1 actualizados, 1 rechazados", salida)
+        self.assertIn("falta precio_compra", errores)
+
+        existente.refresh_from_db()
+        self.assertEqual((existente.nombre, existente.stock, existente.categoria.nombre), ('Filtro de aceite', 25, 'Filtros'))
+        self.assertEqual(Producto.objects.get(codigo='PR-2').costo_promedio, Decimal('2.50'))
+        self.assertFalse(Producto.objects.filter(codigo='PR-3').exists())
+        # Código repetido dentro del lote: gana la última fila
+        self.assertEqual(Producto.objects.get(codigo='PR-4').nombre, 'Pastilla de freno')
+        self.assertEqual(set(Categoria.objects.values_list('nombre', flat=True)), {'Filtros', 'Encendido', 'Frenos'})
+
+        # Kardex: la diferencia importada y el stock inicial de los nuevos
+        self.assertEqual(
+            list(existente.movimientos.order_by('id').values_list('tipo', 'cantidad')),
+            [('inicial', 10), ('importacion', 15)],
+        )
+        for producto in productos_con_stock_kardex():
+            self.assertEqual(producto.stock_kardex, producto.stock, producto.codigo)
+        # PR-2 se creó con stock bajo: no es una transición
+        notificar.assert_not_called()
+
+    def test_no_toca_la_imagen_de_los_existentes(self):
+        variantes = {
+            'imagen': 'https://imagenes.local/grande.jpg',
+            'imagen_mediana': 'https://imagenes.local/mediana.webp',
+            'imagen_miniatura': 'https://imagenes.local/miniatura.webp',
+            'imagen_estado': 'procesada',
+        }
+        existente = Producto.objects.create(
+            codigo='PR-1', nombre='Viejo', descripcion='', precio_compra=Decimal('5.00'),
+            precio_venta=Decimal('9.00'), stock=0, **variantes,
+        )
+        salida, _ = self.importar(
+            "codigo,nombre,precio_compra,precio_venta,stock,imagen\n"
+            "PR-1,Nuevo,5.00,9.00,0,\n"
+            "PR-2,Otro,5.00,9.00,0,https://cdn.local/pr-2.jpg\n"
+        )
+        self.assertIn("1 insertados, 1 actualizados", salida)
+        existente.refresh_from_db()
+        self.assertEqual(existente.nombre, 'Nuevo')
+        self.assertEqual({campo: getattr(existente, campo) for campo in variantes}, variantes)
+        self.assertEqual(Producto.objects.get(codigo='PR-2').imagen, 'https://cdn.local/pr-2.jpg')
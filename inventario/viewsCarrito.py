@@ -2,11 +2,13 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from backend_exa2.campos import ConsultaCamposMixin
 from inventario.modelsCarrito import Carrito
 from inventario.serializers.serializerCarrito import CarritoSerializer, CarritoSimpleSerializer
+from perfiles.cache_perfil import obtener_perfil
 
 
-class CarritoViewSet(viewsets.ModelViewSet):
+class CarritoViewSet(ConsultaCamposMixin, viewsets.ModelViewSet):
     """
     ViewSet para gestionar los carritos de compra.
     Proporciona operaciones CRUD completas con soporte para múltiples carritos por cliente.
@@ -27,13 +29,12 @@ class CarritoViewSet(viewsets.ModelViewSet):
         if user.is_superuser or user.is_staff:
             return Carrito.objects.select_related('cliente').prefetch_related('detalles__producto').all()
         
-        # Si es cliente, solo ver sus propios carritos
-        try:
-            cliente = user.cliente
-            return Carrito.objects.filter(cliente=cliente).select_related('cliente').prefetch_related('detalles__producto')
-        except:
+        # Si es cliente, solo ver sus propios carritos (el ID sale del perfil cacheado)
+        cliente_id = (obtener_perfil(user) or {}).get('cliente_id')
+        if cliente_id is None:
             # Si el usuario no tiene perfil de cliente, no devolver ningún carrito
             return Carrito.objects.none()
+        return Carrito.objects.filter(cliente_id=cliente_id).select_related('cliente').prefetch_related('detalles__producto')
 
     def get_serializer_class(self):
         """Usa CarritoSimpleSerializer para listados, CarritoSerializer para detalle"""
@@ -1,9 +1,10 @@
 from rest_framework import viewsets
+from backend_exa2.campos import ConsultaCamposMixin
 from inventario.modelsCategoria import Categoria
 from inventario.serializers.serializerCategoria import CategoriaSerializer
 
 
-class CategoriaViewSet(viewsets.ModelViewSet):
+class CategoriaViewSet(ConsultaCamposMixin, viewsets.ModelViewSet):
     """
     ViewSet para gestionar las categorías de productos.
     Proporciona operaciones CRUD completas.
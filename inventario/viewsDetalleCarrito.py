@@ -3,11 +3,13 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.core.exceptions import ValidationError
 from inventario.modelsDetalleCarrito import DetalleCarrito
-from inventario.modelsCarrito import Carrito
-from inventario.serializers.serializerDetalleCarrito import DetalleCarritoSerializer
+from backend_exa2.campos import ConsultaCamposMixin
+from backend_exa2.serializacion import ListadoRapidoMixin
+from inventario.serializers.serializerDetalleCarrito import DETALLE_CARRITO_RAPIDO, DetalleCarritoSerializer
+from perfiles.cache_perfil import obtener_perfil
 
 
-class DetalleCarritoViewSet(viewsets.ModelViewSet):
+class DetalleCarritoViewSet(ListadoRapidoMixin, ConsultaCamposMixin, viewsets.ModelViewSet):
     """
     ViewSet para gestionar los detalles de carrito.
     Permite agregar, actualizar cantidad y eliminar productos del carrito.
@@ -15,6 +17,7 @@ class DetalleCarritoViewSet(viewsets.ModelViewSet):
     Filtra por carritos del usuario autenticado.
     """
     serializer_class = DetalleCarritoSerializer
+    serializador_rapido = DETALLE_CARRITO_RAPIDO
     permission_classes = [IsAuthenticated]
     
     def get_queryset(self):
@@ -31,14 +34,12 @@ class DetalleCarritoViewSet(viewsets.ModelViewSet):
         if user.is_superuser or user.is_staff:
             queryset = DetalleCarrito.objects.select_related('carrito', 'producto').all()
         else:
-            # Si es cliente, solo ver detalles de sus propios carritos
-            try:
-                cliente = user.cliente
-                carritos_cliente = Carrito.objects.filter(cliente=cliente).values_list('id', flat=True)
-                queryset = DetalleCarrito.objects.filter(carrito__id__in=carritos_cliente).select_related('carrito', 'producto')
-            except:
+            # Si es cliente, solo ver detalles de sus propios carritos (el ID sale del perfil cacheado)
+            cliente_id = (obtener_perfil(user) or {}).get('cliente_id')
+            if cliente_id is None:
                 # Si el usuario no tiene perfil de cliente, no devolver ningún detalle
                 return DetalleCarrito.objects.none()
+            queryset = DetalleCarrito.objects.filter(carrito__cliente_id=cliente_id).select_related('carrito', 'producto')
         
         # Filtro adicional por carrito específico si se proporciona
         carrito_id = self.request.query_params.get('carrito')
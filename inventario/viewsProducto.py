@@ -1,13 +1,31 @@
 from rest_framework import viewsets
+from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework import status
-from django.conf import settings
-import requests
+from rest_framework.permissions import IsAdminUser
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from datetime import datetime, timedelta
+import base64
+import json
+from django.core.files.storage import default_storage
 from inventario.modelsProducto import Producto
-from inventario.serializers.serializerProducto import ProductoSerializer
+from inventario.modelsProductoEliminado import ProductoEliminado
+from backend_exa2.campos import ConsultaCamposMixin
+from backend_exa2.serializacion import ListadoRapidoMixin
+from inventario.serializers.serializerProducto import PRODUCTO_RAPIDO, ProductoSerializer
+from inventario.serializers.serializerActualizacionMasiva import ActualizacionMasivaSerializer
+from inventario.serializers.serializerMovimientoInventario import MovimientoInventarioSerializer
+from inventario.stock_bajo import evaluar_stock_bajo
+from inventario.kardex import KardexDepurado, ajustar_stock, registrar_movimientos, stock_en_fecha
+from inventario.relacionados import TOP_K, obtener_relacionados
+from inventario.modelsMovimientoInventario import MovimientoInventario
+from inventario.procesamiento_imagenes import ImagenInvalida, encolar_procesamiento, guardar_imagen_original
 
 
-class ProductoViewSet(viewsets.ModelViewSet):
+class ProductoViewSet(ListadoRapidoMixin, ConsultaCamposMixin, viewsets.ModelViewSet):
     """
     ViewSet para gestionar los productos.
     Proporciona operaciones CRUD completas con soporte para categorías e imágenes.
@@ -15,6 +33,14 @@ class ProductoViewSet(viewsets.ModelViewSet):
     """
     queryset = Producto.objects.select_related('categoria').all()
     serializer_class = ProductoSerializer
+    serializador_rapido = PRODUCTO_RAPIDO
+
+    # Parámetros del feed de sincronización (/productos/cambios/)
+    limite_cambios_defecto = 200
+    limite_cambios_maximo = 1000
+    # Las filas más recientes que este margen se difieren al siguiente sync para no
+    # saltar cambios de transacciones que aún no se confirmaron.
+    margen_consistencia = timedelta(seconds=2)
 
     def get_queryset(self):
         """Permite filtrar productos por categoría"""
@@ -40,41 +66,34 @@ class ProductoViewSet(viewsets.ModelViewSet):
 
     def handle_image_upload(self, request, is_update=False, *args, **kwargs):
         """
-        Maneja la lógica de subida de imágenes a ImgBB y procesamiento de datos.
+        Procesa los datos del producto y, si viene un archivo de imagen, lo guarda
+        localmente y encola la generación de variantes (no se sube nada durante la petición).
         """
         # Crear una copia mutable de los datos
         data = request.data.copy()
         imagen_file = request.FILES.get("imagen")
+        instance = self.get_object() if is_update else None
+        campos_extra = {}
 
         if imagen_file:
-            # Subir imagen a ImgBB
-            url = "https://api.imgbb.com/1/upload"
-            payload = {"key": settings.API_KEY_IMGBB}
-            files = {"image": imagen_file.read()}
-            
+            # El archivo no es una URL: la imagen la completa el pipeline en segundo plano
+            data.pop("imagen", None)
             try:
-                response = requests.post(url, data=payload, files=files)
-                response.raise_for_status()  # Lanza excepción si hay error HTTP
-                
-                if response.status_code == 200:
-                    image_url = response.json()["data"]["url"]
-                    data["imagen"] = image_url
-                else:
-                    return Response(
-                        {"error": "Error al subir imagen a ImgBB"}, 
-                        status=status.HTTP_500_INTERNAL_SERVER_ERROR
-                    )
-            except requests.exceptions.RequestException as e:
+                ruta_original = guardar_imagen_original(imagen_file)
+            except ImagenInvalida as e:
                 return Response(
-                    {"error": f"Error de conexión con ImgBB: {str(e)}"}, 
-                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
+                    {"error": "Imagen inválida", "details": str(e)},
+                    status=status.HTTP_400_BAD_REQUEST
                 )
+            campos_extra = {'imagen_original': ruta_original, 'imagen_estado': 'pendiente'}
 
         elif is_update:
             # Si es una actualización y no hay nueva imagen, mantener la existente
-            instance = self.get_object()
             if not data.get("imagen") and instance.imagen:
                 data["imagen"] = instance.imagen
+            elif data.get("imagen") and data.get("imagen") != instance.imagen:
+                # URL externa nueva: las variantes anteriores ya no corresponden
+                campos_extra = {'imagen_mediana': None, 'imagen_miniatura': None, 'imagen_estado': ''}
 
         # Si no se proporciona costo_promedio, usar precio_compra
         if not data.get('costo_promedio') and not is_update:
@@ -82,7 +101,6 @@ class ProductoViewSet(viewsets.ModelViewSet):
         
         # Si es actualización y el precio de compra cambió, guardar el anterior
         if is_update:
-            instance = self.get_object()
             if 'precio_compra' in data and data['precio_compra'] != str(instance.precio_compra):
                 data['precio_compra_anterior'] = instance.precio_compra
             
@@ -92,15 +110,30 @@ class ProductoViewSet(viewsets.ModelViewSet):
 
         # Crear el serializer con los datos procesados
         if is_update:
-            instance = self.get_object()
             serializer = self.get_serializer(instance, data=data, partial=kwargs.get('partial', False))
         else:
             serializer = self.get_serializer(data=data)
 
         if serializer.is_valid():
-            serializer.save()
+            original_anterior = instance.imagen_original if instance else None
+            # En una edición el stock no se sobrescribe: la diferencia se registra en el kardex
+            stock_nuevo = serializer.validated_data.pop('stock', None) if is_update else None
+            with transaction.atomic():
+                if is_update:
+                    # Bloquear la fila y partir del stock vigente para no pisar ventas concurrentes
+                    instance.stock = Producto.objects.select_for_update().values_list('stock', flat=True).get(pk=instance.pk)
+                producto = serializer.save(**campos_extra)
+                if stock_nuevo is not None:
+                    ajustar_stock(producto, stock_nuevo, documento='edicion_manual', usuario=request.user)
+            if imagen_file:
+                # Un original que aún no se procesó queda reemplazado por el nuevo
+                if original_anterior:
+                    default_storage.delete(original_anterior)
+                encolar_procesamiento(producto.pk)
             return Response(serializer.data, status=status.HTTP_201_CREATED if not is_update else status.HTTP_200_OK)
         else:
+            if imagen_file:
+                default_storage.delete(campos_extra['imagen_original'])
             return Response(
                 {"error": "Datos inválidos", "details": serializer.errors}, 
                 status=status.HTTP_400_BAD_REQUEST
@@ -112,3 +145,317 @@ class ProductoViewSet(viewsets.ModelViewSet):
         """
         instance = self.get_object()
         return super().destroy(request, *args, **kwargs)
+
+    @action(detail=False, methods=['post'], url_path='bulk-update', permission_classes=[IsAdminUser])
+    def bulk_update(self, request):
+        """
+        Actualiza precios y/o stock de muchos productos en una sola transacción.
+        Pensado para conteos de inventario y cambios de precios masivos (solo staff).
+
+        Body:
+        {
+            "productos": [
+                {"codigo": "LB-001", "precio_venta": "2100.00", "precio_compra": "1450.00", "stock": 20},
+                {"codigo": "LB-002", "stock": 0},
+                ...
+            ]
+        }
+
+        Se aplica todo o nada: si algún código no existe o alguna fila es inválida no se modifica ningún producto.
+        """
+        serializer = ActualizacionMasivaSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(
+                {"error": "Datos inválidos", "details": serializer.errors},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        filas = {item['codigo']: item for item in serializer.validated_data['productos']}
+
+        with transaction.atomic():
+            # Bloquear las filas (en orden de pk para evitar deadlocks entre lotes concurrentes)
+            productos = list(
+                Producto.objects.select_for_update()
+                .filter(codigo__in=filas.keys())
+                .order_by('pk')
+                .only('id', 'codigo', 'precio_venta', 'precio_compra', 'precio_compra_anterior', 'costo_promedio', 'stock')
+            )
+
+            no_encontrados = filas.keys() - {producto.codigo for producto in productos}
+            if no_encontrados:
+                return Response(
+                    {"error": "Productos no encontrados", "details": {"codigos": sorted(no_encontrados)}},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            ahora = timezone.now()
+            modificados = []
+            diferencias_stock = []
+            for producto in productos:
+                fila = filas[producto.codigo]
+                cambio = False
+
+                if 'precio_compra' in fila:
+                    # Mismas reglas que la edición individual: se guarda el precio anterior
+                    # y el costo promedio pasa a ser el nuevo precio de compra
+                    if fila['precio_compra'] != producto.precio_compra:
+                        producto.precio_compra_anterior = producto.precio_compra
+                        producto.precio_compra = fila['precio_compra']
+                        cambio = True
+                    if producto.costo_promedio != fila['precio_compra']:
+                        producto.costo_promedio = fila['precio_compra']
+                        cambio = True
+
+                if 'precio_venta' in fila and fila['precio_venta'] != producto.precio_venta:
+                    producto.precio_venta = fila['precio_venta']
+                    cambio = True
+
+                if 'stock' in fila and fila['stock'] != producto.stock:
+                    diferencias_stock.append((producto, fila['stock'] - producto.stock))
+                    producto.stock = fila['stock']
+                    cambio = True
+
+                if cambio:
+                    producto.fecha_actualizacion = ahora
+                    modificados.append(producto)
+
+            Producto.objects.bulk_update(
+                modificados,
+                ['precio_venta', 'precio_compra', 'precio_compra_anterior', 'costo_promedio', 'stock', 'fecha_actualizacion'],
+                batch_size=1000
+            )
+
+            # El stock ya quedó escrito con las filas bloqueadas: solo se registra en el kardex
+            registrar_movimientos(
+                [
+                    MovimientoInventario(
+                        producto_id=producto.pk,
+                        tipo='ajuste',
+                        cantidad=diferencia,
+                        documento='actualizacion_masiva',
+                        usuario=request.user,
+                    )
+                    for producto, diferencia in diferencias_stock
+                ],
+                aplicar=False,
+                evaluar_stock=False
+            )
+
+            # Transiciones de stock bajo / reabastecido para todo el lote, con un único resumen
+            stock_bajo = evaluar_stock_bajo(producto.pk for producto in modificados)
+
+        return Response({
+            "mensaje": "Actualización masiva completada",
+            "recibidos": len(filas),
+            "actualizados": len(modificados),
+            "sin_cambios": len(filas) - len(modificados),
+            "stock_bajo": [producto['id'] for producto in stock_bajo],
+        }, status=status.HTTP_200_OK)
+
+    @action(detail=True, methods=['get'], url_path='kardex')
+    def kardex(self, request, pk=None):
+        """
+        Movimientos de inventario de un producto en un rango de fechas.
+
+        Parámetros opcionales:
+        - desde: fecha inicial YYYY-MM-DD (por defecto, inicio del mes actual)
+        - hasta: fecha final YYYY-MM-DD, inclusive (por defecto, hoy)
+        - cursor: valor devuelto por la llamada anterior para continuar el listado
+
+        Retorna el stock al inicio del rango, los movimientos y el stock al final.
+        Los movimientos se devuelven de a `limite_cambios_maximo`: si "hay_mas" es true,
+        volver a llamar con el mismo rango y el "cursor" recibido.
+        Ejemplo: /api/inventario/productos/5/kardex/?desde=2025-10-01&hasta=2025-10-31
+        """
+        hoy = timezone.localdate()
+        desde = parse_date(request.query_params.get('desde', '')) or hoy.replace(day=1)
+        hasta = parse_date(request.query_params.get('hasta', '')) or hoy
+        if desde > hasta:
+            return Response(
+                {"error": "'desde' no puede ser posterior a 'hasta'"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        producto_id = self.get_object().pk
+        inicio = timezone.make_aware(datetime.combine(desde, datetime.min.time()))
+        fin = timezone.make_aware(datetime.combine(hasta + timedelta(days=1), datetime.min.time()))
+
+        movimientos = MovimientoInventario.objects.filter(
+            producto_id=producto_id, fecha__gte=inicio, fecha__lt=fin
+        )
+        cursor = request.query_params.get('cursor')
+        if cursor:
+            try:
+                fecha, ultimo_id = self._decodificar_posicion(
+                    json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+                )
+            except (ValueError, TypeError, IndexError):
+                return Response(
+                    {"error": "Cursor inválido"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            movimientos = movimientos.filter(Q(fecha__gt=fecha) | Q(fecha=fecha, id__gt=ultimo_id))
+        movimientos = list(movimientos.order_by('fecha', 'id')[:self.limite_cambios_maximo + 1])
+        hay_mas = len(movimientos) > self.limite_cambios_maximo
+        movimientos = movimientos[:self.limite_cambios_maximo]
+
+        try:
+            # stock_en_fecha incluye los movimientos de ese instante: restar un microsegundo
+            stock_inicial = stock_en_fecha(producto_id, inicio - timedelta(microseconds=1))
+            stock_final = stock_en_fecha(producto_id, fin - timedelta(microseconds=1))
+        except KardexDepurado as error:
+            return Response(
+                {"error": "Los movimientos de ese rango ya se eliminaron del kardex",
+                 "disponible_desde": timezone.localtime(error.disponible_desde).date()},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        ultimo = movimientos[-1] if hay_mas else None
+        return Response({
+            'producto': producto_id,
+            'desde': desde,
+            'hasta': hasta,
+            'stock_inicial': stock_inicial,
+            'stock_final': stock_final,
+            'movimientos': MovimientoInventarioSerializer(movimientos, many=True).data,
+            'hay_mas': hay_mas,
+            'cursor': base64.urlsafe_b64encode(
+                json.dumps(self._codificar_posicion((ultimo.fecha, ultimo.id))).encode()
+            ).decode() if ultimo else None,
+        })
+
+    @action(detail=True, methods=['get'], url_path='relacionados')
+    def relacionados(self, request, pk=None):
+        """
+        Productos que se compran con más frecuencia junto a este (para la pantalla del carrito).
+
+        Parámetros opcionales:
+        - limite: cantidad de productos (por defecto 10, máximo TOP_K)
+
+        Se leen del índice precalculado CoocurrenciaProducto con una sola consulta.
+        Ejemplo: /api/inventario/productos/5/relacionados/?limite=5
+        """
+        try:
+            limite = int(request.query_params.get('limite', 10))
+        except ValueError:
+            return Response(
+                {"error": "El parámetro 'limite' debe ser un número entero"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        limite = max(1, min(limite, TOP_K))
+
+        try:
+            producto_id = int(pk)
+        except (TypeError, ValueError):
+            return Response({"error": "Producto no encontrado"}, status=status.HTTP_404_NOT_FOUND)
+
+        return Response({
+            'producto': producto_id,
+            'relacionados': obtener_relacionados(producto_id, limite),
+        })
+
+    @action(detail=False, methods=['get'], url_path='cambios')
+    def cambios(self, request):
+        """
+        Feed de cambios para la sincronización incremental del catálogo móvil.
+
+        Parámetros opcionales:
+        - cursor: valor devuelto por la llamada anterior (omitir en la primera descarga)
+        - limite: cantidad máxima de productos y de eliminados por página
+
+        Retorna los productos creados/modificados y los IDs de productos eliminados
+        desde el cursor, junto con el nuevo cursor. Si "hay_mas" es true, el cliente
+        debe volver a llamar inmediatamente con el nuevo cursor.
+
+        Ejemplo: /api/inventario/productos/cambios/?cursor=XXX&limite=500
+        """
+        try:
+            limite = int(request.query_params.get('limite', self.limite_cambios_defecto))
+        except ValueError:
+            return Response(
+                {"error": "El parámetro 'limite' debe ser un número entero"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        limite = max(1, min(limite, self.limite_cambios_maximo))
+
+        hasta = timezone.now() - self.margen_consistencia
+        cursor = request.query_params.get('cursor')
+
+        if cursor:
+            try:
+                posicion_productos, posicion_eliminados = self._decodificar_cursor(cursor)
+            except (ValueError, KeyError, TypeError, IndexError):
+                return Response(
+                    {"error": "Cursor inválido"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        else:
+            # Primera descarga: todo el catálogo, sin eliminaciones anteriores
+            posicion_productos = None
+            posicion_eliminados = (hasta, 0)
+
+        productos = self.get_queryset().filter(fecha_actualizacion__lte=hasta)
+        if posicion_productos:
+            fecha, ultimo_id = posicion_productos
+            productos = productos.filter(
+                Q(fecha_actualizacion__gt=fecha) | Q(fecha_actualizacion=fecha, id__gt=ultimo_id)
+            )
+        productos = list(productos.order_by('fecha_actualizacion', 'id')[:limite + 1])
+
+        fecha, ultimo_id = posicion_eliminados
+        eliminados = list(
+            ProductoEliminado.objects.filter(fecha_eliminacion__lte=hasta).filter(
+                Q(fecha_eliminacion__gt=fecha) | Q(fecha_eliminacion=fecha, id__gt=ultimo_id)
+            ).order_by('fecha_eliminacion', 'id').values_list('id', 'producto_id', 'fecha_eliminacion')[:limite + 1]
+        )
+
+        hay_mas = len(productos) > limite or len(eliminados) > limite
+        productos = productos[:limite]
+        eliminados = eliminados[:limite]
+
+        if productos:
+            posicion_productos = (productos[-1].fecha_actualizacion, productos[-1].id)
+        if eliminados:
+            posicion_eliminados = (eliminados[-1][2], eliminados[-1][0])
+
+        serializer = self.get_serializer(productos, many=True)
+        return Response({
+            "productos": serializer.data,
+            "eliminados": [producto_id for _, producto_id, _ in eliminados],
+            "cursor": self._codificar_cursor(posicion_productos, posicion_eliminados),
+            "hay_mas": hay_mas,
+        })
+
+    @staticmethod
+    def _codificar_posicion(valor):
+        """Posición (fecha, id) de un listado ordenado como lista serializable en JSON"""
+        return [valor[0].isoformat(), valor[1]] if valor else None
+
+    @staticmethod
+    def _decodificar_posicion(valor):
+        """Inverso de _codificar_posicion. Lanza ValueError si la posición no es válida"""
+        if valor is None:
+            return None
+        if not isinstance(valor, list) or len(valor) != 2:
+            raise ValueError("Posición de cursor mal formada")
+        fecha = datetime.fromisoformat(valor[0])
+        if timezone.is_naive(fecha):
+            raise ValueError("Fecha de cursor sin zona horaria")
+        return fecha, int(valor[1])
+
+    @classmethod
+    def _codificar_cursor(cls, posicion_productos, posicion_eliminados):
+        """Serializa las posiciones (fecha, id) del feed en un cursor opaco"""
+        contenido = json.dumps({
+            "p": cls._codificar_posicion(posicion_productos),
+            "e": cls._codificar_posicion(posicion_eliminados),
+        })
+        return base64.urlsafe_b64encode(contenido.encode()).decode()
+
+    @classmethod
+    def _decodificar_cursor(cls, cursor):
+        """Inverso de _codificar_cursor. Lanza ValueError si el cursor no es válido"""
+        contenido = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+        posicion_eliminados = cls._decodificar_posicion(contenido["e"])
+        if posicion_eliminados is None:
+            raise ValueError("Cursor sin posición de eliminados")
+        return cls._decodificar_posicion(contenido["p"]), posicion_eliminados
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class PerfilesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'perfiles'
+
+    def ready(self):
+        # Registrar señales que invalidan el perfil cacheado
+        from perfiles import signals  # noqa: F401
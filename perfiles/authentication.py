@@ -0,0 +1,249 @@
+"""
+Autenticación JWT sin estado.
+
+JWTAuthentication de simplejwt lee la fila del User en cada request. Aquí el
+usuario se arma con los claims firmados del token de acceso (id, username,
+is_staff, is_superuser, grupos, cliente_id, empleado_id) y el modelo completo
+solo se carga si una vista lo necesita (ej: asignarlo a una FK o leer su email).
+
+Como el token no se contrasta con la base de datos, la revocación se hace con:
+- una duración corta del token de acceso (SIMPLE_JWT['ACCESS_TOKEN_LIFETIME'])
+- una lista de denegación en caché: por jti (logout) o por usuario (tokens
+  emitidos antes de desactivarlo, cambiar su contraseña, rol o grupos)
+
+La lista de denegación solo es efectiva si la caché es compartida entre workers:
+settings.JWT_SIN_ESTADO no arranca sin ella (salvo con DEBUG).
+
+Los refresh tokens rotados van a la blacklist de simplejwt (base de datos);
+RefreshTokenCacheado recuerda además los jti revocados en memoria y en caché
+para rechazar su reutilización sin consultar las tablas.
+"""
+import threading
+import time
+from collections import OrderedDict
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils.functional import SimpleLazyObject, empty
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from .cache_permisos import obtener_permisos
+
+CLAVE_JTI_REVOCADO = 'jwt:revocado:{}'
+CLAVE_USUARIO_REVOCADO = 'jwt:usuario:{}'
+CLAVE_REFRESH_REVOCADO = 'jwt:refresh:revocado:{}'
+
+# Refresh tokens revocados recientemente en este proceso: jti -> exp
+MAX_REVOCADOS_LOCALES = 10000
+_revocados_locales = OrderedDict()
+_lock_revocados = threading.Lock()
+
+
+def agregar_claims(token, perfil):
+    """Copia al token los datos del perfil (perfiles/cache_perfil.py) que usan los permisos"""
+    token['username'] = perfil['username']
+    token['is_staff'] = perfil['is_staff']
+    token['is_superuser'] = perfil['is_superuser']
+    token['groups'] = perfil['groups']
+    token['cliente_id'] = perfil['cliente_id']
+    token['empleado_id'] = perfil['empleado_id']
+    return token
+
+
+def _duracion_acceso():
+    return int(api_settings.ACCESS_TOKEN_LIFETIME.total_seconds())
+
+
+def revocar_token(token):
+    """Deniega un token de acceso puntual hasta que expire (ej: logout)"""
+    jti = token.get(api_settings.JTI_CLAIM)
+    if jti:
+        cache.set(CLAVE_JTI_REVOCADO.format(jti), True, _duracion_acceso())
+
+
+def revocar_tokens_usuario(user_id, desde):
+    """
+    Deniega los tokens de acceso del usuario emitidos antes de `desde` (timestamp).
+    La entrada dura lo mismo que un token de acceso: después ya expiraron todos.
+    """
+    cache.set(CLAVE_USUARIO_REVOCADO.format(user_id), int(desde), _duracion_acceso())
+
+
+class UsuarioToken(SimpleLazyObject):
+    """
+    Usuario respaldado por los claims del token. Los atributos definidos aquí no
+    consultan la base de datos (has_perm usa los permisos cacheados); cualquier
+    otro (email, groups, asignarlo a una FK, etc.) carga el User completo una sola vez.
+    """
+
+    def __init__(self, token):
+        User = get_user_model()
+        # simplejwt guarda el id como texto: convertirlo para que pk/id y __eq__ coincidan con el User
+        user_id = User._meta.pk.to_python(token[api_settings.USER_ID_CLAIM])
+        super().__init__(lambda: User.objects.get(**{api_settings.USER_ID_FIELD: user_id}))
+        # LazyObject redirige __setattr__ al objeto envuelto: guardar directo en __dict__
+        self.__dict__['token'] = token
+        self.__dict__['_user_id'] = user_id
+
+    def _claim(self, nombre):
+        # Tokens emitidos antes de incluir los claims: leer del modelo
+        if nombre in self.token:
+            return self.token[nombre]
+        return getattr(self.usuario, nombre)
+
+    @property
+    def usuario(self):
+        """User completo (se carga en el primer acceso)"""
+        if self._wrapped is empty:
+            self._setup()
+        return self._wrapped
+
+    @property
+    def id(self):
+        return self._user_id
+
+    @property
+    def pk(self):
+        return self._user_id
+
+    @property
+    def username(self):
+        return self._claim('username')
+
+    @property
+    def is_staff(self):
+        return self._claim('is_staff')
+
+    @property
+    def is_superuser(self):
+        return self._claim('is_superuser')
+
+    @property
+    def nombres_grupos(self):
+        if 'groups' in self.token:
+            return self.token['groups']
+        return list(self.usuario.groups.values_list('name', flat=True))
+
+    @property
+    def cliente_id(self):
+        return self.token.get('cliente_id')
+
+    @property
+    def empleado_id(self):
+        return self.token.get('empleado_id')
+
+    def get_all_permissions(self, obj=None):
+        if obj is not None:
+            return self.usuario.get_all_permissions(obj)
+        return set(obtener_permisos(self._user_id))
+
+    def has_perm(self, perm, obj=None):
+        # Mismo criterio que User.has_perm, con los permisos cacheados (perfiles/cache_permisos.py)
+        if self.is_superuser:
+            return True
+        if obj is not None:
+            return self.usuario.has_perm(perm, obj)
+        return perm in obtener_permisos(self._user_id)
+
+    def has_perms(self, perm_list, obj=None):
+        return all(self.has_perm(perm, obj) for perm in perm_list)
+
+    @property
+    def is_active(self):
+        # Solo se emiten tokens para usuarios activos y la baja los revoca (perfiles/signals.py);
+        # JWT_SIN_ESTADO exige caché compartida para que la revocación llegue a todos los workers.
+        # Si el User ya se cargó, vale su estado real
+        if self._wrapped is not empty:
+            return self._wrapped.is_active
+        return True
+
+    is_authenticated = True
+    is_anonymous = False
+
+    # LazyObject delega estos métodos al objeto envuelto (lo que cargaría el User):
+    # IsAuthenticated evalúa bool(request.user)
+    def __bool__(self):
+        return True
+
+    def __eq__(self, other):
+        return getattr(other, 'pk', None) == self._user_id and hasattr(other, 'is_authenticated')
+
+    def __hash__(self):
+        return hash(self._user_id)
+
+    def __str__(self):
+        return self.username
+
+    def __repr__(self):
+        return f"<UsuarioToken {self._user_id}>"
+
+
+class JWTSinEstadoAuthentication(JWTAuthentication):
+    """
+    Autentica con el token de acceso sin leer el User de la base de datos.
+    Solo consulta la caché (una lectura) para la lista de denegación.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        clave_jti = CLAVE_JTI_REVOCADO.format(validated_token.get(api_settings.JTI_CLAIM))
+        clave_usuario = CLAVE_USUARIO_REVOCADO.format(user_id)
+        revocados = cache.get_many([clave_jti, clave_usuario])
+
+        if revocados.get(clave_jti):
+            raise AuthenticationFailed(_("Token revocado"), code="token_revoked")
+        revocado_desde = revocados.get(clave_usuario)
+        # iat tiene resolución de segundos: un login en el mismo segundo de la revocación sigue siendo válido
+        if revocado_desde is not None and validated_token.get('iat', 0) < revocado_desde:
+            raise AuthenticationFailed(_("Token revocado"), code="token_revoked")
+
+        return UsuarioToken(validated_token)
+
+
+def _recordar_refresh_revocado(jti, exp):
+    ahora = time.time()
+    with _lock_revocados:
+        _revocados_locales[jti] = exp
+        while len(_revocados_locales) > MAX_REVOCADOS_LOCALES:
+            _revocados_locales.popitem(last=False)
+    if exp > ahora:
+        cache.set(CLAVE_REFRESH_REVOCADO.format(jti), True, int(exp - ahora) + 1)
+
+
+def _refresh_revocado_en_cache(jti):
+    with _lock_revocados:
+        if jti in _revocados_locales:
+            return True
+    return bool(cache.get(CLAVE_REFRESH_REVOCADO.format(jti)))
+
+
+class RefreshTokenCacheado(RefreshToken):
+    """
+    Refresh token con verificación rápida de la blacklist.
+
+    Un jti revocado se recuerda en memoria del proceso y en la caché compartida
+    hasta que expira: reutilizar un refresh ya rotado se rechaza sin consultar
+    BlacklistedToken. Si no está en caché se consulta la tabla como siempre
+    (la caché pudo reiniciarse o la revocación venir del admin).
+    """
+
+    def check_blacklist(self):
+        jti = self.payload[api_settings.JTI_CLAIM]
+        if _refresh_revocado_en_cache(jti):
+            raise TokenError(_("Token is blacklisted"))
+        try:
+            super().check_blacklist()
+        except TokenError:
+            _recordar_refresh_revocado(jti, self.payload.get('exp', 0))
+            raise
+
+    def blacklist(self):
+        resultado = super().blacklist()
+        _recordar_refresh_revocado(self.payload[api_settings.JTI_CLAIM], self.payload.get('exp', 0))
+        return resultado
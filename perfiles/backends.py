@@ -0,0 +1,14 @@
+"""
+Backend de autenticación con los permisos cacheados (perfiles/cache_permisos.py).
+El login sigue siendo el de ModelBackend; has_perm resuelve en memoria.
+"""
+from django.contrib.auth.backends import ModelBackend
+from .cache_permisos import obtener_permisos
+
+
+class ModelBackendCacheado(ModelBackend):
+
+    def get_all_permissions(self, user_obj, obj=None):
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+        return obtener_permisos(user_obj.pk)
@@ -0,0 +1,77 @@
+"""
+Perfil cacheado del usuario autenticado.
+
+Reúne en un solo diccionario lo que las vistas consultan en cada request (datos
+del User, grupos, rol y los IDs de Cliente/Empleado) para no repetir esas
+consultas en /api/me/, carritos, etc. Las señales de perfiles/signals.py lo
+invalidan cuando cambia el usuario, su cliente/empleado o sus grupos.
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+CLAVE_PERFIL = 'perfiles:perfil:{}'
+
+
+def _clave(user_id):
+    return CLAVE_PERFIL.format(user_id)
+
+
+def construir_perfil(user_id):
+    """Arma el perfil consultando la base de datos (None si el usuario no existe)"""
+    from django.contrib.auth import get_user_model
+    from django.contrib.auth.models import Group
+    from perfiles.models import Cliente, Empleado
+
+    user = get_user_model().objects.filter(pk=user_id).values(
+        'id', 'username', 'email', 'first_name', 'last_name', 'is_staff', 'is_superuser', 'is_active'
+    ).first()
+    if user is None:
+        return None
+
+    groups = list(Group.objects.filter(user__id=user_id).order_by('id').values_list('name', flat=True))
+    cliente = Cliente.objects.filter(usuario_id=user_id).values('id', 'nombre', 'apellido').first()
+    empleado = Empleado.objects.filter(usuario_id=user_id).values('id', 'nombre', 'apellido').first()
+
+    # Nombre: primero el del cliente, luego el del empleado, si no el del User
+    nombre = user['first_name'] or user['username']
+    apellido = user['last_name'] or ''
+    datos = cliente or empleado
+    if datos:
+        nombre = datos['nombre']
+        apellido = datos['apellido']
+
+    return {
+        **user,
+        'nombre': nombre,
+        'apellido': apellido,
+        'groups': groups,
+        'role': 'administrador' if user['is_superuser'] or user['is_staff'] else (groups[0] if groups else 'usuario'),
+        'cliente_id': cliente['id'] if cliente else None,
+        'empleado_id': empleado['id'] if empleado else None,
+    }
+
+
+def obtener_perfil(user):
+    """
+    Perfil del usuario desde la caché (se construye y guarda si no está)
+
+    Args:
+        user: User autenticado (o UsuarioToken: solo se usa su pk)
+
+    Returns:
+        dict: id, username, email, nombre, apellido, first_name, last_name, is_staff,
+            is_superuser, is_active, groups, role, cliente_id, empleado_id
+    """
+    perfil = cache.get(_clave(user.pk))
+    if perfil is None:
+        perfil = construir_perfil(user.pk)
+        if perfil is not None:
+            cache.set(_clave(user.pk), perfil, settings.PERFIL_CACHE_TIMEOUT)
+    return perfil
+
+
+def invalidar_perfil(*user_ids):
+    """Elimina de la caché el perfil de los usuarios indicados"""
+    claves = [_clave(user_id) for user_id in user_ids if user_id is not None]
+    if claves:
+        cache.delete_many(claves)
@@ -0,0 +1,107 @@
+"""
+Permisos y catálogo de roles cacheados.
+
+- Permisos de cada usuario ("app_label.codename", como ModelBackend) para que
+  has_perm no consulte grupos y permisos en cada request.
+- Catálogo de roles (grupos con sus permisos ya serializados) y de permisos
+  para la pantalla de roles.
+
+Los permisos por usuario llevan una versión global: un cambio en los permisos de
+un grupo o en la tabla Permission afecta a muchos usuarios y se resuelve
+incrementando la versión en vez de borrar clave por clave. Las señales de
+perfiles/signals.py invalidan todo esto. La versión y los borrados solo llegan a
+otros workers si la caché es compartida (REDIS_URL); si no, cada proceso conserva
+su copia hasta settings.PERFIL_CACHE_TIMEOUT, que entonces es corto por defecto.
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+CLAVE_PERMISOS = 'perfiles:permisos:{}:{}'
+CLAVE_VERSION_PERMISOS = 'perfiles:permisos:version'
+CLAVE_CATALOGO_ROLES = 'perfiles:catalogo:roles'
+CLAVE_CATALOGO_PERMISOS = 'perfiles:catalogo:permisos'
+
+
+def _version():
+    version = cache.get(CLAVE_VERSION_PERMISOS)
+    if version is None:
+        version = 1
+        cache.add(CLAVE_VERSION_PERMISOS, version, timeout=None)
+    return version
+
+
+def construir_permisos(user_id):
+    """Permisos del usuario (directos y de sus grupos); todos si es superusuario"""
+    from django.contrib.auth import get_user_model
+    from django.contrib.auth.models import Permission
+    from django.db.models import Q
+
+    usuario = get_user_model().objects.filter(pk=user_id).values('is_active', 'is_superuser').first()
+    if usuario is None or not usuario['is_active']:
+        return frozenset()
+    permisos = Permission.objects.all()
+    if not usuario['is_superuser']:
+        permisos = permisos.filter(Q(group__user__id=user_id) | Q(user__id=user_id))
+    return frozenset(
+        f"{app_label}.{codename}"
+        for app_label, codename in permisos.values_list('content_type__app_label', 'codename').distinct()
+    )
+
+
+def obtener_permisos(user_id):
+    """Conjunto de permisos del usuario desde la caché (se construye si no está)"""
+    clave = CLAVE_PERMISOS.format(_version(), user_id)
+    permisos = cache.get(clave)
+    if permisos is None:
+        permisos = construir_permisos(user_id)
+        cache.set(clave, permisos, settings.PERFIL_CACHE_TIMEOUT)
+    return permisos
+
+
+def invalidar_permisos(*user_ids):
+    """Elimina de la caché los permisos de los usuarios indicados"""
+    version = _version()
+    claves = [CLAVE_PERMISOS.format(version, user_id) for user_id in user_ids if user_id is not None]
+    if claves:
+        cache.delete_many(claves)
+
+
+def invalidar_permisos_todos():
+    """Invalida los permisos de todos los usuarios (cambió un grupo o un permiso)"""
+    try:
+        cache.incr(CLAVE_VERSION_PERMISOS)
+    except ValueError:
+        # La versión no estaba en caché: las claves anteriores tampoco sirven
+        cache.set(CLAVE_VERSION_PERMISOS, 2, timeout=None)
+
+
+def obtener_catalogo_roles():
+    """Grupos con sus permisos, como los devuelve GroupSerializer"""
+    catalogo = cache.get(CLAVE_CATALOGO_ROLES)
+    if catalogo is None:
+        from django.contrib.auth.models import Group
+        from perfiles.serializers_rol import GroupSerializer
+
+        grupos = Group.objects.prefetch_related('permissions').order_by('id')
+        catalogo = list(GroupSerializer(grupos, many=True).data)
+        cache.set(CLAVE_CATALOGO_ROLES, catalogo, settings.PERFIL_CACHE_TIMEOUT)
+    return catalogo
+
+
+def obtener_catalogo_permisos():
+    """Todos los permisos, como los devuelve PermissionSerializer"""
+    catalogo = cache.get(CLAVE_CATALOGO_PERMISOS)
+    if catalogo is None:
+        from django.contrib.auth.models import Permission
+        from perfiles.serializers_rol import PermissionSerializer
+
+        catalogo = list(PermissionSerializer(Permission.objects.all(), many=True).data)
+        cache.set(CLAVE_CATALOGO_PERMISOS, catalogo, settings.PERFIL_CACHE_TIMEOUT)
+    return catalogo
+
+
+def invalidar_catalogos(permisos=False):
+    claves = [CLAVE_CATALOGO_ROLES]
+    if permisos:
+        claves.append(CLAVE_CATALOGO_PERMISOS)
+    cache.delete_many(claves)
@@ -1,12 +1,25 @@
 """
 Helper para enviar notificaciones push usando Firebase Cloud Messaging (FCM)
+
+google-auth y las credenciales de la cuenta de servicio se cargan en el primer
+envío, no al importar el módulo.
+
+Los envíos a varios dispositivos (send_push_to_user, send_push_to_users) salen a
+la vez con el cliente HTTP async compartido (backend_exa2/http_asincrono.py): la
+notificación de una venta a todos los administradores tarda lo que el envío más
+lento, no la suma de todos. Las vistas async usan las variantes *_async.
 """
+import asyncio
 import json
 import logging
 import requests
-from google.auth.transport.requests import Request
-from google.oauth2 import service_account
+from contextlib import suppress
+from functools import cached_property
+from asgiref.sync import sync_to_async
 from django.conf import settings
+from django.utils import timezone
+from backend_exa2.http_asincrono import cliente_http, ejecutar
+from backend_exa2.instrumentacion import medir
 
 logger = logging.getLogger(__name__)
 
@@ -18,28 +31,38 @@ class FCMService:
     
     # Alcances necesarios para FCM
     SCOPES = ['https://www.googleapis.com/auth/firebase.messaging']
+    # API HTTP v1 de FCM
+    url_base = 'https://fcm.googleapis.com/v1'
+    # Segundos de espera de cada envío
+    timeout = 10
     
     def __init__(self):
         """
-        Inicializa el servicio FCM con las credenciales de Firebase
+        Inicializa el servicio FCM con la configuración de Firebase
         """
         self.project_id = getattr(settings, 'FIREBASE_PROJECT_ID', None)
         self.service_account_json = getattr(settings, 'FIREBASE_SERVICE_ACCOUNT_JSON', None)
-        
+    
+    @cached_property
+    def credentials(self):
+        """
+        Credenciales de la cuenta de servicio (None si Firebase no está configurado).
+        Se construyen en el primer uso.
+        """
         if not self.project_id or not self.service_account_json:
             logger.error("Firebase credentials not configured in settings")
-            self.credentials = None
-        else:
-            try:
-                # Cargar credenciales desde JSON
-                service_account_info = json.loads(self.service_account_json)
-                self.credentials = service_account.Credentials.from_service_account_info(
-                    service_account_info,
-                    scopes=self.SCOPES
-                )
-            except Exception as e:
-                logger.error(f"Error loading Firebase credentials: {e}")
-                self.credentials = None
+            return None
+        try:
+            from google.oauth2 import service_account
+            # Cargar credenciales desde JSON
+            service_account_info = json.loads(self.service_account_json)
+            return service_account.Credentials.from_service_account_info(
+                service_account_info,
+                scopes=self.SCOPES
+            )
+        except Exception as e:
+            logger.error(f"Error loading Firebase credentials: {e}")
+            return None
     
     def _get_access_token(self):
         """
@@ -53,10 +76,60 @@ class FCMService:
         
         # Refrescar el token si es necesario
         if not self.credentials.valid:
+            from google.auth.transport.requests import Request
             self.credentials.refresh(Request())
         
         return self.credentials.token
     
+    async def _get_access_token_async(self):
+        """
+        _get_access_token sin bloquear el event loop: el refresco del token
+        (HTTP síncrono de google-auth) se hace en un hilo
+        """
+        if self.credentials and self.credentials.valid:
+            return self.credentials.token
+        return await sync_to_async(self._get_access_token, thread_sensitive=False)()
+    
+    def _url(self):
+        return f'{self.url_base}/projects/{self.project_id}/messages:send'
+    
+    def _headers(self, access_token):
+        return {
+            'Authorization': f'Bearer {access_token}',
+            'Content-Type': 'application/json; UTF-8',
+        }
+    
+    def _mensaje(self, token, title, body, data=None):
+        """Cuerpo del mensaje de la API HTTP v1"""
+        message = {
+            'message': {
+                'token': token,
+                'notification': {
+                    'title': title,
+                    'body': body,
+                },
+            }
+        }
+        
+        # Agregar datos adicionales si existen
+        if data:
+            message['message']['data'] = data
+        return message
+    
+    def _resultado(self, token, response):
+        """Resultado del envío a partir de la respuesta de FCM (de requests o de httpx)"""
+        if response.status_code == 200:
+            logger.info(f"Push notification sent successfully to token: {token[:20]}...")
+            return {
+                'success': True,
+                'message_id': response.json().get('name')
+            }
+        logger.error(f"FCM Error: {response.status_code} - {response.text}")
+        return {
+            'success': False,
+            'error': response.text
+        }
+    
     def send_push_notification(self, token, title, body, data=None):
         """
         Envía una notificación push a un token FCM específico
@@ -78,47 +151,44 @@ class FCMService:
             }
         
         try:
-            access_token = self._get_access_token()
-            
-            # URL del endpoint de FCM
-            url = f'https://fcm.googleapis.com/v1/projects/{self.project_id}/messages:send'
-            
-            # Headers
-            headers = {
-                'Authorization': f'Bearer {access_token}',
-                'Content-Type': 'application/json; UTF-8',
+            with medir('fcm'):
+                access_token = self._get_access_token()
+                response = requests.post(
+                    self._url(),
+                    headers=self._headers(access_token),
+                    json=self._mensaje(token, title, body, data),
+                    timeout=self.timeout
+                )
+            return self._resultado(token, response)
+        
+        except Exception as e:
+            logger.error(f"Error sending push notification: {e}")
+            return {
+                'success': False,
+                'error': str(e)
             }
-            
-            # Construir el mensaje
-            message = {
-                'message': {
-                    'token': token,
-                    'notification': {
-                        'title': title,
-                        'body': body,
-                    },
-                }
+    
+    async def send_push_notification_async(self, token, title, body, data=None):
+        """
+        send_push_notification con el cliente HTTP async compartido (mismos argumentos y resultado)
+        """
+        if not self.credentials:
+            logger.error("Cannot send notification: Firebase not configured")
+            return {
+                'success': False,
+                'error': 'Firebase not configured'
             }
-            
-            # Agregar datos adicionales si existen
-            if data:
-                message['message']['data'] = data
-            
-            # Enviar la notificación
-            response = requests.post(url, headers=headers, json=message, timeout=10)
-            
-            if response.status_code == 200:
-                logger.info(f"Push notification sent successfully to token: {token[:20]}...")
-                return {
-                    'success': True,
-                    'message_id': response.json().get('name')
-                }
-            else:
-                logger.error(f"FCM Error: {response.status_code} - {response.text}")
-                return {
-                    'success': False,
-                    'error': response.text
-                }
+        
+        try:
+            with medir('fcm'):
+                access_token = await self._get_access_token_async()
+                response = await cliente_http().post(
+                    self._url(),
+                    headers=self._headers(access_token),
+                    json=self._mensaje(token, title, body, data),
+                    timeout=self.timeout
+                )
+            return self._resultado(token, response)
         
         except Exception as e:
             logger.error(f"Error sending push notification: {e}")
@@ -127,12 +197,67 @@ class FCMService:
                 'error': str(e)
             }
     
-    def send_push_to_user(self, user, title, body, data=None):
+    async def send_push_to_tokens_async(self, tokens, title, body, data=None):
         """
-        Envía notificación push a todos los dispositivos activos de un usuario
+        Envía la misma notificación a varios tokens a la vez
+        
+        Returns:
+            list: Un resultado de send_push_notification_async por token, en el mismo orden
+        """
+        with medir('fcm'):
+            if self.credentials:
+                # Refrescar el access token una sola vez antes de repartir los envíos
+                # (si falla, cada envío informa el error)
+                with suppress(Exception):
+                    await self._get_access_token_async()
+            return await asyncio.gather(*(
+                self.send_push_notification_async(token, title, body, data) for token in tokens
+            ))
+    
+    def _dispositivos(self, users):
+        """(id, token) de los dispositivos activos de los usuarios"""
+        from perfiles.models_device_token import DeviceToken
+        return DeviceToken.objects.filter(user__in=users, is_active=True).values_list('id', 'token')
+    
+    def _resumir(self, dispositivos, resultados):
+        """
+        Returns:
+            tuple: (resumen del envío, ids de los tokens inválidos)
+        """
+        results = {
+            'total': len(dispositivos),
+            'successful': 0,
+            'failed': 0,
+            'errors': []
+        }
+        invalidos = []
+        for (token_id, token), result in zip(dispositivos, resultados):
+            if result['success']:
+                results['successful'] += 1
+                continue
+            results['failed'] += 1
+            results['errors'].append({
+                'token': token[:20] + '...',
+                'error': result.get('error', 'Unknown error')
+            })
+            
+            # Si el token es inválido, marcarlo como inactivo
+            if 'NOT_FOUND' in str(result.get('error', '')) or \
+               'UNREGISTERED' in str(result.get('error', '')):
+                invalidos.append(token_id)
+                logger.info(f"Token marked as inactive: {token[:20]}...")
+        
+        logger.info(f"Push notifications sent to {len(dispositivos)} devices: "
+                   f"{results['successful']} successful, {results['failed']} failed")
+        return results, invalidos
+    
+    def send_push_to_users(self, users, title, body, data=None):
+        """
+        Envía notificación push a todos los dispositivos activos de varios usuarios.
+        Los envíos salen a la vez (send_push_to_tokens_async)
         
         Args:
-            user: Instancia del modelo User
+            users: Lista o QuerySet de User
             title (str): Título de la notificación
             body (str): Cuerpo del mensaje
             data (dict): Datos adicionales (opcional)
@@ -142,56 +267,65 @@ class FCMService:
         """
         from perfiles.models_device_token import DeviceToken
         
-        # Obtener todos los tokens activos del usuario
-        tokens = DeviceToken.objects.filter(user=user, is_active=True)
-        
-        if not tokens.exists():
-            logger.info(f"No active tokens found for user: {user.username}")
+        dispositivos = list(self._dispositivos(users))
+        if not dispositivos:
+            logger.info("No active tokens found for the users")
             return {
                 'success': False,
                 'message': 'No active tokens found'
             }
         
-        results = {
-            'total': tokens.count(),
-            'successful': 0,
-            'failed': 0,
-            'errors': []
-        }
+        resultados = ejecutar(self.send_push_to_tokens_async, [token for _, token in dispositivos], title, body, data)
+        results, invalidos = self._resumir(dispositivos, resultados)
+        if invalidos:
+            DeviceToken.objects.filter(id__in=invalidos).update(is_active=False, updated_at=timezone.now())
+        return results
+    
+    async def send_push_to_users_async(self, users, title, body, data=None):
+        """
+        send_push_to_users para vistas async (mismos argumentos y resumen)
+        """
+        from perfiles.models_device_token import DeviceToken
         
-        # Enviar a cada token
-        for device_token in tokens:
-            result = self.send_push_notification(
-                token=device_token.token,
-                title=title,
-                body=body,
-                data=data
-            )
-            
-            if result['success']:
-                results['successful'] += 1
-            else:
-                results['failed'] += 1
-                results['errors'].append({
-                    'token': device_token.token[:20] + '...',
-                    'error': result.get('error', 'Unknown error')
-                })
-                
-                # Si el token es inválido, marcarlo como inactivo
-                if 'NOT_FOUND' in str(result.get('error', '')) or \
-                   'UNREGISTERED' in str(result.get('error', '')):
-                    device_token.is_active = False
-                    device_token.save()
-                    logger.info(f"Token marked as inactive: {device_token.token[:20]}...")
-        
-        logger.info(f"Push notifications sent to user {user.username}: "
-                   f"{results['successful']} successful, {results['failed']} failed")
+        dispositivos = [dispositivo async for dispositivo in self._dispositivos(users)]
+        if not dispositivos:
+            logger.info("No active tokens found for the users")
+            return {
+                'success': False,
+                'message': 'No active tokens found'
+            }
         
+        resultados = await self.send_push_to_tokens_async([token for _, token in dispositivos], title, body, data)
+        results, invalidos = self._resumir(dispositivos, resultados)
+        if invalidos:
+            await DeviceToken.objects.filter(id__in=invalidos).aupdate(is_active=False, updated_at=timezone.now())
         return results
+    
+    def send_push_to_user(self, user, title, body, data=None):
+        """
+        Envía notificación push a todos los dispositivos activos de un usuario
+        
+        Args:
+            user: Instancia del modelo User
+            title (str): Título de la notificación
+            body (str): Cuerpo del mensaje
+            data (dict): Datos adicionales (opcional)
+        
+        Returns:
+            dict: Resumen del envío
+        """
+        return self.send_push_to_users([user], title, body, data)
 
 
-# Instancia global del servicio
-fcm_service = FCMService()
+# Instancia global del servicio (se crea en el primer envío)
+_fcm_service = None
+
+
+def obtener_fcm_service():
+    global _fcm_service
+    if _fcm_service is None:
+        _fcm_service = FCMService()
+    return _fcm_service
 
 
 # Funciones de conveniencia
@@ -199,11 +333,25 @@ def send_push_to_token(token, title, body, data=None):
     """
     Función helper para enviar notificación a un token específico
     """
-    return fcm_service.send_push_notification(token, title, body, data)
+    return obtener_fcm_service().send_push_notification(token, title, body, data)
 
 
 def send_push_to_user(user, title, body, data=None):
     """
     Función helper para enviar notificación a un usuario
     """
-    return fcm_service.send_push_to_user(user, title, body, data)
+    return obtener_fcm_service().send_push_to_user(user, title, body, data)
+
+
+def send_push_to_users(users, title, body, data=None):
+    """
+    Función helper para enviar la misma notificación a varios usuarios (ej: todos los administradores)
+    """
+    return obtener_fcm_service().send_push_to_users(users, title, body, data)
+
+
+async def send_push_to_users_async(users, title, body, data=None):
+    """
+    send_push_to_users para vistas async
+    """
+    return await obtener_fcm_service().send_push_to_users_async(users, title, body, data)
@@ -0,0 +1,214 @@
+"""
+Da de alta usuarios (User + Cliente/Empleado + grupo) en lotes desde JSON o CSV.
+
+Formato JSON (como nuevos_usuarios.json): lista de objetos. Formato CSV: una fila
+por usuario con encabezados. Campos:
+    username, email, nombre, apellido, rol (cliente|empleado), password,
+    ci, telefono, direccion, sexo (M|F, si falta queda vacío), cargo, estado
+
+Los hashes PBKDF2 de las contraseñas se calculan en un pool de procesos y las
+filas se insertan con bulk_create. Los usuarios que ya existen se omiten; el
+username, email, CI y teléfono repetidos se detectan con conjuntos cargados una
+sola vez desde la base de datos.
+
+Uso:
+    python manage.py provisionar_usuarios nuevos_usuarios.json --password pass3210
+    python manage.py provisionar_usuarios clientes.csv --lote 2000 --procesos 8
+"""
+import csv
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import Group, User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from perfiles.models import Cliente, Empleado
+
+ROLES = ('cliente', 'empleado')
+CARGOS = {cargo for cargo, _ in Empleado.CARGOS}
+
+
+class FilaInvalida(Exception):
+    """La fila no se puede convertir en un usuario"""
+
+
+def _inicializar_proceso():
+    # Con el método 'spawn' (Windows/macOS) el proceso hijo no hereda Django configurado
+    import django
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend_exa2.settings')
+    django.setup()
+
+
+class Command(BaseCommand):
+    help = 'Crea usuarios, clientes y empleados en lotes con hash de contraseñas en paralelo'
+
+    def add_arguments(self, parser):
+        parser.add_argument('archivo', help='Ruta del JSON o CSV de usuarios')
+        parser.add_argument('--password', default=None,
+                            help='Contraseña para las filas que no traen una (si se omite, quedan sin contraseña utilizable)')
+        parser.add_argument('--lote', type=int, default=1000, help='Usuarios por lote (por defecto 1000)')
+        parser.add_argument('--procesos', type=int, default=os.cpu_count() or 1,
+                            help='Procesos para calcular los hashes (por defecto: núcleos disponibles)')
+        parser.add_argument('--encoding', default='utf-8', help='Codificación del archivo (por defecto utf-8)')
+
+    def handle(self, *args, **options):
+        if options['lote'] <= 0 or options['procesos'] <= 0:
+            raise CommandError("--lote y --procesos deben ser mayores a 0")
+
+        inicio = time.perf_counter()
+        filas = self.leer_archivo(options['archivo'], options['encoding'])
+        self.cargar_existentes()
+
+        self.omitidos = self.rechazados = 0
+        usuarios = []
+        for numero, row in enumerate(filas, start=1):
+            try:
+                datos = self.convertir_fila(row, options['password'])
+            except FilaInvalida as e:
+                self.rechazados += 1
+                self.stderr.write(f"❌ Fila {numero} rechazada: {e}")
+                continue
+            if datos is not None:
+                usuarios.append(datos)
+
+        self.grupos = {rol: Group.objects.get_or_create(name=rol)[0].pk for rol in ROLES}
+        self.creados = 0
+        t_lectura = time.perf_counter()
+
+        # Los hashes se calculan en paralelo y en orden: mientras se inserta un lote
+        # los procesos siguen con los siguientes
+        with ProcessPoolExecutor(max_workers=options['procesos'], initializer=_inicializar_proceso) as pool:
+            hashes = pool.map(make_password, [datos.pop('password') for datos in usuarios], chunksize=32)
+            for desde in range(0, len(usuarios), options['lote']):
+                lote = usuarios[desde:desde + options['lote']]
+                for datos in lote:
+                    datos['usuario'].password = next(hashes)
+                self.guardar_lote(lote)
+
+        duracion = time.perf_counter() - inicio
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {self.creados} usuarios creados, {self.omitidos} ya existían, {self.rechazados} rechazados "
+            f"en {duracion:.2f}s (lectura y validación {t_lectura - inicio:.2f}s, "
+            f"{self.creados / duracion if duracion > 0 else 0:,.0f} usuarios/s)"
+        ))
+
+    def leer_archivo(self, ruta, encoding):
+        try:
+            with open(ruta, newline='', encoding=encoding) as archivo:
+                if ruta.lower().endswith('.json'):
+                    filas = json.load(archivo)
+                    if not isinstance(filas, list):
+                        raise CommandError("El JSON debe ser una lista de usuarios")
+                    return filas
+                return list(csv.DictReader(archivo))
+        except OSError as e:
+            raise CommandError(f"No se pudo abrir el archivo: {e}")
+        except json.JSONDecodeError as e:
+            raise CommandError(f"JSON inválido: {e}")
+
+    def cargar_existentes(self):
+        """Conjuntos de valores únicos ya registrados (una consulta por campo)"""
+        self.usernames = set(User.objects.values_list('username', flat=True))
+        self.emails = {email.lower() for email in User.objects.exclude(email='').values_list('email', flat=True)}
+        self.cis = set()
+        self.telefonos = set()
+        for modelo in (Cliente, Empleado):
+            self.cis.update(modelo.objects.exclude(ci__isnull=True).exclude(ci='').values_list('ci', flat=True))
+            self.telefonos.update(
+                modelo.objects.exclude(telefono__isnull=True).exclude(telefono='').values_list('telefono', flat=True)
+            )
+
+    def convertir_fila(self, row, password_por_defecto):
+        """Valida la fila; devuelve None si el usuario ya existe"""
+        if not isinstance(row, dict):
+            raise FilaInvalida("se esperaba un objeto")
+        texto = lambda campo: str(row.get(campo) or '').strip()
+
+        username = texto('username')
+        if not username:
+            raise FilaInvalida("falta el username")
+        if len(username) > 150:
+            raise FilaInvalida(f"el username '{username}' supera 150 caracteres")
+        if username in self.usernames:
+            self.omitidos += 1
+            return None
+
+        rol = texto('rol') or 'cliente'
+        if rol not in ROLES:
+            raise FilaInvalida(f"rol inválido para {username}: {rol!r}")
+        email = texto('email')
+        if email and email.lower() in self.emails:
+            raise FilaInvalida(f"el email {email} ya está registrado")
+        ci = texto('ci') or None
+        if ci and ci in self.cis:
+            raise FilaInvalida(f"el CI {ci} ya está registrado")
+        telefono = texto('telefono') or None
+        if telefono and telefono in self.telefonos:
+            raise FilaInvalida(f"el teléfono {telefono} ya está registrado")
+
+        nombre = texto('nombre') or username
+        # Sin sexo en el archivo queda vacío para completarlo después, no se adivina
+        sexo = texto('sexo').upper()
+        if sexo and sexo not in ('M', 'F'):
+            raise FilaInvalida(f"sexo inválido para {username}: {sexo!r}")
+        cargo = texto('cargo') or 'GESTOR_PEDIDOS'
+        if rol == 'empleado' and cargo not in CARGOS:
+            raise FilaInvalida(f"cargo inválido para {username}: {cargo!r}")
+
+        # Reservar los valores únicos: detecta también los repetidos dentro del archivo
+        self.usernames.add(username)
+        if email:
+            self.emails.add(email.lower())
+        if ci:
+            self.cis.add(ci)
+        if telefono:
+            self.telefonos.add(telefono)
+
+        perfil = {
+            'nombre': nombre,
+            'apellido': texto('apellido'),
+            'sexo': sexo,
+            'ci': ci,
+            'telefono': telefono,
+            'direccion': texto('direccion') or None,
+        }
+        if rol == 'empleado':
+            perfil['cargo'] = cargo
+            perfil['estado'] = texto('estado') or 'Activo'
+        else:
+            perfil['estado'] = texto('estado') or 'activo'
+
+        return {
+            'rol': rol,
+            # make_password(None) genera una contraseña no utilizable
+            'password': texto('password') or password_por_defecto,
+            'usuario': User(username=username, email=email, first_name=nombre[:150], last_name=perfil['apellido'][:150]),
+            'perfil': perfil,
+        }
+
+    def guardar_lote(self, lote):
+        """Inserta usuarios, perfiles y grupos del lote (una sentencia por tabla)"""
+        with transaction.atomic():
+            usuarios = User.objects.bulk_create([datos['usuario'] for datos in lote])
+            if not all(usuario.pk for usuario in usuarios):
+                # Motores que no devuelven los IDs insertados
+                ids = dict(User.objects.filter(username__in=[u.username for u in usuarios]).values_list('username', 'id'))
+                for usuario in usuarios:
+                    usuario.pk = ids[usuario.username]
+
+            clientes, empleados, membresias = [], [], []
+            for datos, usuario in zip(lote, usuarios):
+                if datos['rol'] == 'empleado':
+                    empleados.append(Empleado(usuario_id=usuario.pk, **datos['perfil']))
+                else:
+                    clientes.append(Cliente(usuario_id=usuario.pk, **datos['perfil']))
+                membresias.append(User.groups.through(user_id=usuario.pk, group_id=self.grupos[datos['rol']]))
+
+            Cliente.objects.bulk_create(clientes)
+            Empleado.objects.bulk_create(empleados)
+            User.groups.through.objects.bulk_create(membresias)
+
+        self.creados += len(lote)
+        self.stdout.write(f"👥 Lote guardado: {self.creados} usuarios creados")
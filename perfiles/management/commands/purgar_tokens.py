@@ -0,0 +1,55 @@
+"""
+Elimina los refresh tokens vencidos (OutstandingToken) y sus entradas en la blacklist.
+
+Con ROTATE_REFRESH_TOKENS y BLACKLIST_AFTER_ROTATION cada refresh agrega filas a
+ambas tablas. Borra por lotes con DELETE directos (transacciones cortas, sin
+cargar los objetos en memoria como flushexpiredtokens). Pensado para ejecutarse cada noche:
+    python manage.py purgar_tokens
+    python manage.py purgar_tokens --lote 10000 --pausa 0.1
+"""
+import time
+from django.core.management.base import BaseCommand
+from django.db import connections, transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+TAMANO_LOTE = 5000
+
+
+class Command(BaseCommand):
+    help = 'Elimina por lotes los refresh tokens vencidos y su blacklist'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=TAMANO_LOTE, help=f'Tokens por lote (por defecto {TAMANO_LOTE})')
+        parser.add_argument('--pausa', type=float, default=0, help='Segundos de espera entre lotes (por defecto 0)')
+
+    def handle(self, *args, **options):
+        lote = options['lote']
+        ahora = timezone.now()
+        inicio = time.perf_counter()
+        total_blacklist = total_tokens = 0
+
+        connection = connections[OutstandingToken.objects.db]
+        tabla_tokens = connection.ops.quote_name(OutstandingToken._meta.db_table)
+        tabla_blacklist = connection.ops.quote_name(BlacklistedToken._meta.db_table)
+        columna_token = connection.ops.quote_name(BlacklistedToken._meta.get_field('token').column)
+
+        vencidos = OutstandingToken.objects.filter(expires_at__lte=ahora).order_by().values_list('id', flat=True)
+        while True:
+            ids = list(vencidos[:lote])
+            if not ids:
+                break
+            marcadores = ", ".join(["%s"] * len(ids))
+            with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+                # Primero la blacklist (FK hacia OutstandingToken)
+                cursor.execute(f"DELETE FROM {tabla_blacklist} WHERE {columna_token} IN ({marcadores})", ids)
+                total_blacklist += cursor.rowcount
+                cursor.execute(f"DELETE FROM {tabla_tokens} WHERE id IN ({marcadores})", ids)
+                total_tokens += cursor.rowcount
+            if options['pausa']:
+                time.sleep(options['pausa'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {total_tokens} tokens vencidos y {total_blacklist} entradas de blacklist eliminados "
+            f"en {time.perf_counter() - inicio:.2f}s"
+        ))
@@ -0,0 +1,20 @@
+from django.db import migrations
+
+# La tabla es de rest_framework_simplejwt.token_blacklist: el índice se crea con SQL
+# para que purgar_tokens encuentre los tokens vencidos sin recorrer toda la tabla.
+INDICE = 'token_blacklist_outstandingtoken_expires_at_idx'
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('perfiles', '0003_devicetoken'),
+        ('token_blacklist', '0013_alter_blacklistedtoken_options_and_more'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=f'CREATE INDEX IF NOT EXISTS {INDICE} ON token_blacklist_outstandingtoken (expires_at)',
+            reverse_sql=f'DROP INDEX IF EXISTS {INDICE}',
+        ),
+    ]
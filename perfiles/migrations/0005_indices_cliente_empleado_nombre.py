@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-19 03:40
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('perfiles', '0004_indice_expiracion_tokens'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cliente',
+            index=models.Index(fields=['nombre', 'apellido', 'id'], name='perfiles_cl_nombre_e4a9ec_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='empleado',
+            index=models.Index(fields=['nombre', 'apellido', 'id'], name='perfiles_em_nombre_390ed7_idx'),
+        ),
+    ]
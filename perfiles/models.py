@@ -36,6 +36,12 @@ class Empleado(models.Model):
     def __str__(self):
         return f"{self.nombre} {self.apellido} ({self.get_cargo_display()})"
 
+    class Meta:
+        indexes = [
+            # Orden del listado y paginación por cursor
+            models.Index(fields=['nombre', 'apellido', 'id']),
+        ]
+
 
 
 
@@ -58,5 +64,12 @@ class Cliente(models.Model):
     telefono = models.CharField(max_length=20, blank=True, null=True)
     # Relación 1-a-1: Un cliente es un usuario de Django
     usuario = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Orden del listado y paginación por cursor
+            models.Index(fields=['nombre', 'apellido', 'id']),
+        ]
+
     def __str__(self):
         return f"{self.nombre} {self.apellido}"
\ No newline at end of file
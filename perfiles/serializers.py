@@ -1,6 +1,8 @@
 from rest_framework import serializers
+from backend_exa2.campos import CamposDinamicosMixin
 from django.contrib.auth import get_user_model
 from .models import Cliente, Empleado
+from .serializers_user import primer_grupo
 
 # Campo personalizado para aceptar ID o objeto anidado
 class UserPKOrNestedField(serializers.PrimaryKeyRelatedField):
@@ -9,7 +11,7 @@ class UserPKOrNestedField(serializers.PrimaryKeyRelatedField):
 
 User = get_user_model()
 
-class ClienteSerializer(serializers.ModelSerializer):
+class ClienteSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
 	usuario_info = serializers.SerializerMethodField(read_only=True)
 	usuario = UserPKOrNestedField(queryset=User.objects.all(), required=False, allow_null=True)
 	role = serializers.SerializerMethodField(read_only=True)
@@ -24,12 +26,20 @@ class ClienteSerializer(serializers.ModelSerializer):
 			'role', 'email', 'username'
 		]
 		read_only_fields = ('id',)
+		rutas_campos = {
+			'usuario_info': ['usuario__username', 'usuario__email'],
+			'role': ['usuario__groups__name'],
+			'email': ['usuario__email'],
+			'username': ['usuario__username'],
+		}
 
 	def __init__(self, *args, **kwargs):
 		super().__init__(*args, **kwargs)
 		if self.instance:
-			self.fields['ci'].required = False
-			self.fields['telefono'].required = False
+			# Con ?fields= pueden no estar
+			for campo in ('ci', 'telefono'):
+				if campo in self.fields:
+					self.fields[campo].required = False
 
 	def get_usuario_info(self, obj):
 		if not obj.usuario:
@@ -44,7 +54,7 @@ class ClienteSerializer(serializers.ModelSerializer):
 		"""Obtiene el rol del usuario desde sus grupos de Django"""
 		if not obj.usuario:
 			return None
-		first_group = obj.usuario.groups.first()
+		first_group = primer_grupo(obj.usuario)
 		return first_group.name if first_group else None
 
 	def get_email(self, obj):
@@ -98,7 +108,7 @@ class ClienteSerializer(serializers.ModelSerializer):
 		return super().update(instance, validated_data)
 
 
-class EmpleadoSerializer(serializers.ModelSerializer):
+class EmpleadoSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
 	usuario_info = serializers.SerializerMethodField(read_only=True)
 	usuario = UserPKOrNestedField(queryset=User.objects.all(), required=True)
 	role = serializers.SerializerMethodField(read_only=True)
@@ -113,12 +123,20 @@ class EmpleadoSerializer(serializers.ModelSerializer):
 			'role', 'email', 'username'
 		]
 		read_only_fields = ('id',)
+		rutas_campos = {
+			'usuario_info': ['usuario__username', 'usuario__email'],
+			'role': ['usuario__groups__name'],
+			'email': ['usuario__email'],
+			'username': ['usuario__username'],
+		}
 
 	def __init__(self, *args, **kwargs):
 		super().__init__(*args, **kwargs)
 		if self.instance:
-			self.fields['ci'].required = False
-			self.fields['telefono'].required = False
+			# Con ?fields= pueden no estar
+			for campo in ('ci', 'telefono'):
+				if campo in self.fields:
+					self.fields[campo].required = False
 
 	def get_usuario_info(self, obj):
 		if not obj.usuario:
@@ -133,7 +151,7 @@ class EmpleadoSerializer(serializers.ModelSerializer):
 		"""Obtiene el rol del usuario desde sus grupos de Django"""
 		if not obj.usuario:
 			return None
-		first_group = obj.usuario.groups.first()
+		first_group = primer_grupo(obj.usuario)
 		return first_group.name if first_group else None
 
 	def get_email(self, obj):
@@ -0,0 +1,35 @@
+from django.contrib.auth import get_user_model
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+from .authentication import RefreshTokenCacheado, agregar_claims
+from .cache_perfil import obtener_perfil
+
+
+class TokenObtainConClaimsSerializer(TokenObtainPairSerializer):
+	"""Login JWT: incluye en los tokens los claims que usa JWTSinEstadoAuthentication"""
+	token_class = RefreshTokenCacheado
+
+	@classmethod
+	def get_token(cls, user):
+		token = super().get_token(user)
+		return agregar_claims(token, obtener_perfil(user))
+
+
+class TokenRefreshConClaimsSerializer(TokenRefreshSerializer):
+	"""
+	Refresh JWT: el nuevo token de acceso lleva los claims vigentes del perfil,
+	no los copiados del refresh (que pueden tener días).
+	"""
+	token_class = RefreshTokenCacheado
+
+	def validate(self, attrs):
+		data = super().validate(attrs)
+		acceso = AccessToken(data['access'])
+		# obtener_perfil solo usa el pk: no hace falta leer el User
+		usuario = get_user_model()(pk=acceso[api_settings.USER_ID_CLAIM])
+		perfil = obtener_perfil(usuario)
+		if perfil is not None:
+			data['access'] = str(agregar_claims(acceso, perfil))
+		return data
+
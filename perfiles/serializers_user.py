@@ -1,10 +1,17 @@
 from rest_framework import serializers
+from backend_exa2.campos import CamposDinamicosMixin
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Group
 
 User = get_user_model()
 
-class serializer_user(serializers.ModelSerializer):
+
+def primer_grupo(usuario):
+	"""Primer grupo (menor id) del usuario; usa los grupos precargados con prefetch_related si los hay"""
+	return min(usuario.groups.all(), key=lambda grupo: grupo.pk, default=None)
+
+
+class serializer_user(CamposDinamicosMixin, serializers.ModelSerializer):
 	password = serializers.CharField(write_only=True, required=False)
 	groups = serializers.PrimaryKeyRelatedField(
 		many=True, 
@@ -17,10 +24,11 @@ class serializer_user(serializers.ModelSerializer):
 		model = User
 		fields = ['id', 'username', 'email', 'is_active', 'password', 'groups', 'role']
 		read_only_fields = ['id', 'role']
+		rutas_campos = {'role': ['groups__name']}
 
 	def get_role(self, obj):
 		"""Devuelve el nombre del primer grupo/rol asignado al usuario"""
-		first_group = obj.groups.first()
+		first_group = primer_grupo(obj)
 		return first_group.name if first_group else None
 
 	def create(self, validated_data):
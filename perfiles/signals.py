@@ -0,0 +1,155 @@
+"""
+Señales del módulo de perfiles.
+Invalidan el perfil y los permisos cacheados (perfiles/cache_perfil.py, perfiles/cache_permisos.py)
+cuando cambian los datos que contienen, y revocan los tokens de acceso (perfiles/authentication.py) cuando cambian sus claims o credenciales.
+"""
+import time
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group, Permission
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from perfiles.authentication import revocar_tokens_usuario
+from perfiles.cache_perfil import invalidar_perfil
+from perfiles.cache_permisos import invalidar_catalogos, invalidar_permisos, invalidar_permisos_todos
+from perfiles.models import Cliente, Empleado
+
+User = get_user_model()
+
+
+# Campos del User cuyo cambio invalida los tokens ya emitidos
+CAMPOS_TOKEN = ('password', 'is_active', 'is_staff', 'is_superuser', 'username')
+
+
+def _invalidar_usuarios(*user_ids):
+    invalidar_perfil(*user_ids)
+    invalidar_permisos(*user_ids)
+
+
+def _invalidar(*user_ids, revocar=False):
+    # También al confirmar: un request concurrente pudo volver a cachear los datos anteriores
+    _invalidar_usuarios(*user_ids)
+    transaction.on_commit(lambda: _invalidar_usuarios(*user_ids))
+    if revocar:
+        transaction.on_commit(lambda: _revocar(user_ids))
+
+
+def _invalidar_roles(permisos=False):
+    """Catálogo de roles y permisos de todos los usuarios (cambió un grupo o un permiso)"""
+    def invalidar():
+        invalidar_catalogos(permisos=permisos)
+        invalidar_permisos_todos()
+    invalidar()
+    transaction.on_commit(invalidar)
+
+
+def _revocar(user_ids):
+    desde = time.time()
+    for user_id in user_ids:
+        if user_id is not None:
+            revocar_tokens_usuario(user_id, desde)
+
+
+@receiver(pre_save, sender=User)
+def detectar_cambio_credenciales(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Marca al usuario si cambia algún dato que viaja en el token o que lo invalida"""
+    instance._revocar_tokens = False
+    if raw or not instance.pk:
+        return
+    campos = CAMPOS_TOKEN if update_fields is None else [c for c in CAMPOS_TOKEN if c in update_fields]
+    if not campos:
+        return
+    anterior = sender.objects.filter(pk=instance.pk).values(*campos).first()
+    instance._revocar_tokens = anterior is not None and any(
+        anterior[campo] != getattr(instance, campo) for campo in campos
+    )
+
+
+@receiver(post_save, sender=User)
+def invalidar_perfil_usuario(sender, instance, update_fields=None, **kwargs):
+    # El login solo actualiza last_login, que no forma parte del perfil
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    _invalidar(instance.pk, revocar=getattr(instance, '_revocar_tokens', False))
+
+
+@receiver(post_delete, sender=User)
+def invalidar_perfil_usuario_eliminado(sender, instance, **kwargs):
+    _invalidar(instance.pk, revocar=True)
+
+
+@receiver(pre_save, sender=Cliente)
+@receiver(pre_save, sender=Empleado)
+def recordar_usuario_anterior(sender, instance, raw=False, **kwargs):
+    """Si el perfil cambia de usuario, el anterior también debe invalidarse"""
+    if instance.pk and not raw:
+        instance._usuario_anterior_id = (
+            sender.objects.filter(pk=instance.pk).values_list('usuario_id', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Cliente)
+@receiver(post_save, sender=Empleado)
+def invalidar_perfil_cliente_empleado(sender, instance, created, **kwargs):
+    usuario_anterior_id = getattr(instance, '_usuario_anterior_id', None)
+    # cliente_id/empleado_id viajan en el token: revocar si se crea o cambia de usuario
+    revocar = created or usuario_anterior_id != instance.usuario_id
+    _invalidar(instance.usuario_id, usuario_anterior_id, revocar=revocar)
+
+
+@receiver(post_delete, sender=Cliente)
+@receiver(post_delete, sender=Empleado)
+def invalidar_perfil_cliente_empleado_eliminado(sender, instance, **kwargs):
+    _invalidar(instance.usuario_id, revocar=True)
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def invalidar_perfil_grupos(sender, instance, action, reverse, pk_set, **kwargs):
+    """Altas/bajas de grupos, tanto desde el usuario (user.groups) como desde el grupo (group.user_set)"""
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            _invalidar(instance.pk, revocar=True)
+        return
+
+    # instance es un Group: pk_set son usuarios (en clear hay que leerlos antes)
+    if action == 'pre_clear':
+        instance._usuarios_anteriores = list(instance.user_set.values_list('pk', flat=True))
+    elif action in ('post_add', 'post_remove'):
+        _invalidar(*pk_set, revocar=True)
+    elif action == 'post_clear':
+        _invalidar(*getattr(instance, '_usuarios_anteriores', []), revocar=True)
+
+
+@receiver(m2m_changed, sender=User.user_permissions.through)
+def invalidar_permisos_directos(sender, instance, action, reverse, **kwargs):
+    """Permisos asignados directamente a un usuario (user.user_permissions o permission.user_set)"""
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        if reverse:
+            _invalidar_roles()
+        else:
+            _invalidar(instance.pk)
+
+
+@receiver(m2m_changed, sender=Group.permissions.through)
+def invalidar_permisos_grupo(sender, instance, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        _invalidar_roles()
+
+
+@receiver(post_save, sender=Group)
+def invalidar_perfil_grupo_renombrado(sender, instance, created, **kwargs):
+    _invalidar_roles()
+    if not created:
+        _invalidar(*instance.user_set.values_list('pk', flat=True), revocar=True)
+
+
+@receiver(pre_delete, sender=Group)
+def invalidar_perfil_grupo_eliminado(sender, instance, **kwargs):
+    _invalidar_roles()
+    _invalidar(*instance.user_set.values_list('pk', flat=True), revocar=True)
+
+
+@receiver(post_save, sender=Permission)
+@receiver(post_delete, sender=Permission)
+def invalidar_catalogo_permisos(sender, **kwargs):
+    _invalidar_roles(permisos=True)
@@ -1,3 +1,249 @@
-from django.test import TestCase
+import json
+import os
+import tempfile
+from io import StringIO
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group, Permission
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import RequestFactory, TestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+
+from backend_exa2 import pruebas_consultas
+from perfiles import fcm_service
+from perfiles.authentication import JWTSinEstadoAuthentication, UsuarioToken, revocar_token
+from perfiles.models import Cliente, Empleado
+from perfiles.models_device_token import DeviceToken
+from perfiles.serializers_token import TokenObtainConClaimsSerializer
+
+User = get_user_model()
+
+
+class PresupuestoConsultasTest(pruebas_consultas.PresupuestoConsultasTestCase):
+    app = 'perfiles'
+    prefijo = '/api/'
+    presupuestos = {
+        'cliente-list': 2,
+        'cliente-get-profile': 2,
+        'cliente-detail': 2,
+        'empleado-list': 2,
+        'empleado-get-profile': 2,
+        'empleado-detail': 2,
+        'rol-list': 3,
+        'rol-detail': 2,
+        'usuario-list': 2,
+        'usuario-detail': 2,
+        'api-root': 0,
+        'permissions': 1,
+        'me': 4,
+        'list_device_tokens': 2,
+    }
+
+
+class RevocacionTokenTest(TestCase):
+    """JWTSinEstadoAuthentication rechaza los tokens revocados (perfiles/authentication.py)"""
+
+    def setUp(self):
+        cache.clear()
+        self.usuario = User.objects.create_user(username='revocado', password='clave-inicial-123')
+        self.autenticacion = JWTSinEstadoAuthentication()
+
+    def _acceso(self):
+        acceso = TokenObtainConClaimsSerializer.get_token(self.usuario).access_token
+        # Emitido antes del cambio: la revocación por usuario tiene resolución de segundos
+        acceso['iat'] -= 10
+        return acceso
+
+    def _autenticar(self, acceso):
+        request = RequestFactory().get('/api/me/', HTTP_AUTHORIZATION=f"Bearer {acceso}")
+        return self.autenticacion.authenticate(request)
+
+    def test_token_vigente(self):
+        usuario, _ = self._autenticar(self._acceso())
+        self.assertEqual(usuario.pk, self.usuario.pk)
+        self.assertTrue(usuario.is_active)
+
+    def test_logout_revoca_el_jti(self):
+        acceso = self._acceso()
+        revocar_token(acceso)
+        with self.assertRaises(AuthenticationFailed):
+            self._autenticar(acceso)
+        # Solo ese token: uno nuevo sigue valiendo
+        self._autenticar(TokenObtainConClaimsSerializer.get_token(self.usuario).access_token)
+
+    def test_desactivar_usuario(self):
+        acceso = self._acceso()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.usuario.is_active = False
+            self.usuario.save()
+        with self.assertRaises(AuthenticationFailed):
+            self._autenticar(acceso)
+
+    def test_cambiar_contrasena(self):
+        acceso = self._acceso()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.usuario.set_password('clave-nueva-456')
+            self.usuario.save()
+        with self.assertRaises(AuthenticationFailed):
+            self._autenticar(acceso)
+
+    def test_quitar_staff_y_grupos(self):
+        grupo = Group.objects.create(name='Vendedores')
+        self.usuario.is_staff = True
+        self.usuario.save()
+        self.usuario.groups.add(grupo)
+        acceso = self._acceso()
+        self.assertEqual(acceso['groups'], ['Vendedores'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.usuario.groups.remove(grupo)
+        with self.assertRaises(AuthenticationFailed):
+            self._autenticar(acceso)
+
+        acceso = self._acceso()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.usuario.is_staff = False
+            self.usuario.save()
+        with self.assertRaises(AuthenticationFailed):
+            self._autenticar(acceso)
+
+
+class InvalidacionPermisosTest(TestCase):
+    """Las señales de perfiles/signals.py invalidan los permisos cacheados (perfiles/cache_permisos.py)"""
+
+    def setUp(self):
+        cache.clear()
+        self.permiso = Permission.objects.get(codename='view_cliente')
+        self.grupo = Group.objects.create(name='Vendedores')
+        self.grupo.permissions.add(self.permiso)
+        self.usuario = User.objects.create_user(username='vendedor', password='clave-inicial-123')
+        self.usuario.groups.add(self.grupo)
+
+    def _tiene_permiso(self):
+        # Instancia nueva: User cachea los permisos en el objeto
+        return User.objects.get(pk=self.usuario.pk).has_perm('perfiles.view_cliente')
+
+    def test_quitar_permiso_del_grupo(self):
+        self.assertTrue(self._tiene_permiso())
+        with self.captureOnCommitCallbacks(execute=True):
+            self.grupo.permissions.remove(self.permiso)
+        self.assertFalse(self._tiene_permiso())
+        with self.captureOnCommitCallbacks(execute=True):
+            self.grupo.permissions.add(self.permiso)
+        self.assertTrue(self._tiene_permiso())
+
+    def test_quitar_usuario_del_grupo(self):
+        self.assertTrue(self._tiene_permiso())
+        with self.captureOnCommitCallbacks(execute=True):
+            self.grupo.user_set.remove(self.usuario)
+        self.assertFalse(self._tiene_permiso())
+
+    def test_permiso_directo(self):
+        otro = Permission.objects.get(codename='add_cliente')
+        self.assertFalse(User.objects.get(pk=self.usuario.pk).has_perm('perfiles.add_cliente'))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.usuario.user_permissions.add(otro)
+        self.assertTrue(User.objects.get(pk=self.usuario.pk).has_perm('perfiles.add_cliente'))
+
+    def test_usuario_del_token(self):
+        acceso = TokenObtainConClaimsSerializer.get_token(self.usuario).access_token
+        self.assertTrue(UsuarioToken(acceso).has_perm('perfiles.view_cliente'))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.grupo.permissions.clear()
+        self.assertFalse(UsuarioToken(acceso).has_perm('perfiles.view_cliente'))
+
+    def test_listado_de_roles_paginado(self):
+        cliente = APIClient()
+        cliente.force_authenticate(self.usuario)
+        Group.objects.create(name='Cajeros')
+        respuesta = cliente.get('/api/roles/', {'page_size': 1})
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual([rol['name'] for rol in respuesta.data['results']], ['Vendedores'])
+        self.assertEqual(respuesta.data['results'][0]['permissions'][0]['codename'], 'view_cliente')
+
+        siguiente = cliente.get(respuesta.data['next'])
+        self.assertEqual([rol['name'] for rol in siguiente.data['results']], ['Cajeros'])
+        self.assertIsNone(siguiente.data['next'])
+
+        # Un cambio en el grupo invalida el catálogo cacheado
+        with self.captureOnCommitCallbacks(execute=True):
+            self.grupo.permissions.clear()
+        respuesta = cliente.get('/api/roles/', {'contar': 'true'})
+        self.assertEqual(respuesta.data['count'], 2)
+        self.assertEqual(respuesta.data['results'][0]['permissions'], [])
+
+
+class ProvisionarUsuariosTest(TestCase):
+    """manage.py provisionar_usuarios sobre un CSV pequeño"""
+
+    def provisionar(self, contenido):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False, encoding='utf-8') as archivo:
+            archivo.write(contenido)
+        self.addCleanup(os.remove, archivo.name)
+        errores = StringIO()
+        call_command('provisionar_usuarios', archivo.name, '--password', 'clave-prueba-123', '--procesos', '1',
+                     stdout=StringIO(), stderr=errores)
+        return errores.getvalue()
+
+    def test_alta_de_clientes_y_empleados(self):
+        User.objects.create(username='existente')
+        errores = self.provisionar(
+            "username,email,nombre,apellido,rol,ci,sexo,cargo\n"
+            "maria,maria@prueba.local,Maria,Rojas,cliente,100,,\n"
+            "juan,juan@prueba.local,Juan,Paz,empleado,200,m,\n"
+            "existente,otro@prueba.local,Otro,Usuario,cliente,300,F,\n"
+            "repetido,maria@prueba.local,Rep,Etido,cliente,400,F,\n"
+            "malo,malo@prueba.local,Malo,Sexo,cliente,500,X,\n"
+        )
+
+        maria = Cliente.objects.get(usuario__username='maria')
+        # Sin sexo en el archivo no se deduce del nombre
+        self.assertEqual(maria.sexo, '')
+        self.assertTrue(maria.usuario.check_password('clave-prueba-123'))
+        self.assertEqual(list(maria.usuario.groups.values_list('name', flat=True)), ['cliente'])
+        juan = Empleado.objects.get(usuario__username='juan')
+        self.assertEqual((juan.sexo, juan.cargo), ('M', 'GESTOR_PEDIDOS'))
+
+        self.assertFalse(User.objects.filter(username__in=['repetido', 'malo']).exists())
+        self.assertIn('maria@prueba.local ya está registrado', errores)
+        self.assertIn("sexo inválido para malo", errores)
+
+
+@override_settings(FIREBASE_PROJECT_ID='demo')
+class EnvioPushTest(TestCase):
+    """send_push_to_users desde código síncrono: ejecutar() corre los envíos async con un cliente propio"""
+
+    def test_envio_desde_codigo_sincrono(self):
+        import httpx
+
+        usuario = User.objects.create(username='admin-push')
+        valido = DeviceToken.objects.create(user=usuario, token='token-valido')
+        vencido = DeviceToken.objects.create(user=usuario, token='token-vencido')
+        enviados = []
+
+        def fcm(request):
+            token = json.loads(request.content)['message']['token']
+            enviados.append((request.url.path, request.headers['Authorization'], token))
+            if token == vencido.token:
+                return httpx.Response(404, json={'error': {'status': 'UNREGISTERED'}})
+            return httpx.Response(200, json={'name': 'projects/demo/messages/1'})
+
+        servicio = fcm_service.FCMService()
+        servicio.credentials = SimpleNamespace(valid=True, token='acceso')
+        with mock.patch.object(fcm_service, '_fcm_service', servicio), \
+                mock.patch('backend_exa2.http_asincrono.nuevo_cliente',
+                           lambda: httpx.AsyncClient(transport=httpx.MockTransport(fcm))):
+            resumen = fcm_service.send_push_to_users([usuario], 'Venta', 'Nueva venta')
+
+        self.assertEqual((resumen['total'], resumen['successful'], resumen['failed']), (2, 1, 1))
+        self.assertEqual(
+            sorted(enviados),
+            [('/v1/projects/demo/messages:send', 'Bearer acceso', token) for token in ('token-valido', 'token-vencido')],
+        )
+        valido.refresh_from_db()
+        vencido.refresh_from_db()
+        self.assertEqual((valido.is_active, vencido.is_active), (True, False))
@@ -1,16 +1,12 @@
 from rest_framework.routers import DefaultRouter
-from .views import ClienteViewSet, EmpleadoViewSet, UserRegisterView, CustomTokenObtainPairView, RoleViewSet, UserViewSet, PermissionListView, MeView
+from .views import ClienteViewSet, EmpleadoViewSet, UserRegisterView, CustomTokenObtainPairView, CustomTokenRefreshView, RoleViewSet, UserViewSet, PermissionListView, MeView
 from .views_device_token import register_device_token, unregister_device_token, list_device_tokens, delete_device_token
 from django.urls import path, include
 from django.views.decorators.csrf import csrf_exempt
 
 
 # Importa las vistas JWT
-from rest_framework_simplejwt.views import (
-    TokenObtainPairView,
-    TokenRefreshView,
-    TokenVerifyView,
-)
+from rest_framework_simplejwt.views import TokenVerifyView
 
 router = DefaultRouter()
 router.register(r'clientes', ClienteViewSet, basename='cliente')
@@ -25,7 +21,7 @@ urlpatterns = [
     path('me/', MeView.as_view(), name='me'),
     # Endpoints JWT
     path('token/', CustomTokenObtainPairView.as_view(), name='token_obtain_pair'),
-    path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('token/refresh/', CustomTokenRefreshView.as_view(), name='token_refresh'),
     path('token/verify/', TokenVerifyView.as_view(), name='token_verify'),
     # Endpoints para tokens de dispositivos FCM
     path('device-tokens/', csrf_exempt(register_device_token), name='register_device_token'),
@@ -1,4 +1,5 @@
 # Imports principales
+import logging
 from django.shortcuts import render
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Permission, Group
@@ -11,28 +12,33 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.permissions import AllowAny
-from rest_framework_simplejwt.views import TokenObtainPairView
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from backend_exa2.campos import ConsultaCamposMixin
 
 # Imports de modelos locales
 from .models import Cliente, Empleado
+from .cache_perfil import obtener_perfil
+from .cache_permisos import obtener_catalogo_permisos, obtener_catalogo_roles
 
 # Imports de serializers locales
 from .serializers import ClienteSerializer, EmpleadoSerializer
 from .serializers_register import UserRegistrationSerializer
 from .serializers_user import serializer_user
 from .serializers_rol import PermissionSerializer, RoleSerializer, GroupSerializer
+from .serializers_token import TokenObtainConClaimsSerializer, TokenRefreshConClaimsSerializer
+
+logger = logging.getLogger(__name__)
 
 # Create your views here.
 
 # Endpoint para listar todos los permisos
 class PermissionListView(APIView):
     def get(self, request):
-        permissions = Permission.objects.all()
-        serializer = PermissionSerializer(permissions, many=True)
-        return Response(serializer.data)
+        # Catálogo serializado en caché (perfiles/cache_permisos.py)
+        return Response(obtener_catalogo_permisos())
 
 # ViewSet para el CRUD de usuario
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(ConsultaCamposMixin, viewsets.ModelViewSet):
     queryset = get_user_model().objects.prefetch_related('groups').order_by('username')
     serializer_class = serializer_user
 
@@ -48,9 +54,15 @@ class UserViewSet(viewsets.ModelViewSet):
 # Vista personalizada para login JWT sin requerir CSRF
 @method_decorator(csrf_exempt, name='dispatch')
 class CustomTokenObtainPairView(TokenObtainPairView):
-    pass
+    # Los tokens llevan id, rol, grupos y cliente/empleado para la autenticación sin estado
+    serializer_class = TokenObtainConClaimsSerializer
+
+# Refresh JWT que renueva los claims del token de acceso
+@method_decorator(csrf_exempt, name='dispatch')
+class CustomTokenRefreshView(TokenRefreshView):
+    serializer_class = TokenRefreshConClaimsSerializer
 
-class ClienteViewSet(viewsets.ModelViewSet):
+class ClienteViewSet(ConsultaCamposMixin, viewsets.ModelViewSet):
     """
     ViewSet para gestionar Clientes.
     - Listar con filtros y búsqueda
@@ -72,13 +84,13 @@ class ClienteViewSet(viewsets.ModelViewSet):
     def get_profile(self, request):
         """Obtener perfil del cliente autenticado"""
         try:
-            cliente = Cliente.objects.select_related('usuario').prefetch_related('usuario__groups').get(usuario=request.user)
+            cliente = Cliente.objects.select_related('usuario').prefetch_related('usuario__groups').get(usuario_id=request.user.id)
             serializer = self.get_serializer(cliente)
             return Response(serializer.data)
         except Cliente.DoesNotExist:
             return Response({'detail': 'Cliente no encontrado'}, status=status.HTTP_404_NOT_FOUND)
 
-class EmpleadoViewSet(viewsets.ModelViewSet):
+class EmpleadoViewSet(ConsultaCamposMixin, viewsets.ModelViewSet):
     """
     ViewSet para gestionar Empleados.
     - Listar con filtros y búsqueda
@@ -91,17 +103,17 @@ class EmpleadoViewSet(viewsets.ModelViewSet):
     def get_profile(self, request):
         """Obtener perfil del empleado autenticado"""
         try:
-            empleado = Empleado.objects.select_related('usuario').prefetch_related('usuario__groups').get(usuario=request.user)
+            empleado = Empleado.objects.select_related('usuario').prefetch_related('usuario__groups').get(usuario_id=request.user.id)
             serializer = self.get_serializer(empleado)
             return Response(serializer.data)
         except Empleado.DoesNotExist:
             return Response({'detail': 'Empleado no encontrado'}, status=status.HTTP_404_NOT_FOUND)
 
     def create(self, request, *args, **kwargs):
-        print("DEBUG - Datos recibidos:", request.data)
         serializer = self.get_serializer(data=request.data)
         if not serializer.is_valid():
-            print("DEBUG - Errores de validación:", serializer.errors)
+            # Sin request.data: trae la contraseña del usuario nuevo
+            logger.debug(f"Errores de validación al crear empleado: {serializer.errors}")
         serializer.is_valid(raise_exception=True)
         self.perform_create(serializer)
         headers = self.get_success_headers(serializer.data)
@@ -130,49 +142,52 @@ class UserRegisterView(APIView):
 # Vista para obtener información del usuario autenticado
 class MeView(APIView):
     def get(self, request):
-        """Obtener información del usuario autenticado (funciona para cualquier rol)"""
-        user = request.user
-        
-        # Obtener grupos/roles
-        groups = [group.name for group in user.groups.all()]
-        
-        # Determinar el rol principal
-        role = 'administrador' if user.is_superuser or user.is_staff else (groups[0] if groups else 'usuario')
-        
-        # Intentar obtener datos adicionales de Cliente o Empleado
-        nombre = user.first_name or user.username
-        apellido = user.last_name or ''
-        
-        try:
-            cliente = Cliente.objects.get(usuario=user)
-            nombre = cliente.nombre
-            apellido = cliente.apellido
-        except Cliente.DoesNotExist:
-            try:
-                empleado = Empleado.objects.get(usuario=user)
-                nombre = empleado.nombre
-                apellido = empleado.apellido
-            except Empleado.DoesNotExist:
-                pass
-        
+        """
+        Obtener información del usuario autenticado (funciona para cualquier rol).
+        Se sirve desde el perfil cacheado: sin consultas mientras no cambien sus datos.
+        """
+        perfil = obtener_perfil(request.user)
+        if perfil is None:
+            return Response({'detail': 'Usuario no encontrado'}, status=status.HTTP_404_NOT_FOUND)
         return Response({
-            'id': user.id,
-            'username': user.username,
-            'email': user.email,
-            'nombre': nombre,
-            'apellido': apellido,
-            'first_name': user.first_name,
-            'last_name': user.last_name,
-            'is_staff': user.is_staff,
-            'is_superuser': user.is_superuser,
-            'groups': groups,
-            'role': role,
+            'id': perfil['id'],
+            'username': perfil['username'],
+            'email': perfil['email'],
+            'nombre': perfil['nombre'],
+            'apellido': perfil['apellido'],
+            'first_name': perfil['first_name'],
+            'last_name': perfil['last_name'],
+            'is_staff': perfil['is_staff'],
+            'is_superuser': perfil['is_superuser'],
+            'groups': perfil['groups'],
+            'role': perfil['role'],
+            'cliente_id': perfil['cliente_id'],
+            'empleado_id': perfil['empleado_id'],
         })
 
 class RoleViewSet(viewsets.ModelViewSet):
-    queryset = Group.objects.all()
+    queryset = Group.objects.prefetch_related('permissions')
     serializer_class = GroupSerializer
 
+    def list(self, request, *args, **kwargs):
+        # Filtros y paginación como en los demás listados (sobre los ids); cada rol sale del
+        # catálogo serializado en caché, que se invalida al cambiar grupos o permisos
+        catalogo = {rol['id']: rol for rol in obtener_catalogo_roles()}
+        queryset = self.filter_queryset(Group.objects.only('id').order_by('id'))
+        pagina = self.paginate_queryset(queryset)
+        grupos = pagina if pagina is not None else list(queryset)
+
+        # Roles creados después de cachear el catálogo
+        faltantes = [grupo.pk for grupo in grupos if grupo.pk not in catalogo]
+        if faltantes:
+            nuevos = GroupSerializer(self.get_queryset().filter(pk__in=faltantes), many=True).data
+            catalogo.update((rol['id'], rol) for rol in nuevos)
+
+        datos = [catalogo[grupo.pk] for grupo in grupos]
+        if pagina is not None:
+            return self.get_paginated_response(datos)
+        return Response(datos)
+
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
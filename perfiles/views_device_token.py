@@ -32,7 +32,7 @@ def register_device_token(request):
     device_token, created = DeviceToken.objects.update_or_create(
         token=token,
         defaults={
-            'user': request.user,
+            'user_id': request.user.id,
             'platform': platform,
             'is_active': True
         }
@@ -68,7 +68,7 @@ def unregister_device_token(request):
     try:
         device_token = DeviceToken.objects.get(
             token=token,
-            user=request.user
+            user_id=request.user.id
         )
         device_token.is_active = False
         device_token.save()
@@ -89,7 +89,7 @@ def list_device_tokens(request):
     """
     Listar todos los tokens del usuario actual
     """
-    tokens = DeviceToken.objects.filter(user=request.user)
+    tokens = DeviceToken.objects.filter(user_id=request.user.id)
     serializer = DeviceTokenSerializer(tokens, many=True)
     
     return Response({
@@ -107,7 +107,7 @@ def delete_device_token(request, token_id):
     try:
         device_token = DeviceToken.objects.get(
             id=token_id,
-            user=request.user
+            user_id=request.user.id
         )
         device_token.delete()
         
@@ -0,0 +1,84 @@
+"""
+Compara la autenticación JWT de simplejwt (lee el User en cada request) con
+JWTSinEstadoAuthentication (usuario armado con los claims del token).
+
+Uso:
+    python tools/bench_jwt_auth.py [username] [iteraciones]
+
+Mide consultas SQL y tiempo de:
+- authenticate() aislado
+- requests completos a /api/me/ y /api/inventario/carritos/ con un token Bearer real
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend_exa2.settings')
+
+import django
+django.setup()
+
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client, RequestFactory
+from rest_framework.views import APIView
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from perfiles.authentication import JWTSinEstadoAuthentication
+from perfiles.serializers_token import TokenObtainConClaimsSerializer
+
+CLASES = [
+    ('simplejwt', JWTAuthentication),
+    ('sin estado', JWTSinEstadoAuthentication),
+]
+RUTAS = ['/api/me/', '/api/inventario/carritos/']
+
+
+def medir(funcion, iteraciones):
+    """Devuelve (consultas por llamada, ms por llamada)"""
+    funcion()  # calentar caché de perfil, URLconf, etc.
+    # execute_wrapper y no CaptureQueriesContext: cada request vacía connection.queries
+    consultas = []
+    with connection.execute_wrapper(lambda execute, sql, *args: consultas.append(sql) or execute(sql, *args)):
+        funcion()
+    inicio = time.perf_counter()
+    for _ in range(iteraciones):
+        funcion()
+    ms = (time.perf_counter() - inicio) * 1000 / iteraciones
+    return len(consultas), ms
+
+
+def main():
+    username = sys.argv[1] if len(sys.argv) > 1 else None
+    iteraciones = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+
+    User = get_user_model()
+    usuario = User.objects.filter(username=username).first() if username else User.objects.filter(is_active=True).first()
+    if usuario is None:
+        print("❌ No hay usuarios activos para generar el token")
+        return
+
+    token = str(TokenObtainConClaimsSerializer.get_token(usuario).access_token)
+    cabecera = f'Bearer {token}'
+    print(f"👤 Usuario: {usuario.username} | iteraciones: {iteraciones}\n")
+
+    request = RequestFactory().get('/api/me/', HTTP_AUTHORIZATION=cabecera)
+    print("🔐 authenticate()")
+    for nombre, clase in CLASES:
+        autenticador = clase()
+        consultas, ms = medir(lambda: autenticador.authenticate(request), iteraciones)
+        print(f"   {nombre:<12} {consultas} consultas  {ms:.3f} ms")
+
+    cliente = Client(SERVER_NAME='localhost', HTTP_AUTHORIZATION=cabecera)
+    for ruta in RUTAS:
+        print(f"\n🌐 GET {ruta}")
+        for nombre, clase in CLASES:
+            with mock.patch.object(APIView, 'authentication_classes', [clase]):
+                respuesta = cliente.get(ruta)
+                consultas, ms = medir(lambda: cliente.get(ruta), iteraciones // 5 or 1)
+            print(f"   {nombre:<12} {consultas} consultas  {ms:.3f} ms  (HTTP {respuesta.status_code})")
+
+
+if __name__ == '__main__':
+    main()
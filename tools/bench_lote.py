@@ -0,0 +1,77 @@
+"""
+Arranque de la app móvil: N llamadas sueltas contra una sola a /api/batch/.
+
+Uso:
+    python tools/bench_lote.py [username] [rtt_ms] [iteraciones]
+
+Mide el tiempo de servidor de cada llamada por separado y del lote (secuencial
+y en paralelo) con un token Bearer real, y estima la latencia que ve el cliente
+sumando un viaje de red (`rtt_ms`, por defecto 300 ms en red celular) por request.
+"""
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend_exa2.settings')
+
+import django
+django.setup()
+
+from django.contrib.auth import get_user_model
+from django.test import Client
+from perfiles.serializers_token import TokenObtainConClaimsSerializer
+
+# Llamadas del arranque de la app
+ARRANQUE = [
+    '/api/me/',
+    '/api/inventario/categorias/',
+    '/api/inventario/productos/',
+    '/api/inventario/carritos/',
+    '/api/transacciones/nota-venta/',
+]
+
+
+def medir(funcion, iteraciones):
+    funcion()  # calentar
+    inicio = time.perf_counter()
+    for _ in range(iteraciones):
+        resultado = funcion()
+    return resultado, (time.perf_counter() - inicio) * 1000 / iteraciones
+
+
+def main():
+    username = sys.argv[1] if len(sys.argv) > 1 else None
+    rtt = float(sys.argv[2]) if len(sys.argv) > 2 else 300.0
+    iteraciones = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+
+    User = get_user_model()
+    usuario = User.objects.filter(username=username).first() if username else User.objects.filter(is_active=True).first()
+    if usuario is None:
+        print("❌ No hay usuarios activos para generar el token")
+        return
+    token = str(TokenObtainConClaimsSerializer.get_token(usuario).access_token)
+    cliente = Client(SERVER_NAME='localhost', HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    print(f"📱 Arranque con {len(ARRANQUE)} llamadas, usuario {usuario.username}, RTT {rtt:.0f} ms\n")
+    total_servidor = 0
+    for ruta in ARRANQUE:
+        respuesta, ms = medir(lambda: cliente.get(ruta), iteraciones)
+        total_servidor += ms
+        print(f"   {ruta:<34} {respuesta.status_code} {ms:>8.1f} ms")
+    print(f"   {'llamadas sueltas':<34}     {total_servidor:>8.1f} ms servidor, "
+          f"~{total_servidor + rtt * len(ARRANQUE):,.0f} ms en el cliente\n")
+
+    for paralelo in (False, True):
+        cuerpo = json.dumps({'paralelo': paralelo, 'solicitudes': [{'id': ruta, 'url': ruta} for ruta in ARRANQUE]})
+        respuesta, ms = medir(
+            lambda: cliente.post('/api/batch/', cuerpo, content_type='application/json'), iteraciones)
+        estados = [r['estado'] for r in respuesta.json()['respuestas']]
+        nombre = 'lote en paralelo' if paralelo else 'lote secuencial'
+        print(f"   {nombre:<34} {respuesta.status_code} {ms:>8.1f} ms servidor, ~{ms + rtt:,.0f} ms en el cliente "
+              f"(estados {estados})")
+
+
+if __name__ == '__main__':
+    main()
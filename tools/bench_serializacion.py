@@ -0,0 +1,118 @@
+"""
+Compara, por endpoint, el listado con el serializer de DRF y el camino rápido
+(SerializadorRapido + JSONRendererRapido, ver backend_exa2/serializacion.py).
+
+Uso:
+    python tools/bench_serializacion.py [filas] [iteraciones]
+
+Para cada listado mide, sobre las mismas `filas` (por defecto 1000):
+- DRF: queryset de la vista + serializer.data + JSONRenderer
+- rápido: .values() + función de conversión + json de DRF
+- rápido + orjson: .values() + función de conversión + JSONRendererRapido
+y verifica que los tres produzcan exactamente los mismos bytes (la misma
+verificación corre en la suite: backend_exa2/tests.py, SerializacionRapidaTest).
+
+Además hace un request completo a cada endpoint (?page_size=500) con y sin
+?rapido=false para ver consultas SQL y tiempo de punta a punta.
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend_exa2.settings')
+
+import django
+django.setup()
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from backend_exa2.renderizadores import JSONRendererRapido, orjson
+from inventario.modelsDetalleCarrito import DetalleCarrito
+from inventario.modelsProducto import Producto
+from inventario.serializers.serializerDetalleCarrito import DETALLE_CARRITO_RAPIDO, DetalleCarritoSerializer
+from inventario.serializers.serializerProducto import PRODUCTO_RAPIDO, ProductoSerializer
+from transacciones.modelsDetalleNotaDeVenta import DetalleNotaDeVenta
+from transacciones.modelsListadoHistoricoVentas import ListadoHistoricoVentas
+from transacciones.modelsNotaDeVenta import NotaDeVenta
+from transacciones.serializers.serializersDetalleNotaDeVenta import (
+    DETALLE_NOTA_DE_VENTA_RAPIDO, DetalleNotaDeVentaSerializer
+)
+from transacciones.serializers.serializersListadoHistoricoVentas import (
+    HISTORIAL_VENTAS_RAPIDO, ListadoHistoricoVentasSimpleSerializer
+)
+from transacciones.serializers.serializersNotaDeVenta import NOTA_DE_VENTA_RAPIDO, NotaDeVentaSimpleSerializer
+
+# (ruta, queryset como el de la vista, serializer de DRF, serializador rápido)
+LISTADOS = [
+    ('/api/inventario/productos/', Producto.objects.select_related('categoria').order_by('-fecha_creacion', '-id'),
+     ProductoSerializer, PRODUCTO_RAPIDO),
+    ('/api/transacciones/nota-venta/', NotaDeVenta.objects.order_by('-fecha', '-id'),
+     NotaDeVentaSimpleSerializer, NOTA_DE_VENTA_RAPIDO),
+    ('/api/transacciones/detalle-nota-venta/', DetalleNotaDeVenta.objects.order_by('-id'),
+     DetalleNotaDeVentaSerializer, DETALLE_NOTA_DE_VENTA_RAPIDO),
+    ('/api/transacciones/historial-ventas/',
+     ListadoHistoricoVentas.objects.select_related('nota_venta', 'nota_venta__cliente').order_by('-fecha_venta', '-nota_venta_id'),
+     ListadoHistoricoVentasSimpleSerializer, HISTORIAL_VENTAS_RAPIDO),
+    ('/api/inventario/detalles-carrito/', DetalleCarrito.objects.select_related('carrito', 'producto').order_by('-id'),
+     DetalleCarritoSerializer, DETALLE_CARRITO_RAPIDO),
+]
+
+
+def medir(funcion, iteraciones):
+    """Devuelve (resultado, consultas por llamada, ms por llamada)"""
+    resultado = funcion()  # calentar (compilación del serializador rápido, etc.)
+    consultas = []
+    with connection.execute_wrapper(lambda execute, sql, *args: consultas.append(sql) or execute(sql, *args)):
+        funcion()
+    inicio = time.perf_counter()
+    for _ in range(iteraciones):
+        funcion()
+    ms = (time.perf_counter() - inicio) * 1000 / iteraciones
+    return resultado, len(consultas), ms
+
+
+def main():
+    filas = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    iteraciones = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    if orjson is None:
+        print("⚠️ orjson no está instalado: JSONRendererRapido usa el json de DRF")
+
+    print(f"📊 Serialización de {filas} filas, {iteraciones} iteraciones\n")
+    for ruta, queryset, serializer_class, rapido in LISTADOS:
+        queryset = queryset.all()[:filas]
+        drf, q_drf, ms_drf = medir(
+            lambda: JSONRenderer().render(serializer_class(queryset.all(), many=True).data), iteraciones)
+        lento, q_rapido, ms_rapido = medir(
+            lambda: JSONRenderer().render(rapido.convertir(rapido.consulta(queryset.all()))), iteraciones)
+        veloz, _, ms_orjson = medir(
+            lambda: JSONRendererRapido().render(rapido.convertir(rapido.consulta(queryset.all()))), iteraciones)
+
+        cantidad = drf.count(b'},{') + 1 if drf != b'[]' else 0
+        iguales = drf == lento == veloz
+        print(f"{ruta} ({cantidad} filas) {'✅ mismo JSON' if iguales else '❌ JSON DISTINTO'}")
+        for nombre, consultas, ms in (('DRF', q_drf, ms_drf), ('rápido', q_rapido, ms_rapido),
+                                      ('rápido + orjson', q_rapido, ms_orjson)):
+            filas_s = cantidad / ms * 1000 if ms > 0 else 0
+            print(f"   {nombre:<16} {consultas:>5} consultas {ms:>9.1f} ms {filas_s:>12,.0f} filas/s "
+                  f"(x{ms_drf / ms if ms > 0 else 0:.1f})")
+
+    usuario = get_user_model().objects.filter(is_staff=True, is_active=True).first()
+    if usuario is None:
+        print("\n⚠️ Sin usuario staff activo: se omiten los requests completos")
+        return
+    cliente = APIClient(SERVER_NAME='localhost')
+    cliente.force_authenticate(usuario)
+
+    print(f"\n🌐 Requests completos (?page_size=500, usuario {usuario.username})")
+    for ruta, *_ in LISTADOS:
+        for nombre, parametros in (('DRF', '&rapido=false'), ('rápido', '')):
+            respuesta, consultas, ms = medir(lambda: cliente.get(f"{ruta}?page_size=500{parametros}"), iteraciones)
+            print(f"   {ruta:<42} {nombre:<7} {respuesta.status_code} {consultas:>5} consultas {ms:>9.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
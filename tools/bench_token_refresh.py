@@ -0,0 +1,118 @@
+"""
+Latencia de /api/token/refresh/ con muchos refresh tokens históricos en la blacklist.
+
+Uso:
+    python tools/bench_token_refresh.py [cantidad] [refreshes]
+    python tools/bench_token_refresh.py 10000000 200
+
+1. Inserta `cantidad` OutstandingToken históricos (90% vencidos, la mitad en la blacklist)
+2. Mide refreshes encadenados (rotación) y la reutilización de un refresh ya rotado
+3. Ejecuta purgar_tokens y vuelve a medir
+Los tokens del benchmark usan el prefijo "bench-" en el jti y se eliminan al final.
+"""
+import os
+import sys
+import time
+from datetime import timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend_exa2.settings')
+
+import django
+django.setup()
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connections, transaction
+from django.test import Client
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from perfiles.serializers_token import TokenObtainConClaimsSerializer
+
+TAMANO_LOTE = 5000
+USERNAME = 'bench_refresh'
+
+
+def insertar_historicos(cantidad, user_id):
+    """Inserta los tokens con executemany (bulk_create es demasiado lento para millones)"""
+    connection = connections[OutstandingToken.objects.db]
+    tabla_tokens = connection.ops.quote_name(OutstandingToken._meta.db_table)
+    tabla_blacklist = connection.ops.quote_name(BlacklistedToken._meta.db_table)
+    campo_fecha = OutstandingToken._meta.get_field('expires_at')
+    ahora = timezone.now()
+    vencido = campo_fecha.get_db_prep_value(ahora - timedelta(days=30), connection)
+    vigente = campo_fecha.get_db_prep_value(ahora + timedelta(days=7), connection)
+
+    siguiente_id = (OutstandingToken.objects.order_by('-id').values_list('id', flat=True).first() or 0) + 1
+    for inicio in range(0, cantidad, TAMANO_LOTE):
+        fin = min(inicio + TAMANO_LOTE, cantidad)
+        tokens = [
+            (siguiente_id + i, user_id, f'bench-{i}', '', vencido if i % 10 else vigente, vencido)
+            for i in range(inicio, fin)
+        ]
+        blacklist = [(siguiente_id + i, vencido) for i in range(inicio, fin) if i % 2 == 0]
+        with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {tabla_tokens} (id, user_id, jti, token, expires_at, created_at) "
+                f"VALUES (%s, %s, %s, %s, %s, %s)",
+                tokens
+            )
+            cursor.executemany(f"INSERT INTO {tabla_blacklist} (token_id, blacklisted_at) VALUES (%s, %s)", blacklist)
+        if fin % 500000 == 0 or fin == cantidad:
+            print(f"   {fin} tokens insertados")
+
+
+def medir_refresh(cliente, refresh, cantidad):
+    """Refreshes encadenados: cada respuesta trae el refresh rotado para el siguiente"""
+    tiempos = []
+    rotados = []
+    for _ in range(cantidad):
+        inicio = time.perf_counter()
+        respuesta = cliente.post('/api/token/refresh/', {'refresh': refresh}, content_type='application/json')
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+        assert respuesta.status_code == 200, respuesta.content
+        rotados.append(refresh)
+        refresh = respuesta.json()['refresh']
+
+    inicio = time.perf_counter()
+    for anterior in rotados:
+        respuesta = cliente.post('/api/token/refresh/', {'refresh': anterior}, content_type='application/json')
+        assert respuesta.status_code == 401
+    reuso_ms = (time.perf_counter() - inicio) * 1000 / len(rotados)
+
+    tiempos.sort()
+    print(f"   refresh    p50 {tiempos[len(tiempos) // 2]:.2f} ms  p95 {tiempos[int(len(tiempos) * 0.95)]:.2f} ms")
+    print(f"   reutilizar refresh rotado (rechazo): {reuso_ms:.2f} ms")
+    return refresh
+
+
+def main():
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    refreshes = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    User = get_user_model()
+    usuario, _ = User.objects.get_or_create(username=USERNAME)
+    cliente = Client(SERVER_NAME='localhost')
+    refresh = str(TokenObtainConClaimsSerializer.get_token(usuario))
+
+    try:
+        print(f"📥 Insertando {cantidad} tokens históricos...")
+        inicio = time.perf_counter()
+        insertar_historicos(cantidad, usuario.pk)
+        print(f"   {time.perf_counter() - inicio:.1f}s\n")
+
+        print(f"⏱️  {refreshes} refreshes con {OutstandingToken.objects.count()} tokens en la tabla")
+        refresh = medir_refresh(cliente, refresh, refreshes)
+
+        print("\n🧹 purgar_tokens")
+        call_command('purgar_tokens')
+
+        print(f"\n⏱️  {refreshes} refreshes con {OutstandingToken.objects.count()} tokens en la tabla")
+        medir_refresh(cliente, refresh, refreshes)
+    finally:
+        OutstandingToken.objects.filter(user=usuario).delete()
+        usuario.delete()
+
+
+if __name__ == '__main__':
+    main()
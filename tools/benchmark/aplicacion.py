@@ -0,0 +1,23 @@
+"""
+backend_exa2 con Stripe, FCM e ImgBB apuntando a simulados.py (`ejecutar.py externos`).
+
+gunicorn la carga como `aplicacion:application`: WSGI o ASGI según
+BENCHMARK_PERFIL, con la base de BENCHMARK_TRABAJO / BENCHMARK_BASE_DATOS y los
+servicios en BENCHMARK_SIMULADOS (URL del servidor simulado; sin ella, los
+servicios no se usan, como en `ejecutar.py conexiones`).
+"""
+import os
+
+from entorno import apuntar_a_simulados, preparar
+
+PERFIL = os.environ['BENCHMARK_PERFIL']
+# Vistas async solo con ASGI, como en el despliegue real (backend_exa2/asgi.py)
+os.environ['VISTAS_ASINCRONAS'] = str(PERFIL == 'asgi')
+preparar(os.environ['BENCHMARK_TRABAJO'], os.environ.get('BENCHMARK_BASE_DATOS') or None)
+if os.environ.get('BENCHMARK_SIMULADOS'):
+    apuntar_a_simulados(os.environ['BENCHMARK_SIMULADOS'])
+
+if PERFIL == 'asgi':
+    from backend_exa2.asgi import application
+else:
+    from backend_exa2.wsgi import application
@@ -0,0 +1,257 @@
+"""
+Prueba de carga HTTP de punta a punta con varios usuarios simultáneos.
+
+Escenario de cada usuario virtual (un cliente generado por datos.py):
+    login (POST /api/token/, una vez)
+    navegar:  categorías, primera y segunda página de productos, detalle de 2 productos
+    carrito:  crear carrito, agregar 1-3 productos
+    checkout: create-payment-intent (Stripe simulado), nota de venta desde el carrito
+    pagar:    procesar_stripe (descuenta stock, notifica por FCM simulado)
+    reporte:  cada `reporte_cada` iteraciones, reporte en lenguaje natural (PDF o XLSX)
+
+Por defecto la aplicación corre en un proceso aparte (`ejecutar.py servidor`):
+el servidor WSGI con hilos de Django, con los servicios externos simulados y la
+misma base del benchmark; los usuarios virtuales son hilos de este proceso con
+conexiones keep-alive. Con `url` se apunta a un servidor ya levantado (gunicorn,
+Railway de prueba...); ahí Stripe y FCM son los que tenga configurados ese servidor.
+
+Por paso se informan latencias (p50/p90/p99), errores y las consultas SQL y el
+tiempo en base de datos que reporta el encabezado Server-Timing.
+"""
+import http.client
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+from resultados import resumen_ms
+
+CONSULTAS_REPORTE = [
+    "Productos con stock bajo",
+    "Productos con precio mayor a 1000",
+    "Ventas pagadas este mes",
+    "Clientes activos",
+]
+_DB = re.compile(r'(?:^|,\s*)db;dur=([\d.]+);desc="(\d+) consultas"')
+
+
+class ErrorPaso(Exception):
+    """Un paso del escenario respondió con un estado inesperado"""
+
+
+class UsuarioVirtual:
+
+    def __init__(self, base, username, password, semilla, registros):
+        partes = urlsplit(base)
+        self.host, self.puerto = partes.hostname, partes.port or 80
+        self.username, self.password = username, password
+        self.generador = random.Random(semilla)
+        self.registros = registros
+        self.conexion = None
+        self.token = None
+        self.cliente_id = None
+        self.grabar = True
+
+    def llamar(self, paso, metodo, ruta, cuerpo=None, esperado=(200,)):
+        encabezados = {'Accept': 'application/json', 'Host': 'localhost'}
+        datos = None
+        if cuerpo is not None:
+            datos = json.dumps(cuerpo).encode()
+            encabezados['Content-Type'] = 'application/json'
+        if self.token:
+            encabezados['Authorization'] = f"Bearer {self.token}"
+
+        inicio = time.perf_counter()
+        for intento in range(2):
+            if self.conexion is None:
+                self.conexion = http.client.HTTPConnection(self.host, self.puerto, timeout=60)
+            try:
+                self.conexion.request(metodo, ruta, body=datos, headers=encabezados)
+                respuesta = self.conexion.getresponse()
+                contenido = respuesta.read()
+                break
+            except (http.client.HTTPException, ConnectionError):
+                # El servidor cerró la conexión keep-alive: reintentar una vez con una nueva
+                self.conexion.close()
+                self.conexion = None
+                if intento:
+                    raise
+        ms = (time.perf_counter() - inicio) * 1000
+
+        if self.grabar:
+            coincidencia = _DB.search(respuesta.getheader('Server-Timing') or '')
+            self.registros.append((
+                paso, respuesta.status, ms,
+                float(coincidencia.group(1)) if coincidencia else None,
+                int(coincidencia.group(2)) if coincidencia else None,
+                time.perf_counter(),
+            ))
+        if respuesta.status not in esperado:
+            raise ErrorPaso(f"{paso}: {metodo} {ruta} -> {respuesta.status} {contenido[:200]!r}")
+        return json.loads(contenido) if contenido else None
+
+    def login(self):
+        datos = self.llamar('login', 'POST', '/api/token/', {'username': self.username, 'password': self.password})
+        self.token = datos['access']
+        self.cliente_id = self.llamar('login', 'GET', '/api/me/')['cliente_id']
+
+    def iteracion(self, numero, corrida, reporte_cada):
+        # Navegar
+        self.llamar('navegar', 'GET', '/api/inventario/categorias/')
+        pagina = self.llamar('navegar', 'GET', '/api/inventario/productos/?page_size=20')
+        productos = pagina['results']
+        if pagina.get('next'):
+            siguiente = urlsplit(pagina['next'])
+            productos = productos + self.llamar('navegar', 'GET', f"{siguiente.path}?{siguiente.query}")['results']
+        for producto in self.generador.sample(productos, min(2, len(productos))):
+            self.llamar('navegar', 'GET', f"/api/inventario/productos/{producto['id']}/")
+
+        # Carrito
+        carrito = self.llamar('carrito', 'POST', '/api/inventario/carritos/', {
+            'codigo': f"B{corrida}-{self.username}-{numero}", 'cliente': self.cliente_id, 'estado': 'activo',
+        }, esperado=(201,))
+        con_stock = [producto for producto in productos if producto['stock'] >= 5]
+        for producto in self.generador.sample(con_stock, min(self.generador.randint(1, 3), len(con_stock))):
+            self.llamar('carrito', 'POST', '/api/inventario/detalles-carrito/', {
+                'carrito': carrito['id'], 'producto': producto['id'], 'cantidad': 1,
+            }, esperado=(201,))
+
+        # Checkout
+        intent = self.llamar('checkout', 'POST', '/api/transacciones/pagos/create-payment-intent/',
+                             {'carrito_id': carrito['id']})
+        nota = self.llamar('checkout', 'POST', '/api/transacciones/nota-venta/desde-carrito/',
+                           {'carrito_id': carrito['id']}, esperado=(201,))
+
+        # Pagar
+        self.llamar('pagar', 'POST', '/api/transacciones/pagos/procesar_stripe/', {
+            'nota_venta_id': nota['id'], 'monto': nota['total'], 'moneda': 'BOB',
+            'payment_intent_id': intent['paymentIntentId'],
+        }, esperado=(201,))
+
+        # Reporte
+        if reporte_cada and numero % reporte_cada == 0:
+            self.llamar('reporte', 'POST', '/api/analitica/reportes/generar-natural/', {
+                'consulta': self.generador.choice(CONSULTAS_REPORTE),
+                'formato': self.generador.choice(['PDF', 'XLSX']),
+            }, esperado=(201,))
+
+
+def _usuario(base, indice, password, iteraciones, calentamiento, reporte_cada, corrida, registros, errores):
+    usuario = UsuarioVirtual(base, f"bench{indice:06d}", password, indice, registros)
+    try:
+        usuario.login()
+        usuario.grabar = False
+        for numero in range(-calentamiento, iteraciones):
+            usuario.grabar = numero >= 0
+            try:
+                usuario.iteracion(numero, corrida, reporte_cada)
+            except ErrorPaso as e:
+                errores.append(str(e))
+    except Exception as e:
+        errores.append(f"bench{indice:06d}: {e!r}")
+    finally:
+        if usuario.conexion is not None:
+            usuario.conexion.close()
+
+
+def levantar_servidor(globales, latencia_ms=0):
+    """Inicia `ejecutar.py servidor` y devuelve (proceso, url) cuando acepta requests"""
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ejecutar.py')
+    proceso = subprocess.Popen(
+        [sys.executable, script, *globales, 'servidor', '--puerto', '0', '--latencia-externa', str(latencia_ms)],
+        stdout=subprocess.PIPE, text=True,
+    )
+    linea = proceso.stdout.readline()
+    if not linea.startswith('PUERTO '):
+        proceso.kill()
+        raise RuntimeError(f"El servidor del benchmark no arrancó: {linea!r}")
+    return proceso, f"http://127.0.0.1:{int(linea.split()[1])}"
+
+
+def servir(puerto):
+    """
+    Servidor WSGI con hilos (proceso hijo de la prueba de carga). ejecutar.py
+    ya activó los servicios simulados.
+    """
+    from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+    from django.core.wsgi import get_wsgi_application
+
+    class ManejadorSilencioso(WSGIRequestHandler):
+        def log_message(self, *args):
+            pass
+
+    servidor = ThreadedWSGIServer(('127.0.0.1', puerto), ManejadorSilencioso, allow_reuse_address=True)
+    servidor.set_app(get_wsgi_application())
+    print(f"PUERTO {servidor.server_address[1]}", flush=True)
+    try:
+        servidor.serve_forever()
+    finally:
+        servidor.server_close()
+
+
+def ejecutar(url, usuarios=10, iteraciones=5, calentamiento=1, reporte_cada=5, password=None):
+    """
+    Returns:
+        dict: {paso: métricas} más 'total' con requests/s y errores
+    """
+    from datos import PASSWORD_CARGA
+
+    registros, errores = [], []
+    corrida = int(time.time()) % 1000000
+    hilos = [
+        threading.Thread(target=_usuario, args=(
+            url, indice, password or PASSWORD_CARGA, iteraciones, calentamiento, reporte_cada, corrida,
+            registros, errores,
+        ))
+        for indice in range(1, usuarios + 1)
+    ]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    mediciones = {}
+    for paso in ('login', 'navegar', 'carrito', 'checkout', 'pagar', 'reporte'):
+        del_paso = [registro for registro in registros if registro[0] == paso]
+        if not del_paso:
+            continue
+        metricas = resumen_ms([ms for _, _, ms, *_ in del_paso])
+        metricas['errores'] = sum(1 for _, estado, *_ in del_paso if estado >= 400)
+        con_db = [(db, consultas) for _, _, _, db, consultas, _ in del_paso if db is not None]
+        if con_db:
+            metricas['db_media_ms'] = round(sum(db for db, _ in con_db) / len(con_db), 3)
+            metricas['consultas_media'] = round(sum(consultas for _, consultas in con_db) / len(con_db), 2)
+        mediciones[paso] = metricas
+
+    # Sin login ni calentamiento: desde el primer request medido hasta el último
+    grabados = [registro for registro in registros if registro[0] != 'login']
+    duracion = (
+        max(fin for *_, fin in grabados) - min(fin - ms / 1000 for _, _, ms, *_, fin in grabados) if grabados else 0
+    )
+    mediciones['total'] = {
+        'requests': len(grabados),
+        'errores': sum(1 for _, estado, *_ in grabados if estado >= 400),
+        'duracion_s': round(duracion, 3),
+        'rps': round(len(grabados) / duracion, 2) if duracion else None,
+        **{clave: valor for clave, valor in resumen_ms([ms for _, _, ms, *_ in grabados]).items() if clave != 'n'},
+    }
+
+    for paso, metricas in mediciones.items():
+        if paso == 'total':
+            continue
+        print(f"   {paso:<9} {metricas['n']:>6} requests {metricas['p50_ms']:>9.1f} ms p50 {metricas['p90_ms']:>9.1f} ms p90 "
+              f"{metricas['p99_ms']:>9.1f} ms p99 {metricas['errores']:>4} errores "
+              f"{metricas.get('consultas_media', 0):>6.1f} consultas")
+    total = mediciones['total']
+    print(f"   {'total':<9} {total['requests']:>6} requests en {total['duracion_s']:.1f}s "
+          f"({total['rps']:,.1f} req/s), {total['errores']} errores")
+    for error in errores[:10]:
+        print(f"   ❌ {error}")
+    if len(errores) > 10:
+        print(f"   ... y {len(errores) - 10} errores más")
+    return mediciones
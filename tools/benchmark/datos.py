@@ -0,0 +1,223 @@
+"""
+Generador determinista de datos sintéticos: clientes, productos y ventas.
+
+Con los mismos parámetros y la misma semilla produce siempre los mismos
+archivos, en los formatos de los comandos de importación del proyecto, y los
+carga con ellos:
+- usuarios.json  -> manage.py provisionar_usuarios
+- productos.csv  -> manage.py importar_productos
+- ventas.csv     -> manage.py importar_ventas
+
+Distribuciones:
+- precios: log-normal alrededor del precio típico de cada categoría, margen 15-60 %
+- stock: gamma (la mayoría con stock medio, ~5 % en cero o casi)
+- popularidad de productos: Zipf (s=1.1), pocos productos concentran las ventas
+- frecuencia de compra de clientes: Pareto, el 20 % de los clientes hace la mayor parte
+- productos por venta: 1 + Poisson(0.8) (máx. 8); cantidad: geométrica, casi siempre 1
+- fechas: `dias` días hasta `hasta`, con más ventas en fin de semana y tendencia creciente
+- método de pago: Stripe 70 %, efectivo 20 %, transferencia 10 %
+
+Los primeros `usuarios_carga` clientes (bench000001, ...) reciben `password` para
+poder iniciar sesión en la prueba de carga; el resto queda sin contraseña
+utilizable (el hash PBKDF2 de miles de usuarios no aporta al benchmark).
+"""
+import bisect
+import csv
+import itertools
+import json
+import math
+import os
+import random
+import time
+from datetime import date, datetime, timedelta
+
+PASSWORD_CARGA = 'bench-pass-3210'
+
+# (prefijo, nombre, precio típico en Bs., tipos de producto)
+CATEGORIAS = [
+    ('LB', 'Línea Blanca', 2500, ['Refrigerador', 'Lavadora', 'Secadora', 'Cocina', 'Congelador']),
+    ('EL', 'Electrodomésticos', 450, ['Licuadora', 'Microondas', 'Freidora de aire', 'Cafetera', 'Plancha']),
+    ('TV', 'Televisores', 3200, ['Smart TV', 'Televisor QLED', 'Televisor OLED', 'Monitor TV']),
+    ('AU', 'Audio', 700, ['Parlante', 'Barra de sonido', 'Audífonos', 'Minicomponente']),
+    ('CO', 'Computación', 4200, ['Laptop', 'Monitor', 'Impresora', 'Tablet', 'Router']),
+    ('CL', 'Climatización', 2100, ['Aire acondicionado', 'Ventilador', 'Calefactor', 'Purificador']),
+    ('CE', 'Celulares', 2600, ['Celular', 'Smartwatch', 'Cargador', 'Power bank']),
+    ('HO', 'Hogar', 250, ['Aspiradora', 'Juego de ollas', 'Colchón', 'Lámpara']),
+]
+MARCAS = ['Samsung', 'LG', 'Mabe', 'Oster', 'Philips', 'Sony', 'Whirlpool', 'Electrolux', 'Xiaomi', 'Lenovo', 'HP']
+NOMBRES_M = ['Juan', 'Carlos', 'Luis', 'Jorge', 'Miguel', 'José', 'Diego', 'Andrés', 'Fernando', 'Ricardo', 'Mario']
+NOMBRES_F = ['María', 'Ana', 'Lucía', 'Carla', 'Sofía', 'Valeria', 'Daniela', 'Paola', 'Gabriela', 'Andrea', 'Rosa']
+APELLIDOS = ['Flores', 'Rojas', 'Gutierrez', 'Vargas', 'Mamani', 'Quispe', 'Fernández', 'Suárez', 'Justiniano',
+             'Áñez', 'Rivero', 'Montaño', 'Salvatierra', 'Cuéllar', 'Paz']
+BARRIOS = ['Equipetrol', 'Centro', 'Los Lotes', 'Plan 3000', 'Villa 1ro de Mayo', 'Urbarí', 'Las Palmas', 'Sirari']
+METODOS_PAGO = [('Stripe', 0.7), ('Efectivo', 0.2), ('Transferencia', 0.1)]
+
+
+def _elegir_ponderado(generador, acumulados, elementos):
+    return elementos[bisect.bisect(acumulados, generador.random() * acumulados[-1])]
+
+
+def _poisson(generador, media):
+    # Knuth: suficiente para medias chicas
+    limite, k, p = math.exp(-media), 0, 1.0
+    while True:
+        p *= generador.random()
+        if p <= limite:
+            return k
+        k += 1
+
+
+def generar_clientes(generador, cantidad, usuarios_carga, password):
+    for numero in range(1, cantidad + 1):
+        sexo = 'F' if generador.random() < 0.5 else 'M'
+        nombre = generador.choice(NOMBRES_F if sexo == 'F' else NOMBRES_M)
+        fila = {
+            'username': f"bench{numero:06d}",
+            'email': f"bench{numero:06d}@benchmark.local",
+            'nombre': nombre,
+            'apellido': f"{generador.choice(APELLIDOS)} {generador.choice(APELLIDOS)}",
+            'rol': 'cliente',
+            'ci': str(20000000 + numero),
+            'telefono': f"7{numero:07d}",
+            'direccion': f"Calle {generador.randint(1, 300)}, {generador.choice(BARRIOS)}, Santa Cruz de la Sierra",
+            'sexo': sexo,
+        }
+        if numero <= usuarios_carga:
+            fila['password'] = password
+        yield fila
+
+
+def generar_productos(generador, cantidad):
+    for numero in range(1, cantidad + 1):
+        prefijo, categoria, precio_tipico, tipos = CATEGORIAS[(numero - 1) % len(CATEGORIAS)]
+        precio_venta = round(precio_tipico * generador.lognormvariate(0, 0.45), 2)
+        precio_compra = round(precio_venta / (1 + generador.uniform(0.15, 0.6)), 2)
+        stock = 0 if generador.random() < 0.03 else int(generador.gammavariate(2.0, 15))
+        tipo = generador.choice(tipos)
+        marca = generador.choice(MARCAS)
+        yield {
+            'codigo': f"{prefijo}-B{numero:06d}",
+            'nombre': f"{tipo} {marca} {generador.choice('ABCDEFGHJKLMNPRSTX')}{generador.randint(100, 999)}",
+            'descripcion': f"{tipo} marca {marca} de la línea {categoria.lower()}",
+            'precio_compra': f"{precio_compra:.2f}",
+            'precio_compra_anterior': '',
+            'precio_venta': f"{precio_venta:.2f}",
+            'costo_promedio': f"{precio_compra:.2f}",
+            'stock': stock,
+            'imagen': f"https://imagenes.local/{prefijo.lower()}-{numero}.webp",
+            'categoria': categoria,
+        }
+
+
+def generar_ventas(generador, cantidad, codigos, cis, dias, hasta):
+    # Popularidad Zipf sobre un orden aleatorio de productos
+    orden = list(codigos)
+    generador.shuffle(orden)
+    acumulados_productos = list(itertools.accumulate(1 / (rango ** 1.1) for rango in range(1, len(orden) + 1)))
+    # Frecuencia de compra Pareto por cliente
+    acumulados_clientes = list(itertools.accumulate(generador.paretovariate(1.16) for _ in cis))
+    # Días: fin de semana x1.6 y tendencia creciente hacia `hasta`
+    inicio = hasta - timedelta(days=dias - 1)
+    fechas = [inicio + timedelta(days=indice) for indice in range(dias)]
+    acumulados_dias = list(itertools.accumulate(
+        (1.6 if dia.weekday() >= 5 else 1.0) * (0.7 + 0.6 * indice / max(dias - 1, 1))
+        for indice, dia in enumerate(fechas)
+    ))
+    metodos = [metodo for metodo, _ in METODOS_PAGO]
+    acumulados_metodos = list(itertools.accumulate(peso for _, peso in METODOS_PAGO))
+
+    for venta_id in range(1, cantidad + 1):
+        cliente_ci = _elegir_ponderado(generador, acumulados_clientes, cis)
+        dia = _elegir_ponderado(generador, acumulados_dias, fechas)
+        # Horario comercial, más movimiento a la tarde
+        momento = datetime(dia.year, dia.month, dia.day, min(int(generador.gauss(16, 3)) % 24, 23),
+                           generador.randint(0, 59), generador.randint(0, 59))
+        metodo = _elegir_ponderado(generador, acumulados_metodos, metodos)
+        elegidos = {}
+        for _ in range(min(1 + _poisson(generador, 0.8), 8)):
+            codigo = _elegir_ponderado(generador, acumulados_productos, orden)
+            cantidad_item = 1
+            while generador.random() < 0.25 and cantidad_item < 6:
+                cantidad_item += 1
+            elegidos[codigo] = elegidos.get(codigo, 0) + cantidad_item
+        for codigo, cantidad_item in elegidos.items():
+            yield {
+                'venta_id': venta_id,
+                'cliente_ci': cliente_ci,
+                'producto_codigo': codigo,
+                'cantidad': cantidad_item,
+                'metodo_pago': metodo,
+                'moneda': 'BOB',
+                'referencia_pago': f"pi_bench_hist_{venta_id:08d}",
+                'fecha': momento.isoformat(),
+            }
+
+
+def generar(directorio, clientes=1000, productos=500, ventas=5000, semilla=42, dias=365,
+            hasta=date(2025, 10, 31), usuarios_carga=20, password=PASSWORD_CARGA):
+    """
+    Escribe usuarios.json, productos.csv y ventas.csv en `directorio`.
+
+    Returns:
+        dict: Rutas de los archivos y cantidades generadas
+    """
+    os.makedirs(directorio, exist_ok=True)
+    generador = random.Random(semilla)
+
+    filas_clientes = list(generar_clientes(generador, clientes, min(usuarios_carga, clientes), password))
+    ruta_usuarios = os.path.join(directorio, 'usuarios.json')
+    with open(ruta_usuarios, 'w', encoding='utf-8') as archivo:
+        json.dump(filas_clientes, archivo, ensure_ascii=False, indent=1)
+
+    filas_productos = list(generar_productos(generador, productos))
+    ruta_productos = os.path.join(directorio, 'productos.csv')
+    with open(ruta_productos, 'w', newline='', encoding='utf-8') as archivo:
+        escritor = csv.DictWriter(archivo, fieldnames=list(filas_productos[0]))
+        escritor.writeheader()
+        escritor.writerows(filas_productos)
+
+    ruta_ventas = os.path.join(directorio, 'ventas.csv')
+    lineas = 0
+    with open(ruta_ventas, 'w', newline='', encoding='utf-8') as archivo:
+        escritor = csv.DictWriter(archivo, fieldnames=[
+            'venta_id', 'cliente_ci', 'producto_codigo', 'cantidad', 'metodo_pago', 'moneda', 'referencia_pago', 'fecha',
+        ])
+        escritor.writeheader()
+        for fila in generar_ventas(generador, ventas, [p['codigo'] for p in filas_productos],
+                                   [c['ci'] for c in filas_clientes], dias, hasta):
+            escritor.writerow(fila)
+            lineas += 1
+
+    return {
+        'usuarios': ruta_usuarios, 'productos': ruta_productos, 'ventas': ruta_ventas,
+        'cantidades': {'clientes': clientes, 'productos': productos, 'ventas': ventas, 'lineas_venta': lineas},
+    }
+
+
+def crear_administrador():
+    """Administrador con un dispositivo registrado: las ventas y el stock bajo le notifican por FCM"""
+    from django.contrib.auth.models import User
+    from perfiles.models_device_token import DeviceToken
+
+    administrador, _ = User.objects.get_or_create(
+        username='benchadmin', defaults={'email': 'benchadmin@benchmark.local', 'is_staff': True},
+    )
+    DeviceToken.objects.get_or_create(user=administrador, token='benchmark-dispositivo-admin',
+                                      defaults={'platform': 'android'})
+
+
+def cargar(archivos, procesos=1):
+    """Carga los archivos generados con los comandos de importación del proyecto"""
+    from django.core.management import call_command
+
+    crear_administrador()
+    tiempos = {}
+    for nombre, comando, extra in (
+        ('usuarios', 'provisionar_usuarios', ['--procesos', str(procesos)]),
+        ('productos', 'importar_productos', []),
+        ('ventas', 'importar_ventas', ['--procesos', str(procesos)]),
+    ):
+        inicio = time.perf_counter()
+        call_command(comando, archivos[nombre], *extra)
+        tiempos[nombre] = round(time.perf_counter() - inicio, 3)
+    return tiempos
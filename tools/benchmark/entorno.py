@@ -0,0 +1,179 @@
+"""
+Entorno aislado y sin red para el benchmark.
+
+`preparar()` se llama antes de django.setup(): apunta DATABASE_URL a una base
+propia del benchmark (SQLite en el directorio de trabajo, salvo que se indique
+otra), usa caché en memoria, imágenes con el backend 'local' y deja sin
+credenciales a Stripe y Firebase.
+
+`servicios_simulados()` (activo en todos los subcomandos de ejecutar.py)
+reemplaza las llamadas externas por dobles en memoria:
+- Stripe: PaymentIntent.create / retrieve / confirm y sus *_async (pagos siempre exitosos)
+- FCM: FCMService.send_push_notification y send_push_notification_async
+- cualquier otro uso de `requests` o de httpx falla, para que nada salga a la red
+Cada doble puede esperar `latencia_ms` para simular el viaje al servicio.
+
+`apuntar_a_simulados()` (subcomando externos) en cambio deja las llamadas
+reales por HTTP, pero contra el servidor local de simulados.py.
+"""
+import asyncio
+import itertools
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import ExitStack
+from types import SimpleNamespace
+from unittest import mock
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+TRABAJO_POR_DEFECTO = os.path.join(tempfile.gettempdir(), 'backend_exa2_benchmark')
+
+
+def preparar(trabajo=TRABAJO_POR_DEFECTO, base_datos=None):
+    """Configura el entorno del benchmark y carga Django"""
+    os.makedirs(trabajo, exist_ok=True)
+    if RAIZ not in sys.path:
+        sys.path.insert(0, RAIZ)
+    os.environ['DATABASE_URL'] = base_datos or f"sqlite:///{os.path.join(trabajo, 'benchmark.sqlite3')}"
+    os.environ.update({
+        'DJANGO_SETTINGS_MODULE': 'backend_exa2.settings',
+        'DEBUG': 'False',
+        'REDIS_URL': '',
+        'IMAGENES_BACKEND': 'local',
+        'STRIPE_SECRET_KEY': 'sk_test_benchmark',
+        'FIREBASE_PROJECT_ID': '',
+        'FIREBASE_SERVICE_ACCOUNT_JSON': '',
+        # El benchmark mide la aplicación, no la detección de N+1
+        'INSTRUMENTACION_MUESTREO': '0',
+        'INSTRUMENTACION_LENTO_MS': '60000',
+        'LOG_LEVEL': 'WARNING',
+    })
+
+    import django
+    django.setup()
+
+    import logging
+    from django.conf import settings
+    # Firebase queda sin credenciales a propósito (FCM está simulado)
+    logging.getLogger('perfiles.fcm_service').setLevel(logging.CRITICAL)
+    # Los reportes generados no se mezclan con los de desarrollo
+    settings.MEDIA_ROOT = os.path.join(trabajo, 'media')
+    settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, 'testserver']
+
+
+def migrar():
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0, interactive=False)
+
+
+class StripeSimulado:
+    """PaymentIntent en memoria con la interfaz que usa transacciones/viewsPago.py"""
+
+    def __init__(self, latencia_ms=0):
+        self.latencia = latencia_ms / 1000
+        self.intents = {}
+        self.contador = itertools.count(1)
+        # Los pagos guardan el id del intent (único): no repetirlos entre ejecuciones sobre la misma base
+        self.prefijo = f"pi_bench_{uuid.uuid4().hex[:8]}"
+        self.lock = threading.Lock()
+
+    def _esperar(self):
+        if self.latencia:
+            time.sleep(self.latencia)
+
+    async def _esperar_async(self):
+        if self.latencia:
+            await asyncio.sleep(self.latencia)
+
+    def _crear(self, amount, currency, metadata):
+        with self.lock:
+            numero = next(self.contador)
+        intent = SimpleNamespace(
+            id=f"{self.prefijo}_{numero}", client_secret=f"{self.prefijo}_{numero}_secret", amount=amount,
+            amount_received=amount, currency=currency, metadata=dict(metadata or {}), status='succeeded',
+        )
+        self.intents[intent.id] = intent
+        return intent
+
+    def _buscar(self, intent_id):
+        return self.intents.get(intent_id) or SimpleNamespace(
+            id=intent_id, amount=0, amount_received=0, currency='usd', metadata={}, status='succeeded',
+        )
+
+    def create(self, amount, currency, metadata=None, **kwargs):
+        self._esperar()
+        return self._crear(amount, currency, metadata)
+
+    def retrieve(self, intent_id, **kwargs):
+        self._esperar()
+        return self._buscar(intent_id)
+
+    def confirm(self, intent_id, **kwargs):
+        intent = self.retrieve(intent_id)
+        intent.status = 'succeeded'
+        return intent
+
+    async def create_async(self, amount, currency, metadata=None, **kwargs):
+        await self._esperar_async()
+        return self._crear(amount, currency, metadata)
+
+    async def retrieve_async(self, intent_id, **kwargs):
+        await self._esperar_async()
+        return self._buscar(intent_id)
+
+    async def confirm_async(self, intent_id, **kwargs):
+        intent = await self.retrieve_async(intent_id)
+        intent.status = 'succeeded'
+        return intent
+
+
+def servicios_simulados(latencia_ms=0):
+    """ExitStack con Stripe, FCM y la red reemplazados (ver módulo)"""
+    import httpx
+    import requests
+
+    latencia = latencia_ms / 1000
+    stripe = StripeSimulado(latencia_ms)
+
+    def enviar_push(self, token, title, body, data=None):
+        if latencia:
+            time.sleep(latencia)
+        return {'success': True, 'message_id': 'projects/benchmark/messages/1'}
+
+    async def enviar_push_async(self, token, title, body, data=None):
+        if latencia:
+            await asyncio.sleep(latencia)
+        return {'success': True, 'message_id': 'projects/benchmark/messages/1'}
+
+    def sin_red(self, method, url, *args, **kwargs):
+        raise requests.ConnectionError(f"Red deshabilitada en el benchmark: {method} {url}")
+
+    async def sin_red_async(self, request, *args, **kwargs):
+        raise httpx.ConnectError(f"Red deshabilitada en el benchmark: {request.method} {request.url}")
+
+    pila = ExitStack()
+    for metodo in ('create', 'retrieve', 'confirm', 'create_async', 'retrieve_async', 'confirm_async'):
+        pila.enter_context(mock.patch(f'stripe.PaymentIntent.{metodo}', getattr(stripe, metodo)))
+    pila.enter_context(mock.patch('perfiles.fcm_service.FCMService.send_push_notification', enviar_push))
+    pila.enter_context(mock.patch('perfiles.fcm_service.FCMService.send_push_notification_async', enviar_push_async))
+    pila.enter_context(mock.patch('requests.Session.request', sin_red))
+    pila.enter_context(mock.patch('httpx.AsyncClient.send', sin_red_async))
+    return pila
+
+
+def apuntar_a_simulados(url):
+    """Stripe, FCM e ImgBB contra el servidor de simulados.py en `url` (por HTTP, sin dobles)"""
+    import stripe
+    from django.conf import settings
+    from inventario.almacenamiento_imagenes import ImgBBAlmacenamiento
+    from perfiles.fcm_service import FCMService
+
+    stripe.api_base = url
+    FCMService.url_base = f"{url}/v1"
+    ImgBBAlmacenamiento.url = f"{url}/1/upload"
+    # Firebase "configurado" con un access token que no vence (el simulado no lo valida)
+    settings.FIREBASE_PROJECT_ID = 'benchmark'
+    FCMService.credentials = SimpleNamespace(valid=True, token='benchmark')
@@ -0,0 +1,300 @@
+"""
+WSGI contra ASGI cuando Stripe, FCM e ImgBB tardan en responder.
+
+1. Levanta simulados.py con uvicorn en un proceso aparte: cada llamada a Stripe,
+   FCM o ImgBB tarda `latencia_ms`, como un servicio lento de verdad, por HTTP.
+2. Por cada perfil levanta la aplicación con gunicorn y los mismos `workers`:
+   - wsgi: workers sync, como `gunicorn backend_exa2.wsgi:application` (despliegue actual)
+   - asgi: `-c python:backend_exa2.gunicorn_asgi` con backend_exa2.asgi (vistas async)
+   y `concurrencia` usuarios virtuales (corrutinas con httpx) repiten el pago de
+   la app móvil hasta completar `pagos` entre todos:
+       create-payment-intent   PaymentIntent.create
+       confirm-payment-auto    PaymentIntent.retrieve + confirm
+       confirm-payment         PaymentIntent.retrieve
+3. En este proceso, contra el mismo simulado, de a uno contra a la vez:
+   - fcm: la misma notificación a `tokens` dispositivos
+   - imgbb: las 3 variantes de la imagen de un producto
+
+Por perfil se informan latencias por paso, pagos/s (ops_s), requests/s y errores.
+"""
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+
+from entorno import RAIZ
+from resultados import resumen_ms
+
+CARPETA = os.path.dirname(os.path.abspath(__file__))
+PASOS = ('create-payment-intent', 'confirm-payment-auto', 'confirm-payment')
+# Argumentos de gunicorn de cada perfil (la aplicación es aplicacion.py)
+PERFILES = {
+    'wsgi': [],
+    'asgi': ['-c', 'python:backend_exa2.gunicorn_asgi'],
+}
+PREFIJO_CARRITOS = 'EXT-'
+
+
+class ErrorPaso(Exception):
+    """Un paso del pago respondió con un estado inesperado"""
+
+
+def _puerto_libre():
+    with socket.socket() as conexion:
+        conexion.bind(('127.0.0.1', 0))
+        return conexion.getsockname()[1]
+
+
+def _esperar_puerto(puerto, proceso, segundos=120):
+    limite = time.monotonic() + segundos
+    while time.monotonic() < limite:
+        if proceso.poll() is not None:
+            raise RuntimeError(f"El proceso terminó al arrancar (código {proceso.returncode})")
+        try:
+            with socket.create_connection(('127.0.0.1', puerto), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    proceso.kill()
+    raise RuntimeError(f"Nada escucha en el puerto {puerto} después de {segundos}s")
+
+
+def detener(proceso):
+    proceso.terminate()
+    try:
+        proceso.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        proceso.kill()
+        proceso.wait()
+
+
+def levantar_simulados(latencia_ms):
+    """Inicia simulados.py y devuelve (proceso, url)"""
+    puerto = _puerto_libre()
+    proceso = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'simulados:aplicacion', '--app-dir', CARPETA, '--port', str(puerto),
+         '--backlog', '4096', '--log-level', 'warning', '--no-access-log'],
+        env={**os.environ, 'SIMULADOS_LATENCIA_MS': str(latencia_ms)},
+    )
+    _esperar_puerto(puerto, proceso)
+    return proceso, f"http://127.0.0.1:{puerto}"
+
+
+def levantar_aplicacion(perfil, workers, simulados, trabajo, base_datos=None, variables=None):
+    """Inicia gunicorn con el perfil (y `variables` de entorno extra) y devuelve (proceso, url)"""
+    puerto = _puerto_libre()
+    entorno = {
+        **os.environ,
+        'BENCHMARK_PERFIL': perfil,
+        'BENCHMARK_TRABAJO': trabajo,
+        'BENCHMARK_BASE_DATOS': base_datos or '',
+        'BENCHMARK_SIMULADOS': simulados or '',
+        **(variables or {}),
+    }
+    proceso = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', *PERFILES[perfil], '--pythonpath', CARPETA, '--workers', str(workers),
+         '--bind', f"127.0.0.1:{puerto}", '--backlog', '4096', '--timeout', '300', '--log-level', 'warning',
+         'aplicacion:application'],
+        cwd=RAIZ, env=entorno,
+    )
+    _esperar_puerto(puerto, proceso)
+    return proceso, f"http://127.0.0.1:{puerto}"
+
+
+def preparar_carritos(cantidad):
+    """
+    Carritos con 1 a 3 productos para create-payment-intent (se reutilizan entre
+    ejecuciones: el pago solo los lee)
+    """
+    from inventario.modelsCarrito import Carrito
+    from inventario.modelsDetalleCarrito import DetalleCarrito
+    from inventario.modelsProducto import Producto
+    from perfiles.models import Cliente
+
+    existentes = list(Carrito.objects.filter(codigo__startswith=PREFIJO_CARRITOS).values_list('id', flat=True))
+    if len(existentes) >= cantidad:
+        return existentes[:cantidad]
+
+    clientes = list(Cliente.objects.order_by('id')[:cantidad])
+    productos = list(Producto.objects.order_by('id')[:50])
+    if not clientes or not productos:
+        raise RuntimeError("La base del benchmark no tiene datos: ejecute primero `ejecutar.py datos`")
+    generador = random.Random(42)
+    carritos = Carrito.objects.bulk_create([
+        Carrito(codigo=f"{PREFIJO_CARRITOS}{indice}", cliente=clientes[indice % len(clientes)])
+        for indice in range(len(existentes), cantidad)
+    ])
+    DetalleCarrito.objects.bulk_create([
+        DetalleCarrito(carrito=carrito, producto=producto, cantidad=1, precio_unitario=producto.precio_venta)
+        for carrito in carritos
+        for producto in generador.sample(productos, generador.randint(1, min(3, len(productos))))
+    ])
+    return existentes + [carrito.id for carrito in carritos]
+
+
+async def _llamar(cliente, registros, paso, cuerpo):
+    inicio = time.perf_counter()
+    try:
+        respuesta = await cliente.post(f"/api/transacciones/pagos/{paso}/", json=cuerpo)
+    except Exception as e:
+        registros.append((paso, 599, (time.perf_counter() - inicio) * 1000, time.perf_counter()))
+        raise ErrorPaso(f"{paso}: {e!r}")
+    registros.append((paso, respuesta.status_code, (time.perf_counter() - inicio) * 1000, time.perf_counter()))
+    if respuesta.status_code != 200:
+        raise ErrorPaso(f"{paso} -> {respuesta.status_code} {respuesta.text[:200]}")
+    return respuesta.json()
+
+
+async def _usuario(cliente, carritos, turnos, generador, registros, errores):
+    # `turnos` es un iterador compartido: cada usuario toma el siguiente pago pendiente
+    for _ in turnos:
+        try:
+            intent = await _llamar(cliente, registros, 'create-payment-intent', {'carrito_id': generador.choice(carritos)})
+            datos = {'payment_intent_id': intent['paymentIntentId']}
+            await _llamar(cliente, registros, 'confirm-payment-auto', datos)
+            await _llamar(cliente, registros, 'confirm-payment', datos)
+        except ErrorPaso as e:
+            errores.append(str(e))
+
+
+async def _carga(url, carritos, concurrencia, pagos, calentamiento):
+    import httpx
+
+    limites = httpx.Limits(max_connections=concurrencia, max_keepalive_connections=concurrencia)
+    async with httpx.AsyncClient(base_url=url, limits=limites, timeout=300) as cliente:
+        generador = random.Random(7)
+
+        async def ronda(cantidad, registros, errores):
+            turnos = iter(range(cantidad))
+            await asyncio.gather(*(
+                _usuario(cliente, carritos, turnos, generador, registros, errores) for _ in range(concurrencia)
+            ))
+
+        # Calentamiento: workers cargados y conexiones abiertas
+        await ronda(calentamiento, [], [])
+        registros, errores = [], []
+        inicio = time.perf_counter()
+        await ronda(pagos, registros, errores)
+        return registros, errores, time.perf_counter() - inicio
+
+
+def medir_perfil(url, carritos, concurrencia, pagos, calentamiento):
+    """
+    Returns:
+        dict: {paso: métricas} más 'total' con pagos/s (ops_s), requests/s y errores
+    """
+    registros, errores, duracion = asyncio.run(_carga(url, carritos, concurrencia, pagos, calentamiento))
+
+    mediciones = {}
+    for paso in PASOS:
+        del_paso = [registro for registro in registros if registro[0] == paso]
+        metricas = resumen_ms([ms for _, _, ms, _ in del_paso])
+        metricas['errores'] = sum(1 for _, estado, _, _ in del_paso if estado != 200)
+        mediciones[paso] = metricas
+    completos = len([registro for registro in registros if registro[0] == PASOS[-1] and registro[1] == 200])
+    mediciones['total'] = {
+        'requests': len(registros),
+        'errores': len(errores),
+        'duracion_s': round(duracion, 3),
+        'ops_s': round(completos / duracion, 2) if duracion else None,
+        'rps': round(len(registros) / duracion, 2) if duracion else None,
+        **{clave: valor for clave, valor in resumen_ms([ms for _, _, ms, _ in registros]).items() if clave != 'n'},
+    }
+
+    for paso in PASOS:
+        metricas = mediciones[paso]
+        if metricas['n']:
+            print(f"   {paso:<22} {metricas['n']:>6} requests {metricas['p50_ms']:>9.1f} ms p50 "
+                  f"{metricas['p90_ms']:>9.1f} ms p90 {metricas['p99_ms']:>9.1f} ms p99 {metricas['errores']:>4} errores")
+    total = mediciones['total']
+    print(f"   {'total':<22} {completos} pagos en {total['duracion_s']:.1f}s: {total['ops_s']:,.1f} pagos/s, "
+          f"{total['rps']:,.1f} req/s, {total['errores']} errores")
+    for error in errores[:5]:
+        print(f"   ❌ {error}")
+    if len(errores) > 5:
+        print(f"   ... y {len(errores) - 5} errores más")
+    return mediciones
+
+
+def medir_clientes(tokens, rondas):
+    """
+    FCM e ImgBB desde este proceso: de a uno (como antes, con requests) contra a la
+    vez (cliente HTTP async). apuntar_a_simulados() ya se llamó.
+
+    Returns:
+        dict: {prueba: métricas de tiempo por operación}
+    """
+    from backend_exa2.http_asincrono import ejecutar
+    from inventario.almacenamiento_imagenes import ImgBBAlmacenamiento
+    from inventario.procesamiento_imagenes import publicar_variantes
+    from perfiles.fcm_service import FCMService
+
+    servicio = FCMService()
+    destinos = [f"token-benchmark-{indice}" for indice in range(tokens)]
+    almacenamiento = ImgBBAlmacenamiento()
+    generador = random.Random(3)
+    archivos = {
+        campo: (f"benchmark-{campo}.webp", generador.randbytes(tamano), 'image/webp')
+        for campo, tamano in (('imagen_miniatura', 8_000), ('imagen_mediana', 60_000), ('imagen', 250_000))
+    }
+
+    pruebas = {
+        'fcm.uno_por_uno': lambda: [
+            servicio.send_push_notification(token, 'Benchmark', 'Fan-out') for token in destinos
+        ],
+        'fcm.a_la_vez': lambda: ejecutar(servicio.send_push_to_tokens_async, destinos, 'Benchmark', 'Fan-out'),
+        'imgbb.uno_por_uno': lambda: [almacenamiento.guardar(*archivo) for archivo in archivos.values()],
+        'imgbb.a_la_vez': lambda: list(ejecutar(publicar_variantes, almacenamiento, archivos).values()),
+    }
+
+    mediciones = {}
+    for nombre, prueba in pruebas.items():
+        prueba()
+        tiempos, fallidos = [], 0
+        for _ in range(rondas):
+            inicio = time.perf_counter()
+            resultados = prueba()
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+            fallidos += sum(1 for resultado in resultados if isinstance(resultado, dict) and not resultado['success'])
+        mediciones[nombre] = {**resumen_ms(tiempos), 'errores': fallidos}
+        print(f"   {nombre:<22} {mediciones[nombre]['p50_ms']:>9.1f} ms p50 {mediciones[nombre]['max_ms']:>9.1f} ms máx "
+              f"{fallidos:>4} errores")
+    return mediciones
+
+
+def ejecutar(trabajo, base_datos=None, perfiles=tuple(PERFILES), workers=2, concurrencia=100, pagos=300,
+             calentamiento=20, latencia_ms=200, tokens=50, rondas=3):
+    """
+    Returns:
+        dict: {'<perfil>.<paso>': métricas, 'fcm.*' / 'imgbb.*': métricas}
+    """
+    from entorno import apuntar_a_simulados
+
+    carritos = preparar_carritos(50)
+    simulados, url_simulados = levantar_simulados(latencia_ms)
+    mediciones = {}
+    try:
+        for perfil in perfiles:
+            proceso, url = levantar_aplicacion(perfil, workers, url_simulados, trabajo, base_datos)
+            print(f"🚀 {perfil}: {workers} workers, {concurrencia} usuarios, {pagos} pagos, "
+                  f"servicios externos de {latencia_ms:.0f} ms")
+            try:
+                for paso, metricas in medir_perfil(url, carritos, concurrencia, pagos, calentamiento).items():
+                    mediciones[f"{perfil}.{paso}"] = metricas
+            finally:
+                detener(proceso)
+
+        print(f"📨 Llamadas desde un proceso: FCM a {tokens} dispositivos, 3 variantes a ImgBB")
+        apuntar_a_simulados(url_simulados)
+        mediciones.update(medir_clientes(tokens, rondas))
+    finally:
+        detener(simulados)
+
+    if all(f"{perfil}.total" in mediciones for perfil in ('wsgi', 'asgi')):
+        wsgi, asgi = mediciones['wsgi.total']['ops_s'], mediciones['asgi.total']['ops_s']
+        if wsgi:
+            print(f"⚖️ ASGI atiende {asgi / wsgi:.1f}x los pagos/s de WSGI con los mismos workers")
+    return mediciones
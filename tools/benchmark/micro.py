@@ -0,0 +1,88 @@
+"""
+Microbenchmarks de las funciones calientes.
+
+- interpretar_consulta: las consultas de ejemplo del parser de lenguaje natural
+- generar_excel / generar_pdf_tabla: reporte de `filas` productos
+- serializers: listado de productos, notas de venta con detalles e historial de
+  ventas con el serializer de DRF y con el serializador rápido
+
+Cada prueba se calibra como timeit (llamadas por ronda hasta ~0,2 s), se repite
+`rondas` veces y se informa el tiempo por llamada de cada ronda. Los datos de
+las pruebas de serializers se traen una vez y se serializan los objetos ya
+cargados; solo entran en la medición las consultas que el serializer hace por
+su cuenta (ej: cantidad_items del historial con DRF).
+"""
+import timeit
+
+from resultados import resumen_ms
+
+
+def _pruebas(filas):
+    from analitica.utils.excel_generator import generar_excel
+    from analitica.utils.nl_parser import generar_ejemplos_consultas, interpretar_consulta
+    from analitica.utils.pdf_generator import generar_pdf_tabla
+    from inventario.modelsProducto import Producto
+    from inventario.serializers.serializerProducto import PRODUCTO_RAPIDO, ProductoSerializer
+    from transacciones.modelsListadoHistoricoVentas import ListadoHistoricoVentas
+    from transacciones.modelsNotaDeVenta import NotaDeVenta
+    from transacciones.serializers.serializersListadoHistoricoVentas import (
+        HISTORIAL_VENTAS_RAPIDO, ListadoHistoricoVentasSimpleSerializer
+    )
+    from transacciones.serializers.serializersNotaDeVenta import NotaDeVentaSerializer
+
+    consultas = [consulta for ejemplos in generar_ejemplos_consultas().values() for consulta in ejemplos]
+
+    encabezados = ['Código', 'Nombre', 'Categoría', 'Precio', 'Stock']
+    datos = [
+        [codigo, nombre, categoria or '', f"{precio:.2f}", stock]
+        for codigo, nombre, categoria, precio, stock in Producto.objects.order_by('id').values_list(
+            'codigo', 'nombre', 'categoria__nombre', 'precio_venta', 'stock'
+        )[:filas]
+    ]
+
+    productos = list(Producto.objects.select_related('categoria').order_by('-fecha_creacion', '-id')[:filas])
+    productos_valores = list(PRODUCTO_RAPIDO.consulta(Producto.objects.order_by('-fecha_creacion', '-id'))[:filas])
+    notas = list(NotaDeVenta.objects.select_related('cliente').prefetch_related('detalles__producto')
+                 .order_by('-fecha', '-id')[:max(filas // 5, 1)])
+    historial = list(ListadoHistoricoVentas.objects.select_related('nota_venta', 'nota_venta__cliente')
+                     .order_by('-fecha_venta', '-nota_venta_id')[:filas])
+    historial_valores = list(HISTORIAL_VENTAS_RAPIDO.consulta(
+        ListadoHistoricoVentas.objects.order_by('-fecha_venta', '-nota_venta_id'))[:filas])
+
+    def interpretar_todas():
+        for consulta in consultas:
+            interpretar_consulta(consulta)
+
+    return {
+        f'interpretar_consulta x{len(consultas)}': interpretar_todas,
+        f'generar_excel {len(datos)} filas': lambda: generar_excel('Inventario', encabezados, datos),
+        f'generar_pdf_tabla {len(datos)} filas': lambda: generar_pdf_tabla(
+            'Inventario', 'Benchmark', encabezados, datos, {'Total': len(datos)}),
+        f'ProductoSerializer {len(productos)}': lambda: ProductoSerializer(productos, many=True).data,
+        f'PRODUCTO_RAPIDO {len(productos_valores)}': lambda: PRODUCTO_RAPIDO.convertir(productos_valores),
+        f'NotaDeVentaSerializer {len(notas)} con detalles': lambda: NotaDeVentaSerializer(notas, many=True).data,
+        f'ListadoHistoricoVentasSimpleSerializer {len(historial)}':
+            lambda: ListadoHistoricoVentasSimpleSerializer(historial, many=True).data,
+        f'HISTORIAL_VENTAS_RAPIDO {len(historial_valores)}': lambda: HISTORIAL_VENTAS_RAPIDO.convertir(historial_valores),
+    }
+
+
+def ejecutar(filas=200, rondas=5, filtro=None):
+    """
+    Returns:
+        dict: {prueba: métricas por llamada}
+    """
+    mediciones = {}
+    for nombre, funcion in _pruebas(filas).items():
+        if filtro and filtro.lower() not in nombre.lower():
+            continue
+        temporizador = timeit.Timer(funcion)
+        llamadas, _ = temporizador.autorange()
+        tiempos = [segundos * 1000 / llamadas for segundos in temporizador.repeat(repeat=rondas, number=llamadas)]
+        metricas = resumen_ms(tiempos)
+        metricas['llamadas_por_ronda'] = llamadas
+        metricas['ops_s'] = round(1000 / metricas['min_ms'], 2) if metricas['min_ms'] else None
+        mediciones[nombre] = metricas
+        print(f"   {nombre:<48} {metricas['min_ms']:>10.3f} ms (mín) {metricas['p50_ms']:>10.3f} ms (p50) "
+              f"{metricas['ops_s']:>10,.1f} ops/s")
+    return mediciones
@@ -0,0 +1,111 @@
+"""
+Resultados del benchmark en JSON comparable entre ejecuciones.
+
+Cada archivo lleva el entorno (commit, Python, Django, base de datos, CPUs), los
+parámetros de la ejecución y las mediciones. Las claves de las mediciones son
+estables (nombre de la prueba -> métricas), así `comparar` puede cruzar dos
+archivos de commits distintos.
+"""
+import json
+import os
+import platform
+import statistics
+import subprocess
+from datetime import datetime, timezone
+
+from entorno import RAIZ
+
+# Métricas en las que un valor más alto es mejor
+MAYOR_ES_MEJOR = ('ops_s', 'rps', 'ahorro_p50_ms')
+# Valores informativos que no se comparan
+NO_COMPARABLES = ('n', 'llamadas_por_ronda', 'requests', 'pool_en_uso', 'pool_libres', 'pool_abiertas')
+
+
+def percentil(valores, p):
+    """Percentil p (0-100) con interpolación lineal; None si no hay valores"""
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    posicion = (len(ordenados) - 1) * p / 100
+    inferior = int(posicion)
+    superior = min(inferior + 1, len(ordenados) - 1)
+    return ordenados[inferior] + (ordenados[superior] - ordenados[inferior]) * (posicion - inferior)
+
+
+def resumen_ms(valores):
+    """Estadísticas de una lista de tiempos en milisegundos"""
+    if not valores:
+        return {'n': 0}
+    return {
+        'n': len(valores),
+        'min_ms': round(min(valores), 3),
+        'p50_ms': round(percentil(valores, 50), 3),
+        'p90_ms': round(percentil(valores, 90), 3),
+        'p99_ms': round(percentil(valores, 99), 3),
+        'max_ms': round(max(valores), 3),
+        'media_ms': round(statistics.fmean(valores), 3),
+    }
+
+
+def _commit():
+    try:
+        salida = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=RAIZ, capture_output=True,
+                                text=True, timeout=10)
+        return salida.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def entorno():
+    import django
+    from django.db import connection
+    return {
+        'fecha': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': _commit(),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'base_datos': connection.vendor,
+        'plataforma': platform.platform(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def guardar(ruta, tipo, parametros, mediciones):
+    datos = {'tipo': tipo, 'entorno': entorno(), 'parametros': parametros, 'mediciones': mediciones}
+    carpeta = os.path.dirname(ruta)
+    if carpeta:
+        os.makedirs(carpeta, exist_ok=True)
+    with open(ruta, 'w', encoding='utf-8') as archivo:
+        json.dump(datos, archivo, ensure_ascii=False, indent=2)
+    return datos
+
+
+def comparar(ruta_base, ruta_nueva):
+    """Imprime, por prueba y métrica, la diferencia de la ejecución nueva respecto de la base"""
+    with open(ruta_base, encoding='utf-8') as archivo:
+        base = json.load(archivo)
+    with open(ruta_nueva, encoding='utf-8') as archivo:
+        nueva = json.load(archivo)
+
+    print(f"📊 {base['tipo']}: {base['entorno'].get('commit')} -> {nueva['entorno'].get('commit')}")
+    if base['parametros'] != nueva['parametros']:
+        print(f"⚠️ Parámetros distintos:\n   base  {base['parametros']}\n   nueva {nueva['parametros']}")
+
+    for prueba, metricas in nueva['mediciones'].items():
+        anteriores = base['mediciones'].get(prueba)
+        if anteriores is None:
+            print(f"\n{prueba} (nueva)")
+            continue
+        print(f"\n{prueba}")
+        for metrica, valor in metricas.items():
+            anterior = anteriores.get(metrica)
+            if not isinstance(valor, (int, float)) or not isinstance(anterior, (int, float)) or metrica in NO_COMPARABLES:
+                continue
+            if anterior == 0:
+                cambio = ''
+            else:
+                diferencia = (valor - anterior) / anterior * 100
+                mejora = diferencia > 0 if metrica.endswith(MAYOR_ES_MEJOR) else diferencia < 0
+                marca = '✅' if mejora and abs(diferencia) >= 5 else '❌' if abs(diferencia) >= 5 else '  '
+                cambio = f"{diferencia:+7.1f} % {marca}"
+            print(f"   {metrica:<14} {anterior:>12,.3f} -> {valor:>12,.3f}  {cambio}")
@@ -0,0 +1,93 @@
+"""
+Servidor simulado de Stripe, FCM e ImgBB para `ejecutar.py externos`.
+
+Aplicación ASGI (uvicorn la sirve en un proceso aparte) que responde lo que la
+aplicación usa de cada API real, después de esperar SIMULADOS_LATENCIA_MS:
+- Stripe: POST /v1/payment_intents, GET /v1/payment_intents/<id>,
+          POST /v1/payment_intents/<id>/confirm
+- FCM:    POST /v1/projects/<proyecto>/messages:send
+- ImgBB:  POST /1/upload
+
+La espera es un asyncio.sleep: atiende miles de llamadas a la vez sin ser el
+cuello de botella de la medición.
+"""
+import asyncio
+import itertools
+import json
+import os
+from urllib.parse import parse_qsl
+
+LATENCIA = float(os.environ.get('SIMULADOS_LATENCIA_MS', 200)) / 1000
+
+_intents = {}
+_contador = itertools.count(1)
+
+
+def _payment_intent(formulario):
+    numero = next(_contador)
+    intent = {
+        'id': f"pi_simulado_{numero}",
+        'object': 'payment_intent',
+        'client_secret': f"pi_simulado_{numero}_secret",
+        'amount': int(formulario.get('amount', 0)),
+        'amount_received': 0,
+        'currency': formulario.get('currency', 'usd'),
+        'metadata': {
+            clave[len('metadata['):-1]: valor for clave, valor in formulario.items() if clave.startswith('metadata[')
+        },
+        # Como un pago de prueba de la app móvil: confirm-payment-auto lo confirma
+        'status': 'requires_confirmation',
+    }
+    _intents[intent['id']] = intent
+    return intent
+
+
+def _confirmar(intent):
+    intent.update(status='succeeded', amount_received=intent['amount'])
+    return intent
+
+
+def _stripe(metodo, partes, cuerpo):
+    if metodo == 'POST' and partes == ['v1', 'payment_intents']:
+        return 200, _payment_intent(dict(parse_qsl(cuerpo.decode())))
+    if len(partes) >= 3 and partes[:2] == ['v1', 'payment_intents'] and partes[2] in _intents:
+        intent = _intents[partes[2]]
+        if metodo == 'GET' and len(partes) == 3:
+            return 200, intent
+        if metodo == 'POST' and partes[3:] == ['confirm']:
+            return 200, _confirmar(intent)
+    return 404, {'error': {'type': 'invalid_request_error', 'message': 'No such payment_intent'}}
+
+
+async def _leer_cuerpo(receive):
+    cuerpo = b''
+    while True:
+        mensaje = await receive()
+        cuerpo += mensaje.get('body', b'')
+        if not mensaje.get('more_body'):
+            return cuerpo
+
+
+async def aplicacion(scope, receive, send):
+    if scope['type'] != 'http':
+        return
+    cuerpo = await _leer_cuerpo(receive)
+    await asyncio.sleep(LATENCIA)
+
+    partes = [parte for parte in scope['path'].split('/') if parte]
+    if partes[:2] == ['v1', 'projects'] and scope['path'].endswith('/messages:send'):
+        estado, datos = 200, {'name': f"projects/{partes[2]}/messages/{next(_contador)}"}
+    elif partes == ['1', 'upload']:
+        estado, datos = 200, {'data': {'url': f"https://i.ibb.co/simulado/{next(_contador)}.webp"}, 'success': True}
+    elif partes[:1] == ['v1']:
+        estado, datos = _stripe(scope['method'], partes, cuerpo)
+    else:
+        estado, datos = 404, {'error': 'Ruta no simulada'}
+
+    contenido = json.dumps(datos).encode()
+    await send({
+        'type': 'http.response.start',
+        'status': estado,
+        'headers': [(b'content-type', b'application/json'), (b'content-length', str(len(contenido)).encode())],
+    })
+    await send({'type': 'http.response.body', 'body': contenido})
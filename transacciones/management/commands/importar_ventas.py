@@ -0,0 +1,374 @@
+"""
+Importa ventas históricas (notas de venta, detalles, pagos e histórico) desde un CSV.
+
+Columnas esperadas (una fila por producto vendido; las filas de una venta pueden estar en cualquier orden):
+    venta_id,cliente_ci,producto_codigo,cantidad,metodo_pago,moneda,referencia_pago[,fecha]
+
+Si el CSV no trae la columna `fecha`, a cada venta se le asigna una fecha aleatoria
+(reproducible con --semilla) dentro del rango --desde / --hasta.
+
+Las ventas cuya referencia_pago ya existe se omiten, por lo que el comando se puede
+volver a ejecutar sobre el mismo archivo. Si dos ventas del CSV comparten referencia_pago
+se importa solo la primera, sin importar cuántos procesos se usen. Igual que el script original, las ventas
+históricas no descuentan stock ni envían notificaciones.
+
+Uso:
+    python manage.py importar_ventas historial_ventas.csv
+    python manage.py importar_ventas ventas_2024.csv --lote 2000 --procesos 4
+"""
+import csv
+import multiprocessing
+import random
+import time
+import zlib
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, connections, transaction
+from django.utils.dateparse import parse_date, parse_datetime
+from inventario.modelsProducto import Producto
+from perfiles.models import Cliente
+from transacciones.modelsDetalleNotaDeVenta import DetalleNotaDeVenta
+from transacciones.modelsListadoHistoricoVentas import ListadoHistoricoVentas
+from transacciones.modelsNotaDeVenta import NotaDeVenta
+from transacciones.modelsPago import Pago
+
+CENTAVOS = Decimal('0.01')
+# Máximo de advertencias que se guardan por proceso para el resumen final
+MAX_MENSAJES = 500
+# Columnas sin las que no se puede armar una venta
+COLUMNAS_REQUERIDAS = ('venta_id', 'cliente_ci', 'producto_codigo', 'cantidad', 'referencia_pago')
+
+# Datos de solo lectura compartidos con los procesos hijos (se heredan con fork)
+_contexto = {}
+
+
+class Command(BaseCommand):
+    help = 'Importa ventas históricas desde un CSV usando inserciones por lotes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('archivo', help='Ruta del CSV de ventas')
+        parser.add_argument('--lote', type=int, default=1000, help='Ventas por transacción (por defecto 1000)')
+        parser.add_argument(
+            '--procesos', type=int, default=1,
+            help='Procesos en paralelo, repartiendo las ventas por venta_id (recomendado solo con PostgreSQL)'
+        )
+        parser.add_argument('--desde', default='2025-09-01', help='Inicio del rango de fechas aleatorias (YYYY-MM-DD)')
+        parser.add_argument('--hasta', default='2025-10-31', help='Fin del rango de fechas aleatorias (YYYY-MM-DD)')
+        parser.add_argument('--semilla', default='historial', help='Semilla para las fechas aleatorias')
+        parser.add_argument('--encoding', default='utf-8', help='Codificación del archivo (por defecto utf-8)')
+
+    def handle(self, *args, **options):
+        if options['lote'] <= 0 or options['procesos'] <= 0:
+            raise CommandError("--lote y --procesos deben ser mayores a 0")
+
+        desde, hasta = parse_date(options['desde']), parse_date(options['hasta'])
+        if not desde or not hasta or desde > hasta:
+            raise CommandError("Rango de fechas inválido")
+
+        inicio = time.perf_counter()
+        self.precargar(options, desde, hasta)
+        self.stdout.write(
+            f"📚 Precargados {len(_contexto['clientes'])} clientes, {len(_contexto['productos'])} productos "
+            f"y {len(_contexto['referencias'])} referencias de pago"
+        )
+        if _contexto['duplicadas']:
+            self.stdout.write(
+                f"🔁 {len(_contexto['duplicadas'])} ventas repiten la referencia_pago de otra venta del archivo y se omitirán"
+            )
+
+        procesos = options['procesos']
+        if procesos == 1:
+            resultados = [importar_fragmento(0, 1)]
+        else:
+            # Cada proceso abre sus propias conexiones: cerrar las del padre antes de hacer fork
+            connections.close_all()
+            with multiprocessing.get_context('fork').Pool(procesos) as pool:
+                resultados = pool.starmap(importar_fragmento, [(indice, procesos) for indice in range(procesos)])
+
+        totales = {clave: sum(r[clave] for r in resultados) for clave in resultados[0] if clave != 'mensajes'}
+        for resultado in resultados:
+            for mensaje in resultado['mensajes']:
+                self.stderr.write(mensaje)
+
+        duracion = time.perf_counter() - inicio
+        velocidad = totales['lineas'] / duracion if duracion > 0 else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Importación finalizada: {totales['ventas']} ventas y {totales['detalles']} detalles creados, "
+            f"{totales['omitidas']} ya existentes, {totales['rechazadas']} rechazadas "
+            f"en {duracion:.2f}s ({velocidad:,.0f} líneas/s)"
+        ))
+
+    def precargar(self, options, desde, hasta):
+        """Carga en memoria todo lo que se consulta por fila"""
+        clientes = {}
+        for cliente in Cliente.objects.filter(ci__isnull=False).values(
+            'id', 'ci', 'nombre', 'apellido', 'usuario_id', 'usuario__email'
+        ).iterator(chunk_size=5000):
+            clientes[cliente['ci']] = cliente
+
+        productos = {
+            codigo: (producto_id, precio_venta)
+            for producto_id, codigo, precio_venta in Producto.objects.values_list('id', 'codigo', 'precio_venta').iterator(chunk_size=5000)
+        }
+
+        duplicadas = self.buscar_duplicadas(options['archivo'], options['encoding'])
+
+        _contexto.update({
+            'archivo': options['archivo'],
+            'encoding': options['encoding'],
+            'lote': options['lote'],
+            'semilla': options['semilla'],
+            'desde': int(datetime(desde.year, desde.month, desde.day, tzinfo=dt_timezone.utc).timestamp()),
+            'hasta': int(datetime(hasta.year, hasta.month, hasta.day, 23, 59, 59, tzinfo=dt_timezone.utc).timestamp()),
+            # Prefijo común a todos los procesos para los números de comprobante
+            'prefijo': f"NV-H{int(time.time())}",
+            'clientes': clientes,
+            'productos': productos,
+            'referencias': set(Pago.objects.values_list('total_stripe', flat=True).iterator(chunk_size=10000)),
+            'duplicadas': duplicadas,
+        })
+
+    def buscar_duplicadas(self, archivo, encoding):
+        """
+        Ventas que repiten la referencia_pago de una venta anterior del archivo.
+        Se resuelve antes de repartir: las ventas se reparten por venta_id y dos procesos
+        distintos no verían la referencia del otro (total_stripe es único en Pago).
+        """
+        try:
+            with open(archivo, newline='', encoding=encoding) as csvfile:
+                lector = csv.DictReader(csvfile)
+                faltantes = [columna for columna in COLUMNAS_REQUERIDAS if columna not in (lector.fieldnames or ())]
+                if faltantes:
+                    raise CommandError(f"Al CSV le faltan las columnas: {', '.join(faltantes)}")
+
+                # La referencia de una venta es la de su primera fila, igual que en preparar_venta
+                vistas, referencias, duplicadas = set(), set(), set()
+                for row in lector:
+                    venta_id = row['venta_id']
+                    if venta_id in vistas:
+                        continue
+                    vistas.add(venta_id)
+                    referencia = (row['referencia_pago'] or '').strip()
+                    if referencia in referencias:
+                        duplicadas.add(venta_id)
+                    elif referencia:
+                        referencias.add(referencia)
+        except OSError as e:
+            raise CommandError(f"No se pudo abrir el archivo: {e}")
+        return duplicadas
+
+
+def fragmento_de(venta_id, procesos):
+    """Proceso al que pertenece una venta (estable entre ejecuciones)"""
+    if venta_id.isdigit():
+        return int(venta_id) % procesos
+    return zlib.crc32(venta_id.encode()) % procesos
+
+
+def asignar_fechas(modelo, fechas):
+    """
+    Sobrescribe el campo `fecha` (auto_now_add) con la fecha histórica.
+    Un UPDATE parametrizado con executemany es mucho más rápido que bulk_update (CASE WHEN).
+
+    Args:
+        modelo: NotaDeVenta o Pago
+        fechas: lista de tuplas (fecha, pk)
+    """
+    connection = connections[modelo.objects.db]
+    campo = modelo._meta.get_field('fecha')
+    tabla = connection.ops.quote_name(modelo._meta.db_table)
+    columna_fecha = connection.ops.quote_name(campo.column)
+    columna_pk = connection.ops.quote_name(modelo._meta.pk.column)
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"UPDATE {tabla} SET {columna_fecha} = %s WHERE {columna_pk} = %s",
+            [(campo.get_db_prep_value(fecha, connection), pk) for fecha, pk in fechas]
+        )
+
+
+def importar_fragmento(indice, procesos):
+    """
+    Importa las ventas del CSV que corresponden a este proceso.
+
+    Returns:
+        dict: Contadores de la importación y mensajes de filas rechazadas
+    """
+    importador = ImportadorVentas()
+    try:
+        with open(_contexto['archivo'], newline='', encoding=_contexto['encoding']) as csvfile:
+            # Se agrupa el archivo completo: las filas de una venta pueden no estar contiguas
+            ventas = {}
+            for row in csv.DictReader(csvfile):
+                if fragmento_de(row['venta_id'], procesos) == indice:
+                    ventas.setdefault(row['venta_id'], []).append(row)
+
+            lote = []
+            for venta_id, filas in ventas.items():
+                importador.resultado['lineas'] += len(filas)
+                venta = importador.preparar_venta(venta_id, filas)
+                if venta:
+                    lote.append(venta)
+                if len(lote) >= _contexto['lote']:
+                    importador.guardar_lote(lote)
+                    lote = []
+            if lote:
+                importador.guardar_lote(lote)
+    except OSError as e:
+        raise CommandError(f"No se pudo abrir el archivo: {e}")
+    finally:
+        if procesos > 1:
+            connections.close_all()
+    return importador.resultado
+
+
+class ImportadorVentas:
+    """Convierte grupos de filas en ventas y las guarda por lotes"""
+
+    def __init__(self):
+        self.resultado = {'lineas': 0, 'ventas': 0, 'detalles': 0, 'omitidas': 0, 'rechazadas': 0, 'mensajes': []}
+        self.referencias = _contexto['referencias']
+
+    def avisar(self, mensaje):
+        if len(self.resultado['mensajes']) < MAX_MENSAJES:
+            self.resultado['mensajes'].append(mensaje)
+
+    def rechazar(self, mensaje):
+        self.resultado['rechazadas'] += 1
+        self.avisar(f"❌ {mensaje}")
+
+    def fecha_venta(self, venta_id, fila):
+        valor = (fila.get('fecha') or '').strip()
+        if valor:
+            fecha = parse_datetime(valor)
+            if fecha is None and parse_date(valor):
+                fecha = datetime.combine(parse_date(valor), datetime.min.time())
+            if fecha is not None:
+                return fecha if fecha.tzinfo else fecha.replace(tzinfo=dt_timezone.utc)
+        # Fecha aleatoria, pero siempre la misma para la misma venta
+        generador = random.Random(f"{_contexto['semilla']}-{venta_id}")
+        return datetime.fromtimestamp(generador.randint(_contexto['desde'], _contexto['hasta']), tz=dt_timezone.utc)
+
+    def preparar_venta(self, venta_id, filas):
+        """Valida una venta y arma sus objetos en memoria (sin tocar la base de datos)"""
+        primera_fila = filas[0]
+        referencia = (primera_fila.get('referencia_pago') or '').strip()
+        if not referencia:
+            self.rechazar(f"Venta {venta_id}: falta referencia_pago")
+            return None
+        if referencia in self.referencias or venta_id in _contexto['duplicadas']:
+            self.resultado['omitidas'] += 1
+            return None
+
+        cliente = _contexto['clientes'].get(primera_fila['cliente_ci'])
+        if cliente is None:
+            self.rechazar(f"Venta {venta_id}: cliente con CI {primera_fila['cliente_ci']} no encontrado")
+            return None
+        if not cliente['usuario_id']:
+            self.rechazar(f"Venta {venta_id}: el cliente {cliente['nombre']} no tiene usuario asignado")
+            return None
+
+        detalles = []
+        for fila in filas:
+            producto = _contexto['productos'].get(fila['producto_codigo'])
+            try:
+                cantidad = int(fila['cantidad'])
+            except (TypeError, ValueError):
+                cantidad = 0
+            if producto is None or cantidad <= 0:
+                self.avisar(
+                    f"⚠️ Venta {venta_id}: detalle omitido ({fila['producto_codigo']} x {fila['cantidad']})"
+                )
+                continue
+            producto_id, precio_venta = producto
+            subtotal = (precio_venta * cantidad).quantize(CENTAVOS)
+            detalles.append(DetalleNotaDeVenta(
+                producto_id=producto_id,
+                codigo=fila['producto_codigo'],
+                cantidad=cantidad,
+                subtotal=subtotal,
+                total=subtotal,
+            ))
+
+        if not detalles:
+            self.rechazar(f"Venta {venta_id}: no tiene productos válidos")
+            return None
+
+        self.referencias.add(referencia)
+        total = sum(detalle.subtotal for detalle in detalles)
+        return {
+            'venta_id': venta_id,
+            'cliente': cliente,
+            'fecha': self.fecha_venta(venta_id, primera_fila),
+            'metodo_pago': primera_fila.get('metodo_pago') or 'Stripe',
+            'moneda': primera_fila.get('moneda') or 'BOB',
+            'referencia': referencia,
+            'total': total,
+            'detalles': detalles,
+        }
+
+    def guardar_lote(self, ventas):
+        """Inserta un lote de ventas completo en una sola transacción; si falla, se rechaza el lote entero"""
+        try:
+            detalles = self.insertar_lote(ventas)
+        except IntegrityError as e:
+            self.resultado['rechazadas'] += len(ventas)
+            self.avisar(
+                f"❌ Lote de {len(ventas)} ventas ({ventas[0]['venta_id']} … {ventas[-1]['venta_id']}) "
+                f"descartado por un conflicto en la base de datos: {e}"
+            )
+            return
+        self.resultado['ventas'] += len(ventas)
+        self.resultado['detalles'] += len(detalles)
+
+    def insertar_lote(self, ventas):
+        """Inserta las notas, detalles, pagos e histórico del lote y devuelve los detalles creados"""
+        with transaction.atomic():
+            notas = NotaDeVenta.objects.bulk_create([
+                NotaDeVenta(
+                    numero_comprobante=f"{_contexto['prefijo']}-{venta['venta_id']}",
+                    cliente_id=venta['cliente']['id'],
+                    estado='pagada',
+                    subtotal=venta['total'],
+                    total=venta['total'],
+                )
+                for venta in ventas
+            ])
+
+            detalles, pagos, historial = [], [], []
+            for nota, venta in zip(notas, ventas):
+                # auto_now_add pisa la fecha al insertar, se corrige con asignar_fechas más abajo
+                nota.fecha = venta['fecha']
+                for detalle in venta['detalles']:
+                    detalle.nota_venta_id = nota.pk
+                    detalles.append(detalle)
+                pagos.append(Pago(
+                    nota_venta_id=nota.pk,
+                    monto=venta['total'],
+                    moneda=venta['moneda'],
+                    total_stripe=venta['referencia'],
+                ))
+                cliente = venta['cliente']
+                historial.append(ListadoHistoricoVentas(
+                    nota_venta_id=nota.pk,
+                    cliente_nombre=f"{cliente['nombre']} {cliente['apellido'] or ''}".strip(),
+                    cliente_ci=cliente['ci'],
+                    cliente_email=cliente['usuario__email'] or None,
+                    numero_venta=nota.numero_comprobante,
+                    fecha_venta=venta['fecha'],
+                    subtotal=venta['total'],
+                    total=venta['total'],
+                    fecha_pago=venta['fecha'],
+                    referencia_pago=venta['referencia'],
+                    metodo_pago=venta['metodo_pago'],
+                    estado_pago='completado',
+                ))
+
+            DetalleNotaDeVenta.objects.bulk_create(detalles, batch_size=5000)
+            Pago.objects.bulk_create(pagos)
+            ListadoHistoricoVentas.objects.bulk_create(historial)
+
+            fechas = [(nota.fecha, nota.pk) for nota in notas]
+            asignar_fechas(NotaDeVenta, fechas)
+            asignar_fechas(Pago, fechas)
+        return detalles
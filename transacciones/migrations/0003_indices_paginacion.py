@@ -0,0 +1,30 @@
+# Generated by Django 5.2.7 on 2026-10-19 03:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('perfiles', '0005_indices_cliente_empleado_nombre'),
+        ('transacciones', '0002_alter_listadohistoricoventas_cliente_ci'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='listadohistoricoventas',
+            name='transaccion_fecha_v_697ca6_idx',
+        ),
+        migrations.AddIndex(
+            model_name='listadohistoricoventas',
+            index=models.Index(fields=['-fecha_venta', '-nota_venta'], name='transaccion_fecha_v_570217_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notadeventa',
+            index=models.Index(fields=['-fecha', '-id'], name='transaccion_fecha_09a7ca_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pago',
+            index=models.Index(fields=['-fecha', '-nota_venta'], name='transaccion_fecha_70722b_idx'),
+        ),
+    ]
@@ -113,7 +113,7 @@ class ListadoHistoricoVentas(models.Model):
         verbose_name_plural = 'Listado Histórico de Ventas'
         ordering = ['-fecha_venta']
         indexes = [
-            models.Index(fields=['-fecha_venta']),
+            models.Index(fields=['-fecha_venta', '-nota_venta']),  # orden y paginación por cursor
             models.Index(fields=['estado_pago']),
             models.Index(fields=['cliente_ci']),
             models.Index(fields=['numero_venta']),
@@ -24,6 +24,10 @@ class NotaDeVenta(models.Model):
         verbose_name = 'Nota de Venta'
         verbose_name_plural = 'Notas de Venta'
         ordering = ['-fecha']
+        indexes = [
+            # Paginación por cursor del listado
+            models.Index(fields=['-fecha', '-id']),
+        ]
 
     def calcular_totales(self):
         """Calcula el subtotal y total de la nota de venta"""
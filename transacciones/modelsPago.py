@@ -1,6 +1,9 @@
+import logging
 from django.db import models
 from .modelsNotaDeVenta import NotaDeVenta
 
+logger = logging.getLogger(__name__)
+
 
 class Pago(models.Model):
     # Relación 1 a 1 con NotaDeVenta - La FK va en Pago
@@ -36,13 +39,18 @@ class Pago(models.Model):
         verbose_name = 'Pago'
         verbose_name_plural = 'Pagos'
         ordering = ['-fecha']
+        indexes = [
+            # Paginación por cursor del listado
+            models.Index(fields=['-fecha', '-nota_venta']),
+        ]
     
     def save(self, *args, **kwargs):
         """
         Al guardar el pago:
         1. Marca automáticamente la nota de venta como pagada
         2. Reduce el stock de los productos vendidos
-        3. Envía notificación a administradores
+        3. Actualiza el índice de productos comprados juntos y las métricas RFM del cliente
+        4. Envía notificación a administradores
         """
         # Verificar si es un nuevo pago (no una actualización)
         es_nuevo_pago = self.nota_venta_id and not Pago.objects.filter(nota_venta_id=self.nota_venta_id).exists()
@@ -56,6 +64,11 @@ class Pago(models.Model):
             # Reducir el stock de cada producto vendido
             if es_nuevo_pago:
                 self.reducir_stock_productos()
+
+                from inventario.relacionados import programar_registro_compra
+                from analitica.utils.rfm import programar_registro_compra_cliente
+                programar_registro_compra(self.nota_venta_id)
+                programar_registro_compra_cliente(self.nota_venta.cliente_id, self.nota_venta.total, self.fecha)
                 
                 # 🔔 ENVIAR NOTIFICACIÓN A ADMINISTRADORES
                 self.enviar_notificacion_admin()
@@ -64,20 +77,29 @@ class Pago(models.Model):
         """
         Reduce el stock de todos los productos en la nota de venta.
         Se ejecuta automáticamente al confirmar el pago.
+        Cada salida queda registrada en el kardex (MovimientoInventario).
         """
-        for detalle in self.nota_venta.detalles.all():
-            producto = detalle.producto
-            cantidad_vendida = detalle.cantidad
-            
-            # Validar que hay stock suficiente antes de reducir
-            if producto.stock >= cantidad_vendida:
-                producto.stock -= cantidad_vendida
-                producto.save()
-            else:
-                # Si no hay stock suficiente, registrar el error
-                # pero no detener el proceso (el pago ya se procesó)
-                print(f"ADVERTENCIA: Stock insuficiente para {producto.nombre}. "
-                      f"Stock actual: {producto.stock}, Cantidad vendida: {cantidad_vendida}")
+        from inventario.kardex import registrar_movimientos
+        from inventario.modelsMovimientoInventario import MovimientoInventario
+
+        detalles = list(self.nota_venta.detalles.select_related('producto'))
+        movimientos = [
+            MovimientoInventario(
+                producto_id=detalle.producto_id,
+                tipo='venta',
+                cantidad=-detalle.cantidad,
+                documento='nota_venta',
+                documento_id=str(self.nota_venta_id),
+            )
+            for detalle in detalles
+        ]
+
+        # Los productos sin stock suficiente no se descuentan, pero el pago ya se procesó
+        rechazados = registrar_movimientos(movimientos, permitir_negativo=False)
+        for detalle in detalles:
+            if detalle.producto_id in rechazados:
+                logger.warning(f"Stock insuficiente para {detalle.producto.nombre}. "
+                               f"Stock actual: {detalle.producto.stock}, Cantidad vendida: {detalle.cantidad}")
     
     def validar_monto(self):
         """
@@ -91,7 +113,7 @@ class Pago(models.Model):
         """
         try:
             from django.contrib.auth.models import User
-            from perfiles.fcm_service import send_push_to_user
+            from perfiles.fcm_service import send_push_to_users
             
             nota_venta = self.nota_venta
             cliente = nota_venta.cliente
@@ -116,22 +138,21 @@ class Pago(models.Model):
             titulo = "💰 Nueva venta realizada"
             cuerpo = f"{cliente_nombre} realizó una compra de {producto_texto} por un valor de Bs. {float(nota_venta.total):.2f}"
             
-            # Enviar a todos los administradores
+            # Enviar a todos los administradores (a la vez)
             admins = User.objects.filter(is_staff=True, is_active=True)
-            for admin in admins:
-                send_push_to_user(
-                    user=admin,
-                    title=titulo,
-                    body=cuerpo,
-                    data={
-                        'type': 'nueva_venta',
-                        'nota_venta_id': str(nota_venta.id),
-                        'screen': '/historial-ventas',
-                        'cliente_nombre': cliente_nombre,
-                        'total': str(nota_venta.total)
-                    }
-                )
-                print(f"📱 Notificación enviada al admin: {admin.username}")
+            send_push_to_users(
+                users=admins,
+                title=titulo,
+                body=cuerpo,
+                data={
+                    'type': 'nueva_venta',
+                    'nota_venta_id': str(nota_venta.id),
+                    'screen': '/historial-ventas',
+                    'cliente_nombre': cliente_nombre,
+                    'total': str(nota_venta.total)
+                }
+            )
+            logger.info("📱 Notificación de venta enviada a los administradores")
                 
         except Exception as e:
-            print(f"⚠️ Error enviando notificación admin: {str(e)}")
+            logger.warning(f"⚠️ Error enviando notificación admin: {str(e)}")
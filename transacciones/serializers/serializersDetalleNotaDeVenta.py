@@ -1,8 +1,10 @@
 from rest_framework import serializers
+from backend_exa2.campos import CamposDinamicosMixin
+from backend_exa2.serializacion import SerializadorRapido
 from transacciones.modelsDetalleNotaDeVenta import DetalleNotaDeVenta
 
 
-class DetalleNotaDeVentaSerializer(serializers.ModelSerializer):
+class DetalleNotaDeVentaSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     producto_nombre = serializers.CharField(source='producto.nombre', read_only=True)
     producto_codigo = serializers.CharField(source='producto.codigo', read_only=True)
     precio_unitario = serializers.DecimalField(
@@ -44,3 +46,18 @@ class DetalleNotaDeVentaSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("La cantidad debe ser mayor a 0.")
 
         return data
+
+
+# Listado rápido: mismo JSON que DetalleNotaDeVentaSerializer (el producto va en la misma consulta)
+DETALLE_NOTA_DE_VENTA_RAPIDO = SerializadorRapido(DetalleNotaDeVenta, [
+    'id',
+    'nota_venta',
+    'producto',
+    ('producto_nombre', 'producto__nombre'),
+    ('producto_codigo', 'producto__codigo'),
+    'codigo',
+    'cantidad',
+    ('precio_unitario', 'producto__precio_venta'),
+    'subtotal',
+    'total',
+])
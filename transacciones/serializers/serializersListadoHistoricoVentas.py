@@ -1,10 +1,13 @@
 from rest_framework import serializers
+from backend_exa2.campos import CamposDinamicosMixin
+from backend_exa2.serializacion import Anotado, SerializadorRapido, conteo_relacionado
+from transacciones.modelsDetalleNotaDeVenta import DetalleNotaDeVenta
 from transacciones.modelsListadoHistoricoVentas import ListadoHistoricoVentas
 from transacciones.modelsNotaDeVenta import NotaDeVenta
 from transacciones.modelsPago import Pago
 
 
-class ListadoHistoricoVentasSerializer(serializers.ModelSerializer):
+class ListadoHistoricoVentasSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     """
     Serializer completo para el Listado Histórico de Ventas.
     Incluye toda la información necesaria para visualizar el historial.
@@ -46,9 +49,17 @@ class ListadoHistoricoVentasSerializer(serializers.ModelSerializer):
             'ganancia_neta',
             'dias_desde_venta',
         ]
+        rutas_campos = {
+            'cantidad_items': ['nota_venta__detalles__id'],
+            'ganancia_neta': ['total'],
+            'dias_desde_venta': ['fecha_venta'],
+        }
     
     def get_cantidad_items(self, obj):
         """Obtiene la cantidad de items de la venta"""
+        # Anotado por el listado (conteo_relacionado): sin una consulta por fila
+        if hasattr(obj, 'items_anotados'):
+            return obj.items_anotados
         return obj.get_cantidad_items()
     
     def get_ganancia_neta(self, obj):
@@ -64,7 +75,7 @@ class ListadoHistoricoVentasSerializer(serializers.ModelSerializer):
         return None
 
 
-class ListadoHistoricoVentasSimpleSerializer(serializers.ModelSerializer):
+class ListadoHistoricoVentasSimpleSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     """
     Serializer simplificado para listados rápidos.
     Solo incluye los campos esenciales.
@@ -84,13 +95,31 @@ class ListadoHistoricoVentasSimpleSerializer(serializers.ModelSerializer):
             'metodo_pago',
             'cantidad_items',
         ]
+        rutas_campos = {'cantidad_items': ['nota_venta__detalles__id']}
     
     def get_cantidad_items(self, obj):
         """Obtiene la cantidad de items de la venta"""
+        # Anotado por el listado (conteo_relacionado): sin una consulta por fila
+        if hasattr(obj, 'items_anotados'):
+            return obj.items_anotados
         return obj.get_cantidad_items()
 
 
-class ListadoHistoricoVentasDetalleSerializer(serializers.ModelSerializer):
+# Listado rápido: mismo JSON que ListadoHistoricoVentasSimpleSerializer; la cantidad
+# de items sale de una subconsulta en vez de un COUNT por fila
+HISTORIAL_VENTAS_RAPIDO = SerializadorRapido(ListadoHistoricoVentas, [
+    'nota_venta',
+    'numero_venta',
+    'cliente_nombre',
+    'fecha_venta',
+    'total',
+    'estado_pago',
+    'metodo_pago',
+    Anotado('cantidad_items', conteo_relacionado(DetalleNotaDeVenta.objects, 'nota_venta', 'nota_venta')),
+])
+
+
+class ListadoHistoricoVentasDetalleSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     """
     Serializer detallado que incluye información de productos vendidos.
     """
@@ -128,6 +157,21 @@ class ListadoHistoricoVentasDetalleSerializer(serializers.ModelSerializer):
             'productos_vendidos',
             'ganancia_neta',
         ]
+        # Bloques que arman consultas propias: con ?fields= / ?expand= solo si se piden
+        expandibles = ['nota_venta_info', 'pago_info', 'productos_vendidos']
+        rutas_campos = {
+            'nota_venta_info': [
+                'nota_venta__numero_comprobante', 'nota_venta__estado', 'nota_venta__fecha',
+                'nota_venta__cliente__nombre', 'nota_venta__cliente__apellido', 'nota_venta__cliente__ci',
+            ],
+            'pago_info': ['nota_venta__pago__fecha', 'nota_venta__pago__monto', 'nota_venta__pago__moneda', 'nota_venta__pago__total_stripe'],
+            'productos_vendidos': [
+                'nota_venta__detalles__cantidad', 'nota_venta__detalles__codigo', 'nota_venta__detalles__subtotal',
+                'nota_venta__detalles__total', 'nota_venta__detalles__producto__nombre',
+                'nota_venta__detalles__producto__codigo',
+            ],
+            'ganancia_neta': ['total'],
+        }
     
     def get_nota_venta_info(self, obj):
         """Obtiene información detallada de la nota de venta"""
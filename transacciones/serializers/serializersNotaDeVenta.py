@@ -1,9 +1,11 @@
 from rest_framework import serializers
+from backend_exa2.campos import CamposDinamicosMixin
+from backend_exa2.serializacion import SerializadorRapido
 from transacciones.modelsNotaDeVenta import NotaDeVenta
 from transacciones.serializers.serializersDetalleNotaDeVenta import DetalleNotaDeVentaSerializer
 
 
-class NotaDeVentaSerializer(serializers.ModelSerializer):
+class NotaDeVentaSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     cliente_nombre = serializers.CharField(source='cliente.nombre', read_only=True)
     cliente_apellido = serializers.CharField(source='cliente.apellido', read_only=True)
     cliente_ci = serializers.CharField(source='cliente.ci', read_only=True)
@@ -25,6 +27,7 @@ class NotaDeVentaSerializer(serializers.ModelSerializer):
             'detalles'
         ]
         read_only_fields = ['fecha', 'subtotal', 'total']
+        expandibles = ['detalles']
 
     def validate_numero_comprobante(self, value):
         """Validar que el número de comprobante sea único"""
@@ -37,7 +40,7 @@ class NotaDeVentaSerializer(serializers.ModelSerializer):
         return value
 
 
-class NotaDeVentaSimpleSerializer(serializers.ModelSerializer):
+class NotaDeVentaSimpleSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     """Serializer sin detalles anidados, útil para listados"""
     cliente_nombre = serializers.CharField(source='cliente.nombre', read_only=True)
     cliente_apellido = serializers.CharField(source='cliente.apellido', read_only=True)
@@ -56,3 +59,17 @@ class NotaDeVentaSimpleSerializer(serializers.ModelSerializer):
             'total'
         ]
         read_only_fields = ['fecha', 'subtotal', 'total']
+
+
+# Listado rápido: mismo JSON que NotaDeVentaSimpleSerializer (el cliente va en la misma consulta)
+NOTA_DE_VENTA_RAPIDO = SerializadorRapido(NotaDeVenta, [
+    'id',
+    'numero_comprobante',
+    'fecha',
+    'estado',
+    'cliente',
+    ('cliente_nombre', 'cliente__nombre'),
+    ('cliente_apellido', 'cliente__apellido'),
+    'subtotal',
+    'total',
+])
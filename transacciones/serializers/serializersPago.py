@@ -1,9 +1,10 @@
 from rest_framework import serializers
+from backend_exa2.campos import CamposDinamicosMixin
 from transacciones.modelsPago import Pago
 from transacciones.modelsNotaDeVenta import NotaDeVenta
 
 
-class PagoSerializer(serializers.ModelSerializer):
+class PagoSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     # Campos de solo lectura de la nota de venta relacionada
     numero_comprobante = serializers.CharField(source='nota_venta.numero_comprobante', read_only=True)
     nota_venta_total = serializers.DecimalField(
@@ -75,7 +76,7 @@ class PagoSerializer(serializers.ModelSerializer):
         return value
 
 
-class PagoSimpleSerializer(serializers.ModelSerializer):
+class PagoSimpleSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     """Serializer simplificado para listados o referencias anidadas"""
     numero_comprobante = serializers.CharField(source='nota_venta.numero_comprobante', read_only=True)
     
@@ -1,3 +1,187 @@
-from django.test import TestCase
+import importlib.util
+import os
+import tempfile
+from decimal import Decimal
+from io import StringIO
+from types import SimpleNamespace
+from unittest import mock
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import IntegrityError
+from django.test import AsyncClient, TestCase, override_settings
+from django.urls import include, path, resolve
+from rest_framework.test import APIClient
+from backend_exa2 import pruebas_consultas
+from inventario.modelsProducto import Producto
+from perfiles.models import Cliente
+from transacciones.management.commands.importar_ventas import ImportadorVentas
+from transacciones.modelsNotaDeVenta import NotaDeVenta
+from transacciones.modelsPago import Pago
+from transacciones import viewsPagoAsincrono
 
-# Create your tests here.
+
+def _urls_asincronas():
+    """transacciones/urls.py evaluado con VISTAS_ASINCRONAS=True (la decisión se toma al importarlo)"""
+    spec = importlib.util.find_spec('transacciones.urls')
+    modulo = importlib.util.module_from_spec(spec)
+    with override_settings(VISTAS_ASINCRONAS=True):
+        spec.loader.exec_module(modulo)
+    return modulo.urlpatterns
+
+
+# URLconf de PagosAsincronosTest
+urlpatterns = [path('api/transacciones/', include(_urls_asincronas()))]
+
+
+class PresupuestoConsultasTest(pruebas_consultas.PresupuestoConsultasTestCase):
+    app = 'transacciones'
+    prefijo = '/api/transacciones/'
+    presupuestos = {
+        'api-root': 0,
+        'nota-venta-list': 1,
+        'nota-venta-list?rapido=false': 1,
+        'nota-venta-detail': 3,
+        'detalle-nota-venta-list': 1,
+        'detalle-nota-venta-list?rapido=false': 1,
+        'detalle-nota-venta-detail': 1,
+        'pago-list': 1,
+        'pago-detail': 1,
+        'pago-estadisticas': 2,
+        'pago-por-nota-venta?nota_venta_id={nota_venta_id}': 3,
+        'pago-verificar-monto': 1,
+        'historial-ventas-list': 1,
+        'historial-ventas-list?rapido=false': 1,
+        'historial-ventas-detail': 3,
+        'historial-ventas-estadisticas': 1,
+        'historial-ventas-por-cliente?ci={cliente_ci}': 1,
+        'historial-ventas-por-estado': 1,
+        'historial-ventas-por-fecha?inicio={desde}&fin={hasta}': 1,
+        'historial-ventas-recientes': 1,
+        'historial-ventas-top-clientes': 1,
+    }
+
+
+class ImportarVentasTest(TestCase):
+    """manage.py importar_ventas sobre un CSV pequeño"""
+
+    def setUp(self):
+        usuario = get_user_model().objects.create(username='cliente', email='cliente@prueba.local')
+        Cliente.objects.create(nombre='Ana', apellido='Rojas', ci='100', sexo='F', usuario=usuario)
+        for codigo, precio in (('PR-1', '10.00'), ('PR-2', '25.00')):
+            Producto.objects.create(codigo=codigo, nombre=codigo, descripcion='', precio_compra=Decimal('5.00'),
+                                    precio_venta=Decimal(precio), stock=50)
+
+    def importar(self, contenido):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False, encoding='utf-8') as archivo:
+            archivo.write(contenido)
+        self.addCleanup(os.remove, archivo.name)
+        salida, errores = StringIO(), StringIO()
+        call_command('importar_ventas', archivo.name, stdout=salida, stderr=errores)
+        return salida.getvalue(), errores.getvalue()
+
+    def test_filas_no_contiguas_de_una_venta(self):
+        csv = (
+            "venta_id,cliente_ci,producto_codigo,cantidad,metodo_pago,moneda,referencia_pago,fecha\n"
+            "1,100,PR-1,2,Stripe,BOB,pi_1,2025-09-10\n"
+            "2,100,PR-2,1,Stripe,BOB,pi_2,2025-09-11\n"
+            "1,100,PR-2,1,Stripe,BOB,pi_1,2025-09-10\n"
+            "3,999,PR-1,1,Stripe,BOB,pi_3,2025-09-12\n"
+        )
+        salida, errores = self.importar(csv)
+        self.assertIn("2 ventas y 3 detalles creados, 0 ya existentes, 1 rechazadas", salida)
+        self.assertIn("cliente con CI 999 no encontrado", errores)
+
+        nota = NotaDeVenta.objects.get(pago__total_stripe='pi_1')
+        self.assertEqual(nota.total, Decimal('45.00'))
+        self.assertEqual(sorted(nota.detalles.values_list('codigo', flat=True)), ['PR-1', 'PR-2'])
+        self.assertEqual(nota.fecha.date().isoformat(), '2025-09-10')
+        # Las ventas históricas no descuentan stock
+        self.assertEqual(Producto.objects.get(codigo='PR-1').stock, 50)
+
+        # Reejecutar sobre el mismo archivo no duplica
+        salida, _ = self.importar(csv)
+        self.assertIn("0 ventas y 0 detalles creados, 2 ya existentes", salida)
+        self.assertEqual(NotaDeVenta.objects.count(), 2)
+
+    def test_referencia_repetida_entre_ventas(self):
+        # Con --procesos 2 las ventas 1 y 2 caerían en procesos distintos: se decide antes de repartir
+        salida, _ = self.importar(
+            "venta_id,cliente_ci,producto_codigo,cantidad,metodo_pago,moneda,referencia_pago\n"
+            "1,100,PR-1,1,Stripe,BOB,pi_1\n"
+            "2,100,PR-2,1,Stripe,BOB,pi_1\n"
+            "3,100,PR-2,2,Stripe,BOB,pi_3\n"
+        )
+        self.assertIn("1 ventas repiten la referencia_pago", salida)
+        self.assertIn("2 ventas y 2 detalles creados, 1 ya existentes, 0 rechazadas", salida)
+        self.assertEqual(Pago.objects.get(total_stripe='pi_1').monto, Decimal('10.00'))
+
+    def test_csv_sin_venta_id(self):
+        with self.assertRaisesMessage(CommandError, "venta_id"):
+            self.importar("cliente_ci,producto_codigo,cantidad,referencia_pago\n100,PR-1,1,pi_1\n")
+
+    def test_lote_con_conflicto_se_rechaza(self):
+        with mock.patch.object(ImportadorVentas, 'insertar_lote', side_effect=IntegrityError('duplicado')):
+            salida, errores = self.importar(
+                "venta_id,cliente_ci,producto_codigo,cantidad,metodo_pago,moneda,referencia_pago\n"
+                "1,100,PR-1,1,Stripe,BOB,pi_1\n"
+                "2,100,PR-2,1,Stripe,BOB,pi_2\n"
+            )
+        self.assertIn("0 ventas y 0 detalles creados, 0 ya existentes, 2 rechazadas", salida)
+        self.assertIn("Lote de 2 ventas (1 … 2) descartado", errores)
+        self.assertFalse(NotaDeVenta.objects.exists())
+
+
+class StripeFalso:
+    """cliente_stripe() sin red: PaymentIntent.retrieve y retrieve_async devuelven `intent`"""
+
+    class error:
+        StripeError = type('StripeError', (Exception,), {})
+
+    def __init__(self, intent):
+        self.PaymentIntent = SimpleNamespace(retrieve=lambda _id: intent, retrieve_async=self.retrieve_async)
+        self.intent = intent
+
+    async def retrieve_async(self, payment_intent_id):
+        return self.intent
+
+
+@override_settings(VISTAS_ASINCRONAS=True, ROOT_URLCONF=__name__)
+class PagosAsincronosTest(TestCase):
+    """Vistas de viewsPagoAsincrono con AsyncClient: mismas respuestas que PagoViewSet"""
+
+    url = '/api/transacciones/pagos/confirm-payment/'
+
+    def stripe(self, estado):
+        intent = SimpleNamespace(id='pi_1', status=estado, amount_received=4550, metadata={})
+        return mock.patch('transacciones.viewsPagoAsincrono.cliente_stripe', return_value=StripeFalso(intent))
+
+    def test_rutas_async(self):
+        self.assertIs(resolve(self.url).func, viewsPagoAsincrono.confirm_payment)
+
+    async def test_json_invalido(self):
+        respuesta = await AsyncClient().post(self.url, 'no es json', content_type='application/json')
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertEqual(respuesta.json(), {"error": "El cuerpo no es un JSON válido"})
+
+    async def test_falta_payment_intent_id(self):
+        for url in (self.url, '/api/transacciones/pagos/confirm-payment-auto/'):
+            with self.subTest(url=url):
+                respuesta = await AsyncClient().post(url, {}, content_type='application/json')
+                self.assertEqual(respuesta.status_code, 400)
+                self.assertEqual(respuesta.json(), {"error": "Se requiere payment_intent_id"})
+
+    async def test_misma_respuesta_que_el_viewset(self):
+        for estado, codigo in (('succeeded', 200), ('requires_payment_method', 400)):
+            with self.subTest(estado=estado), self.stripe(estado) as stripe_async:
+                asincrona = await AsyncClient().post(self.url, {'payment_intent_id': 'pi_1'}, content_type='application/json')
+                with mock.patch('transacciones.viewsPago.cliente_stripe', return_value=stripe_async.return_value):
+                    with override_settings(ROOT_URLCONF='backend_exa2.urls'):
+                        sincrona = await sync_to_async(APIClient().post)(
+                            self.url, {'payment_intent_id': 'pi_1'}, format='json'
+                        )
+                self.assertEqual(asincrona.status_code, codigo)
+                self.assertEqual(sincrona.status_code, codigo)
+                self.assertEqual(asincrona.json(), sincrona.json())
+                self.assertEqual(asincrona.json()['status'], estado)
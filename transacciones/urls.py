@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from transacciones.viewsNotaDeVenta import NotaDeVentaViewSet
@@ -11,6 +12,19 @@ router.register(r'detalle-nota-venta', DetalleNotaDeVentaViewSet, basename='deta
 router.register(r'pagos', PagoViewSet, basename='pago')
 router.register(r'historial-ventas', ListadoHistoricoVentasViewSet, basename='historial-ventas')
 
-urlpatterns = [
+urlpatterns = []
+
+if settings.VISTAS_ASINCRONAS:
+    # Despliegue ASGI: los pagos con Stripe con vistas async, en las mismas rutas del router
+    from transacciones import viewsPagoAsincrono
+
+    urlpatterns += [
+        path('pagos/create-payment-intent/', viewsPagoAsincrono.create_payment_intent,
+             name='pago-create-payment-intent'),
+        path('pagos/confirm-payment/', viewsPagoAsincrono.confirm_payment, name='pago-confirm-payment'),
+        path('pagos/confirm-payment-auto/', viewsPagoAsincrono.confirm_payment_auto, name='pago-confirm-payment-auto'),
+    ]
+
+urlpatterns += [
     path('', include(router.urls)),
 ]
@@ -1,19 +1,27 @@
+import logging
 from rest_framework import viewsets, status
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 from django.core.exceptions import ValidationError
 from transacciones.modelsDetalleNotaDeVenta import DetalleNotaDeVenta
-from transacciones.serializers.serializersDetalleNotaDeVenta import DetalleNotaDeVentaSerializer
+from backend_exa2.campos import ConsultaCamposMixin
+from backend_exa2.serializacion import ListadoRapidoMixin
+from transacciones.serializers.serializersDetalleNotaDeVenta import (
+    DETALLE_NOTA_DE_VENTA_RAPIDO, DetalleNotaDeVentaSerializer
+)
 
+logger = logging.getLogger(__name__)
 
-class DetalleNotaDeVentaViewSet(viewsets.ModelViewSet):
+
+class DetalleNotaDeVentaViewSet(ListadoRapidoMixin, ConsultaCamposMixin, viewsets.ModelViewSet):
     """
     ViewSet para gestionar los detalles de nota de venta.
     Permite agregar, actualizar y eliminar productos de una nota de venta.
     Valida stock automáticamente y recalcula totales.
     """
-    queryset = DetalleNotaDeVenta.objects.all()
+    queryset = DetalleNotaDeVenta.objects.select_related('producto')
     serializer_class = DetalleNotaDeVentaSerializer
+    serializador_rapido = DETALLE_NOTA_DE_VENTA_RAPIDO
     permission_classes = [AllowAny]
 
     def get_queryset(self):
@@ -93,15 +101,15 @@ class DetalleNotaDeVentaViewSet(viewsets.ModelViewSet):
 
     def list(self, request, *args, **kwargs):
         """
-        Listar detalles con filtrado por nota_venta
+        Listar detalles con filtrado por nota_venta (paginado, camino rápido de ListadoRapidoMixin)
         """
-        queryset = self.get_queryset()
-        serializer = self.get_serializer(queryset, many=True)
-        
-        # Log para debug
+        response = super().list(request, *args, **kwargs)
+
+        # Log para debug (sin COUNT extra: se cuentan los de la página)
         nota_venta_id = request.query_params.get('nota_venta', None)
         if nota_venta_id:
-            print(f"📋 Filtrando detalles para nota_venta_id: {nota_venta_id}")
-            print(f"📦 Detalles encontrados: {queryset.count()}")
-        
-        return Response(serializer.data)
+            detalles = response.data.get('results', response.data) if isinstance(response.data, dict) else response.data
+            logger.debug(f"📋 Filtrando detalles para nota_venta_id: {nota_venta_id}")
+            logger.debug(f"📦 Detalles en la página: {len(detalles)}")
+
+        return response
@@ -5,12 +5,17 @@ from rest_framework.permissions import AllowAny
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 from django.db.models import Q
+from backend_exa2.campos import ConsultaCamposMixin
+from backend_exa2.instrumentacion import serializar
+from backend_exa2.serializacion import ListadoRapidoMixin, conteo_relacionado
 from datetime import datetime, timedelta
+from transacciones.modelsDetalleNotaDeVenta import DetalleNotaDeVenta
 from transacciones.modelsListadoHistoricoVentas import ListadoHistoricoVentas
 from transacciones.modelsNotaDeVenta import NotaDeVenta
 from transacciones.serializers.serializersListadoHistoricoVentas import (
     ListadoHistoricoVentasSerializer,
     ListadoHistoricoVentasSimpleSerializer,
+    HISTORIAL_VENTAS_RAPIDO,
     ListadoHistoricoVentasDetalleSerializer,
     EstadisticasVentasSerializer,
     CrearHistorialVentaSerializer,
@@ -19,7 +24,7 @@ from transacciones.serializers.serializersListadoHistoricoVentas import (
 
 
 @method_decorator(csrf_exempt, name='dispatch')
-class ListadoHistoricoVentasViewSet(viewsets.ModelViewSet):
+class ListadoHistoricoVentasViewSet(ListadoRapidoMixin, ConsultaCamposMixin, viewsets.ModelViewSet):
     """
     ViewSet para gestionar el Listado Histórico de Ventas.
     
@@ -42,6 +47,7 @@ class ListadoHistoricoVentasViewSet(viewsets.ModelViewSet):
     
     queryset = ListadoHistoricoVentas.objects.select_related('nota_venta', 'nota_venta__cliente').all()
     serializer_class = ListadoHistoricoVentasSerializer
+    serializador_rapido = HISTORIAL_VENTAS_RAPIDO
     permission_classes = [AllowAny]
     
     # Filtros y búsqueda
@@ -49,6 +55,7 @@ class ListadoHistoricoVentasViewSet(viewsets.ModelViewSet):
     search_fields = ['numero_venta', 'cliente_nombre', 'cliente_ci', 'referencia_pago']
     ordering_fields = ['fecha_venta', 'total', 'estado_pago']
     ordering = ['-fecha_venta']  # Por defecto ordenar por fecha descendente
+    ordering_cursor = ['-fecha_venta', '-pk']  # Paginación por cursor (índice fecha_venta, nota_venta)
     
     def get_serializer_class(self):
         """Usa diferentes serializers según la acción"""
@@ -101,22 +108,23 @@ class ListadoHistoricoVentasViewSet(viewsets.ModelViewSet):
         if monto_max:
             queryset = queryset.filter(total__lte=monto_max)
         
+        # cantidad_items con el serializer de DRF (?rapido=false): un COUNT por fila de la página en la misma consulta
+        if self.action == 'list' and not getattr(self, 'listado_rapido', False):
+            queryset = queryset.annotate(
+                items_anotados=conteo_relacionado(DetalleNotaDeVenta.objects, 'nota_venta', 'nota_venta')
+            )
+        # Detalle: pago y productos vendidos sin una consulta por producto
+        elif self.action == 'retrieve':
+            queryset = queryset.select_related('nota_venta__pago').prefetch_related('nota_venta__detalles__producto')
+        
         return queryset
     
     def list(self, request, *args, **kwargs):
         """
         Lista todas las ventas históricas con filtros opcionales
+        (camino rápido de ListadoRapidoMixin, ?rapido=false usa el serializer)
         """
-        queryset = self.filter_queryset(self.get_queryset())
-        
-        # Paginación
-        page = self.paginate_queryset(queryset)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-        
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        return super().list(request, *args, **kwargs)
     
     def retrieve(self, request, *args, **kwargs):
         """
@@ -124,7 +132,7 @@ class ListadoHistoricoVentasViewSet(viewsets.ModelViewSet):
         """
         instance = self.get_object()
         serializer = self.get_serializer(instance)
-        return Response(serializer.data)
+        return Response(serializar(serializer))
     
     def create(self, request, *args, **kwargs):
         """
@@ -225,13 +233,12 @@ class ListadoHistoricoVentasViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        ventas = ListadoHistoricoVentas.obtener_ventas_por_cliente(cliente_ci)
-        serializer = ListadoHistoricoVentasSimpleSerializer(ventas, many=True)
+        ventas = HISTORIAL_VENTAS_RAPIDO.serializar(ListadoHistoricoVentas.obtener_ventas_por_cliente(cliente_ci))
         
         return Response({
             "cliente_ci": cliente_ci,
-            "total_ventas": ventas.count(),
-            "ventas": serializer.data
+            "total_ventas": len(ventas),
+            "ventas": ventas
         })
     
     @action(detail=False, methods=['get'], url_path='por_fecha')
@@ -263,14 +270,13 @@ class ListadoHistoricoVentasViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        ventas = ListadoHistoricoVentas.obtener_ventas_por_fecha(fecha_inicio, fecha_fin)
-        serializer = ListadoHistoricoVentasSimpleSerializer(ventas, many=True)
+        ventas = HISTORIAL_VENTAS_RAPIDO.serializar(ListadoHistoricoVentas.obtener_ventas_por_fecha(fecha_inicio, fecha_fin))
         
         return Response({
             "fecha_inicio": fecha_inicio.date(),
             "fecha_fin": fecha_fin.date(),
-            "total_ventas": ventas.count(),
-            "ventas": serializer.data
+            "total_ventas": len(ventas),
+            "ventas": ventas
         })
     
     @action(detail=False, methods=['get'], url_path='recientes')
@@ -285,12 +291,12 @@ class ListadoHistoricoVentasViewSet(viewsets.ModelViewSet):
         """
         limit = int(request.query_params.get('limit', 10))
         
-        ventas = self.get_queryset()[:limit]
-        serializer = ListadoHistoricoVentasSimpleSerializer(ventas, many=True)
+        filas = HISTORIAL_VENTAS_RAPIDO.consulta(self.get_queryset())[:limit]
+        ventas = HISTORIAL_VENTAS_RAPIDO.convertir(filas)
         
         return Response({
             "total": len(ventas),
-            "ventas": serializer.data
+            "ventas": ventas
         })
     
     @action(detail=True, methods=['post'], url_path='actualizar_estado')
@@ -395,18 +401,37 @@ class ListadoHistoricoVentasViewSet(viewsets.ModelViewSet):
         Parámetro opcional:
         - limit: Cantidad de clientes a retornar (por defecto 10)
         
+        Se lee de la tabla precalculada de métricas RFM (índice por monto total).
         Ejemplo: /api/transacciones/historial-ventas/top_clientes/?limit=5
         """
         from django.db.models import Count, Sum
+        from analitica.models import MetricaCliente
+        from analitica.utils.rfm import tabla_completa
         
         limit = int(request.query_params.get('limit', 10))
         
-        top_clientes = ListadoHistoricoVentas.objects.values(
-            'cliente_ci', 'cliente_nombre'
-        ).annotate(
-            total_compras=Count('nota_venta'),
-            total_gastado=Sum('total')
-        ).order_by('-total_gastado')[:limit]
+        # Antes del primer recálculo la tabla solo tiene a quienes pagaron desde entonces
+        if tabla_completa():
+            metricas = MetricaCliente.objects.select_related('cliente').order_by('-monto_total')[:limit]
+            top_clientes = [
+                {
+                    'cliente_id': metrica.cliente_id,
+                    'cliente_ci': metrica.cliente.ci or 'SIN-CI',
+                    'cliente_nombre': f"{metrica.cliente.nombre} {metrica.cliente.apellido or ''}".strip(),
+                    'total_compras': metrica.frecuencia,
+                    'total_gastado': metrica.monto_total,
+                    'segmento': metrica.segmento,
+                }
+                for metrica in metricas
+            ]
+        else:
+            # Tabla aún no recalculada completa (`recalcular_rfm`): agrupar el histórico
+            top_clientes = ListadoHistoricoVentas.objects.values(
+                'cliente_ci', 'cliente_nombre'
+            ).annotate(
+                total_compras=Count('nota_venta'),
+                total_gastado=Sum('total')
+            ).order_by('-total_gastado')[:limit]
         
         return Response({
             "top_clientes": list(top_clientes)
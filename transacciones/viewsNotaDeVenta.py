@@ -5,18 +5,24 @@ from rest_framework.permissions import AllowAny
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 from transacciones.modelsNotaDeVenta import NotaDeVenta
-from transacciones.serializers.serializersNotaDeVenta import NotaDeVentaSerializer, NotaDeVentaSimpleSerializer
+from backend_exa2.campos import ConsultaCamposMixin
+from backend_exa2.serializacion import ListadoRapidoMixin
+from transacciones.serializers.serializersNotaDeVenta import (
+    NOTA_DE_VENTA_RAPIDO, NotaDeVentaSerializer, NotaDeVentaSimpleSerializer
+)
 
 
 @method_decorator(csrf_exempt, name='dispatch')
-class NotaDeVentaViewSet(viewsets.ModelViewSet):
+class NotaDeVentaViewSet(ListadoRapidoMixin, ConsultaCamposMixin, viewsets.ModelViewSet):
     """
     ViewSet para gestionar las notas de venta.
     Proporciona operaciones CRUD completas para notas de venta con sus detalles.
     """
     queryset = NotaDeVenta.objects.all()
     serializer_class = NotaDeVentaSerializer
+    serializador_rapido = NOTA_DE_VENTA_RAPIDO
     permission_classes = [AllowAny]
+    ordering_cursor = ['-fecha', '-pk']  # Paginación por cursor (índice fecha, id)
 
     def get_serializer_class(self):
         """Usa NotaDeVentaSimpleSerializer para listados, NotaDeVentaSerializer para detalle"""
@@ -24,6 +30,13 @@ class NotaDeVentaViewSet(viewsets.ModelViewSet):
             return NotaDeVentaSimpleSerializer
         return NotaDeVentaSerializer
 
+    def get_queryset(self):
+        """El cliente en la misma consulta; el detalle trae sus productos con prefetch"""
+        queryset = super().get_queryset().select_related('cliente')
+        if self.action == 'retrieve':
+            queryset = queryset.prefetch_related('detalles__producto')
+        return queryset
+
     def create(self, request, *args, **kwargs):
         """
         Crear una nueva nota de venta.
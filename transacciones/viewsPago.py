@@ -1,3 +1,4 @@
+import logging
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
@@ -5,6 +6,9 @@ from rest_framework.permissions import AllowAny
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 from django.conf import settings
+from backend_exa2.campos import ConsultaCamposMixin
+from backend_exa2.http_asincrono import cliente_http
+from backend_exa2.instrumentacion import medir
 from transacciones.modelsPago import Pago
 from transacciones.modelsNotaDeVenta import NotaDeVenta
 from transacciones.serializers.serializersPago import (
@@ -13,16 +17,140 @@ from transacciones.serializers.serializersPago import (
     PagoCreateSerializer
 )
 from inventario.modelsCarrito import Carrito
-import stripe
 import uuid
 from datetime import datetime
 
-# Configurar Stripe con la clave secreta
-stripe.api_key = settings.STRIPE_SECRET_KEY
+logger = logging.getLogger(__name__)
+
+
+_http_stripe = None
+
+
+def cliente_stripe():
+    """
+    SDK de Stripe con la clave secreta configurada. Se importa en el primer
+    pago y no al cargar las vistas: solo el import tarda ~1 s en el arranque
+    de cada worker.
+
+    Las llamadas síncronas siguen yendo por requests; las *_async (vistas de
+    viewsPagoAsincrono) por el cliente HTTP async compartido.
+    """
+    global _http_stripe
+    import stripe
+    stripe.api_key = settings.STRIPE_SECRET_KEY
+    if _http_stripe is None:
+        _http_stripe = stripe.RequestsClient(
+            verify_ssl_certs=stripe.verify_ssl_certs,
+            proxy=stripe.proxy,
+            async_fallback_client=_clase_httpx_compartido(stripe)(verify_ssl_certs=stripe.verify_ssl_certs),
+        )
+        stripe.default_http_client = _http_stripe
+    return stripe
+
+
+def _clase_httpx_compartido(stripe):
+    """HTTPXClient de Stripe que usa el pool de backend_exa2.http_asincrono en vez de uno propio"""
+
+    class HTTPXCompartido(stripe.HTTPXClient):
+
+        async def request_async(self, method, url, headers, post_data=None):
+            try:
+                response = await cliente_http().request(
+                    method, url, headers=headers, content=post_data, timeout=self._timeout
+                )
+            except Exception as e:
+                self._handle_request_error(e)
+            return response.content, response.status_code, response.headers
+
+    return HTTPXCompartido
+
+
+class ErrorPago(Exception):
+    """Un paso del pago que termina en una respuesta de error (cuerpo y estado HTTP)"""
+
+    def __init__(self, cuerpo, estado):
+        super().__init__(cuerpo.get('error'))
+        self.cuerpo = cuerpo
+        self.estado = estado
+
+
+def preparar_payment_intent(carrito_id):
+    """
+    Valida el carrito y arma los argumentos de stripe.PaymentIntent.create.
+
+    Returns:
+        tuple: (argumentos para Stripe, total del carrito)
+
+    Raises:
+        ErrorPago: sin carrito_id, el carrito no existe o está vacío
+    """
+    if not carrito_id:
+        raise ErrorPago({"error": "Se requiere carrito_id"}, status.HTTP_400_BAD_REQUEST)
+
+    try:
+        carrito = Carrito.objects.select_related('cliente').get(id=carrito_id)
+    except Carrito.DoesNotExist:
+        raise ErrorPago({"error": f"No existe el carrito con ID {carrito_id}"}, status.HTTP_404_NOT_FOUND)
+
+    # Verificar que el carrito tenga items
+    if carrito.detalles.count() == 0:
+        raise ErrorPago({"error": "El carrito está vacío"}, status.HTTP_400_BAD_REQUEST)
+
+    total = carrito.total_carrito
+    argumentos = {
+        # Convertir el monto a centavos (Stripe trabaja en centavos)
+        'amount': int(float(total) * 100),
+        'currency': 'usd',  # Stripe no soporta BOB directamente, usar USD
+        'automatic_payment_methods': {
+            'enabled': True,
+        },
+        'metadata': {
+            'carrito_id': carrito_id,
+            'cliente_id': carrito.cliente.id if carrito.cliente else None,
+            'cliente_nombre': f"{carrito.cliente.nombre} {carrito.cliente.apellido}" if carrito.cliente else "N/A",
+        },
+    }
+    return argumentos, total
+
+
+def respuesta_payment_intent(payment_intent, argumentos, total, carrito_id):
+    """Cuerpo de la respuesta de create-payment-intent (clientSecret para el frontend)"""
+    return {
+        "clientSecret": payment_intent.client_secret,
+        "paymentIntentId": payment_intent.id,
+        "amount": float(total),
+        "amount_cents": argumentos['amount'],
+        "currency": "usd",
+        "carrito_id": carrito_id
+    }
+
+
+def resultado_pago(payment_intent, payment_intent_id, mensaje, **extra):
+    """
+    Verifica que el pago fue exitoso.
+
+    Returns:
+        tuple: (cuerpo de la respuesta, estado HTTP)
+    """
+    if payment_intent.status != 'succeeded':
+        return {
+            "success": False,
+            "message": f"El pago no fue exitoso. Estado: {payment_intent.status}",
+            "status": payment_intent.status
+        }, status.HTTP_400_BAD_REQUEST
+
+    return {
+        "success": True,
+        "message": mensaje,
+        "payment_intent_id": payment_intent_id,
+        "status": payment_intent.status,
+        "amount_received": payment_intent.amount_received / 100,  # Convertir de centavos
+        **extra
+    }, status.HTTP_200_OK
 
 
 @method_decorator(csrf_exempt, name='dispatch')
-class PagoViewSet(viewsets.ModelViewSet):
+class PagoViewSet(ConsultaCamposMixin, viewsets.ModelViewSet):
     """
     ViewSet para gestionar los pagos con Stripe.
     Proporciona operaciones CRUD para pagos asociados a notas de venta.
@@ -75,55 +203,22 @@ class PagoViewSet(viewsets.ModelViewSet):
         Retorna: clientSecret para el frontend
         """
         carrito_id = request.data.get('carrito_id')
-        
-        if not carrito_id:
-            return Response(
-                {"error": "Se requiere carrito_id"},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
         try:
-            carrito = Carrito.objects.get(id=carrito_id)
-        except Carrito.DoesNotExist:
-            return Response(
-                {"error": f"No existe el carrito con ID {carrito_id}"},
-                status=status.HTTP_404_NOT_FOUND
-            )
-        
-        # Verificar que el carrito tenga items
-        if carrito.detalles.count() == 0:
-            return Response(
-                {"error": "El carrito está vacío"},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+            argumentos, total = preparar_payment_intent(carrito_id)
+        except ErrorPago as e:
+            return Response(e.cuerpo, status=e.estado)
         
+        stripe = cliente_stripe()
         try:
             # Crear Payment Intent REAL con Stripe
-            # Convertir el monto a centavos (Stripe trabaja en centavos)
-            amount_in_cents = int(float(carrito.total_carrito) * 100)
+            with medir('stripe'):
+                payment_intent = stripe.PaymentIntent.create(**argumentos)
             
-            payment_intent = stripe.PaymentIntent.create(
-                amount=amount_in_cents,
-                currency='usd',  # Stripe no soporta BOB directamente, usar USD
-                automatic_payment_methods={
-                    'enabled': True,
-                },
-                metadata={
-                    'carrito_id': carrito_id,
-                    'cliente_id': carrito.cliente.id if carrito.cliente else None,
-                    'cliente_nombre': f"{carrito.cliente.nombre} {carrito.cliente.apellido}" if carrito.cliente else "N/A",
-                }
+            return Response(
+                respuesta_payment_intent(payment_intent, argumentos, total, carrito_id),
+                status=status.HTTP_200_OK
             )
             
-            return Response({
-                "clientSecret": payment_intent.client_secret,
-                "paymentIntentId": payment_intent.id,
-                "amount": float(carrito.total_carrito),
-                "amount_cents": amount_in_cents,
-                "currency": "usd",
-                "carrito_id": carrito_id
-            }, status=status.HTTP_200_OK)
-            
         except stripe.error.StripeError as e:
             return Response(
                 {"error": f"Error de Stripe: {str(e)}"},
@@ -151,26 +246,15 @@ class PagoViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
+        stripe = cliente_stripe()
         try:
             # Verificar el pago con Stripe
-            payment_intent = stripe.PaymentIntent.retrieve(payment_intent_id)
+            with medir('stripe'):
+                payment_intent = stripe.PaymentIntent.retrieve(payment_intent_id)
             
             # Verificar que el pago fue exitoso
-            if payment_intent.status != 'succeeded':
-                return Response({
-                    "success": False,
-                    "message": f"El pago no fue exitoso. Estado: {payment_intent.status}",
-                    "status": payment_intent.status
-                }, status=status.HTTP_400_BAD_REQUEST)
-            
-            # Pago exitoso - retornar confirmación
-            return Response({
-                "success": True,
-                "message": "Pago confirmado exitosamente",
-                "payment_intent_id": payment_intent_id,
-                "status": payment_intent.status,
-                "amount_received": payment_intent.amount_received / 100,  # Convertir de centavos
-            }, status=status.HTTP_200_OK)
+            cuerpo, estado = resultado_pago(payment_intent, payment_intent_id, "Pago confirmado exitosamente")
+            return Response(cuerpo, status=estado)
             
         except stripe.error.StripeError as e:
             return Response(
@@ -198,9 +282,11 @@ class PagoViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
+        stripe = cliente_stripe()
         try:
             # Obtener el Payment Intent de Stripe
-            payment_intent = stripe.PaymentIntent.retrieve(payment_intent_id)
+            with medir('stripe'):
+                payment_intent = stripe.PaymentIntent.retrieve(payment_intent_id)
             
             # Obtener carrito_id de los metadata
             carrito_id = payment_intent.metadata.get('carrito_id')
@@ -221,28 +307,17 @@ class PagoViewSet(viewsets.ModelViewSet):
             
             # Si el pago aún está pendiente, confirmarlo automáticamente (modo test)
             if payment_intent.status == 'requires_confirmation':
-                payment_intent = stripe.PaymentIntent.confirm(payment_intent_id)
+                with medir('stripe'):
+                    payment_intent = stripe.PaymentIntent.confirm(payment_intent_id)
             
             # Verificar que el pago fue exitoso
-            if payment_intent.status != 'succeeded':
-                return Response({
-                    "success": False,
-                    "message": f"El pago no fue exitoso. Estado: {payment_intent.status}",
-                    "status": payment_intent.status
-                }, status=status.HTTP_400_BAD_REQUEST)
-            
             # Pago exitoso - Crear nota de venta si no existe
             # Aquí deberías crear la nota de venta y registrar el pago
             # Por ahora solo confirmamos el pago
-            
-            return Response({
-                "success": True,
-                "message": "Pago confirmado y procesado exitosamente",
-                "payment_intent_id": payment_intent_id,
-                "status": payment_intent.status,
-                "amount_received": payment_intent.amount_received / 100,
-                "carrito_id": carrito_id
-            }, status=status.HTTP_200_OK)
+            cuerpo, estado = resultado_pago(
+                payment_intent, payment_intent_id, "Pago confirmado y procesado exitosamente", carrito_id=carrito_id
+            )
+            return Response(cuerpo, status=estado)
             
         except stripe.error.StripeError as e:
             return Response(
@@ -318,7 +393,7 @@ class PagoViewSet(viewsets.ModelViewSet):
             # 🔔 ENVIAR NOTIFICACIÓN A ADMINISTRADORES
             try:
                 from django.contrib.auth.models import User
-                from perfiles.fcm_service import send_push_to_user
+                from perfiles.fcm_service import send_push_to_users
                 
                 # Obtener información del cliente y productos
                 cliente = nota_venta.cliente
@@ -343,27 +418,26 @@ class PagoViewSet(viewsets.ModelViewSet):
                 titulo = "💰 Nueva venta realizada"
                 cuerpo = f"{cliente_nombre} realizó una compra de {producto_texto} por un valor de Bs. {float(nota_venta.total):.2f}"
                 
-                # Enviar notificación a todos los administradores
+                # Enviar notificación a todos los administradores (a la vez)
                 admins = User.objects.filter(is_staff=True, is_active=True)
-                for admin in admins:
-                    send_push_to_user(
-                        user=admin,
-                        title=titulo,
-                        body=cuerpo,
-                        data={
-                            'type': 'nueva_venta',
-                            'nota_venta_id': str(nota_venta.id),
-                            'historial_venta_id': str(nota_venta.historial_venta.id) if hasattr(nota_venta, 'historial_venta') else None,
-                            'screen': '/historial-ventas',
-                            'cliente_nombre': cliente_nombre,
-                            'total': str(nota_venta.total)
-                        }
-                    )
-                    print(f"📱 Notificación enviada al admin: {admin.username}")
+                send_push_to_users(
+                    users=admins,
+                    title=titulo,
+                    body=cuerpo,
+                    data={
+                        'type': 'nueva_venta',
+                        'nota_venta_id': str(nota_venta.id),
+                        'historial_venta_id': str(nota_venta.historial_venta.id) if hasattr(nota_venta, 'historial_venta') else None,
+                        'screen': '/historial-ventas',
+                        'cliente_nombre': cliente_nombre,
+                        'total': str(nota_venta.total)
+                    }
+                )
+                logger.info("📱 Notificación de venta enviada a los administradores")
                     
             except Exception as e:
                 # No fallar el pago si la notificación falla
-                print(f"⚠️ Error enviando notificación: {str(e)}")
+                logger.warning(f"⚠️ Error enviando notificación: {str(e)}")
             
             return Response(
                 {
@@ -0,0 +1,153 @@
+"""
+Vistas async de los pagos con Stripe para el despliegue ASGI (settings.VISTAS_ASINCRONAS).
+
+Mismas rutas, cuerpos y respuestas que las acciones create-payment-intent,
+confirm-payment y confirm-payment-auto de PagoViewSet, pero mientras esperan a
+Stripe (PaymentIntent.*_async por el cliente HTTP compartido) el worker sigue
+atendiendo otros requests. Las consultas a la base de datos se hacen con el ORM
+async o en un hilo (sync_to_async).
+
+/api/batch/ ejecuta sus sub-requests con vistas síncronas: cada vista de aquí
+indica en `vista_sincrona` la acción equivalente de PagoViewSet.
+"""
+import json
+from functools import wraps
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from rest_framework import status
+from backend_exa2.instrumentacion import medir
+from inventario.modelsCarrito import Carrito
+from transacciones.viewsPago import (
+    ErrorPago,
+    PagoViewSet,
+    cliente_stripe,
+    preparar_payment_intent,
+    respuesta_payment_intent,
+    resultado_pago,
+)
+
+
+def _datos(request):
+    """El cuerpo del request como request.data de DRF (JSON o formulario)"""
+    if request.content_type == 'application/json':
+        return json.loads(request.body or b'{}')
+    return request.POST
+
+
+def vista_pago(accion):
+    """
+    Vista async de la acción `accion` de PagoViewSet: solo POST y sin CSRF (como
+    el ViewSet), recibe el cuerpo ya leído y deja la acción en `vista_sincrona`
+    """
+    def decorador(vista):
+        @wraps(vista)
+        async def envoltura(request):
+            try:
+                datos = _datos(request)
+            except ValueError:
+                return JsonResponse({"error": "El cuerpo no es un JSON válido"}, status=status.HTTP_400_BAD_REQUEST)
+            return await vista(request, datos)
+
+        envoltura = csrf_exempt(require_POST(envoltura))
+        envoltura.vista_sincrona = PagoViewSet.as_view({'post': accion}, basename='pago', detail=False)
+        return envoltura
+    return decorador
+
+
+@vista_pago('create_payment_intent')
+async def create_payment_intent(request, datos):
+    """
+    Crear una intención de pago REAL con Stripe.
+    Recibe: carrito_id
+    Retorna: clientSecret para el frontend
+    """
+    carrito_id = datos.get('carrito_id')
+    try:
+        argumentos, total = await sync_to_async(preparar_payment_intent)(carrito_id)
+    except ErrorPago as e:
+        return JsonResponse(e.cuerpo, status=e.estado)
+
+    stripe = cliente_stripe()
+    try:
+        with medir('stripe'):
+            payment_intent = await stripe.PaymentIntent.create_async(**argumentos)
+        return JsonResponse(respuesta_payment_intent(payment_intent, argumentos, total, carrito_id))
+
+    except stripe.error.StripeError as e:
+        return JsonResponse({"error": f"Error de Stripe: {str(e)}"}, status=status.HTTP_400_BAD_REQUEST)
+    except Exception as e:
+        return JsonResponse(
+            {"error": f"Error al crear payment intent: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+@vista_pago('confirm_payment')
+async def confirm_payment(request, datos):
+    """
+    Confirmar el pago después de procesarlo con Stripe.
+    Recibe: payment_intent_id, carrito_id
+    """
+    payment_intent_id = datos.get('payment_intent_id')
+    if not payment_intent_id:
+        return JsonResponse({"error": "Se requiere payment_intent_id"}, status=status.HTTP_400_BAD_REQUEST)
+
+    stripe = cliente_stripe()
+    try:
+        with medir('stripe'):
+            payment_intent = await stripe.PaymentIntent.retrieve_async(payment_intent_id)
+        cuerpo, estado = resultado_pago(payment_intent, payment_intent_id, "Pago confirmado exitosamente")
+        return JsonResponse(cuerpo, status=estado)
+
+    except stripe.error.StripeError as e:
+        return JsonResponse(
+            {"error": f"Error al verificar pago con Stripe: {str(e)}"}, status=status.HTTP_400_BAD_REQUEST
+        )
+    except Exception as e:
+        return JsonResponse(
+            {"error": f"Error al confirmar pago: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+@vista_pago('confirm_payment_auto')
+async def confirm_payment_auto(request, datos):
+    """
+    Confirmar pago automáticamente para apps móviles (modo prueba).
+    Recibe: payment_intent_id
+    """
+    payment_intent_id = datos.get('payment_intent_id')
+    if not payment_intent_id:
+        return JsonResponse({"error": "Se requiere payment_intent_id"}, status=status.HTTP_400_BAD_REQUEST)
+
+    stripe = cliente_stripe()
+    try:
+        with medir('stripe'):
+            payment_intent = await stripe.PaymentIntent.retrieve_async(payment_intent_id)
+
+        carrito_id = payment_intent.metadata.get('carrito_id')
+        if not carrito_id:
+            return JsonResponse(
+                {"error": "No se encontró carrito_id en los metadatos del pago"}, status=status.HTTP_400_BAD_REQUEST
+            )
+        if not await Carrito.objects.filter(id=carrito_id).aexists():
+            return JsonResponse(
+                {"error": f"No existe el carrito con ID {carrito_id}"}, status=status.HTTP_404_NOT_FOUND
+            )
+
+        # Si el pago aún está pendiente, confirmarlo automáticamente (modo test)
+        if payment_intent.status == 'requires_confirmation':
+            with medir('stripe'):
+                payment_intent = await stripe.PaymentIntent.confirm_async(payment_intent_id)
+
+        cuerpo, estado = resultado_pago(
+            payment_intent, payment_intent_id, "Pago confirmado y procesado exitosamente", carrito_id=carrito_id
+        )
+        return JsonResponse(cuerpo, status=estado)
+
+    except stripe.error.StripeError as e:
+        return JsonResponse({"error": f"Error de Stripe: {str(e)}"}, status=status.HTTP_400_BAD_REQUEST)
+    except Exception as e:
+        return JsonResponse(
+            {"error": f"Error al confirmar pago: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )